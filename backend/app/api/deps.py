@@ -1,17 +1,33 @@
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional
 
 from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
-from app.dbmodels import Client, Project, ProjectMember, User, UserRole
+from app.db.replica import reads_from_primary
+from app.db.session import (
+    AsyncReplicaSessionLocal,
+    AsyncSessionLocal,
+    ReplicaSessionLocal,
+    SessionLocal,
+)
+from app.dbmodels import Client, ProjectMember, User
 from app.schemas.user import TokenPayload
-from fastapi import Depends, Header, HTTPException, status
+from app.services.auth_context import ADMIN_ROLES, AuthContext
+from app.services.principal_cache import (
+    client_principal_cache,
+    credential_key,
+    user_principal_cache,
+)
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token")
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token", auto_error=False
+)
 
 
 def get_db() -> Generator:
@@ -27,16 +43,76 @@ def get_db() -> Generator:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async session for `async def` routes, so database I/O does not hold a
+    threadpool thread. Attributes stay loaded after commit; anything lazy must
+    be loaded inside the session (e.g. through ``AsyncSession.run_sync``).
+    """
+    if AsyncSessionLocal is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Async database access is not configured.",
+        )
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db(request: Request) -> Generator:
+    """
+    Session for read-only endpoints: the read replica when one is configured,
+    the primary for clients that wrote recently (read-your-writes, see app.db.replica).
+    Authentication still goes through get_db.
+    """
+    if ReplicaSessionLocal is None or reads_from_primary(request):
+        yield from get_db()
+        return
+    try:
+        db = ReplicaSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Async counterpart of get_read_db."""
+    if AsyncReplicaSessionLocal is None or reads_from_primary(request):
+        async for db in get_async_db():
+            yield db
+        return
+    async with AsyncReplicaSessionLocal() as db:
+        yield db
+
+
+def _load_user_for_token(db: Session, token: str) -> Optional[User]:
+    """
+    Resolve an access token to its user, through the principal cache.
+
+    Raises JWTError/ValidationError for an invalid token; returns None when the
+    user no longer exists.
+    """
+    key = credential_key(token)
+    user = user_principal_cache.get(db, key, User)
+    if user is not None:
+        return user
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+    token_data = TokenPayload(**payload)
+    generation = user_principal_cache.generation()
+    user = db.query(User).filter(User.id == token_data.sub).first()
+    if user is not None:
+        user_principal_cache.set(key, user, expires_at=payload.get("exp"), generation=generation)
+    return user
+
+
 def get_current_user(db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)) -> User:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
-        token_data = TokenPayload(**payload)
+        user = _load_user_for_token(db, token)
     except (JWTError, ValidationError) as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,  # CHANGED FROM 403 TO 401
             detail="Could not validate credentials",
         ) from exc
-    user = db.query(User).filter(User.id == token_data.sub).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     # Access attributes while session is still active to prevent DetachedInstanceError
@@ -47,19 +123,12 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(reusabl
 
 def get_current_user_optional(
     db: Session = Depends(get_db),
-    token: str = Depends(
-        OAuth2PasswordBearer(
-            tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token", auto_error=False
-        )
-    ),
+    token: str = Depends(optional_oauth2),
 ) -> Optional[User]:
     if not token:
         return None
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
-        token_data = TokenPayload(**payload)
-        user = db.query(User).filter(User.id == token_data.sub).first()
-        return user
+        return _load_user_for_token(db, token)
     except (JWTError, ValidationError):
         return None
 
@@ -71,75 +140,37 @@ def get_current_active_admin(
     Verify the current user has admin privileges.
     Admin roles: ADMIN, PROJECTMANAGER
     """
-    admin_roles = {UserRole.ADMIN, UserRole.PROJECTMANAGER}
-    if current_user.role not in admin_roles:
+    if current_user.role not in ADMIN_ROLES:
         raise HTTPException(status_code=403, detail="The user doesn't have enough privileges")
     return current_user
 
 
 def is_admin_user(user: User) -> bool:
     """Helper function to check if a user has admin privileges."""
-    return user.role in {UserRole.ADMIN, UserRole.PROJECTMANAGER}
+    return user.role in ADMIN_ROLES
+
+
+def get_auth_context(
+    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+) -> AuthContext:
+    """Authorization context of the current user, shared by everything in the request."""
+    return AuthContext(db, current_user)
 
 
 # ==================================================get the current memebr of a project==========================
 def get_current_project_member(
-    project_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    project_id: int, auth: AuthContext = Depends(get_auth_context)
 ) -> ProjectMember:
-    """Helper function to check if the current user is a member of the project and get that member."""
-    # first we need to check if the project exists if not we return an error
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="This Project does not exist")
-    # then we need to check if the current user is a member of the project
-    # if it does exist if not we return an error
-    member = (
-        db.query(ProjectMember)
-        .filter(ProjectMember.project_id == project_id, ProjectMember.user_id == current_user.id)
-        .first()
-    )
-    if not member:
-        raise HTTPException(status_code=403, detail="You are not a member of this project")
-    # then we return the member
-    return member
+    """Get the current user's membership of the project (404 if no project, 403 if not a member)."""
+    return auth.require_member(project_id)
 
 
 # ==================================================get the current admin of a project==========================
 def get_current_project_admin(
-    project_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    project_id: int, auth: AuthContext = Depends(get_auth_context)
 ) -> ProjectMember:
-    """Helper function to check if the current user is an admin or project manager of the project."""
-
-    # we need to check if the project exists if not we return an error
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="This Project does not exist")
-
-    # then we check if the current user is an admin of the project
-    # if not we check if they are a project manager
-    admin = (
-        db.query(ProjectMember)
-        .filter(
-            ProjectMember.project_id == project_id,
-            ProjectMember.user_id == current_user.id,
-            ProjectMember.role == UserRole.ADMIN.value,
-        )
-        .first()
-    )
-    if admin:
-        return admin
-
-    # then we check if the current user is a project manager(member)
-    # of the project if not we return an error
-    member = get_current_project_member(project_id, current_user, db)
-    # then we check if the member has project manager role
-    if member.role == UserRole.PROJECTMANAGER.value:
-        return member
-
-    # if neither admin nor project manager we return an error
-    raise HTTPException(
-        status_code=403, detail="You must be an admin or a project manager of this project"
-    )
+    """Get the current user's membership if they are an admin or project manager of the project."""
+    return auth.require_project_admin(project_id)
 
 
 # Matches PM mental model - user-based authentication
@@ -176,10 +207,17 @@ def get_current_client_by_token(
             detail="Missing client token",
         )
 
+    key = credential_key(x_client_token)
+    client = client_principal_cache.get(db, key, Client)
+    if client is not None:
+        return client
+
+    generation = client_principal_cache.generation()
     client = db.query(Client).filter(Client.api_key == x_client_token).first()
     if not client:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid client token",
         )
+    client_principal_cache.set(key, client, generation=generation)
     return client
@@ -1,6 +1,12 @@
 from app.api import deps
+from app.core.password_pool import password_hasher
+from app.db.pool_monitor import pool_monitor
 from app.dbmodels import User
+from app.services.attachment_blob import AttachmentBlobService
+from app.services.author_resolver import author_cache
+from app.services.principal_cache import principal_cache_stats
 from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
 
 router = APIRouter()
 
@@ -19,3 +25,66 @@ def admin_dashboard(
         "user_id": current_user.id,
         "role": current_user.role.value,
     }
+
+
+@router.get("/author-cache")
+def author_cache_stats(
+    _current_user: User = Depends(deps.get_current_active_admin),
+):
+    """
+    Get hit/miss counters of the commit author email cache (this process only).
+
+    Requires admin privileges (ADMIN or PROJECTMANAGER role).
+    """
+    return author_cache.stats()
+
+
+@router.get("/principal-cache")
+def principal_cache_stats_endpoint(
+    _current_user: User = Depends(deps.get_current_active_admin),
+):
+    """
+    Get hit-rate counters of the authenticated user/client cache (this process only).
+
+    Requires admin privileges (ADMIN or PROJECTMANAGER role).
+    """
+    return principal_cache_stats()
+
+
+@router.get("/password-hasher")
+def password_hasher_stats(
+    _current_user: User = Depends(deps.get_current_active_admin),
+):
+    """
+    Get load counters of the password hashing pool (this process only).
+
+    Requires admin privileges (ADMIN or PROJECTMANAGER role).
+    """
+    return password_hasher.stats()
+
+
+@router.get("/db-pool")
+def db_pool_stats(
+    _current_user: User = Depends(deps.get_current_active_admin),
+):
+    """
+    Get connection pool usage (this process only): checked-out and overflow
+    connections per engine, checkout wait times, who holds connections right now,
+    recent long-held checkouts and the routes/workers holding connections longest.
+
+    Requires admin privileges (ADMIN or PROJECTMANAGER role).
+    """
+    return pool_monitor.stats()
+
+
+@router.get("/attachment-storage")
+def attachment_storage_stats(
+    db: Session = Depends(deps.get_db),
+    _current_user: User = Depends(deps.get_current_active_admin),
+):
+    """
+    Get attachment deduplication statistics (logical vs stored bytes, dedup ratio).
+
+    Requires admin privileges (ADMIN or PROJECTMANAGER role).
+    """
+    return AttachmentBlobService.get_stats(db)
@@ -1,9 +1,17 @@
+from typing import List, Optional
+
 from app.api import deps
 from app.dbmodels import Client
-from app.schemas.project import ClientPortalProject, ProjectProgress
+from app.schemas.project import ActivityItem, ClientPortalProject, ProjectProgress
+from app.schemas.task_timeline import ActivityType
+from app.services import project_activity
 from app.services.project import ProjectService
+from app.services.resource_version import ResourceVersionService
+from app.utils.conditional import not_modified_response
 from app.utils.logger import get_logger
-from fastapi import APIRouter, Depends, Query
+from app.utils.pagination import PageParams, page_params, set_page_headers
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 logger = get_logger(__name__)
@@ -13,7 +21,7 @@ router = APIRouter()
 @router.get("/projects/{id}", response_model=ClientPortalProject)
 def get_client_portal_project(
     id: int,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     client: Client = Depends(deps.get_current_client_by_token),
 ):
     """
@@ -23,20 +31,55 @@ def get_client_portal_project(
 
 
 @router.get("/projects/{project_id}/progress", response_model=ProjectProgress)
-def get_project_progress_route(
+async def get_project_progress_route(
+    request: Request,
+    response: Response,
     project_id: int,
     activity_limit: int = Query(
         10, ge=1, le=50, description="Maximum number of recent activity items to return"
     ),
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_read_db),
     client: Client = Depends(deps.get_current_client),
 ):
     """
     Get project progress for a client (user-based authentication).
+
+    Conditional: If-None-Match with the last ETag answers 304 when nothing changed.
     """
-    return ProjectService.get_project_progress(
+    version = await ResourceVersionService.get_project_version_async(db, project_id)
+    # Unknown or foreign projects fall through to the service, which raises
+    if version is not None and version.client_id == client.id:
+        not_modified = not_modified_response(
+            request, response, version.version, version.last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+    return await ProjectService.get_project_progress_async(
         db=db,
         project_id=project_id,
         client=client,
         activity_limit=activity_limit,
     )
+
+
+@router.get("/projects/{project_id}/activity", response_model=List[ActivityItem])
+def get_project_activity_route(
+    response: Response,
+    project_id: int,
+    types: Optional[List[ActivityType]] = Query(
+        None, description="Only return these activity types (repeatable)"
+    ),
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(deps.get_read_db),
+    client: Client = Depends(deps.get_current_client),
+):
+    """
+    Get the activity feed of a client's project, newest first.
+
+    Shows logged hours, commits, task creation and status changes, without
+    their details. Follow the X-Next-Cursor header with `cursor`.
+    """
+    result = project_activity.get_client_project_activity(db, project_id, client, page, types)
+    set_page_headers(response, result)
+    return result.items
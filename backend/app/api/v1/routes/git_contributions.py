@@ -1,15 +1,16 @@
 # pylint: disable=unused-argument
 from typing import List, Optional
 
-from app.api.deps import get_current_user, get_db, is_admin_user
-from app.dbmodels import User
+from app.api.deps import get_auth_context, get_db
 from app.schemas.git_contribution import (
     GitContribution,
     GitContributionCreate,
     GitContributionUpdate,
 )
+from app.services.auth_context import AuthContext
 from app.services.git_contribution import GitContributionService
-from fastapi import APIRouter, Depends, Query, status
+from app.utils.pagination import PageParams, page_params, set_page_headers
+from fastapi import APIRouter, Depends, Query, Response, status
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -19,7 +20,7 @@ router = APIRouter()
 def create_contribution(
     contribution_in: GitContributionCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    auth: AuthContext = Depends(get_auth_context),
 ):
     """
     Create a new git contribution.
@@ -29,20 +30,18 @@ def create_contribution(
     - Same commit hash cannot be linked twice to the same project
     - If task_id is provided, task must belong to the project
     """
-    is_admin = is_admin_user(current_user)
-
-    return GitContributionService.create_contribution(
-        db, contribution_in, current_user.id, is_admin
-    )
+    return GitContributionService.create_contribution(db, contribution_in, auth)
 
 
 @router.get("/", response_model=List[GitContribution])
 def list_contributions(
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    auth: AuthContext = Depends(get_auth_context),
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     project_id: Optional[int] = Query(None, description="Filter by project ID"),
     provider: Optional[str] = Query(None, description="Filter by provider (e.g., github, gitlab)"),
+    page: PageParams = Depends(page_params),
 ):
     """
     List git contributions with optional filters.
@@ -51,24 +50,26 @@ def list_contributions(
     - Admins can view all contributions
     - Regular users can only view contributions from projects they are members of
     - Filters are combinable: user_id, project_id, provider
+    - Newest first; follow the X-Next-Cursor/X-Prev-Cursor headers with `cursor`
+    - `include_total=true` returns the number of matches in the X-Total-Count header
     """
-    is_admin = is_admin_user(current_user)
-
-    return GitContributionService.list_contributions(
+    result = GitContributionService.list_contributions(
         db,
-        current_user.id,
-        is_admin=is_admin,
+        auth,
+        page,
         user_id=user_id,
         project_id=project_id,
         provider=provider,
     )
+    set_page_headers(response, result)
+    return result.items
 
 
 @router.get("/{contribution_id}", response_model=GitContribution)
 def get_contribution(
     contribution_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    auth: AuthContext = Depends(get_auth_context),
 ):
     """
     Get a git contribution by ID.
@@ -76,9 +77,7 @@ def get_contribution(
     - Authentication required
     - User must be a member of the project (or admin)
     """
-    is_admin = is_admin_user(current_user)
-
-    return GitContributionService.get_contribution(db, contribution_id, current_user.id, is_admin)
+    return GitContributionService.get_contribution(db, contribution_id, auth)
 
 
 @router.put("/{contribution_id}", response_model=GitContribution)
@@ -86,7 +85,7 @@ def update_contribution(
     contribution_id: int,
     contribution_in: GitContributionUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    auth: AuthContext = Depends(get_auth_context),
 ):
     """
     Update a git contribution.
@@ -95,11 +94,7 @@ def update_contribution(
     - Only the contributor or admin can update
     - If updating task_id, task must belong to the contribution's project
     """
-    is_admin = is_admin_user(current_user)
-
-    return GitContributionService.update_contribution(
-        db, contribution_id, contribution_in, current_user.id, is_admin
-    )
+    return GitContributionService.update_contribution(db, contribution_id, contribution_in, auth)
 
 
 @router.patch("/{contribution_id}/link-task", response_model=GitContribution)
@@ -107,7 +102,7 @@ def link_contribution_to_task(
     contribution_id: int,
     task_id: Optional[int] = Query(None, description="Task ID to link (null to unlink)"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    auth: AuthContext = Depends(get_auth_context),
 ):
     """
     Link a contribution to a task.
@@ -116,8 +111,4 @@ def link_contribution_to_task(
     - Only the contributor or admin can link commits
     - Task must belong to the contribution's project
     """
-    is_admin = is_admin_user(current_user)
-
-    return GitContributionService.link_to_task(
-        db, contribution_id, task_id, current_user.id, is_admin
-    )
+    return GitContributionService.link_to_task(db, contribution_id, task_id, auth)
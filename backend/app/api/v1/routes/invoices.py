@@ -2,14 +2,28 @@ import logging
 from typing import List, Optional
 
 from app.api import deps
-from app.dbmodels import Invoice, InvoiceItem, Project, User
+from app.core.config import settings
+from app.dbmodels import Invoice, InvoiceItem, Project
 from app.schemas.invoice import Invoice as InvoiceSchema
-from app.schemas.invoice import InvoiceGenerate, InvoiceUpdate, InvoiceWithItems
+from app.schemas.invoice import (
+    InvoiceBatchGenerate,
+    InvoiceBatchResult,
+    InvoiceGenerate,
+    InvoiceUpdate,
+    InvoiceWithItems,
+)
 from app.services import invoice as invoice_service
-from app.utils.file_upload import get_storage_backend
-from app.utils.pdf_generator import save_invoice_pdf
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
+from app.services.auth_context import AuthContext
+from app.services.invoice_pdf import (
+    compute_snapshot_hash,
+    invoice_pdf_renderer,
+    is_pdf_current,
+    load_invoice_for_pdf,
+)
+from app.utils.file_upload import stream_file_response
+from app.utils.pagination import PageParams, page_params, set_page_headers
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session, joinedload
 
 logger = logging.getLogger(__name__)
@@ -20,7 +34,7 @@ router = APIRouter()
 @router.post("/generate", response_model=InvoiceSchema, status_code=status.HTTP_201_CREATED)
 def generate_invoice(
     invoice_in: InvoiceGenerate,
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
     db: Session = Depends(deps.get_db),
 ):
     """
@@ -30,43 +44,46 @@ def generate_invoice(
     - User must be a project member or admin
     - Billing period must contain logged hours
     - Invoice items snapshot hours and rates at generation time
-    - PDF is generated and stored automatically
+    - PDF is rendered in the background right after generation
     """
     # Generate invoice
-    invoice = invoice_service.generate_invoice(db, invoice_in, current_user)
+    invoice = invoice_service.generate_invoice(db, invoice_in, auth)
 
-    # Load relationships for PDF generation
-    invoice = (
-        db.query(Invoice)
-        .options(
-            joinedload(Invoice.items).joinedload(InvoiceItem.user),
-            joinedload(Invoice.items).joinedload(InvoiceItem.task),
-            joinedload(Invoice.project).joinedload(Project.client),
-        )
-        .filter(Invoice.id == invoice.id)
-        .first()
-    )
-
-    # Generate and save PDF
-    try:
-        pdf_path = save_invoice_pdf(invoice, invoice.project, invoice.project.client)
-        invoice.pdf_path = pdf_path
-        db.commit()
-        db.refresh(invoice)
-    except Exception as e:
-        # Log error but don't fail invoice creation
-        logger.error("Failed to generate PDF for invoice %s: %s", invoice.id, e)
-        # Invoice is still created, PDF can be regenerated later
+    # Render the PDF off the request path; downloads answer 202 until it is ready
+    invoice_pdf_renderer.schedule(invoice.id)
 
     return invoice
 
 
+@router.post("/generate-batch", response_model=InvoiceBatchResult)
+def generate_invoices_batch(
+    batch_in: InvoiceBatchGenerate,
+    auth: AuthContext = Depends(deps.get_auth_context),
+    db: Session = Depends(deps.get_db),
+):
+    """
+    Generate invoices for many projects and billing periods in one call.
+
+    - **Authentication required**
+    - Same rules as /generate, applied per entry (max 500 entries)
+    - Returns one result per entry, in request order; failures do not affect other entries
+    - PDFs are rendered in the background for every created invoice
+    """
+    result = invoice_service.generate_invoices_batch(db, batch_in, auth)
+
+    for item in result.results:
+        if item.success:
+            invoice_pdf_renderer.schedule(item.invoice_id)
+
+    return result
+
+
 @router.get("/", response_model=List[InvoiceSchema])
 def list_invoices(
+    response: Response,
     project_id: Optional[int] = Query(None, description="Filter by project ID"),
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
-    current_user: User = Depends(deps.get_current_user),
+    page: PageParams = Depends(page_params),
+    auth: AuthContext = Depends(deps.get_auth_context),
     db: Session = Depends(deps.get_db),
 ):
     """
@@ -76,16 +93,18 @@ def list_invoices(
     - Users can only see invoices for projects they're members of
     - Admins can see all invoices
     - Can filter by project_id
+    - Newest first; follow the X-Next-Cursor/X-Prev-Cursor headers with `cursor`
+    - `include_total=true` returns the number of matching invoices in X-Total-Count
     """
-    return invoice_service.list_invoices(
-        db=db, current_user=current_user, project_id=project_id, skip=skip, limit=limit
-    )
+    result = invoice_service.list_invoices(db=db, auth=auth, page=page, project_id=project_id)
+    set_page_headers(response, result)
+    return result.items
 
 
 @router.get("/{invoice_id}", response_model=InvoiceWithItems)
 def get_invoice(
     invoice_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
     db: Session = Depends(deps.get_db),
 ):
     """
@@ -95,7 +114,7 @@ def get_invoice(
     - User must be a project member or admin
     - Returns full invoice with all line items
     """
-    invoice = invoice_service.get_invoice(db, invoice_id, current_user)
+    invoice = invoice_service.get_invoice(db, invoice_id, auth)
 
     # Load items with relationships
     invoice = (
@@ -116,7 +135,7 @@ def get_invoice(
 def update_invoice(
     invoice_id: int,
     invoice_update: InvoiceUpdate,
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
     db: Session = Depends(deps.get_db),
 ):
     """
@@ -126,16 +145,20 @@ def update_invoice(
     - **Admin only**
     - Only status can be updated (totals are immutable)
     - Valid statuses: draft, sent, paid, overdue, cancelled
+    - The PDF (which shows the status) is re-rendered in the background
     """
-    return invoice_service.update_invoice_status(
-        db=db, invoice_id=invoice_id, invoice_update=invoice_update, current_user=current_user
+    invoice = invoice_service.update_invoice_status(
+        db=db, invoice_id=invoice_id, invoice_update=invoice_update, auth=auth
     )
+    invoice_pdf_renderer.schedule(invoice.id)
+    return invoice
 
 
 @router.get("/{invoice_id}/pdf")
 def download_invoice_pdf(
     invoice_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    auth: AuthContext = Depends(deps.get_auth_context),
     db: Session = Depends(deps.get_db),
 ):
     """
@@ -143,61 +166,38 @@ def download_invoice_pdf(
 
     - **Authentication required**
     - User must be a project member or admin
-    - Generates PDF if it doesn't exist
-    - Returns PDF file for download
+    - Streams the stored PDF (HTTP Range supported) when it matches the invoice
+    - Otherwise queues a background render and returns 202 with Retry-After
     """
     # Get invoice with access check
-    invoice = invoice_service.get_invoice(db, invoice_id, current_user)
+    invoice_service.get_invoice(db, invoice_id, auth)
 
-    # Load relationships for PDF generation
-    invoice = (
-        db.query(Invoice)
-        .options(
-            joinedload(Invoice.items).joinedload(InvoiceItem.user),
-            joinedload(Invoice.items).joinedload(InvoiceItem.task),
-            joinedload(Invoice.project).joinedload(Project.client),
-        )
-        .filter(Invoice.id == invoice_id)
-        .first()
-    )
+    # Load everything the PDF shows to compare against the stored render
+    invoice = load_invoice_for_pdf(db, invoice_id)
+    snapshot_hash = compute_snapshot_hash(invoice)
 
-    # Check if PDF exists, generate if not
-    if not invoice.pdf_path:
-        try:
-            pdf_path = save_invoice_pdf(invoice, invoice.project, invoice.project.client)
-            invoice.pdf_path = pdf_path
-            db.commit()
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to generate PDF: {str(e)}",
-            ) from e
-
-    # Verify PDF file exists
-    storage = get_storage_backend()
-    if not storage.file_exists(invoice.pdf_path):
-        # Regenerate if file is missing
-        try:
-            pdf_path = save_invoice_pdf(invoice, invoice.project, invoice.project.client)
-            invoice.pdf_path = pdf_path
-            db.commit()
-        except Exception as e:
+    if not is_pdf_current(invoice, snapshot_hash):
+        error = invoice_pdf_renderer.get_failure(invoice_id, snapshot_hash)
+        if error:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to regenerate PDF: {str(e)}",
-            ) from e
+                detail=f"Failed to generate PDF: {error}",
+            )
+
+        invoice_pdf_renderer.schedule(invoice_id)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"message": "PDF is being generated", "invoice_id": invoice_id},
+            headers={"Retry-After": str(settings.INVOICE_PDF_RETRY_AFTER_SECONDS)},
+        )
 
     # Return PDF file
     try:
-        pdf_bytes = storage.get_file(invoice.pdf_path)
-        return StreamingResponse(
-            iter([pdf_bytes]),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": (
-                    f'attachment; filename="invoice_{invoice.invoice_number}.pdf"'
-                )
-            },
+        return stream_file_response(
+            invoice.pdf_path,
+            f"invoice_{invoice.invoice_number}.pdf",
+            "application/pdf",
+            range_header,
         )
     except FileNotFoundError as exc:
         raise HTTPException(
@@ -2,10 +2,13 @@ from datetime import datetime
 from typing import List, Optional
 
 from app.api import deps
-from app.dbmodels import ProjectMember, User
+from app.db.query_monitor import query_budget
 from app.schemas.logged_hour import LoggedHourCreate, LoggedHourResponse, LoggedHourUpdate
 from app.services import logged_hour as logged_hour_service
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.services.auth_context import AuthContext
+from app.utils.pagination import PageParams, page_params, set_page_headers
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -14,7 +17,7 @@ router = APIRouter()
 @router.post("/", response_model=LoggedHourResponse, status_code=status.HTTP_201_CREATED)
 def create_logged_hour(
     logged_hour_in: LoggedHourCreate,
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
     db: Session = Depends(deps.get_db),
 ):
     """
@@ -25,20 +28,21 @@ def create_logged_hour(
     - Users can only log hours to tasks they are assigned to OR projects they are a member of
     - Non-members attempting to log hours → 403 Forbidden
     """
-    return logged_hour_service.create(db, obj_in=logged_hour_in, user_id=current_user.id)
+    return logged_hour_service.create(db, obj_in=logged_hour_in, auth=auth)
 
 
 @router.get("/", response_model=List[LoggedHourResponse])
-def list_logged_hours(
+@query_budget(3)
+async def list_logged_hours(
+    response: Response,
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     task_id: Optional[int] = Query(None, description="Filter by task ID"),
     project_id: Optional[int] = Query(None, description="Filter by project ID"),
     start_date: Optional[datetime] = Query(None, description="Filter by start date (inclusive)"),
     end_date: Optional[datetime] = Query(None, description="Filter by end date (inclusive)"),
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
-    current_user: User = Depends(deps.get_current_user),
-    db: Session = Depends(deps.get_db),
+    page: PageParams = Depends(page_params),
+    auth: AuthContext = Depends(deps.get_auth_context),
+    db: AsyncSession = Depends(deps.get_async_db),
 ):
     """
     List logged hours (filterable).
@@ -48,24 +52,26 @@ def list_logged_hours(
     - Admins can see all entries
     - Filters are composable (can be combined)
     - Supported filters: user_id, task_id, project_id, start_date, end_date
+    - Most recent first; follow the X-Next-Cursor/X-Prev-Cursor headers with `cursor`
     """
-    return logged_hour_service.list_logged_hours(
-        db=db,
-        current_user=current_user,
+    result = await logged_hour_service.list_logged_hours_async(
+        db,
+        auth,
+        page,
         user_id=user_id,
         task_id=task_id,
         project_id=project_id,
         start_date=start_date,
         end_date=end_date,
-        skip=skip,
-        limit=limit,
     )
+    set_page_headers(response, result)
+    return result.items
 
 
 @router.get("/{logged_hour_id}", response_model=LoggedHourResponse)
 def get_logged_hour(
     logged_hour_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
     db: Session = Depends(deps.get_db),
 ):
     """
@@ -76,9 +82,7 @@ def get_logged_hour(
     - Users can only view their own entries
     - Admins can view all entries
     """
-    logged_hour = logged_hour_service.get_by_id(
-        db, logged_hour_id=logged_hour_id, current_user=current_user
-    )
+    logged_hour = logged_hour_service.get_by_id(db, logged_hour_id=logged_hour_id, auth=auth)
     if not logged_hour:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Logged hour entry not found"
@@ -90,7 +94,7 @@ def get_logged_hour(
 def update_logged_hour(
     logged_hour_id: int,
     logged_hour_in: LoggedHourUpdate,
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
     db: Session = Depends(deps.get_db),
 ):
     """
@@ -101,14 +105,14 @@ def update_logged_hour(
     - Users can only modify their own entries
     """
     return logged_hour_service.update(
-        db=db, logged_hour_id=logged_hour_id, obj_in=logged_hour_in, current_user=current_user
+        db=db, logged_hour_id=logged_hour_id, obj_in=logged_hour_in, auth=auth
     )
 
 
 @router.delete("/{logged_hour_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_logged_hour(
     logged_hour_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
     db: Session = Depends(deps.get_db),
 ):
     """
@@ -119,7 +123,7 @@ def delete_logged_hour(
     - Users can delete their own entries
     - Admins can delete any entry
     """
-    logged_hour_service.delete(db=db, logged_hour_id=logged_hour_id, current_user=current_user)
+    logged_hour_service.delete(db=db, logged_hour_id=logged_hour_id, auth=auth)
 
 
 # Aggregation endpoints - these will be registered separately in main.py
@@ -129,7 +133,7 @@ aggregation_router = APIRouter()
 @aggregation_router.get("/tasks/{task_id}/hours")
 def get_task_hours(
     task_id: int,
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
     db: Session = Depends(deps.get_db),
 ):
     """
@@ -141,16 +145,14 @@ def get_task_hours(
     - or projects they are members of
     - Admins can view all task hours
     """
-    return logged_hour_service.get_total_hours_for_task(
-        db=db, task_id=task_id, current_user=current_user
-    )
+    return logged_hour_service.get_total_hours_for_task(db=db, task_id=task_id, auth=auth)
 
 
 @aggregation_router.get("/projects/{project_id}/hours")
 def get_project_hours(
     project_id: int,
     db: Session = Depends(deps.get_db),
-    member: ProjectMember = Depends(deps.get_current_project_member),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Get all hours for a project.
@@ -160,6 +162,4 @@ def get_project_hours(
     - Users can view hours for projects they are members of
     - Admins can view all project hours
     """
-    return logged_hour_service.get_total_hours_for_project(
-        db=db, project_id=project_id, current_user=member.user  # Use user from member record
-    )
+    return logged_hour_service.get_total_hours_for_project(db=db, project_id=project_id, auth=auth)
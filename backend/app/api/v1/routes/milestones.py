@@ -4,9 +4,11 @@ from app.api import deps
 from app.api.deps import is_admin_user
 from app.dbmodels import User
 from app.schemas.milestone import Milestone, MilestoneCreate, MilestoneUpdate
+from app.services.auth_context import AuthContext
 from app.services.milestone import MilestoneService
 from app.services.project import ProjectService
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.utils.pagination import set_total_count
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -149,35 +151,44 @@ def delete_milestone(
 
 @router.get("/", response_model=List[Milestone])
 def list_milestones(
-    project_id: int,
+    response: Response,
+    project_id: Optional[int] = Query(
+        None, description="Filter by project (all projects you are a member of if omitted)"
+    ),
     status: Optional[str] = Query(
         None, description="Filter by status (not_started, in_progress, completed, overdue)"
     ),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
-    List milestones for a project.
+    List milestones, ordered by due date.
 
-    Requires project membership (or admin).
+    Requires project membership (or admin) when filtering by project. Filtering,
+    ordering and pagination happen in the database; the total number of matching
+    milestones is returned in the X-Total-Count header.
     """
-    # Verify Project Membership
-    is_admin = is_admin_user(current_user)
-    ProjectService.get_project_with_check(db, project_id, current_user.id, is_admin=is_admin)
+    if project_id is not None:
+        # Verify Project Membership
+        is_admin = is_admin_user(current_user)
+        ProjectService.get_project_with_check(db, project_id, current_user.id, is_admin=is_admin)
 
-    milestones = MilestoneService.get_by_project(db, project_id)  # Get all to ensure status updates
+    milestones, total = MilestoneService.list_milestones(
+        db, auth, project_id=project_id, status=status, skip=skip, limit=limit
+    )
+    set_total_count(response, total)
 
     results = []
     for m in milestones:
+        # Progress comes from the counters loaded with the page
+        prog = MilestoneService.progress_of(m)
         # Lazy update status
-        updated_milestone = MilestoneService.update_status(db, m)
-
-        # Apply filter here, after update
-        if status and updated_milestone.status != status:
-            continue
+        updated_milestone = MilestoneService.update_status(db, m, prog)
 
-        prog = MilestoneService.calculate_progress(db, m.id)
-        res = Milestone.model_validate(m)
+        res = Milestone.model_validate(updated_milestone)
         res.progress = prog
         results.append(res)
 
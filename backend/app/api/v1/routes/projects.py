@@ -2,12 +2,16 @@ from datetime import datetime, timezone
 from typing import List, Optional
 
 from app.api.deps import (
+    get_async_read_db,
+    get_auth_context,
     get_current_active_admin,
     get_current_project_member,
     get_current_user,
     get_db,
+    get_read_db,
     is_admin_user,
 )
+from app.db.query_monitor import query_budget
 from app.dbmodels import User
 from app.schemas.digest import WeeklyDigest
 from app.schemas.milestone import Milestone
@@ -22,15 +26,24 @@ from app.schemas.project import (
     ProjectUpdate,
 )
 from app.schemas.summary import ProjectSummary
+from app.schemas.task_timeline import ActivityType, ProjectActivity
+from app.services import project_activity
+from app.services.auth_context import AuthContext
 from app.services.digest import DigestService
 from app.services.milestone import MilestoneService
 from app.services.project import ProjectService
+from app.services.resource_version import ResourceVersionService
 from app.services.summary import SummaryService
-from fastapi import APIRouter, Depends, Query, status
+from app.utils.conditional import not_modified_response
+from app.utils.pagination import PageParams, page_params, set_page_headers
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
+MAX_BULK_HEALTH_PROJECTS = 200
+
 
 @router.post("/", response_model=Project, status_code=status.HTTP_201_CREATED)
 def create_project(
@@ -67,6 +80,42 @@ def list_projects(
     )
 
 
+@router.get("/health", response_model=List[ProjectHealth])
+def get_projects_health(
+    ids: str = Query(..., description="Comma-separated project IDs, e.g. 1,2,3"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get health for several projects at once (portfolio dashboard).
+
+    Same access as GET /projects/{project_id}/health, for every requested project:
+
+    - Admins can view health of any project
+    - Members and the project owner can view health of their projects
+    """
+    try:
+        project_ids = [int(pid) for pid in ids.split(",") if pid.strip()]
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of integers",
+        ) from exc
+
+    if not project_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="At least one project ID is required"
+        )
+    if len(project_ids) > MAX_BULK_HEALTH_PROJECTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BULK_HEALTH_PROJECTS} projects can be requested at once",
+        )
+
+    is_admin = is_admin_user(current_user)
+    return ProjectService.get_projects_health(db, project_ids, current_user.id, is_admin=is_admin)
+
+
 @router.get("/{project_id}", response_model=ProjectDetail)
 def get_project(
     project_id: int,
@@ -169,9 +218,12 @@ def get_members(
 
 # we make a get requests endpoint for the project statistics
 @router.get("/{project_id}/stats", response_model=ProjectStatistics)
-def get_project_stats(
+@query_budget(13)
+async def get_project_stats(
+    request: Request,
+    response: Response,
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_user),  # pylint: disable=unused-argument
     member: ProjectMember = Depends(get_current_project_member),  # pylint: disable=unused-argument
 ):
@@ -179,26 +231,74 @@ def get_project_stats(
     Get project statistics.
 
     - Members can view stats of projects they belong to
+    - Conditional: If-None-Match with the last ETag answers 304 when nothing changed
     """
-    return ProjectService.get_project_statistics(db=db, project_id=project_id)
+    version = await ResourceVersionService.get_project_version_async(db, project_id)
+    if version is not None:
+        not_modified = not_modified_response(
+            request, response, version.version, version.last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+    return await ProjectService.get_project_statistics_async(db, project_id)
 
 
 # we make a get requests endpoint for the project health
 @router.get("/{project_id}/health", response_model=ProjectHealth)
 def get_project_health(
+    request: Request,
+    response: Response,
     project_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),  # pylint: disable=unused-argument
-    member: ProjectMember = Depends(get_current_project_member),  # pylint: disable=unused-argument
+    current_user: User = Depends(get_current_user),
 ):
     """
     Get project health.
 
-    - Members can view health of projects they belong to
+    - Admins can view health of any project
+    - Members and the project owner can view health of their projects
+    - Conditional: If-None-Match with the last ETag answers 304 when nothing changed
     """
+    is_admin = is_admin_user(current_user)
+    ProjectService.require_access(db, [project_id], current_user.id, is_admin=is_admin)
+    version = ResourceVersionService.get_project_version(db, project_id)
+    if version is not None:
+        not_modified = not_modified_response(
+            request, response, version.version, version.last_modified
+        )
+        if not_modified is not None:
+            return not_modified
     return ProjectService.get_project_health(db=db, project_id=project_id)
 
 
+@router.get("/{project_id}/activity", response_model=List[ProjectActivity])
+@query_budget(7)
+def get_project_activity(
+    response: Response,
+    project_id: int,
+    types: Optional[List[ActivityType]] = Query(
+        None, description="Only return these activity types (repeatable)"
+    ),
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_read_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    """
+    Get the activity feed of a project, newest first.
+
+    Merges task events (creation, status and assignment changes, comments,
+    attachments), logged hours and commits. Follow the X-Next-Cursor header
+    with `cursor`; pages keep their size and do not shift as new activity
+    arrives.
+
+    - Admins can view the feed of any project
+    - Members can view the feed of projects they belong to
+    """
+    result = project_activity.get_project_activity(db, project_id, auth, page, types)
+    set_page_headers(response, result)
+    return result.items
+
+
 @router.get("/{project_id}/milestones", response_model=List[Milestone])
 def list_project_milestones(
     project_id: int,
@@ -217,11 +317,11 @@ def list_project_milestones(
 
     milestones = MilestoneService.get_by_project(db, project_id)
 
-    # Enrichment with progress
+    # Enrichment with progress, from the counters loaded with each milestone
     results = []
     for m in milestones:
-        MilestoneService.update_status(db, m)
-        progress = MilestoneService.calculate_progress(db, m.id)
+        progress = MilestoneService.progress_of(m)
+        MilestoneService.update_status(db, m, progress)
 
         # Pydantic model conversion
         # We need to construct the response manually to inject progress, or rely on pydantic validtion if property set
@@ -239,7 +339,7 @@ def list_project_milestones(
 def get_project_digest(
     project_id: int,
     week_start: datetime = Query(..., description="Start of the week (YYYY-MM-DD)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -258,7 +358,7 @@ def get_project_digest(
 @router.post("/{project_id}/generate-summary", response_model=ProjectSummary)
 def generate_project_summary(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
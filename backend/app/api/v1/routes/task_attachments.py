@@ -2,13 +2,16 @@
 API routes for task attachments.
 """
 
+from typing import Optional
+
 from app.api import deps
-from app.dbmodels import TaskAttachment, User
+from app.dbmodels import TaskAttachment
 from app.schemas.task_attachment import TaskAttachment as TaskAttachmentSchema
 from app.schemas.task_attachment import TaskAttachmentList
 from app.services import task_attachment as attachment_service
-from fastapi import APIRouter, Depends, File, UploadFile, status
-from fastapi.responses import Response
+from app.services.auth_context import AuthContext
+from app.utils.file_upload import stream_file_response
+from fastapi import APIRouter, Depends, File, Header, HTTPException, UploadFile, status
 from sqlalchemy.orm import Session, joinedload
 
 router = APIRouter()
@@ -23,33 +26,21 @@ async def upload_attachment(
     task_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Upload a file attachment to a task.
 
     Requires the user to be a member of the project (or admin).
     """
-    attachment = await attachment_service.create(
-        db=db, upload_file=file, task_id=task_id, user_id=current_user.id
-    )
-
-    # Reload with relationships for response
-    attachment = (
-        db.query(TaskAttachment)
-        .options(joinedload(TaskAttachment.uploader))
-        .filter(TaskAttachment.id == attachment.id)
-        .first()
-    )
-
-    return attachment
+    return await attachment_service.create(db=db, upload_file=file, task_id=task_id, auth=auth)
 
 
 @router.get("/tasks/{task_id}/attachments", response_model=TaskAttachmentList)
 def list_attachments(
     task_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     List all attachments for a task.
@@ -57,7 +48,7 @@ def list_attachments(
     Requires the user to be a member of the project (or admin).
     """
     # Validate task access
-    attachment_service.validate_task_access(db, task_id, current_user.id)
+    attachment_service.validate_task_access(db, task_id, auth)
 
     # Get attachments with uploader relationship loaded
     attachments = (
@@ -73,34 +64,42 @@ def list_attachments(
 @router.get("/attachments/{attachment_id}/download")
 def download_attachment(
     attachment_id: int,
+    range_header: Optional[str] = Header(None, alias="Range"),
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Download an attachment.
 
+    The file is streamed in chunks; a single `Range: bytes=start-end` header is
+    honoured with a 206 Partial Content response.
+
     Requires the user to be a member of the project (or admin).
     """
-    file_content, filename, mime_type = attachment_service.get_file_bytes(
-        db=db, attachment_id=attachment_id, user_id=current_user.id
-    )
+    attachment = attachment_service.get_for_download(db=db, attachment_id=attachment_id, auth=auth)
 
-    return Response(
-        content=file_content,
-        media_type=mime_type,
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    try:
+        return stream_file_response(
+            attachment.file_path,
+            attachment.original_filename,
+            attachment.mime_type,
+            range_header,
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Attachment file not found"
+        ) from e
 
 
 @router.delete("/attachments/{attachment_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_attachment(
     attachment_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Delete an attachment.
 
     Only the uploader or an admin can delete an attachment.
     """
-    attachment_service.delete(db=db, attachment_id=attachment_id, user_id=current_user.id)
+    attachment_service.delete(db=db, attachment_id=attachment_id, auth=auth)
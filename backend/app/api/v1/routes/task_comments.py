@@ -5,7 +5,7 @@ from app.api import deps
 from app.dbmodels import Task, User, UserRole
 from app.schemas.task_comment import TaskComment, TaskCommentCreate, TaskCommentUpdate
 from app.services import task_comment as comment_service
-from app.services.task import validate_project_membership
+from app.services.auth_context import AuthContext
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -42,6 +42,7 @@ def create_comment(
     comment_in: TaskCommentCreate,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Create a new comment on a task.
@@ -58,9 +59,8 @@ def create_comment(
         raise HTTPException(status_code=404, detail="Task not found")
 
     # ADMIN bypasses membership check, others need membership
-    if current_user.role != UserRole.ADMIN:
-        if not validate_project_membership(db, task.project_id, current_user.id):
-            raise HTTPException(status_code=403, detail="Not a member of this project")
+    if current_user.role != UserRole.ADMIN and not auth.is_member(task.project_id):
+        raise HTTPException(status_code=403, detail="Not a member of this project")
 
     comment = comment_service.create_comment(
         db=db, task_id=task_id, user_id=current_user.id, content=comment_in.content
@@ -74,6 +74,7 @@ def list_comments(
     task_id: int,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Get all comments for a task in chronological order.
@@ -90,9 +91,8 @@ def list_comments(
         raise HTTPException(status_code=404, detail="Task not found")
 
     # ADMIN bypasses membership check, others need membership
-    if current_user.role != UserRole.ADMIN:
-        if not validate_project_membership(db, task.project_id, current_user.id):
-            raise HTTPException(status_code=403, detail="Not a member of this project")
+    if current_user.role != UserRole.ADMIN and not auth.is_member(task.project_id):
+        raise HTTPException(status_code=403, detail="Not a member of this project")
 
     comments = comment_service.get_comments(db=db, task_id=task_id)
     return [_enrich_comment_with_author(comment) for comment in comments]
@@ -104,6 +104,7 @@ def update_comment(
     comment_in: TaskCommentUpdate,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Update a comment.
@@ -122,9 +123,8 @@ def update_comment(
         raise HTTPException(status_code=404, detail="Task not found")
 
     # ADMIN bypasses membership check for viewing, but still needs ownership to update
-    if current_user.role != UserRole.ADMIN:
-        if not validate_project_membership(db, task.project_id, current_user.id):
-            raise HTTPException(status_code=403, detail="Not a member of this project")
+    if current_user.role != UserRole.ADMIN and not auth.is_member(task.project_id):
+        raise HTTPException(status_code=403, detail="Not a member of this project")
 
     updated_comment = comment_service.update_comment(
         db=db,
@@ -141,6 +141,7 @@ def delete_comment(
     comment_id: int,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Delete a comment.
@@ -160,9 +161,8 @@ def delete_comment(
         raise HTTPException(status_code=404, detail="Task not found")
 
     # ADMIN bypasses membership check, others need membership
-    if current_user.role != UserRole.ADMIN:
-        if not validate_project_membership(db, task.project_id, current_user.id):
-            raise HTTPException(status_code=403, detail="Not a member of this project")
+    if current_user.role != UserRole.ADMIN and not auth.is_member(task.project_id):
+        raise HTTPException(status_code=403, detail="Not a member of this project")
 
     comment_service.delete_comment(
         db=db, comment_id=comment_id, user_id=current_user.id, user_role=current_user.role
@@ -2,15 +2,18 @@
 from typing import List, Optional
 
 from app.api import deps
-from app.api.deps import get_current_project_admin, get_current_project_member, is_admin_user
-from app.dbmodels import User
+from app.db.query_monitor import query_budget
 from app.schemas.task import AssignTaskRequest, Task, TaskCreate, TaskUpdate, UpdateStatusRequest
 from app.schemas.task_timeline import TaskTimelineResponse
 from app.services import task as task_service
 from app.services import task_timeline
+from app.services.auth_context import AuthContext
 from app.services.milestone import MilestoneService
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.utils.conditional import not_modified_response
+from app.utils.pagination import PageParams, page_params, set_page_headers
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 
@@ -21,11 +24,20 @@ class MilestoneLinkRequest(BaseModel):
 router = APIRouter()
 
 
+def _refresh_milestone_statuses(db: Session, *milestone_ids: Optional[int]) -> None:
+    """Recompute the status of the milestones a task left or joined."""
+    for milestone_id in dict.fromkeys(milestone_ids):
+        if milestone_id:
+            milestone = MilestoneService.get(db, milestone_id)
+            if milestone:
+                MilestoneService.update_status(db, milestone)
+
+
 @router.post("/", response_model=Task, status_code=status.HTTP_201_CREATED)
 def create_task(
     task_in: TaskCreate,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Create a new task.
@@ -33,55 +45,54 @@ def create_task(
     Requires the user to be a member of the project.
     """
     # Verify project membership (admins bypass this check)
-    if not is_admin_user(current_user):
+    if not auth.is_admin:
         # This will raise 403 if not a member
-        get_current_project_member(project_id=task_in.project_id, current_user=current_user, db=db)
+        auth.require_member(task_in.project_id)
+
+    task = task_service.create(db, obj_in=task_in, actor_id=auth.user_id)
+
+    # A task created in a milestone can start or reopen it
+    _refresh_milestone_statuses(db, task.milestone_id)
 
-    return task_service.create(db, obj_in=task_in)
+    return task
 
 
 @router.get("/", response_model=List[Task])
+@query_budget(4)
 def list_tasks(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    page: PageParams = Depends(page_params),
     project_id: Optional[int] = None,
     status: Optional[str] = None,
     assigned_to: Optional[int] = None,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     List tasks with optional filters.
 
     - Admins see all tasks
     - Regular users see only tasks from projects they are members of
+    - Ordered by id; follow the X-Next-Cursor/X-Prev-Cursor headers with `cursor`
+    - `include_total=true` returns the number of matching tasks in X-Total-Count
     """
-    tasks = task_service.get_multi(
-        db, skip=skip, limit=limit, project_id=project_id, status=status, assigned_to=assigned_to
+    result = task_service.get_multi(
+        db,
+        auth,
+        page,
+        project_id=project_id,
+        status=status,
+        assigned_to=assigned_to,
     )
-
-    # Admins see all tasks
-    if is_admin_user(current_user):
-        return tasks
-
-    # Filter tasks to only include those from projects the user is a member of
-    filtered_tasks = []
-    for task in tasks:
-        try:
-            get_current_project_member(project_id=task.project_id, current_user=current_user, db=db)
-            filtered_tasks.append(task)
-        except HTTPException:
-            # User is not a member of this project, skip it
-            continue
-
-    return filtered_tasks
+    set_page_headers(response, result)
+    return result.items
 
 
 @router.get("/{task_id}", response_model=Task)
 def get_task(
     task_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Get a task by ID.
@@ -93,8 +104,8 @@ def get_task(
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Verify project membership (admins bypass)
-    if not is_admin_user(current_user):
-        get_current_project_member(project_id=task.project_id, current_user=current_user, db=db)
+    if not auth.is_admin:
+        auth.require_member(task.project_id)
 
     return task
 
@@ -104,7 +115,7 @@ def update_task(
     task_id: int,
     task_in: TaskUpdate,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Update a task.
@@ -116,16 +127,14 @@ def update_task(
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Verify project membership (admins bypass)
-    if not is_admin_user(current_user):
-        get_current_project_member(project_id=task.project_id, current_user=current_user, db=db)
+    if not auth.is_admin:
+        auth.require_member(task.project_id)
 
-    updated_task = task_service.update(db, db_obj=task, obj_in=task_in)
+    old_milestone_id = task.milestone_id
+    updated_task = task_service.update(db, db_obj=task, obj_in=task_in, actor_id=auth.user_id)
 
     # Trigger milestone status update if task status or milestone_id changed
-    if updated_task.milestone_id:
-        milestone = MilestoneService.get(db, updated_task.milestone_id)
-        if milestone:
-            MilestoneService.update_status(db, milestone)
+    _refresh_milestone_statuses(db, old_milestone_id, updated_task.milestone_id)
 
     return updated_task
 
@@ -134,7 +143,7 @@ def update_task(
 def delete_task(
     task_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Delete a task.
@@ -146,9 +155,11 @@ def delete_task(
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Verify project admin privileges (will raise 403 if not admin)
-    get_current_project_admin(project_id=task.project_id, current_user=current_user, db=db)
+    auth.require_project_admin(task.project_id)
 
+    milestone_id = task.milestone_id
     task_service.delete(db, task_id=task_id)
+    _refresh_milestone_statuses(db, milestone_id)
 
 
 @router.patch("/{task_id}/status", response_model=Task)
@@ -156,7 +167,7 @@ def update_task_status(
     task_id: int,
     status_update: UpdateStatusRequest,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Update only the status of a task.
@@ -168,16 +179,15 @@ def update_task_status(
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Verify project membership (admins bypass)
-    if not is_admin_user(current_user):
-        get_current_project_member(project_id=task.project_id, current_user=current_user, db=db)
+    if not auth.is_admin:
+        auth.require_member(task.project_id)
 
-    updated_task = task_service.update_status(db, task_id=task_id, new_status=status_update.status)
+    updated_task = task_service.update_status(
+        db, task_id=task_id, new_status=status_update.status, actor_id=auth.user_id
+    )
 
     # Trigger milestone status update
-    if updated_task.milestone_id:
-        milestone = MilestoneService.get(db, updated_task.milestone_id)
-        if milestone:
-            MilestoneService.update_status(db, milestone)
+    _refresh_milestone_statuses(db, updated_task.milestone_id)
 
     return updated_task
 
@@ -187,7 +197,7 @@ def assign_task(
     task_id: int,
     assign_request: AssignTaskRequest,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Assign a task to a user.
@@ -199,9 +209,11 @@ def assign_task(
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Verify project admin privileges (will raise 403 if not admin)
-    get_current_project_admin(project_id=task.project_id, current_user=current_user, db=db)
+    auth.require_project_admin(task.project_id)
 
-    return task_service.assign(db, task_id=task_id, user_id=assign_request.user_id)
+    return task_service.assign(
+        db, task_id=task_id, user_id=assign_request.user_id, actor_id=auth.user_id
+    )
 
 
 @router.patch("/{task_id}/milestone", response_model=Task)
@@ -209,7 +221,7 @@ def link_milestone(
     task_id: int,
     link_request: MilestoneLinkRequest,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Link or unlink a task from a milestone.
@@ -219,8 +231,8 @@ def link_milestone(
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Verify project membership (admins bypass)
-    if not is_admin_user(current_user):
-        get_current_project_member(project_id=task.project_id, current_user=current_user, db=db)
+    if not auth.is_admin:
+        auth.require_member(task.project_id)
 
     if link_request.milestone_id is not None:
         milestone = MilestoneService.get(db, link_request.milestone_id)
@@ -233,24 +245,26 @@ def link_milestone(
                 status_code=400, detail="Cannot link task to milestone in different project"
             )
 
+    old_milestone_id = task.milestone_id
     update_data = TaskUpdate(milestone_id=link_request.milestone_id)
-    updated_task = task_service.update(db, db_obj=task, obj_in=update_data)
+    updated_task = task_service.update(db, db_obj=task, obj_in=update_data, actor_id=auth.user_id)
 
-    if updated_task.milestone_id:
-        ms = MilestoneService.get(db, updated_task.milestone_id)
-        if ms:
-            MilestoneService.update_status(db, ms)
+    _refresh_milestone_statuses(db, old_milestone_id, updated_task.milestone_id)
 
     return updated_task
 
 
 @router.get("/{task_id}/timeline", response_model=TaskTimelineResponse)
-def get_task_timeline(
+@query_budget(6)
+async def get_task_timeline(
+    request: Request,
+    response: Response,
     task_id: int,
-    skip: int = Query(0, ge=0, description="Number of activities to skip"),
+    skip: int = Query(0, ge=0, description="Number of activities to skip (ignored with cursor)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of activities to return"),
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_user),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(deps.get_async_db),
+    auth: AuthContext = Depends(deps.get_auth_context),
 ):
     """
     Get the complete activity timeline for a task.
@@ -259,30 +273,47 @@ def get_task_timeline(
     - Task creation
     - Status changes
     - Assignment changes
-    - Comments (when implemented)
+    - Comments
     - Attachments
     - Logged hours
     - Linked git commits
 
-    Requires the user to be a member of the project (or admin).
+    Requires the user to be a member of the project (or admin). Follow
+    `next_cursor` for the next page.
 
     This endpoint serves as:
     - The source of truth for task history
     - The backbone for client reports
     - A primary input for AI summaries and insights
 
-    Note: Status and assignment changes currently only show the most recent change
-    due to lack of historical tracking. For full history, a task_activities table
-    would need to be implemented.
+    Activities come from the task's activity log, so every status and
+    assignment change is listed, not just the latest one.
+
+    Supports conditional requests: send the ETag back in If-None-Match to get
+    a 304 without rebuilding the timeline when nothing changed.
     """
+    version = await task_timeline.get_task_timeline_version_async(db, task_id, auth)
+    if version is not None:
+        not_modified = not_modified_response(
+            request, response, version.version, version.last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
     # Verify task exists and user has access (handled in service)
-    activities, total = task_timeline.get_task_timeline(
+    activities, total, next_cursor = await task_timeline.get_task_timeline_async(
         db=db,
         task_id=task_id,
-        user_id=current_user.id,
-        is_admin=is_admin_user(current_user),
+        auth=auth,
         skip=skip,
         limit=limit,
+        cursor=cursor,
     )
 
-    return TaskTimelineResponse(activities=activities, total=total, skip=skip, limit=limit)
+    return TaskTimelineResponse(
+        activities=activities,
+        total=total,
+        skip=0 if cursor else skip,
+        limit=limit,
+        next_cursor=next_cursor,
+    )
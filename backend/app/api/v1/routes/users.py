@@ -142,7 +142,7 @@ def get_user_hours(
 @router.get("/{id}/profile", response_model=UserProfile)
 def get_user_profile(
     id: int,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: UserModel = Depends(deps.get_current_user),
 ):
     """
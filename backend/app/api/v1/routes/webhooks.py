@@ -2,49 +2,99 @@
 Webhook endpoints for Git providers.
 
 Handles incoming webhook events from GitHub, GitLab, and Bitbucket,
-verifies their authenticity, and processes push events to track contributions.
+verifies their authenticity, and queues push events for asynchronous processing
+(see app.services.webhook_queue). Handlers validate the payload, persist the raw
+body and acknowledge with 202, so large pushes never exceed provider delivery
+timeouts. Malformed payloads are rejected with 400 instead of being queued.
 """
 
+import hashlib
 import hmac
-import json
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from app.api.deps import get_db
 from app.core.config import settings
-from app.schemas.webhook import BitbucketPushPayload, GitHubPushPayload, GitLabPushPayload
-from app.services.webhook import WebhookService
+from app.services.webhook_queue import (
+    PermanentDeliveryError,
+    WebhookQueue,
+    webhook_worker_pool,
+)
 from app.utils.hmac_verifier import verify_bitbucket_signature, verify_github_signature
 from app.utils.logger import get_logger
 from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
 
+async def _enqueue_delivery(
+    db: Session, provider: str, delivery_id: Optional[str], event: str, body_bytes: bytes
+) -> JSONResponse:
+    """Validate and persist a verified delivery, then acknowledge it with 202 Accepted."""
+    try:
+        await run_in_threadpool(WebhookQueue.parse_payload, provider, body_bytes)
+    except PermanentDeliveryError as e:
+        logger.warning("Rejecting %s webhook: %s", provider, e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    # Fall back to a content hash so identical redeliveries are still idempotent
+    if not delivery_id:
+        delivery_id = f"sha256:{hashlib.sha256(body_bytes).hexdigest()}"
+
+    try:
+        delivery, created = await run_in_threadpool(
+            WebhookQueue.enqueue, db, provider, delivery_id, event, body_bytes
+        )
+    except UnicodeDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Payload must be UTF-8 encoded JSON"
+        ) from e
+
+    if created:
+        webhook_worker_pool.notify()
+        logger.info("Queued %s webhook delivery %s", provider, delivery_id)
+    else:
+        logger.info("Ignoring redelivery of %s webhook %s", provider, delivery_id)
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "message": "Delivery queued" if created else "Delivery already received",
+            "delivery_id": delivery.delivery_id,
+            "status": delivery.status.value,
+            "duplicate": not created,
+        },
+    )
+
+
 @router.post("/github")
 async def github_webhook(
     request: Request,
     db: Session = Depends(get_db),
     x_hub_signature_256: str = Header(None, alias="X-Hub-Signature-256"),
     x_github_event: str = Header(None, alias="X-GitHub-Event"),
+    x_github_delivery: Optional[str] = Header(None, alias="X-GitHub-Delivery"),
 ) -> Dict[str, Any]:
     """
     GitHub webhook endpoint.
 
-    Processes push events from GitHub repositories.
+    Queues push events from GitHub repositories.
     - Verifies HMAC SHA-256 signature
-    - Only processes push events
-    - Extracts commits and creates contributions
+    - Only accepts push events
+    - Rejects malformed payloads with 400
+    - Persists the raw body and returns 202; commits are processed by a worker
 
     Headers:
         X-Hub-Signature-256: HMAC SHA-256 signature (required)
         X-GitHub-Event: Event type (must be 'push')
+        X-GitHub-Delivery: Delivery ID, used for idempotency
 
     Returns:
-        Processing results with statistics
+        202 with the queued delivery ID and status
     """
     logger.info("Received GitHub webhook request")
 
@@ -71,28 +121,7 @@ async def github_webhook(
 
     logger.info("GitHub webhook signature verified")
 
-    # Parse and validate payload
-    try:
-        payload_dict = json.loads(body_bytes.decode("utf-8"))
-        payload = GitHubPushPayload(**payload_dict)
-    except Exception as e:
-        logger.error("Error parsing GitHub payload: %s", e, exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid payload structure: {str(e)}"
-        ) from e
-
-    # Process push event
-    try:
-        result = WebhookService.process_github_push(db, payload)
-        logger.info("GitHub webhook processed successfully: %s", result)
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("Error processing GitHub webhook: %s", e, exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to process webhook"
-        ) from e
+    return await _enqueue_delivery(db, "github", x_github_delivery, x_github_event, body_bytes)
 
 
 @router.post("/gitlab")
@@ -101,21 +130,24 @@ async def gitlab_webhook(
     db: Session = Depends(get_db),
     x_gitlab_token: str = Header(None, alias="X-Gitlab-Token"),
     x_gitlab_event: str = Header(None, alias="X-Gitlab-Event"),
+    x_gitlab_event_uuid: Optional[str] = Header(None, alias="X-Gitlab-Event-UUID"),
 ) -> Dict[str, Any]:
     """
     GitLab webhook endpoint.
 
-    Processes push events from GitLab repositories.
+    Queues push events from GitLab repositories.
     - Verifies token authentication
-    - Only processes push events
-    - Extracts commits and creates contributions
+    - Only accepts push events
+    - Rejects malformed payloads with 400
+    - Persists the raw body and returns 202; commits are processed by a worker
 
     Headers:
         X-Gitlab-Token: Webhook token (required)
         X-Gitlab-Event: Event type (must be 'Push Hook')
+        X-Gitlab-Event-UUID: Delivery ID, used for idempotency
 
     Returns:
-        Processing results with statistics
+        202 with the queued delivery ID and status
     """
     logger.info("Received GitLab webhook request")
 
@@ -144,29 +176,16 @@ async def gitlab_webhook(
 
     logger.info("GitLab webhook token verified")
 
-    # Read and parse payload
+    # Read raw body
     try:
         body_bytes = await request.body()
-        payload_dict = json.loads(body_bytes.decode("utf-8"))
-        payload = GitLabPushPayload(**payload_dict)
     except Exception as e:
-        logger.error("Error parsing GitLab payload: %s", e, exc_info=True)
+        logger.error("Error reading request body: %s", e)
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid payload structure: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Failed to read request body"
         ) from e
 
-    # Process push event
-    try:
-        result = WebhookService.process_gitlab_push(db, payload)
-        logger.info("GitLab webhook processed successfully: %s", result)
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("Error processing GitLab webhook: %s", e, exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to process webhook"
-        ) from e
+    return await _enqueue_delivery(db, "gitlab", x_gitlab_event_uuid, x_gitlab_event, body_bytes)
 
 
 @router.post("/bitbucket")
@@ -175,21 +194,24 @@ async def bitbucket_webhook(
     db: Session = Depends(get_db),
     x_hub_signature: str = Header(None, alias="X-Hub-Signature"),
     x_event_key: str = Header(None, alias="X-Event-Key"),
+    x_request_uuid: Optional[str] = Header(None, alias="X-Request-UUID"),
 ) -> Dict[str, Any]:
     """
     Bitbucket webhook endpoint.
 
-    Processes push events from Bitbucket repositories.
+    Queues push events from Bitbucket repositories.
     - Verifies HMAC SHA-256 signature
-    - Only processes push events
-    - Extracts commits and creates contributions
+    - Only accepts push events
+    - Rejects malformed payloads with 400
+    - Persists the raw body and returns 202; commits are processed by a worker
 
     Headers:
         X-Hub-Signature: HMAC SHA-256 signature (required)
         X-Event-Key: Event type (must be 'repo:push')
+        X-Request-UUID: Delivery ID, used for idempotency
 
     Returns:
-        Processing results with statistics
+        202 with the queued delivery ID and status
     """
     logger.info("Received Bitbucket webhook request")
 
@@ -218,25 +240,4 @@ async def bitbucket_webhook(
 
     logger.info("Bitbucket webhook signature verified")
 
-    # Parse and validate payload
-    try:
-        payload_dict = json.loads(body_bytes.decode("utf-8"))
-        payload = BitbucketPushPayload(**payload_dict)
-    except Exception as e:
-        logger.error("Error parsing Bitbucket payload: %s", e, exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid payload structure: {str(e)}"
-        ) from e
-
-    # Process push event
-    try:
-        result = WebhookService.process_bitbucket_push(db, payload)
-        logger.info("Bitbucket webhook processed successfully: %s", result)
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error("Error processing Bitbucket webhook: %s", e, exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to process webhook"
-        ) from e
+    return await _enqueue_delivery(db, "bitbucket", x_request_uuid, x_event_key, body_bytes)
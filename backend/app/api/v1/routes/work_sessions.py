@@ -4,7 +4,8 @@ from app.api import deps
 from app.dbmodels import User
 from app.schemas.work_session import WorkSessionAction, WorkSessionCreate, WorkSessionOut
 from app.services import work_session as work_session_service
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.utils.pagination import PageParams, page_params, set_page_headers
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 router = APIRouter()
@@ -61,10 +62,16 @@ def stop_session(
 
 @router.get("/", response_model=List[WorkSessionOut])
 def list_sessions(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+    response: Response,
+    page: PageParams = Depends(page_params),
     current_user: User = Depends(deps.get_current_user),
     db: Session = Depends(deps.get_db),
 ):
-    """List session history for the current user."""
-    return work_session_service.list_sessions(db, user_id=current_user.id, skip=skip, limit=limit)
+    """
+    List session history for the current user, newest first.
+
+    Follow the X-Next-Cursor/X-Prev-Cursor headers with `cursor` for more pages.
+    """
+    result = work_session_service.list_sessions(db, user_id=current_user.id, page=page)
+    set_page_headers(response, result)
+    return result.items
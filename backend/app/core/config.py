@@ -13,9 +13,37 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_HOURS: int = 24
 
+    # Password hashing runs in a process pool; extra concurrent requests get a 429
+    PASSWORD_HASH_WORKERS: int = 2  # 0 hashes inline in the request thread
+    PASSWORD_HASH_MAX_PENDING: int = 16  # Running + queued operations before shedding
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 10.0
+    PASSWORD_HASH_ROUNDS: int = 29000  # pbkdf2_sha256; changing it rehashes on next login
+
+    # Database connection pools (sync and async engine each get one; SQLite keeps
+    # SQLAlchemy's defaults)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20  # Extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this
+    DB_POOL_LONG_HELD_SECONDS: float = 5.0  # Checkouts held longer are logged and reported
+    # Read-only endpoints use DATABASE_REPLICA_URL when set, except for clients
+    # that committed a write this recently (a cookie/header sends them to the primary)
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # Per-request SQL instrumentation: Server-Timing header, N+1 warnings, query budgets
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10  # Same statement this many times in one request
+    SQL_QUERY_BUDGET_STRICT: bool = False  # Raise past @query_budget (fails tests)
+
+    # ETags of aggregate endpoints also change after this many seconds, for
+    # figures that depend on the current time (overdue tasks, inactive members)
+    ETAG_TIME_BUCKET_SECONDS: int = 60
+
     # File upload settings
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB in bytes
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024  # Bytes read/written per chunk when streaming files
     UPLOAD_DIR: str = "./uploads"
+    ATTACHMENT_DEDUP_ENABLED: bool = True  # Store identical attachment content once
     ALLOWED_MIME_TYPES: list[str] = []  # Empty list means all types allowed (optional whitelist)
 
     # Webhook secrets for Git providers
@@ -23,6 +51,30 @@ class Settings(BaseSettings):
     GITLAB_WEBHOOK_TOKEN: str = ""
     BITBUCKET_WEBHOOK_SECRET: str = ""
 
+    # Webhook delivery queue (processed by an in-process worker pool)
+    WEBHOOK_WORKERS: int = 2  # 0 disables the workers (deliveries stay queued)
+    WEBHOOK_MAX_ATTEMPTS: int = 5
+    WEBHOOK_RETRY_BASE_SECONDS: int = 10  # Backoff doubles on every failed attempt
+    WEBHOOK_RETRY_MAX_SECONDS: int = 3600
+    WEBHOOK_POLL_INTERVAL_SECONDS: float = 2.0
+    WEBHOOK_PROCESSING_TIMEOUT_SECONDS: int = 600  # Reclaim deliveries stuck in processing
+
+    # Commit author email -> user cache (per process)
+    AUTHOR_CACHE_SIZE: int = 10000  # 0 disables caching
+    AUTHOR_CACHE_TTL_SECONDS: int = 300
+    AUTHOR_CACHE_NEGATIVE_TTL_SECONDS: int = 60  # Emails with no matching user
+
+    # Authenticated users/clients cached per token; ORM writes invalidate, other
+    # processes only see changes after the TTL
+    PRINCIPAL_CACHE_SIZE: int = 10000  # 0 disables caching
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Invoice PDFs are rendered in background threads, never inside a request
+    INVOICE_PDF_WORKERS: int = 2
+    INVOICE_PDF_RETRY_AFTER_SECONDS: int = 2  # Retry-After sent while a render is pending
+    INVOICE_BATCH_WORKERS: int = 4  # Parallel chunks for POST /invoices/generate-batch
+    INVOICE_BATCH_CHUNK_SIZE: int = 25  # Invoices generated per transaction in a batch
+
     # SMTP settings (Also added to docker-compose.yml)
     SMTP_HOST: str = "mailpit"
     SMTP_PORT: int = 1025
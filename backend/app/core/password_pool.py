@@ -0,0 +1,123 @@
+"""
+Bounded process pool for password hashing and verification.
+
+pbkdf2 is deliberately slow, and running it in the request thread lets a login
+burst tie up the whole FastAPI threadpool. Hashing runs in a small pool of
+worker processes instead. At most PASSWORD_HASH_MAX_PENDING operations may be
+running or queued; beyond that requests are shed immediately with a 429 and
+Retry-After rather than queueing behind the burst.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from app.core import security
+from app.core.config import settings
+from app.utils.logger import get_logger
+from fastapi import HTTPException, status
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PoolCounters:
+    """Completed and shed operations of a PasswordHasherPool; updated under its lock."""
+
+    processed: int = 0
+    rejected: int = 0
+
+
+class PasswordHasherPool:
+    """Runs security.hash_password / verify_and_update_password in worker processes."""
+
+    def __init__(self, num_workers: int, max_pending: int, timeout: float):
+        self.num_workers = num_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.counters = PoolCounters()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Caller holds the lock. Spawned (not forked) workers do not inherit the
+        # parent's threads, DB connections or locks.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.num_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _run(self, func: Callable, *args):
+        if self.num_workers <= 0:
+            return func(*args)
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.counters.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many concurrent sign-in requests, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            executor = self._get_executor()
+
+        try:
+            return executor.submit(func, *args).result(timeout=self.timeout)
+        except FutureTimeoutError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password check timed out, please retry",
+                headers={"Retry-After": "1"},
+            ) from e
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM killed); start a fresh pool for later calls
+            logger.error("Password hashing pool broke, restarting it")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.counters.processed += 1
+
+    def hash(self, password: str) -> str:
+        return self._run(security.hash_password, password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._run(security.verify_password, password, hashed)
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also returns a new hash if the work factor changed."""
+        return self._run(security.verify_and_update_password, password, hashed)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.num_workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "processed": self.counters.processed,
+                "rejected": self.counters.rejected,
+            }
+
+
+password_hasher = PasswordHasherPool(
+    num_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS,
+)
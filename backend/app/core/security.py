@@ -1,20 +1,39 @@
 # Security utilities
 
 from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 
 from app.core.config import settings
 from jose import jwt
-from passlib import hash as passlib_hash
+from passlib.context import CryptContext
 
 ALGORITHM = settings.ALGORITHM
 
+# Hashes with any other round count are flagged for rehashing on the next login
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    pbkdf2_sha256__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
+
 
 def hash_password(password: str):
-    return passlib_hash.pbkdf2_sha256.hash(password)
+    return pwd_context.hash(password)
 
 
 def verify_password(password: str, hashed: str):
-    return passlib_hash.pbkdf2_sha256.verify(password, hashed)
+    return pwd_context.verify(password, hashed)
+
+
+def verify_and_update_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if the stored hash uses an outdated work factor.
+
+    Returns:
+        (valid, new_hash) - new_hash is None unless the password should be rehashed
+    """
+    return pwd_context.verify_and_update(password, hashed)
 
 
 def create_access_token(data: dict):
@@ -0,0 +1,225 @@
+"""
+Connection pool telemetry.
+
+Tracks every checkout from the sync and async engine pools: who holds the
+connection (the endpoint of the current request, or the thread name for
+background workers), for how long, and how long callers waited for a free
+connection. Checkouts held longer than DB_POOL_LONG_HELD_SECONDS are logged and
+kept in a short history. Everything is exposed through GET /admin/db-pool.
+"""
+
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = get_logger(__name__)
+
+# ASGI scope of the request being served; routing fills in scope["endpoint"]
+_request_scope: ContextVar[Optional[dict]] = ContextVar("db_pool_request_scope", default=None)
+
+
+def endpoint_label(scope: dict) -> str:
+    """e.g. "GET tasks.list_tasks" (module of the route file, endpoint function)."""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return f"{scope.get('method', '')} <unmatched>"
+    module = endpoint.__module__.rsplit(".", 1)[-1]
+    return f"{scope.get('method', '')} {module}.{endpoint.__name__}"
+
+
+def current_holder() -> str:
+    """Label for whoever is checking out a connection right now."""
+    scope = _request_scope.get()
+    if scope is None:
+        return f"thread:{threading.current_thread().name}"
+    return endpoint_label(scope)
+
+
+class PoolHolderMiddleware:
+    """ASGI middleware that tags connection checkouts with the request's endpoint."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(token)
+
+
+@dataclass
+class WaitCounters:
+    """Checkout waits and timeouts of a PoolMonitor; updated under its lock."""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    timeouts: int = 0
+
+
+@dataclass
+class HolderStats:
+    """Completed checkouts of one holder; updated under the PoolMonitor lock."""
+
+    checkouts: int = 0
+    total_held_seconds: float = 0.0
+    max_held_seconds: float = 0.0
+
+
+class PoolMonitor:
+    """Thread-safe checkout/checkin bookkeeping for one or more engine pools."""
+
+    def __init__(self, long_held_seconds: float, history_size: int = 50):
+        self.long_held_seconds = long_held_seconds
+        self._pools: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        # id(connection record) -> (engine name, holder, checkout time)
+        self._held: Dict[int, Tuple[str, str, float]] = {}
+        self._long_held: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self._by_holder: Dict[str, HolderStats] = {}
+        self.waits = WaitCounters()
+
+    def instrument(self, name: str, engine: Engine) -> None:
+        """Start tracking checkouts from an engine's pool."""
+        pool = engine.pool
+        self._pools[name] = pool
+
+        @event.listens_for(pool, "checkout")
+        def _on_checkout(_dbapi_connection, connection_record, _connection_proxy):
+            with self._lock:
+                self._held[id(connection_record)] = (name, current_holder(), time.monotonic())
+
+        @event.listens_for(pool, "checkin")
+        def _on_checkin(_dbapi_connection, connection_record):
+            self._release(connection_record)
+
+    def _release(self, connection_record) -> None:
+        with self._lock:
+            entry = self._held.pop(id(connection_record), None)
+            if entry is None:
+                return
+            name, holder, since = entry
+            held = time.monotonic() - since
+            stats = self._by_holder.setdefault(holder, HolderStats())
+            stats.checkouts += 1
+            stats.total_held_seconds += held
+            stats.max_held_seconds = max(stats.max_held_seconds, held)
+            if held < self.long_held_seconds:
+                return
+            self._long_held.append(
+                {
+                    "engine": name,
+                    "holder": holder,
+                    "held_seconds": round(held, 3),
+                    "released_at": datetime.now(timezone.utc).isoformat(),
+                }
+            )
+        logger.warning("%s connection held for %.1fs by %s", name, held, holder)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.waits.count += 1
+            self.waits.total_seconds += seconds
+            self.waits.max_seconds = max(self.waits.max_seconds, seconds)
+
+    def record_timeout(self) -> None:
+        holder = current_holder()
+        with self._lock:
+            self.waits.timeouts += 1
+        logger.error("Timed out waiting for a database connection in %s", holder)
+
+    def stats(self, top_holders: int = 20) -> Dict[str, Any]:
+        """Snapshot of the pools; holders are the top_holders by total time held."""
+        waits = self.waits
+        now = time.monotonic()
+        with self._lock:
+            held = sorted(
+                (
+                    {"engine": name, "holder": holder, "held_seconds": round(now - since, 3)}
+                    for name, holder, since in self._held.values()
+                ),
+                key=lambda item: item["held_seconds"],
+                reverse=True,
+            )
+            holders = sorted(
+                self._by_holder.items(),
+                key=lambda item: item[1].total_held_seconds,
+                reverse=True,
+            )[:top_holders]
+            return {
+                "engines": {name: _pool_status(pool) for name, pool in self._pools.items()},
+                "waits": {
+                    "count": waits.count,
+                    "avg_ms": (
+                        round(waits.total_seconds / waits.count * 1000, 3) if waits.count else 0.0
+                    ),
+                    "max_ms": round(waits.max_seconds * 1000, 3),
+                    "timeouts": waits.timeouts,
+                },
+                "checked_out": held,
+                "long_held": list(self._long_held),
+                "holders": [
+                    {
+                        "holder": holder,
+                        "checkouts": stats.checkouts,
+                        "total_held_seconds": round(stats.total_held_seconds, 3),
+                        "avg_held_ms": round(stats.total_held_seconds / stats.checkouts * 1000, 3),
+                        "max_held_seconds": round(stats.max_held_seconds, 3),
+                    }
+                    for holder, stats in holders
+                ],
+            }
+
+
+def _pool_status(pool) -> Dict[str, Any]:
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,  # pylint: disable=protected-access
+            timeout_seconds=pool.timeout(),
+        )
+    return status
+
+
+pool_monitor = PoolMonitor(long_held_seconds=settings.DB_POOL_LONG_HELD_SECONDS)
+
+
+class _WaitTimedPoolMixin:
+    """Times how long each checkout waits for a free connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_monitor.record_timeout()
+            raise
+        finally:
+            pool_monitor.record_wait(time.perf_counter() - started)
+
+
+class MonitoredQueuePool(_WaitTimedPoolMixin, QueuePool):
+    pass
+
+
+class MonitoredAsyncQueuePool(_WaitTimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
@@ -0,0 +1,159 @@
+"""
+Per-request SQL instrumentation.
+
+QueryStatsMiddleware starts a QueryStats for every HTTP request and engine-wide
+cursor events add each statement and its duration to it. Sync routes, async
+routes and dependencies running in the threadpool all share it through a
+contextvar. For each request:
+
+- the response gets a ``Server-Timing: db;dur=<ms>;desc="<n> queries"`` header
+- one key=value log line records the query count, DB time and repeats
+- the same SQL run SQL_N_PLUS_ONE_THRESHOLD or more times is logged as a
+  likely N+1
+- endpoints declaring ``@query_budget(n)`` are checked against it and going
+  over is logged. With SQL_QUERY_BUDGET_STRICT (turned on for the whole test
+  suite by tests/conftest.py) QueryBudgetExceeded is raised instead. The check
+  runs once the response has been sent, so the client still gets it; the
+  server logs the exception and the test client re-raises it, failing the
+  test. tests/test_query_budgets.py exercises every budgeted endpoint.
+"""
+
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+from app.db.pool_monitor import endpoint_label
+from app.utils.logger import get_logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+logger = get_logger(__name__)
+
+F = TypeVar("F", bound=Callable)
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """An endpoint ran more queries than its declared budget (strict mode only)."""
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """
+    Declare the most queries an endpoint may run per request.
+
+    Put it below the route decorator::
+
+        @router.get("/")
+        @query_budget(5)
+        def list_things(...):
+    """
+
+    def decorator(func: F) -> F:
+        func.query_budget = max_queries
+        return func
+
+    return decorator
+
+
+class QueryStats:
+    """Statements and DB time of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.duration += seconds
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements run at least ``threshold`` times, most repeated first."""
+        with self._lock:
+            return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany):
+    if _current_stats.get() is not None:
+        context.query_monitor_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(_conn, _cursor, statement, _parameters, context, _executemany):
+    stats = _current_stats.get()
+    started = getattr(context, "query_monitor_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _shorten(statement: str, length: int = 200) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= length else statement[:length] + "..."
+
+
+def _report(scope: dict, stats: QueryStats, status_code: Optional[int]) -> None:
+    label = endpoint_label(scope)
+    repeated = stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+    logger.info(
+        "sql endpoint=%r status=%s queries=%d db_ms=%.1f distinct=%d n_plus_one=%d",
+        label,
+        status_code,
+        stats.count,
+        stats.duration * 1000,
+        len(stats.statements),
+        len(repeated),
+    )
+    for statement, count in repeated:
+        logger.warning("Possible N+1 in %s: %d x %s", label, count, _shorten(statement))
+
+    budget = getattr(scope.get("endpoint"), "query_budget", None)
+    if budget is not None and stats.count > budget:
+        message = f"{label} ran {stats.count} queries, its budget is {budget}"
+        if settings.SQL_QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware collecting QueryStats per HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_INSTRUMENTATION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        token = _current_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+        _report(scope, stats, status_code)
@@ -0,0 +1,118 @@
+"""
+Read-your-writes routing for the read replica.
+
+Read-only endpoints take their session from ``deps.get_read_db`` and read from
+the replica when DATABASE_REPLICA_URL is set. A replica lags the primary, so a
+client whose request committed a write reads from the primary for the next
+READ_YOUR_WRITES_SECONDS and always sees its own changes.
+
+The marker travels with the client, so it holds whichever worker or process
+serves the next read. ReadYourWritesMiddleware adds it to every response whose
+request committed an INSERT/UPDATE/DELETE on a primary session: a short-lived
+cookie, and the same value in the X-Read-Your-Writes response header for
+clients that do not keep cookies (they echo it back as a request header).
+The value is the Unix time until which reads go to the primary. The window
+should comfortably exceed the replica's usual lag.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from app.core.config import settings
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+
+# Session.info keys
+READ_ONLY_SESSION_KEY = "read_only"  # Set on replica sessions
+_SESSION_WROTE_KEY = "wrote"
+
+READ_YOUR_WRITES_COOKIE = "read_your_writes"
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+
+class _RequestWrites:
+    """Whether the current request committed a write; shared with threadpool workers."""
+
+    def __init__(self):
+        self.committed = False
+
+
+_request_writes: ContextVar[Optional[_RequestWrites]] = ContextVar("read_your_writes", default=None)
+
+
+def reads_from_primary(connection: HTTPConnection) -> bool:
+    """True if the request carries an unexpired read-your-writes marker."""
+    marker = connection.headers.get(READ_YOUR_WRITES_HEADER) or connection.cookies.get(
+        READ_YOUR_WRITES_COOKIE
+    )
+    if not marker:
+        return False
+    try:
+        return float(marker) > time.time()
+    except ValueError:
+        return False
+
+
+def track_writes(session_factory: sessionmaker) -> None:
+    """Flag the current request when a session from ``session_factory`` commits writes."""
+
+    @event.listens_for(session_factory, "after_flush")
+    def _flushed(session: Session, _flush_context) -> None:
+        session.info[_SESSION_WROTE_KEY] = True
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _executed(orm_execute_state: ORMExecuteState) -> None:
+        # Bulk query.update()/delete() and insert() statements skip the flush
+        if (
+            orm_execute_state.is_insert
+            or orm_execute_state.is_update
+            or orm_execute_state.is_delete
+        ):
+            orm_execute_state.session.info[_SESSION_WROTE_KEY] = True
+
+    @event.listens_for(session_factory, "after_commit")
+    def _committed(session: Session) -> None:
+        if session.info.pop(_SESSION_WROTE_KEY, False):
+            writes = _request_writes.get()
+            if writes is not None:
+                writes.committed = True
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _rolled_back(session: Session) -> None:
+        session.info.pop(_SESSION_WROTE_KEY, None)
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware that hands the read-your-writes marker to clients that wrote."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes = _RequestWrites()
+
+        async def send_with_marker(message):
+            if message["type"] == "http.response.start" and writes.committed:
+                window = settings.READ_YOUR_WRITES_SECONDS
+                marker = f"{time.time() + window:.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(READ_YOUR_WRITES_HEADER, marker)
+                headers.append(
+                    "Set-Cookie",
+                    f"{READ_YOUR_WRITES_COOKIE}={marker}; Max-Age={int(window) + 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        token = _request_writes.set(writes)
+        try:
+            await self.app(scope, receive, send_with_marker)
+        finally:
+            _request_writes.reset(token)
@@ -1,12 +1,60 @@
 # Database session management
 import logging
 import os
+from typing import Any, Dict, Optional
 
+from app.core.config import settings
+from app.db.pool_monitor import MonitoredAsyncQueuePool, MonitoredQueuePool, pool_monitor
+from app.db.replica import READ_ONLY_SESSION_KEY, track_writes
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 logger = logging.getLogger(__name__)
 
+# asyncio drivers used for the async engine, by database backend
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def get_async_database_url(url: str) -> Optional[str]:
+    """Map a sync DATABASE_URL to the same database through its asyncio driver."""
+    url_obj = make_url(url)
+    driver = ASYNC_DRIVERS.get(url_obj.get_backend_name())
+    if driver is None:
+        return None
+    return url_obj.set(drivername=f"{url_obj.get_backend_name()}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+def get_pool_options(url: str, poolclass: type) -> Dict[str, Any]:
+    """Pool sizing from Settings; SQLite keeps SQLAlchemy's default pool."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
+
+def _create_monitored_engine(name: str, url: str) -> Engine:
+    engine = create_engine(url, pool_pre_ping=True, **get_pool_options(url, MonitoredQueuePool))
+    pool_monitor.instrument(name, engine)
+    return engine
+
+
+def _create_monitored_async_engine(name: str, async_url: str) -> AsyncEngine:
+    engine = create_async_engine(
+        async_url, pool_pre_ping=True, **get_pool_options(async_url, MonitoredAsyncQueuePool)
+    )
+    pool_monitor.instrument(name, engine.sync_engine)
+    return engine
+
+
 DATABASE_URL = os.environ.get("DATABASE_URL")
 if not DATABASE_URL:
     logger.warning("DATABASE_URL is not set. Database features will not work.")
@@ -16,11 +64,69 @@ if not DATABASE_URL:
     SessionLocal = None
 else:
     try:
-        engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+        engine = _create_monitored_engine("sync", DATABASE_URL)
         SessionLocal = sessionmaker(
             autocommit=False, autoflush=False, bind=engine
         )  # pylint: disable=invalid-name
+        # Requests that commit writes pin the client's reads to the primary for a while
+        track_writes(SessionLocal)
     except Exception as e:
         logger.error("Failed to create database engine: %s", e)
         engine = None
         SessionLocal = None
+
+# Async engine for `async def` routes, on the same database. Sessions keep
+# attributes loaded after commit, since lazy loads cannot happen implicitly
+# outside the session's greenlet.
+async_engine = None
+AsyncSessionLocal = None  # pylint: disable=invalid-name
+if DATABASE_URL:
+    ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL") or get_async_database_url(
+        DATABASE_URL
+    )
+    if not ASYNC_DATABASE_URL:
+        logger.warning("No asyncio driver for DATABASE_URL; async routes will not work.")
+    else:
+        try:
+            async_engine = _create_monitored_async_engine("async", ASYNC_DATABASE_URL)
+            AsyncSessionLocal = async_sessionmaker(
+                bind=async_engine, autoflush=False, expire_on_commit=False
+            )
+        except Exception as e:
+            logger.error("Failed to create async database engine: %s", e)
+            async_engine = None
+            AsyncSessionLocal = None
+
+# Optional read replica for read-only endpoints (see deps.get_read_db). Without
+# one, read-only dependencies use the primary.
+DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+replica_engine = None
+ReplicaSessionLocal = None  # pylint: disable=invalid-name
+async_replica_engine = None
+AsyncReplicaSessionLocal = None  # pylint: disable=invalid-name
+if DATABASE_REPLICA_URL:
+    try:
+        replica_engine = _create_monitored_engine("replica", DATABASE_REPLICA_URL)
+        ReplicaSessionLocal = sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=replica_engine,
+            info={READ_ONLY_SESSION_KEY: True},
+        )
+        ASYNC_DATABASE_REPLICA_URL = get_async_database_url(DATABASE_REPLICA_URL)
+        if ASYNC_DATABASE_REPLICA_URL:
+            async_replica_engine = _create_monitored_async_engine(
+                "async_replica", ASYNC_DATABASE_REPLICA_URL
+            )
+            AsyncReplicaSessionLocal = async_sessionmaker(
+                bind=async_replica_engine,
+                autoflush=False,
+                expire_on_commit=False,
+                info={READ_ONLY_SESSION_KEY: True},
+            )
+    except Exception as e:
+        logger.error("Failed to create read replica engine, reading from the primary: %s", e)
+        replica_engine = None
+        ReplicaSessionLocal = None
+        async_replica_engine = None
+        AsyncReplicaSessionLocal = None
@@ -13,6 +13,7 @@ from sqlalchemy import (
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -74,6 +75,9 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     skills = Column(JSON, nullable=True)  # User skills stored as JSON array
 
+    # Case-insensitive email lookups (webhook author resolution)
+    __table_args__ = (Index("ix_users_email_lower", func.lower(email)),)
+
     # Relationships
     projects_owned = relationship("Client", back_populates="creator")
     tasks_assigned = relationship("Task", back_populates="assignee")
@@ -137,6 +141,39 @@ class Project(Base):
     repositories = relationship(
         "Repository", back_populates="project", cascade="all, delete-orphan"
     )
+    rollup = relationship(
+        "ProjectRollup", back_populates="project", uselist=False, cascade="all, delete-orphan"
+    )
+
+
+class ProjectRollup(Base):
+    """
+    Denormalized per-project counters, updated incrementally by the services that
+    write logged hours, tasks and git contributions. Rebuildable from source tables
+    with scripts/rebuild_project_rollups.py.
+    """
+
+    __tablename__ = "project_rollups"
+
+    project_id = Column(
+        Integer,
+        ForeignKey("projects.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+    )
+    total_hours = Column(Float, nullable=False, default=0.0)
+    # Task counts per status; total_tasks also includes tasks with any other status
+    total_tasks = Column(Integer, nullable=False, default=0)
+    todo_tasks = Column(Integer, nullable=False, default=0)
+    in_progress_tasks = Column(Integer, nullable=False, default=0)
+    done_tasks = Column(Integer, nullable=False, default=0)
+    commit_count = Column(Integer, nullable=False, default=0)
+    last_activity_at = Column(DateTime(timezone=True), nullable=True)
+    # Bumped by every flush that writes one of the project's rows (see project_rollup)
+    change_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+
+    # Relationships
+    project = relationship("Project", back_populates="rollup")
 
 
 class ProjectMember(Base):
@@ -199,6 +236,19 @@ class Task(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_tasks_project_status", project_id, status),
+        Index("ix_tasks_project_assigned_to", project_id, assigned_to),
+        # Overdue checks only look at open tasks with a due date
+        Index(
+            "ix_tasks_open_due_date",
+            project_id,
+            due_date,
+            postgresql_where=(status != "done") & due_date.isnot(None),
+            sqlite_where=(status != "done") & due_date.isnot(None),
+        ),
+    )
+
     # Relationships
     project = relationship("Project", back_populates="tasks")
     assignee = relationship("User", back_populates="tasks_assigned")
@@ -236,6 +286,12 @@ class LoggedHour(Base):
     note = Column(Text, nullable=True)
     logged_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Date-range filters and newest-first keyset pages, per project and per user
+    __table_args__ = (
+        Index("ix_logged_hours_project_logged_at", project_id, logged_at, id),
+        Index("ix_logged_hours_user_logged_at", user_id, logged_at, id),
+    )
+
     # Relationships
     user = relationship("User", back_populates="logged_hours")
     task = relationship("Task", back_populates="logged_hours")
@@ -260,6 +316,18 @@ class WorkSession(Base):
     status = Column(Enum(WorkSessionStatus), nullable=False)
     note = Column(Text, nullable=True)
 
+    __table_args__ = (
+        # Session history, newest first
+        Index("ix_work_sessions_user_started_at", user_id, started_at, id),
+        # A user's current (active or paused) session
+        Index(
+            "ix_work_sessions_user_open",
+            user_id,
+            postgresql_where=status.in_([WorkSessionStatus.ACTIVE, WorkSessionStatus.PAUSED]),
+            sqlite_where=status.in_([WorkSessionStatus.ACTIVE, WorkSessionStatus.PAUSED]),
+        ),
+    )
+
     user = relationship("User")
     task = relationship("Task")
     project = relationship("Project")
@@ -268,8 +336,12 @@ class WorkSession(Base):
 class GitContribution(Base):
     __tablename__ = "git_contributions"
 
-    # Composite Unique Constraint: same commit hash cannot be linked twice to the same project
-    __table_args__ = (UniqueConstraint("project_id", "commit_hash", name="uix_project_commit"),)
+    __table_args__ = (
+        # Composite Unique Constraint: same commit hash cannot be linked twice to the same project
+        UniqueConstraint("project_id", "commit_hash", name="uix_project_commit"),
+        # A project's contributions, newest first
+        Index("ix_git_contributions_project_created_at", "project_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
@@ -320,6 +392,12 @@ class Milestone(Base):
     name = Column(String, nullable=False)
     due_date = Column(DateTime(timezone=True), nullable=True)
     status = Column(String, default="not_started")
+    # Task counts per status, updated incrementally by the task service and
+    # rebuildable with scripts/rebuild_milestone_counters.py
+    total_tasks = Column(Integer, nullable=False, default=0)
+    todo_tasks = Column(Integer, nullable=False, default=0)
+    in_progress_tasks = Column(Integer, nullable=False, default=0)
+    done_tasks = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
 
@@ -373,6 +451,7 @@ class Invoice(Base):
 
     # PDF storage
     pdf_path = Column(String, nullable=True)
+    pdf_hash = Column(String(64), nullable=True)  # Snapshot hash the stored PDF was rendered from
 
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -390,6 +469,15 @@ class Invoice(Base):
     creator = relationship("User", foreign_keys=[created_by])
 
 
+class InvoiceNumberSequence(Base):
+    """Last invoice number issued per year (INV-YYYY-NNN), allocated atomically."""
+
+    __tablename__ = "invoice_number_sequences"
+
+    year = Column(Integer, primary_key=True)
+    last_number = Column(Integer, nullable=False, default=0)
+
+
 class InvoiceItem(Base):
     __tablename__ = "invoice_items"
 
@@ -461,6 +549,8 @@ class TaskAttachment(Base):
     file_path = Column(String, nullable=False)  # Storage location
     file_size = Column(Integer, nullable=False)  # Size in bytes
     mime_type = Column(String, nullable=False)
+    # SHA-256 of the content when stored as a shared blob (NULL for legacy per-upload files)
+    content_hash = Column(String(64), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
 
@@ -469,6 +559,18 @@ class TaskAttachment(Base):
     uploader = relationship("User", back_populates="task_attachments")
 
 
+class AttachmentBlob(Base):
+    """Content-addressed file shared by every attachment with the same bytes."""
+
+    __tablename__ = "attachment_blobs"
+
+    content_hash = Column(String(64), primary_key=True)  # SHA-256 hex digest
+    file_path = Column(String, nullable=False)  # Storage location
+    size = Column(Integer, nullable=False)  # Size in bytes
+    ref_count = Column(Integer, nullable=False, default=0)  # Attachments using this blob
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class TaskComment(Base):
     __tablename__ = "task_comments"
 
@@ -494,6 +596,57 @@ class TaskComment(Base):
     author = relationship("User", back_populates="task_comments")
 
 
+class TaskActivity(Base):
+    """
+    Log of what happened to a task (see services.task_activity).
+
+    Rows are inserted in the same transaction as the change they describe and
+    keep the time they were recorded; ``data`` is a snapshot of the change at
+    that time. Only activities about another row (comment, attachment, logged
+    hour, commit) are ever updated: editing that row rewrites their snapshot
+    and deleting it, or moving it to another task, sets ``deleted_at``.
+    """
+
+    __tablename__ = "task_activities"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(
+        Integer,
+        ForeignKey("tasks.id", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False,
+    )
+    project_id = Column(
+        Integer,
+        ForeignKey("projects.id", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False,
+    )
+    # User who performed the change (None for system changes or deleted users)
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="SET NULL", onupdate="CASCADE"),
+        nullable=True,
+    )
+    activity_type = Column(String(32), nullable=False)
+    # Id of the row the activity is about (comment, attachment, logged hour, commit)
+    source_id = Column(Integer, nullable=True)
+    data = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # When the source row was deleted; deleted activities are hidden from timelines and feeds
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # When the snapshot was last rewritten or hidden (part of the task timeline's version)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Task timelines and project feeds are range scans in (created_at, id) order
+    __table_args__ = (
+        Index("ix_task_activities_task_created_at", task_id, created_at, id),
+        Index("ix_task_activities_project_created_at", project_id, created_at, id),
+    )
+
+    # Relationships
+    task = relationship("Task")
+    user = relationship("User")
+
+
 class Repository(Base):
     __tablename__ = "repositories"
 
@@ -514,5 +667,42 @@ class Repository(Base):
     project = relationship("Project", back_populates="repositories")
 
 
+class WebhookDeliveryStatus(enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class WebhookDelivery(Base):
+    """Raw webhook delivery queued for asynchronous processing."""
+
+    __tablename__ = "webhook_deliveries"
+
+    # Providers redeliver with the same delivery ID; process each one only once
+    __table_args__ = (
+        UniqueConstraint("provider", "delivery_id", name="uix_provider_delivery"),
+        Index("ix_webhook_deliveries_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    provider = Column(String, nullable=False)  # github | gitlab | bitbucket
+    delivery_id = Column(String, nullable=False)
+    event = Column(String, nullable=True)
+    body = Column(Text, nullable=False)
+
+    status = Column(
+        Enum(WebhookDeliveryStatus), default=WebhookDeliveryStatus.PENDING, nullable=False
+    )
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+
+
 # --- Initialization Logic ---
 # removed for testing
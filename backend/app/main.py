@@ -1,5 +1,6 @@
 # Main application entry point
 import os
+from contextlib import asynccontextmanager
 
 from app.api.v1.routes import (
     admin,
@@ -20,7 +21,15 @@ from app.api.v1.routes import (
     work_sessions,
 )
 from app.core.config import settings
+from app.core.password_pool import password_hasher
+from app.db.pool_monitor import PoolHolderMiddleware
+from app.db.query_monitor import QueryStatsMiddleware
+from app.db.replica import READ_YOUR_WRITES_HEADER, ReadYourWritesMiddleware
+from app.db.session import async_engine
+from app.services.invoice_pdf import invoice_pdf_renderer
+from app.services.webhook_queue import webhook_worker_pool
 from app.utils.logger import get_logger
+from app.utils.pagination import NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, TOTAL_COUNT_HEADER
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -34,7 +43,19 @@ logger.info("Environment: %s", env)
 logger.info("Port: %s", port)
 
 
-app = FastAPI(title="Continuum API")
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Background workers drain the webhook delivery queue
+    webhook_worker_pool.start()
+    yield
+    webhook_worker_pool.stop()
+    invoice_pdf_renderer.shutdown()
+    password_hasher.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+app = FastAPI(title="Continuum API", lifespan=lifespan)
 
 # Configure CORS - REQUIRED for frontend to communicate with backend
 app.add_middleware(
@@ -49,7 +70,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods
     allow_headers=["*"],  # Allow all headers
+    # Totals and cursors of paginated lists, validators of conditional GETs
+    expose_headers=[
+        TOTAL_COUNT_HEADER,
+        NEXT_CURSOR_HEADER,
+        PREV_CURSOR_HEADER,
+        "Deprecation",
+        "ETag",
+        READ_YOUR_WRITES_HEADER,
+    ],
 )
+# Attributes database connection checkouts to routes (GET /admin/db-pool)
+app.add_middleware(PoolHolderMiddleware)
+# Counts SQL statements and DB time per request (Server-Timing, N+1 warnings)
+app.add_middleware(QueryStatsMiddleware)
+# Marks clients that just wrote so their next reads skip the read replica
+app.add_middleware(ReadYourWritesMiddleware)
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}/users", tags=["Users"])
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["Auth"])
 app.include_router(admin.router, prefix=f"{settings.API_V1_STR}/admin", tags=["Admin"])
@@ -3,7 +3,7 @@ from decimal import Decimal
 from enum import Enum
 from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class InvoiceStatusEnum(str, Enum):
@@ -61,6 +61,34 @@ class InvoiceGenerate(InvoiceBase):
     """Schema for invoice generation request"""
 
 
+class InvoiceBatchGenerate(BaseModel):
+    """Schema for generating many invoices (projects x billing periods) in one call"""
+
+    invoices: List[InvoiceGenerate] = Field(..., min_length=1, max_length=500)
+
+
+class InvoiceBatchItemResult(BaseModel):
+    """Outcome of one entry of a batch generation request"""
+
+    project_id: int
+    billing_period_start: datetime
+    billing_period_end: datetime
+    success: bool
+    invoice_id: Optional[int] = None
+    invoice_number: Optional[str] = None
+    total: Optional[Decimal] = None
+    items_count: int = 0
+    error: Optional[str] = None
+
+
+class InvoiceBatchResult(BaseModel):
+    """Schema for batch invoice generation response (one result per requested entry)"""
+
+    created: int
+    failed: int
+    results: List[InvoiceBatchItemResult]
+
+
 class InvoiceUpdate(BaseModel):
     """Schema for updating invoice (status only)"""
 
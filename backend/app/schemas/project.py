@@ -146,7 +146,7 @@ class ProjectHealth(BaseModel):
 
 # Support schemas for ProjectProgress
 class ActivityItem(BaseModel):
-    type: Literal["logged_hours", "commit"]
+    type: Literal["logged_hours", "commit", "task_created", "status_changed"]
     description: str
     date: datetime
 
@@ -22,6 +22,8 @@ class ActivityType(str, Enum):
     ATTACHMENT_UPLOADED = "attachment_uploaded"
     HOURS_LOGGED = "hours_logged"
     COMMIT_LINKED = "commit_linked"
+    # Project feeds only: a commit recorded for the project, linked to a task or not
+    COMMIT_ADDED = "commit_added"
 
 
 class ActivityUser(BaseModel):
@@ -62,17 +64,32 @@ class TimelineActivity(BaseModel):
     # - attachment_uploaded: {attachment_id, filename, file_size, mime_type}
     # - hours_logged: {logged_hour_id, hours, description, date}
     # - commit_linked: {commit_id, commit_hash, commit_message, branch, provider}
+    # - commit_added: {commit_id, commit_hash, commit_message, branch, provider}
     data: Dict[str, Any]
 
 
+class ProjectActivity(TimelineActivity):
+    """
+    An entry of a project's activity feed.
+
+    Commits appear once, as commit_added, whether or not they are linked to a
+    task; commit_linked entries stay in the task timelines.
+    """
+
+    # Task the activity belongs to (None for hours and commits without a task)
+    task_id: Optional[int] = None
+
+
 class TaskTimelineResponse(BaseModel):
     """
     Response schema for the task timeline endpoint.
 
-    Returns a paginated list of activities in chronological order.
+    Returns a paginated list of activities in chronological order. Pass
+    ``next_cursor`` back as ``cursor`` to get the following page.
     """
 
     activities: list[TimelineActivity]
     total: int
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
@@ -0,0 +1,186 @@
+"""
+Reference counting for content-addressed attachment blobs.
+
+Every TaskAttachment stored in the blob store holds one reference on its
+AttachmentBlob row. Releasing the last reference leaves the row at ref_count 0;
+once that release is committed, ``purge`` locks the row again and removes the
+file and the row. A rolled-back delete therefore never loses a file, and every
+path locks the blob row (SELECT ... FOR UPDATE where supported), so a
+concurrent upload of the same bytes can never lose its file to a purge.
+"""
+
+from typing import Dict, Optional
+
+from app.dbmodels import AttachmentBlob, TaskAttachment
+from app.utils.file_upload import ContentAddressedStorage, delete_file
+from app.utils.logger import get_logger
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+logger = get_logger(__name__)
+
+
+class AttachmentBlobService:
+    @staticmethod
+    def _lock(db: Session, content_hash: str) -> Optional[AttachmentBlob]:
+        return (
+            db.query(AttachmentBlob)
+            .filter(AttachmentBlob.content_hash == content_hash)
+            .with_for_update()
+            .first()
+        )
+
+    @staticmethod
+    def acquire(
+        db: Session,
+        storage: ContentAddressedStorage,
+        staging_path: str,
+        content_hash: str,
+        size: int,
+    ) -> str:
+        """
+        Add a reference to the blob for a staged upload, creating the blob if needed.
+
+        The staged file becomes the blob file if none exists, otherwise it is
+        dropped. The blob row is flushed but not committed; the caller commits
+        it together with the attachment row.
+
+        Returns:
+            The blob's storage path
+        """
+        blob = AttachmentBlobService._lock(db, content_hash)
+        if blob is None:
+            blob = AttachmentBlob(
+                content_hash=content_hash,
+                file_path=storage.blob_path(content_hash),
+                size=size,
+                ref_count=0,
+            )
+            try:
+                with db.begin_nested():
+                    db.add(blob)
+            except IntegrityError:
+                # Another upload created the same blob concurrently
+                blob = AttachmentBlobService._lock(db, content_hash)
+
+        # Promote under the row lock so a concurrent release cannot unlink it in between
+        blob.file_path = storage.promote_staged(staging_path, content_hash)
+        blob.ref_count += 1
+        db.flush()
+        return blob.file_path
+
+    @staticmethod
+    def release(db: Session, content_hash: str) -> bool:
+        """
+        Drop a reference to a blob (no commit).
+
+        The blob row and file stay in place; when this was the last reference,
+        call ``purge`` after committing.
+
+        Returns:
+            True if no references remain, False otherwise
+        """
+        blob = AttachmentBlobService._lock(db, content_hash)
+        if blob is None:
+            logger.warning("Releasing unknown attachment blob %s", content_hash)
+            return False
+
+        blob.ref_count -= 1
+        db.flush()
+        return blob.ref_count <= 0
+
+    @staticmethod
+    def purge(db: Session, content_hash: str) -> bool:
+        """
+        Remove an unreferenced blob row and its file. Commits.
+
+        Only call it once the release of the last reference is committed. The
+        row is locked again first, so a blob that an upload re-acquired in the
+        meantime is kept, and an upload waiting on the lock re-creates the row
+        and file. Should this commit fail after the file is gone, the row stays
+        at ref_count 0: the next upload of the content restores the file and
+        ``reconcile`` drops the row.
+
+        Returns:
+            True if the blob was removed
+        """
+        blob = AttachmentBlobService._lock(db, content_hash)
+        if blob is None or blob.ref_count > 0:
+            db.commit()
+            return False
+
+        if not delete_file(blob.file_path):
+            logger.warning("Could not delete attachment blob file %s", blob.file_path)
+        db.delete(blob)
+        db.commit()
+        return True
+
+    @staticmethod
+    def reconcile(db: Session) -> Dict[str, int]:
+        """
+        Recount blob references from task_attachments and drop unreferenced blobs.
+
+        Attachments removed by a cascading task delete never release their blob,
+        so this repairs counts and reclaims space. Counts are committed before
+        any file is removed. Commits.
+        """
+        counts = dict(
+            db.query(TaskAttachment.content_hash, func.count(TaskAttachment.id))
+            .filter(TaskAttachment.content_hash.isnot(None))
+            .group_by(TaskAttachment.content_hash)
+            .all()
+        )
+
+        updated = 0
+        unreferenced = []
+        for blob in db.query(AttachmentBlob).with_for_update().all():
+            ref_count = counts.get(blob.content_hash, 0)
+            if ref_count == 0:
+                unreferenced.append(blob.content_hash)
+            elif blob.ref_count != ref_count:
+                updated += 1
+            blob.ref_count = ref_count
+        db.commit()
+
+        removed = sum(
+            AttachmentBlobService.purge(db, content_hash) for content_hash in unreferenced
+        )
+        return {"updated": updated, "removed": removed}
+
+    @staticmethod
+    def get_stats(db: Session) -> Dict[str, float]:
+        """
+        Report how much storage deduplication saves.
+
+        logical_bytes is what the attachments would take as separate files,
+        stored_bytes what the blob store actually holds.
+        """
+        attachments, logical_bytes = (
+            db.query(
+                func.count(TaskAttachment.id), func.coalesce(func.sum(TaskAttachment.file_size), 0)
+            )
+            .filter(TaskAttachment.content_hash.isnot(None))
+            .one()
+        )
+        blobs, stored_bytes = db.query(
+            func.count(AttachmentBlob.content_hash),
+            func.coalesce(func.sum(AttachmentBlob.size), 0),
+        ).one()
+        legacy_attachments = (
+            db.query(func.count(TaskAttachment.id))
+            .filter(TaskAttachment.content_hash.is_(None))
+            .scalar()
+        )
+
+        logical_bytes = int(logical_bytes)
+        stored_bytes = int(stored_bytes)
+        return {
+            "attachments": int(attachments),
+            "blobs": int(blobs),
+            "logical_bytes": logical_bytes,
+            "stored_bytes": stored_bytes,
+            "saved_bytes": logical_bytes - stored_bytes,
+            "dedup_ratio": round(logical_bytes / stored_bytes, 2) if stored_bytes else 1.0,
+            "legacy_attachments": int(legacy_attachments or 0),
+        }
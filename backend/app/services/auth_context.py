@@ -0,0 +1,142 @@
+"""
+Request-scoped authorization context.
+
+Loads the current user's project memberships once (one query, on first use)
+and answers membership and project-role questions from memory for the rest of
+the request. Routes get it through ``deps.get_auth_context``; FastAPI caches
+dependencies per request, so every dependency and service in a request shares
+the same instance.
+"""
+
+from typing import Dict, Optional, Set
+
+from app.dbmodels import Project, ProjectMember, User, UserRole
+from fastapi import HTTPException, status
+from sqlalchemy import exists
+from sqlalchemy.orm import Query, Session
+
+# Global roles with admin privileges (see deps.is_admin_user)
+ADMIN_ROLES = {UserRole.ADMIN, UserRole.PROJECTMANAGER}
+
+# ProjectMember.role values that may administer a project
+PROJECT_ADMIN_ROLES = {UserRole.ADMIN.value, UserRole.PROJECTMANAGER.value}
+
+
+def scope_to_member_projects(query: Query, project_id_column, user_id: int) -> Query:
+    """Restrict a query to rows whose project the user is a member of (correlated EXISTS)."""
+    return query.filter(
+        exists().where(
+            ProjectMember.project_id == project_id_column, ProjectMember.user_id == user_id
+        )
+    )
+
+
+class _AuthCache:
+    """What an AuthContext has loaded; shared with the contexts bound from it."""
+
+    def __init__(self):
+        self.memberships: Optional[Dict[int, ProjectMember]] = None
+        self.existing_projects: Dict[int, bool] = {}
+
+
+class AuthContext:
+    """Authorization facts about the current user, resolved at most once per request."""
+
+    def __init__(self, db: Session, user: User, cache: Optional[_AuthCache] = None):
+        self.db = db
+        self.user = user
+        self.user_id = user.id
+        self.is_admin = user.role in ADMIN_ROLES
+        self._cache = cache if cache is not None else _AuthCache()
+
+    def bind(self, db: Session) -> "AuthContext":
+        """
+        The same context on another session, e.g. the sync session inside
+        ``AsyncSession.run_sync``. Both contexts share what either one loads.
+        """
+        return AuthContext(db, self.user, cache=self._cache)
+
+    @property
+    def memberships(self) -> Dict[int, ProjectMember]:
+        """project_id -> the user's ProjectMember row, loaded with a single query."""
+        if self._cache.memberships is None:
+            self._cache.memberships = {
+                member.project_id: member
+                for member in self.db.query(ProjectMember).filter(
+                    ProjectMember.user_id == self.user_id
+                )
+            }
+        return self._cache.memberships
+
+    def member_project_ids(self) -> Set[int]:
+        return set(self.memberships)
+
+    def is_member(self, project_id: int) -> bool:
+        return project_id in self.memberships
+
+    def role_in(self, project_id: int) -> Optional[str]:
+        """The user's role in a project, or None if not a member."""
+        member = self.memberships.get(project_id)
+        return member.role if member is not None else None
+
+    def can_access(self, project_id: int) -> bool:
+        """Admins can access every project, other users only their own."""
+        return self.is_admin or self.is_member(project_id)
+
+    def scope(self, query: Query, project_id_column) -> Query:
+        """
+        Push member/admin scoping into SQL: admins see everything, other users
+        only rows of their projects. Lets the database paginate and count.
+        """
+        if self.is_admin:
+            return query
+        return scope_to_member_projects(query, project_id_column, self.user_id)
+
+    def is_project_admin(self, project_id: int) -> bool:
+        return self.role_in(project_id) in PROJECT_ADMIN_ROLES
+
+    def project_exists(self, project_id: int) -> bool:
+        """Check a project exists; memberships imply it, other IDs cost one query each."""
+        if project_id in self.memberships:
+            return True
+        existing_projects = self._cache.existing_projects
+        if project_id not in existing_projects:
+            existing_projects[project_id] = (
+                self.db.query(Project.id).filter(Project.id == project_id).first() is not None
+            )
+        return existing_projects[project_id]
+
+    def require_project(self, project_id: int, detail: str = "This Project does not exist") -> None:
+        if not self.project_exists(project_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+    def require_member(
+        self, project_id: int, detail: str = "You are not a member of this project"
+    ) -> ProjectMember:
+        """Return the user's membership of a project; 404 if it does not exist, else 403."""
+        member = self.memberships.get(project_id)
+        if member is None:
+            self.require_project(project_id)
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+        return member
+
+    def require_access(
+        self,
+        project_id: int,
+        detail: str = "You are not a member of this project",
+        not_found_detail: str = "This Project does not exist",
+    ) -> None:
+        """Like require_member, but admins pass for any existing project."""
+        self.require_project(project_id, not_found_detail)
+        if not self.can_access(project_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+    def require_project_admin(self, project_id: int) -> ProjectMember:
+        """Return the user's membership if they administer the project (admin or PM role)."""
+        member = self.require_member(project_id)
+        if member.role not in PROJECT_ADMIN_ROLES:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You must be an admin or a project manager of this project",
+            )
+        return member
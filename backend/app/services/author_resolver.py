@@ -0,0 +1,195 @@
+"""
+Commit author resolution shared by webhook ingestion and manual contributions.
+
+Maps author emails to user IDs through an in-process LRU cache with a TTL.
+Unknown emails are cached too (negative entries, shorter TTL), so a push
+authored by the same few developers costs at most one query per new address.
+Entries are invalidated when a user is created, deleted or changes email.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.dbmodels import User
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+NO_REPLY_PATTERNS = [
+    r"noreply@.*",
+    r"no-reply@.*",
+    r".*@users\.noreply\.github\.com",
+    r".*@users\.noreply\.gitlab\.com",
+    r".*@bitbucket\.org",
+]
+
+# Single alternation compiled once; matched against the lowercased address
+NO_REPLY_RE = re.compile("|".join(f"(?:{pattern})" for pattern in NO_REPLY_PATTERNS))
+
+# Max emails per IN list when resolving cache misses
+LOOKUP_BATCH_SIZE = 1000
+
+
+def normalize_email(email: Optional[str]) -> str:
+    return (email or "").strip().lower()
+
+
+def is_no_reply_email(email: Optional[str]) -> bool:
+    """Check if an email is empty or a provider no-reply address."""
+    email = normalize_email(email)
+    return not email or NO_REPLY_RE.match(email) is not None
+
+
+@dataclass
+class CacheCounters:
+    """Lookup and eviction counters of an AuthorCache; updated under the cache lock."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class AuthorCache:
+    """Thread-safe LRU/TTL cache of lowercased email -> user_id (None if unknown)."""
+
+    def __init__(self, max_size: int, ttl_seconds: float, negative_ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Optional[int], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = CacheCounters()
+
+    def get(self, email: str) -> Tuple[bool, Optional[int]]:
+        """
+        Look up a normalized email.
+
+        Returns:
+            (found, user_id) - user_id is None for a cached negative entry
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[email]
+                self.counters.misses += 1
+                return False, None
+            self._entries.move_to_end(email)
+            self.counters.hits += 1
+            return True, entry[0]
+
+    def set(self, email: str, user_id: Optional[int]) -> None:
+        if self.max_size <= 0:
+            return
+        ttl = self.ttl_seconds if user_id is not None else self.negative_ttl_seconds
+        with self._lock:
+            self._entries[email] = (user_id, time.monotonic() + ttl)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.counters.evictions += 1
+
+    def invalidate(self, email: Optional[str]) -> None:
+        with self._lock:
+            self._entries.pop(normalize_email(email), None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every entry pointing at a user (the previous email is not always loaded)."""
+        with self._lock:
+            stale = [
+                email for email, (cached_id, _) in self._entries.items() if cached_id == user_id
+            ]
+            for email in stale:
+                del self._entries[email]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.counters.hits,
+                "misses": self.counters.misses,
+                "evictions": self.counters.evictions,
+            }
+
+
+author_cache = AuthorCache(
+    max_size=settings.AUTHOR_CACHE_SIZE,
+    ttl_seconds=settings.AUTHOR_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=settings.AUTHOR_CACHE_NEGATIVE_TTL_SECONDS,
+)
+
+
+class AuthorResolver:
+    @staticmethod
+    def resolve_user_ids(db: Session, emails: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        Resolve author emails to user IDs (case-insensitive).
+
+        Cache misses are looked up with one IN query per batch and cached,
+        including emails that match no user.
+
+        Returns:
+            Mapping of normalized email -> user_id (None when no user matches)
+        """
+        resolved: Dict[str, Optional[int]] = {}
+        missing = []
+        for email in {normalize_email(email) for email in emails}:
+            if not email:
+                continue
+            found, user_id = author_cache.get(email)
+            if found:
+                resolved[email] = user_id
+            else:
+                missing.append(email)
+
+        for start in range(0, len(missing), LOOKUP_BATCH_SIZE):
+            chunk = missing[start : start + LOOKUP_BATCH_SIZE]
+            matches = {
+                normalize_email(email): user_id
+                for user_id, email in db.query(User.id, User.email).filter(
+                    func.lower(User.email).in_(chunk)
+                )
+            }
+            for email in chunk:
+                user_id = matches.get(email)
+                author_cache.set(email, user_id)
+                resolved[email] = user_id
+
+        return resolved
+
+    @staticmethod
+    def resolve_user_id(db: Session, email: str) -> Optional[int]:
+        """Resolve a single author email to a user ID."""
+        return AuthorResolver.resolve_user_ids(db, [email]).get(normalize_email(email))
+
+    @staticmethod
+    def remember(email: Optional[str], user_id: int) -> None:
+        """Warm the cache with a user already loaded by the caller."""
+        email = normalize_email(email)
+        if email:
+            author_cache.set(email, user_id)
+
+
+# Keep the cache consistent with writes to users, whichever code path makes them
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_email(_mapper, _connection, target: User) -> None:
+    author_cache.invalidate(target.email)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_email(_mapper, _connection, target: User) -> None:
+    history = inspect(target).attrs.email.history
+    if history.has_changes():
+        author_cache.invalidate_user(target.id)
+        for email in history.added or ():
+            author_cache.invalidate(email)
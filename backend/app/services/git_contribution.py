@@ -1,30 +1,20 @@
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Optional
 
-from app.dbmodels import GitContribution, Project, ProjectMember, Task, User
+from app.dbmodels import GitContribution, Task, User
 from app.schemas.git_contribution import GitContributionCreate, GitContributionUpdate
+from app.services.auth_context import AuthContext
+from app.services.author_resolver import AuthorResolver
+from app.services.project_rollup import ProjectRollupService
+from app.services.task_activity import TaskActivityService
+from app.utils.pagination import KeysetOrder, Page, PageParams, paginate_keyset
 from fastapi import HTTPException, status
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+CONTRIBUTION_ORDER = KeysetOrder((GitContribution.created_at, GitContribution.id), descending=True)
 
-class GitContributionService:
-    @staticmethod
-    def _check_project_membership(
-        db: Session, project_id: int, user_id: int, is_admin: bool = False
-    ) -> bool:
-        """Check if user is a member of the project."""
-        if is_admin:
-            return True
-
-        member = (
-            db.query(ProjectMember)
-            .filter(ProjectMember.project_id == project_id, ProjectMember.user_id == user_id)
-            .first()
-        )
-
-        return member is not None
 
+class GitContributionService:
     @staticmethod
     def _check_task_belongs_to_project(db: Session, task_id: int, project_id: int) -> bool:
         """Check if task belongs to the project."""
@@ -36,8 +26,7 @@ class GitContributionService:
     def create_contribution(
         db: Session,
         contribution_in: GitContributionCreate,
-        current_user_id: int,
-        is_admin: bool = False,
+        auth: AuthContext,
     ) -> GitContribution:
         """
         Create a new git contribution.
@@ -48,14 +37,10 @@ class GitContributionService:
         - If task_id is provided, task must belong to the project
         """
         # Verify project exists
-        project = db.query(Project).filter(Project.id == contribution_in.project_id).first()
-        if not project:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+        auth.require_project(contribution_in.project_id, detail="Project not found")
 
         # Check project membership (unless admin)
-        if not GitContributionService._check_project_membership(
-            db, contribution_in.project_id, current_user_id, is_admin
-        ):
+        if not auth.can_access(contribution_in.project_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You must be a member of this project to create contributions",
@@ -66,9 +51,11 @@ class GitContributionService:
         user = db.query(User).filter(User.id == contribution_in.user_id).first()
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        # Share the lookup with webhook ingestion for this author's later pushes
+        AuthorResolver.remember(user.email, user.id)
 
         # Only allow creating for self unless admin
-        if not is_admin and contribution_in.user_id != current_user_id:
+        if not auth.is_admin and contribution_in.user_id != auth.user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You can only create contributions for yourself",
@@ -117,15 +104,18 @@ class GitContributionService:
         )
 
         db.add(db_contribution)
+        ProjectRollupService.record_commits(db, contribution_in.project_id, 1, now)
+        if db_contribution.task_id:
+            TaskActivityService.record_commit_linked(
+                db, db.get(Task, db_contribution.task_id), db_contribution, auth.user_id
+            )
         db.commit()
         db.refresh(db_contribution)
 
         return db_contribution
 
     @staticmethod
-    def get_contribution(
-        db: Session, contribution_id: int, current_user_id: int, is_admin: bool = False
-    ) -> GitContribution:
+    def get_contribution(db: Session, contribution_id: int, auth: AuthContext) -> GitContribution:
         """
         Retrieve a contribution by ID.
 
@@ -142,9 +132,7 @@ class GitContributionService:
             )
 
         # Check project membership
-        if not GitContributionService._check_project_membership(
-            db, contribution.project_id, current_user_id, is_admin
-        ):
+        if not auth.can_access(contribution.project_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have access to this contribution",
@@ -155,21 +143,22 @@ class GitContributionService:
     @staticmethod
     def list_contributions(
         db: Session,
-        current_user_id: int,
-        is_admin: bool = False,
+        auth: AuthContext,
+        page: PageParams,
         user_id: Optional[int] = None,
         project_id: Optional[int] = None,
         provider: Optional[str] = None,
-    ) -> List[GitContribution]:
+    ) -> Page:
         """
-        List contributions with optional filters.
+        List a page of contributions with optional filters, newest first.
 
         Business Rules:
         - Non-admin users can only see contributions from projects they are members of
         - Admins can see all contributions
         - Filters are combinable
         """
-        query = db.query(GitContribution)
+        # Membership scoping is an EXISTS in the same query as the page and its count
+        query = auth.scope(db.query(GitContribution), GitContribution.project_id)
 
         # Apply filters
         if user_id:
@@ -179,10 +168,8 @@ class GitContributionService:
             query = query.filter(GitContribution.project_id == project_id)
 
             # For non-admin users, verify project membership if filtering by project
-            if not is_admin:
-                if not GitContributionService._check_project_membership(
-                    db, project_id, current_user_id, is_admin
-                ):
+            if not auth.is_admin:
+                if not auth.is_member(project_id):
                     raise HTTPException(
                         status_code=status.HTTP_403_FORBIDDEN,
                         detail="You are not a member of this project",
@@ -191,26 +178,14 @@ class GitContributionService:
         if provider:
             query = query.filter(GitContribution.provider == provider.lower())
 
-        # For non-admin users, filter by project membership
-        if not is_admin:
-            # Get all project IDs where user is a member using a subquery
-            member_project_ids = (
-                select(ProjectMember.project_id)
-                .where(ProjectMember.user_id == current_user_id)
-                .scalar_subquery()
-            )
-
-            query = query.filter(GitContribution.project_id.in_(member_project_ids))
-
-        return query.all()
+        return paginate_keyset(query, CONTRIBUTION_ORDER, page)
 
     @staticmethod
     def link_to_task(
         db: Session,
         contribution_id: int,
         task_id: Optional[int],
-        current_user_id: int,
-        is_admin: bool = False,
+        auth: AuthContext,
     ) -> GitContribution:
         """
         Link a contribution to a task.
@@ -229,7 +204,7 @@ class GitContributionService:
             )
 
         # Check permission: only contributor or admin can link
-        if not is_admin and contribution.user_id != current_user_id:
+        if not auth.is_admin and contribution.user_id != auth.user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only the contributor or admin can link commits to tasks",
@@ -246,7 +221,9 @@ class GitContributionService:
                 )
 
         # Update task link
+        old_task_id = contribution.task_id
         contribution.task_id = task_id
+        TaskActivityService.record_commit_edited(db, contribution, old_task_id, auth.user_id)
         db.add(contribution)
         db.commit()
         db.refresh(contribution)
@@ -258,8 +235,7 @@ class GitContributionService:
         db: Session,
         contribution_id: int,
         contribution_in: GitContributionUpdate,
-        current_user_id: int,
-        is_admin: bool = False,
+        auth: AuthContext,
     ) -> GitContribution:
         """
         Update a contribution.
@@ -278,7 +254,7 @@ class GitContributionService:
             )
 
         # Check permission: only contributor or admin can update
-        if not is_admin and contribution.user_id != current_user_id:
+        if not auth.is_admin and contribution.user_id != auth.user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only the contributor or admin can update contributions",
@@ -298,10 +274,12 @@ class GitContributionService:
                 )
 
         # Update fields
+        old_task_id = contribution.task_id
         update_data = contribution_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(contribution, field, value)
 
+        TaskActivityService.record_commit_edited(db, contribution, old_task_id, auth.user_id)
         db.add(contribution)
         db.commit()
         db.refresh(contribution)
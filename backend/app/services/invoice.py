@@ -1,212 +1,303 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from app.core.config import settings
+from app.db.session import SessionLocal
 from app.dbmodels import (
     Invoice,
     InvoiceItem,
+    InvoiceNumberSequence,
     InvoiceStatus,
     LoggedHour,
     Project,
-    ProjectMember,
     User,
-    UserRole,
 )
-from app.schemas.invoice import InvoiceGenerate, InvoiceUpdate
+from app.schemas.invoice import (
+    InvoiceBatchGenerate,
+    InvoiceBatchItemResult,
+    InvoiceBatchResult,
+    InvoiceGenerate,
+    InvoiceUpdate,
+)
+from app.services.auth_context import AuthContext
+from app.utils.logger import get_logger
+from app.utils.pagination import KeysetOrder, Page, PageParams, paginate_keyset
 from fastapi import HTTPException, status
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
-
-
-def _is_admin(user: User) -> bool:
-    """Check if user has admin privileges."""
-    return user.role in {UserRole.ADMIN, UserRole.PROJECTMANAGER}
-
+from sqlalchemy import and_, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 
-def _check_project_access(db: Session, project_id: int, user: User) -> Project:
-    """Check if user has access to project (member or admin)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+logger = get_logger(__name__)
 
-    is_admin = _is_admin(user)
-    if is_admin:
-        return project
 
-    # Check if user is a project member
-    member = (
-        db.query(ProjectMember)
-        .filter(and_(ProjectMember.project_id == project_id, ProjectMember.user_id == user.id))
-        .first()
+def _check_project_access(auth: AuthContext, project_id: int) -> None:
+    """Check the project exists and the user may invoice it (member or admin)."""
+    auth.require_access(
+        project_id,
+        detail="You must be a project member or admin to generate invoices",
+        not_found_detail="Project not found",
     )
 
-    if not member:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You must be a project member or admin to generate invoices",
-        )
-
-    return project
 
-
-def _generate_invoice_number(db: Session, year: int) -> str:
+def _get_last_issued_number(db: Session, year: int) -> int:
     """
-    Generate sequential invoice number in format INV-YYYY-XXX.
+    Find the highest INV-YYYY-NNN number already issued for a year.
 
-    Returns the next invoice number for the given year.
+    Only used to seed a year's sequence row the first time it is needed.
     """
-    # Find the highest invoice number for this year
     year_prefix = f"INV-{year}-"
+    last_number = 0
+    for (invoice_number,) in db.query(Invoice.invoice_number).filter(
+        Invoice.invoice_number.like(f"{year_prefix}%")
+    ):
+        try:
+            last_number = max(last_number, int(invoice_number.split("-")[-1]))
+        except ValueError:
+            continue
+    return last_number
 
-    # Query for invoices with this year prefix, ordered by invoice number
-    # We need to extract the numeric part and sort properly
-    last_invoice = (
-        db.query(Invoice)
-        .filter(Invoice.invoice_number.like(f"{year_prefix}%"))
-        .order_by(Invoice.invoice_number.desc())
-        .first()
-    )
 
-    if last_invoice:
-        # Extract the number part (last 3 digits after the last dash)
-        try:
-            parts = last_invoice.invoice_number.split("-")
-            if len(parts) == 3:
-                last_number = int(parts[-1])
-                next_number = last_number + 1
-            else:
-                # Fallback if format is unexpected
-                next_number = 1
-        except (ValueError, IndexError):
-            # Fallback if format is unexpected
-            next_number = 1
-    else:
-        next_number = 1
-
-    # Format as XXX (3 digits, zero-padded)
-    return f"{year_prefix}{next_number:03d}"
-
-
-def generate_invoice(  # pylint: disable=too-many-locals
-    db: Session, invoice_in: InvoiceGenerate, current_user: User
-) -> Invoice:
+def _allocate_invoice_numbers(db: Session, year: int, count: int) -> List[str]:
     """
-    Generate an invoice from logged hours for a project.
+    Reserve `count` consecutive invoice numbers for a year (format INV-YYYY-XXX).
 
-    Business Rules:
-    - User must be project member or admin
-    - Billing period must have logged hours
-    - Invoice items snapshot hours + rates at generation time
-    - Totals are calculated and stored immutably
+    A single atomic UPDATE ... RETURNING on the year's sequence row, so there
+    is no LIKE scan and concurrent generators never get the same number. The
+    row stays locked until the caller commits, so call this as late as
+    possible in the transaction.
     """
-    # Validate date range
-    if invoice_in.billing_period_start >= invoice_in.billing_period_end:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Billing period start must be before end",
+    bump = (
+        update(InvoiceNumberSequence)
+        .where(InvoiceNumberSequence.year == year)
+        .values(last_number=InvoiceNumberSequence.last_number + count)
+        .returning(InvoiceNumberSequence.last_number)
+    )
+    last_number = db.execute(bump).scalar_one_or_none()
+
+    if last_number is None:
+        # First invoice of the year: seed the sequence from already issued numbers
+        last_number = _get_last_issued_number(db, year) + count
+        try:
+            with db.begin_nested():
+                db.add(InvoiceNumberSequence(year=year, last_number=last_number))
+        except IntegrityError:
+            # Another transaction seeded it concurrently
+            last_number = db.execute(bump).scalar_one()
+
+    first_number = last_number - count + 1
+    # Format as XXX (at least 3 digits, zero-padded)
+    return [f"INV-{year}-{number:03d}" for number in range(first_number, last_number + 1)]
+
+
+def _in_period(value: datetime, start: datetime, end: datetime) -> bool:
+    """Inclusive range check tolerant of naive values coming back from some backends."""
+    if value.tzinfo is None:
+        start, end = (
+            dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+            for dt in (start, end)
         )
+    elif start.tzinfo is None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return start <= value <= end
 
-    # Check project access (validates project exists and user has access)
-    _check_project_access(db, invoice_in.project_id, current_user)
 
-    # Fetch logged hours within billing period
-    logged_hours = (
-        db.query(LoggedHour)
+class InvoiceBuildError(Exception):
+    """An entry breaks an invoice business rule (no hours, users without rates)."""
+
+
+def _load_entry_hours(
+    db: Session, entries: List[InvoiceGenerate]
+) -> Tuple[List[list], Dict[int, Any]]:
+    """
+    Fetch the logged hours of every entry, and the rates of their users.
+
+    One query for the hours of all entries and one for the users (columns only).
+
+    Returns:
+        (logged hour rows per entry, in entry order; user rows by ID)
+    """
+    hour_rows = (
+        db.query(
+            LoggedHour.id,
+            LoggedHour.project_id,
+            LoggedHour.user_id,
+            LoggedHour.task_id,
+            LoggedHour.hours,
+            LoggedHour.note,
+            LoggedHour.logged_at,
+        )
         .filter(
-            and_(
-                LoggedHour.project_id == invoice_in.project_id,
-                LoggedHour.logged_at >= invoice_in.billing_period_start,
-                LoggedHour.logged_at <= invoice_in.billing_period_end,
+            or_(
+                *(
+                    and_(
+                        LoggedHour.project_id == entry.project_id,
+                        LoggedHour.logged_at >= entry.billing_period_start,
+                        LoggedHour.logged_at <= entry.billing_period_end,
+                    )
+                    for entry in entries
+                )
             )
         )
+        .order_by(LoggedHour.id)
         .all()
     )
+    hours_by_project = defaultdict(list)
+    for row in hour_rows:
+        hours_by_project[row.project_id].append(row)
+
+    entry_hours = [
+        [
+            row
+            for row in hours_by_project[entry.project_id]
+            if _in_period(row.logged_at, entry.billing_period_start, entry.billing_period_end)
+        ]
+        for entry in entries
+    ]
 
-    if not logged_hours:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No logged hours found for the specified billing period",
+    user_ids = {row.user_id for row in hour_rows}
+    users = {
+        row.id: row
+        for row in db.query(User.id, User.hourly_rate, User.display_name, User.email).filter(
+            User.id.in_(user_ids)
         )
+    }
+    return entry_hours, users
 
-    # Get all users involved to fetch their hourly rates
-    user_ids = {lh.user_id for lh in logged_hours}
-    users = {u.id: u for u in db.query(User).filter(User.id.in_(user_ids)).all()}
 
-    # Validate all users have hourly rates
-    users_without_rates = [
-        uid for uid in user_ids if not users[uid].hourly_rate or users[uid].hourly_rate == 0
-    ]
-    if users_without_rates:
-        user_names = [users[uid].display_name or users[uid].email for uid in users_without_rates]
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Users without hourly rates: {', '.join(user_names)}",
-        )
+def _build_invoice(
+    entry: InvoiceGenerate, logged_hours: list, users: Dict[int, Any], created_by: int
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Apply the invoice business rules to an entry's logged hours.
 
-    # Generate invoice number
-    year = invoice_in.billing_period_start.year
-    invoice_number = _generate_invoice_number(db, year)
+    Items snapshot hours and rates; totals are computed here and stored as is.
 
-    # Create invoice items from logged hours
-    invoice_items = []
-    subtotal = Decimal("0.0")
+    Returns:
+        (invoice row, item rows) ready for _insert_invoices
+
+    Raises:
+        InvoiceBuildError if there are no hours or a user has no hourly rate
+    """
+    if not logged_hours:
+        raise InvoiceBuildError("No logged hours found for the specified billing period")
 
+    without_rates = sorted({lh.user_id for lh in logged_hours if not users[lh.user_id].hourly_rate})
+    if without_rates:
+        user_names = [users[uid].display_name or users[uid].email for uid in without_rates]
+        raise InvoiceBuildError(f"Users without hourly rates: {', '.join(user_names)}")
+
+    items = []
+    subtotal = Decimal("0.0")
     for lh in logged_hours:
-        user = users[lh.user_id]
-        hourly_rate = Decimal(str(user.hourly_rate))
+        hourly_rate = Decimal(str(users[lh.user_id].hourly_rate))
         hours = Decimal(str(lh.hours))
         line_total = hours * hourly_rate
-
-        invoice_item = InvoiceItem(
-            user_id=lh.user_id,
-            task_id=lh.task_id,
-            logged_hour_id=lh.id,
-            description=lh.note
-            or f"Work on {lh.logged_at.strftime('%Y-%m-%d') if lh.logged_at else 'date unknown'}",
-            hours=hours,
-            hourly_rate=hourly_rate,
-            line_total=line_total,
-            work_date=lh.logged_at,
+        items.append(
+            {
+                "user_id": lh.user_id,
+                "task_id": lh.task_id,
+                "logged_hour_id": lh.id,
+                "description": lh.note
+                or f"Work on {lh.logged_at.strftime('%Y-%m-%d') if lh.logged_at else 'date unknown'}",
+                "hours": hours,
+                "hourly_rate": hourly_rate,
+                "line_total": line_total,
+                "work_date": lh.logged_at,
+            }
         )
-        invoice_items.append(invoice_item)
         subtotal += line_total
 
-    # Calculate tax and total
-    tax_rate = invoice_in.tax_rate or Decimal("0.0")
+    tax_rate = entry.tax_rate or Decimal("0.0")
     tax_amount = subtotal * tax_rate
-    total = subtotal + tax_amount
-
-    # Create invoice
-    invoice = Invoice(
-        project_id=invoice_in.project_id,
-        invoice_number=invoice_number,
-        status=InvoiceStatus.DRAFT,
-        billing_period_start=invoice_in.billing_period_start,
-        billing_period_end=invoice_in.billing_period_end,
-        subtotal=subtotal,
-        tax_rate=tax_rate,
-        tax_amount=tax_amount,
-        total=total,
-        created_by=current_user.id,
-    )
+    invoice_row = {
+        "project_id": entry.project_id,
+        "status": InvoiceStatus.DRAFT,
+        "billing_period_start": entry.billing_period_start,
+        "billing_period_end": entry.billing_period_end,
+        "subtotal": subtotal,
+        "tax_rate": tax_rate,
+        "tax_amount": tax_amount,
+        "total": subtotal + tax_amount,
+        "created_by": created_by,
+    }
+    return invoice_row, items
 
-    db.add(invoice)
-    db.flush()  # Get invoice ID
 
-    # Set invoice_id for all items
-    for item in invoice_items:
-        item.invoice_id = invoice.id
-        db.add(item)
+def _insert_invoices(
+    db: Session, built: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]
+) -> List[int]:
+    """
+    Number and bulk-insert built invoices and their items (no commit).
 
-    db.commit()
-    db.refresh(invoice)
+    Numbers are allocated per billing year, last, to keep the sequence lock short.
+    Sets ``invoice_number`` on each invoice row.
 
-    # Load items relationship
-    db.refresh(invoice)
+    Returns:
+        The new invoice IDs, in the order of ``built``
+    """
+    by_year = defaultdict(list)
+    for invoice_row, _ in built:
+        by_year[invoice_row["billing_period_start"].year].append(invoice_row)
+    for year in sorted(by_year):
+        numbers = _allocate_invoice_numbers(db, year, len(by_year[year]))
+        for invoice_row, number in zip(by_year[year], numbers):
+            invoice_row["invoice_number"] = number
+
+    invoice_ids = db.scalars(
+        insert(Invoice).returning(Invoice.id, sort_by_parameter_order=True),
+        [invoice_row for invoice_row, _ in built],
+    ).all()
+
+    item_rows = []
+    for invoice_id, (_, items) in zip(invoice_ids, built):
+        for item in items:
+            item["invoice_id"] = invoice_id
+        item_rows.extend(items)
+    db.execute(insert(InvoiceItem), item_rows)
+    return invoice_ids
+
+
+def generate_invoice(db: Session, invoice_in: InvoiceGenerate, auth: AuthContext) -> Invoice:
+    """
+    Generate an invoice from logged hours for a project.
 
-    return invoice
+    Business Rules:
+    - User must be project member or admin
+    - Billing period must have logged hours
+    - Invoice items snapshot hours + rates at generation time
+    - Totals are calculated and stored immutably
+    """
+    # Validate date range
+    if invoice_in.billing_period_start >= invoice_in.billing_period_end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Billing period start must be before end",
+        )
+
+    # Check project access (validates project exists and user has access)
+    _check_project_access(auth, invoice_in.project_id)
+
+    entry_hours, users = _load_entry_hours(db, [invoice_in])
+    try:
+        built = _build_invoice(invoice_in, entry_hours[0], users, auth.user_id)
+    except InvoiceBuildError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    (invoice_id,) = _insert_invoices(db, [built])
+    db.commit()
+
+    return (
+        db.query(Invoice)
+        .options(selectinload(Invoice.items))
+        .filter(Invoice.id == invoice_id)
+        .one()
+    )
 
 
-def get_invoice(db: Session, invoice_id: int, current_user: User) -> Invoice:
+def get_invoice(db: Session, invoice_id: int, auth: AuthContext) -> Invoice:
     """Get an invoice by ID with access control."""
     invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
 
@@ -214,49 +305,40 @@ def get_invoice(db: Session, invoice_id: int, current_user: User) -> Invoice:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
 
     # Check access: must be project member or admin
-    _check_project_access(db, invoice.project_id, current_user)
+    _check_project_access(auth, invoice.project_id)
 
     return invoice
 
 
+INVOICE_ORDER = KeysetOrder((Invoice.created_at, Invoice.id), descending=True)
+
+
 def list_invoices(
     db: Session,
-    current_user: User,
+    auth: AuthContext,
+    page: PageParams,
     project_id: Optional[int] = None,
-    skip: int = 0,
-    limit: int = 100,
-) -> List[Invoice]:
-    """List invoices with access control."""
-    is_admin = _is_admin(current_user)
-
-    query = db.query(Invoice)
-
+) -> Page:
+    """List a page of invoices (with their items loaded) with access control, newest first."""
     # Non-admins can only see invoices for projects they're members of
-    if not is_admin:
-        # Get project IDs user is a member of
-        member_projects = (
-            db.query(ProjectMember.project_id)
-            .filter(ProjectMember.user_id == current_user.id)
-            .subquery()
-        )
-        query = query.filter(Invoice.project_id.in_(db.query(member_projects.c.project_id)))
+    query = auth.scope(db.query(Invoice), Invoice.project_id).options(selectinload(Invoice.items))
 
     if project_id is not None:
         # Verify access to this project
-        _check_project_access(db, project_id, current_user)
+        _check_project_access(auth, project_id)
         query = query.filter(Invoice.project_id == project_id)
 
-    return query.order_by(Invoice.created_at.desc()).offset(skip).limit(limit).all()
+    return paginate_keyset(query, INVOICE_ORDER, page)
 
 
 def update_invoice_status(
-    db: Session, invoice_id: int, invoice_update: InvoiceUpdate, current_user: User
+    db: Session, invoice_id: int, invoice_update: InvoiceUpdate, auth: AuthContext
 ) -> Invoice:
     """Update invoice status (admin only)."""
-    invoice = get_invoice(db, invoice_id, current_user)
+    invoice = get_invoice(db, invoice_id, auth)
 
     # Only admins can update status
-    if not _is_admin(current_user):
+    if not auth.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can update invoice status"
         )
@@ -282,3 +364,136 @@ def update_invoice_status(
     db.refresh(invoice)
 
     return invoice
+
+
+def _get_accessible_project_ids(
+    db: Session, project_ids: set, auth: AuthContext
+) -> Tuple[set, set]:
+    """
+    Resolve existence and access for many projects at once.
+
+    Returns:
+        (existing project IDs, project IDs the user may invoice)
+    """
+    existing = {row.id for row in db.query(Project.id).filter(Project.id.in_(project_ids))}
+    if auth.is_admin:
+        return existing, existing
+    return existing, existing & auth.member_project_ids()
+
+
+def _generate_batch_chunk(
+    entries: List[Tuple[int, InvoiceGenerate]], created_by: int
+) -> List[Tuple[int, InvoiceBatchItemResult]]:
+    """
+    Generate the invoices of one batch chunk in a single transaction.
+
+    Same builder as generate_invoice. Entries with no hours or users without
+    rates fail on their own; a database error fails the whole chunk.
+    """
+    results: List[Tuple[int, InvoiceBatchItemResult]] = []
+
+    def result(entry: InvoiceGenerate, **kwargs) -> InvoiceBatchItemResult:
+        return InvoiceBatchItemResult(
+            project_id=entry.project_id,
+            billing_period_start=entry.billing_period_start,
+            billing_period_end=entry.billing_period_end,
+            **kwargs,
+        )
+
+    db = SessionLocal()
+    try:
+        entry_hours, users = _load_entry_hours(db, [entry for _, entry in entries])
+
+        pending = []
+        for (index, entry), logged_hours in zip(entries, entry_hours):
+            try:
+                pending.append(
+                    (index, entry, _build_invoice(entry, logged_hours, users, created_by))
+                )
+            except InvoiceBuildError as e:
+                results.append((index, result(entry, success=False, error=str(e))))
+
+        if pending:
+            invoice_ids = _insert_invoices(db, [built for _, _, built in pending])
+            db.commit()
+
+            for invoice_id, (index, entry, (invoice_row, items)) in zip(invoice_ids, pending):
+                results.append(
+                    (
+                        index,
+                        result(
+                            entry,
+                            success=True,
+                            invoice_id=invoice_id,
+                            invoice_number=invoice_row["invoice_number"],
+                            total=invoice_row["total"],
+                            items_count=len(items),
+                        ),
+                    )
+                )
+    except Exception as e:
+        db.rollback()
+        logger.error("Batch invoice chunk failed: %s", e, exc_info=True)
+        failed = {index for index, _ in results}
+        results.extend(
+            (index, result(entry, success=False, error=f"Failed to generate invoice: {e}"))
+            for index, entry in entries
+            if index not in failed
+        )
+    finally:
+        db.close()
+
+    return results
+
+
+def generate_invoices_batch(
+    db: Session, batch_in: InvoiceBatchGenerate, auth: AuthContext
+) -> InvoiceBatchResult:
+    """
+    Generate invoices for many projects and billing periods at once.
+
+    Business rules are the same as generate_invoice, applied per entry: each
+    entry gets its own result and one failing entry does not affect the others.
+    Valid entries are split into chunks of INVOICE_BATCH_CHUNK_SIZE, each
+    generated in its own transaction by a pool of INVOICE_BATCH_WORKERS threads.
+    """
+    entries = batch_in.invoices
+    existing, accessible = _get_accessible_project_ids(
+        db, {entry.project_id for entry in entries}, auth
+    )
+
+    results: Dict[int, InvoiceBatchItemResult] = {}
+    valid: List[Tuple[int, InvoiceGenerate]] = []
+    for index, entry in enumerate(entries):
+        error = None
+        if entry.billing_period_start >= entry.billing_period_end:
+            error = "Billing period start must be before end"
+        elif entry.project_id not in existing:
+            error = "Project not found"
+        elif entry.project_id not in accessible:
+            error = "You must be a project member or admin to generate invoices"
+
+        if error:
+            results[index] = InvoiceBatchItemResult(
+                project_id=entry.project_id,
+                billing_period_start=entry.billing_period_start,
+                billing_period_end=entry.billing_period_end,
+                success=False,
+                error=error,
+            )
+        else:
+            valid.append((index, entry))
+
+    chunk_size = max(settings.INVOICE_BATCH_CHUNK_SIZE, 1)
+    chunks = [valid[start : start + chunk_size] for start in range(0, len(valid), chunk_size)]
+    if chunks:
+        workers = max(1, min(settings.INVOICE_BATCH_WORKERS, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="invoice-batch") as pool:
+            for chunk_results in pool.map(
+                lambda chunk: _generate_batch_chunk(chunk, auth.user_id), chunks
+            ):
+                results.update(chunk_results)
+
+    ordered = [results[index] for index in range(len(entries))]
+    created = sum(1 for item in ordered if item.success)
+    return InvoiceBatchResult(created=created, failed=len(ordered) - created, results=ordered)
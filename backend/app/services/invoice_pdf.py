@@ -0,0 +1,175 @@
+"""
+Background rendering of invoice PDFs.
+
+PDFs are rendered by a small thread pool, never inside a request. Each stored
+PDF is tagged with a SHA-256 hash of the invoice snapshot it was rendered from
+(every field that appears on the PDF), so an unchanged invoice is never
+rendered twice and a status change is picked up automatically. The download
+endpoint streams the stored file when it is current and otherwise answers 202
+with Retry-After while a render is queued.
+"""
+
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.dbmodels import Invoice, InvoiceItem, Project
+from app.utils.file_upload import get_storage_backend
+from app.utils.logger import get_logger
+from app.utils.pdf_generator import save_invoice_pdf
+from sqlalchemy.orm import Session, joinedload
+
+logger = get_logger(__name__)
+
+
+def load_invoice_for_pdf(db: Session, invoice_id: int) -> Optional[Invoice]:
+    """Load an invoice with everything the PDF renders (items, users, tasks, client)."""
+    return (
+        db.query(Invoice)
+        .options(
+            joinedload(Invoice.items).joinedload(InvoiceItem.user),
+            joinedload(Invoice.items).joinedload(InvoiceItem.task),
+            joinedload(Invoice.project).joinedload(Project.client),
+        )
+        .filter(Invoice.id == invoice_id)
+        .first()
+    )
+
+
+def compute_snapshot_hash(invoice: Invoice) -> str:
+    """Hash every invoice field that is rendered on the PDF."""
+    project = invoice.project
+    client = project.client if project else None
+    snapshot = {
+        "invoice": [
+            invoice.id,
+            invoice.invoice_number,
+            invoice.status.value if invoice.status else None,
+            invoice.billing_period_start,
+            invoice.billing_period_end,
+            invoice.created_at,
+            invoice.subtotal,
+            invoice.tax_rate,
+            invoice.tax_amount,
+            invoice.total,
+        ],
+        "project": project.name if project else None,
+        "client": [client.name, client.email] if client else None,
+        "items": [
+            [
+                item.id,
+                item.description,
+                item.hours,
+                item.hourly_rate,
+                item.line_total,
+                item.work_date,
+                item.user.display_name if item.user else None,
+                item.task.title if item.task else None,
+            ]
+            for item in sorted(invoice.items, key=lambda item: item.id)
+        ],
+    }
+    encoded = json.dumps(snapshot, default=str, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def is_pdf_current(invoice: Invoice, snapshot_hash: str) -> bool:
+    """Check that the stored PDF was rendered from this snapshot and still exists."""
+    return (
+        bool(invoice.pdf_path)
+        and invoice.pdf_hash == snapshot_hash
+        and get_storage_backend().file_exists(invoice.pdf_path)
+    )
+
+
+class InvoicePdfRenderer:
+    """Thread pool that renders invoice PDFs, at most one job per invoice at a time."""
+
+    def __init__(self, num_workers: int):
+        self.num_workers = num_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued: set = set()
+        # Invoices scheduled again while a render was running
+        self._rerun: set = set()
+        # invoice_id -> (snapshot_hash, error) for the last failed render
+        self._failures: Dict[int, Tuple[str, str]] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(self.num_workers, 1), thread_name_prefix="invoice-pdf"
+            )
+        return self._executor
+
+    def schedule(self, invoice_id: int) -> None:
+        """Queue a render; a no-op if one is already queued or running for the invoice."""
+        with self._lock:
+            if invoice_id in self._queued:
+                self._rerun.add(invoice_id)
+                return
+            self._queued.add(invoice_id)
+            self._failures.pop(invoice_id, None)
+            self._get_executor().submit(self._render, invoice_id)
+
+    def get_failure(self, invoice_id: int, snapshot_hash: str) -> Optional[str]:
+        """Return the error of a failed render of this snapshot, clearing it for a retry."""
+        with self._lock:
+            failure = self._failures.get(invoice_id)
+            if failure and failure[0] == snapshot_hash:
+                del self._failures[invoice_id]
+                return failure[1]
+            return None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _render(self, invoice_id: int) -> None:
+        db = SessionLocal()
+        snapshot_hash = None
+        try:
+            invoice = load_invoice_for_pdf(db, invoice_id)
+            if invoice is None:
+                return
+            snapshot_hash = compute_snapshot_hash(invoice)
+            if is_pdf_current(invoice, snapshot_hash):
+                return
+
+            old_path = invoice.pdf_path
+            pdf_path = save_invoice_pdf(
+                invoice, invoice.project, invoice.project.client, version=snapshot_hash[:12]
+            )
+
+            # An invoice changed while rendering is re-scheduled (see schedule) and
+            # re-rendered from its new snapshot
+            invoice.pdf_path = pdf_path
+            invoice.pdf_hash = snapshot_hash
+            db.commit()
+
+            if old_path and old_path != pdf_path:
+                get_storage_backend().delete_file(old_path)
+            logger.info("Rendered PDF for invoice %s (%s)", invoice_id, snapshot_hash[:12])
+        except Exception as e:
+            db.rollback()
+            logger.error("Failed to render PDF for invoice %s: %s", invoice_id, e, exc_info=True)
+            if snapshot_hash:
+                with self._lock:
+                    self._failures[invoice_id] = (snapshot_hash, str(e))
+        finally:
+            db.close()
+            with self._lock:
+                self._queued.discard(invoice_id)
+                rerun = invoice_id in self._rerun
+                self._rerun.discard(invoice_id)
+            if rerun:
+                self.schedule(invoice_id)
+
+
+invoice_pdf_renderer = InvoicePdfRenderer(num_workers=settings.INVOICE_PDF_WORKERS)
@@ -1,19 +1,25 @@
 from datetime import datetime
 from typing import List, Optional
 
-from app.dbmodels import LoggedHour, Project, ProjectMember, Task, User, UserRole
+from app.dbmodels import LoggedHour, Task
 from app.schemas.logged_hour import LoggedHourCreate, LoggedHourUpdate
+from app.services.auth_context import AuthContext
+from app.services.project_rollup import ProjectRollupService
+from app.services.task_activity import TaskActivityService
+from app.utils.pagination import (
+    KeysetOrder,
+    Page,
+    PageParams,
+    paginate_keyset,
+    paginate_keyset_async,
+)
 from fastapi import HTTPException, status
-from sqlalchemy import and_
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 
-def _is_admin(user: User) -> bool:
-    """Check if user has admin privileges."""
-    return user.role in {UserRole.ADMIN, UserRole.PROJECTMANAGER}
-
-
-def create(db: Session, obj_in: LoggedHourCreate, user_id: int) -> LoggedHour:
+def create(db: Session, obj_in: LoggedHourCreate, auth: AuthContext) -> LoggedHour:
     """
     Create a new logged hour entry.
 
@@ -22,7 +28,10 @@ def create(db: Session, obj_in: LoggedHourCreate, user_id: int) -> LoggedHour:
     - If task_id is provided, verify user is assigned to the task
     - If only project_id is provided, verify user is a member of the project
     """
+    user_id = auth.user_id
+
     # Validate task assignment or project membership
+    task = None
     if obj_in.task_id:
         # Check if task exists and user is assigned to it
         task = db.query(Task).filter(Task.id == obj_in.task_id).first()
@@ -40,41 +49,20 @@ def create(db: Session, obj_in: LoggedHourCreate, user_id: int) -> LoggedHour:
         if task.assigned_to != user_id:
             # Also check if user is a project member
             # (they can log hours even if not directly assigned)
-            is_member = (
-                db.query(ProjectMember)
-                .filter(
-                    and_(
-                        ProjectMember.project_id == obj_in.project_id,
-                        ProjectMember.user_id == user_id,
-                    )
-                )
-                .first()
-            )
-            if not is_member:
+            if not auth.is_member(obj_in.project_id):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="You are not assigned to this task or a member of this project",
                 )
     else:
         # Only project_id provided - check if user is a project member
-        is_member = (
-            db.query(ProjectMember)
-            .filter(
-                and_(
-                    ProjectMember.project_id == obj_in.project_id, ProjectMember.user_id == user_id
-                )
-            )
-            .first()
-        )
-        if not is_member:
+        if not auth.is_member(obj_in.project_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="You are not a member of this project"
             )
 
     # Verify project exists
-    project = db.query(Project).filter(Project.id == obj_in.project_id).first()
-    if not project:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    auth.require_project(obj_in.project_id, detail="Project not found")
 
     # Create the logged hour entry
     # Map schema fields to model fields: description -> note, date -> logged_at
@@ -87,12 +75,15 @@ def create(db: Session, obj_in: LoggedHourCreate, user_id: int) -> LoggedHour:
         logged_at=obj_in.date,
     )
     db.add(db_obj)
+    ProjectRollupService.record_hours(db, obj_in.project_id, float(obj_in.hours), obj_in.date)
+    if task is not None:
+        TaskActivityService.record_logged_hour(db, task, db_obj)
     db.commit()
     db.refresh(db_obj)
     return db_obj
 
 
-def get_by_id(db: Session, logged_hour_id: int, current_user: User) -> Optional[LoggedHour]:
+def get_by_id(db: Session, logged_hour_id: int, auth: AuthContext) -> Optional[LoggedHour]:
     """
     Retrieve a logged hour by ID.
 
@@ -106,9 +97,9 @@ def get_by_id(db: Session, logged_hour_id: int, current_user: User) -> Optional[
         return None
 
     # Check permissions: owner or admin
-    is_owner = logged_hour.user_id == current_user.id
+    is_owner = logged_hour.user_id == auth.user_id
 
-    if not (is_owner or _is_admin(current_user)):
+    if not (is_owner or auth.is_admin):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to view this logged hour entry",
@@ -117,55 +108,69 @@ def get_by_id(db: Session, logged_hour_id: int, current_user: User) -> Optional[
     return logged_hour
 
 
-def list_logged_hours(
-    db: Session,
-    current_user: User,
+LOGGED_HOUR_ORDER = KeysetOrder((LoggedHour.logged_at, LoggedHour.id), descending=True)
+
+
+def _list_filters(
+    auth: AuthContext,
     user_id: Optional[int] = None,
     task_id: Optional[int] = None,
     project_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    skip: int = 0,
-    limit: int = 100,
-) -> List[LoggedHour]:
-    """
-    List logged hours with filters.
-
-    Business Rules:
-    - Users can only see their own entries (unless admin)
-    - Admins can see all entries
-    - Filters are composable
-    """
-    query = db.query(LoggedHour)
+) -> List:
+    """WHERE clauses of the listing, shared by the sync and async entry points."""
+    filters = []
 
     # Permission filter: non-admins can only see their own entries
-    is_admin = _is_admin(current_user)
+    is_admin = auth.is_admin
     if not is_admin:
-        query = query.filter(LoggedHour.user_id == current_user.id)
+        filters.append(LoggedHour.user_id == auth.user_id)
 
     # Apply filters
     if user_id is not None:
         # Admins can filter by any user, non-admins are already filtered to themselves
         if is_admin:
-            query = query.filter(LoggedHour.user_id == user_id)
+            filters.append(LoggedHour.user_id == user_id)
 
     if task_id is not None:
-        query = query.filter(LoggedHour.task_id == task_id)
+        filters.append(LoggedHour.task_id == task_id)
 
     if project_id is not None:
-        query = query.filter(LoggedHour.project_id == project_id)
+        filters.append(LoggedHour.project_id == project_id)
 
     if start_date is not None:
-        query = query.filter(LoggedHour.logged_at >= start_date)
+        filters.append(LoggedHour.logged_at >= start_date)
 
     if end_date is not None:
-        query = query.filter(LoggedHour.logged_at <= end_date)
+        filters.append(LoggedHour.logged_at <= end_date)
+
+    return filters
+
+
+def list_logged_hours(db: Session, auth: AuthContext, page: PageParams, **filters) -> Page:
+    """
+    List a page of logged hours with filters, most recent first.
+
+    Business Rules:
+    - Users can only see their own entries (unless admin)
+    - Admins can see all entries
+    - Filters are composable
+    """
+    query = db.query(LoggedHour).filter(*_list_filters(auth, **filters))
+    return paginate_keyset(query, LOGGED_HOUR_ORDER, page)
+
 
-    return query.offset(skip).limit(limit).all()
+async def list_logged_hours_async(
+    db: AsyncSession, auth: AuthContext, page: PageParams, **filters
+) -> Page:
+    """Async variant of list_logged_hours for the async listing route."""
+    stmt = select(LoggedHour).where(*_list_filters(auth, **filters))
+    return await paginate_keyset_async(db, stmt, LOGGED_HOUR_ORDER, page)
 
 
 def update(
-    db: Session, logged_hour_id: int, obj_in: LoggedHourUpdate, current_user: User
+    db: Session, logged_hour_id: int, obj_in: LoggedHourUpdate, auth: AuthContext
 ) -> LoggedHour:
     """
     Update a logged hour entry.
@@ -181,7 +186,7 @@ def update(
         )
 
     # Check if user is the owner
-    if logged_hour.user_id != current_user.id:
+    if logged_hour.user_id != auth.user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only update your own logged hour entries",
@@ -208,39 +213,23 @@ def update(
         # Verify user still has permission (task assignment or project membership)
         if new_task_id:
             task = db.query(Task).filter(Task.id == new_task_id).first()
-            if task.assigned_to != current_user.id:
-                is_member = (
-                    db.query(ProjectMember)
-                    .filter(
-                        and_(
-                            ProjectMember.project_id == new_project_id,
-                            ProjectMember.user_id == current_user.id,
-                        )
-                    )
-                    .first()
-                )
-                if not is_member:
+            if task.assigned_to != auth.user_id:
+                if not auth.is_member(new_project_id):
                     raise HTTPException(
                         status_code=status.HTTP_403_FORBIDDEN,
                         detail="You are not assigned to this task or a member of this project",
                     )
         else:
-            is_member = (
-                db.query(ProjectMember)
-                .filter(
-                    and_(
-                        ProjectMember.project_id == new_project_id,
-                        ProjectMember.user_id == current_user.id,
-                    )
-                )
-                .first()
-            )
-            if not is_member:
+            if not auth.is_member(new_project_id):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="You are not a member of this project",
                 )
 
+    old_project_id = logged_hour.project_id
+    old_task_id = logged_hour.task_id
+    old_hours = logged_hour.hours
+
     # Update fields
     update_data = obj_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
@@ -249,13 +238,25 @@ def update(
         else:
             setattr(logged_hour, field, value)
 
+    # Keep project rollups in step (moves hours between projects if needed)
+    if logged_hour.project_id != old_project_id:
+        ProjectRollupService.record_hours(db, old_project_id, -old_hours)
+        ProjectRollupService.record_hours(
+            db, logged_hour.project_id, logged_hour.hours, logged_hour.logged_at
+        )
+    elif logged_hour.hours != old_hours:
+        ProjectRollupService.record_hours(db, old_project_id, logged_hour.hours - old_hours)
+
+    # Keep the task timelines in step (hours moved between tasks change both)
+    TaskActivityService.record_logged_hour_edited(db, logged_hour, old_task_id)
+
     db.add(logged_hour)
     db.commit()
     db.refresh(logged_hour)
     return logged_hour
 
 
-def delete(db: Session, logged_hour_id: int, current_user: User) -> bool:
+def delete(db: Session, logged_hour_id: int, auth: AuthContext) -> bool:
     """
     Delete a logged hour entry.
 
@@ -271,20 +272,22 @@ def delete(db: Session, logged_hour_id: int, current_user: User) -> bool:
         )
 
     # Check permissions: owner or admin
-    is_owner = logged_hour.user_id == current_user.id
+    is_owner = logged_hour.user_id == auth.user_id
 
-    if not (is_owner or _is_admin(current_user)):
+    if not (is_owner or auth.is_admin):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to delete this logged hour entry",
         )
 
+    ProjectRollupService.record_hours(db, logged_hour.project_id, -logged_hour.hours)
+    TaskActivityService.record_logged_hour_deleted(db, logged_hour)
     db.delete(logged_hour)
     db.commit()
     return True
 
 
-def get_total_hours_for_task(db: Session, task_id: int, current_user: User) -> dict:
+def get_total_hours_for_task(db: Session, task_id: int, auth: AuthContext) -> dict:
     """
     Get total hours logged for a specific task.
 
@@ -298,19 +301,9 @@ def get_total_hours_for_task(db: Session, task_id: int, current_user: User) -> d
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
     # Check permissions: user must be assigned to task, project member, or admin
-    is_admin = _is_admin(current_user)
-    is_assigned = task.assigned_to == current_user.id
-    is_member = (
-        db.query(ProjectMember)
-        .filter(
-            and_(
-                ProjectMember.project_id == task.project_id,
-                ProjectMember.user_id == current_user.id,
-            )
-        )
-        .first()
-        is not None
-    )
+    is_admin = auth.is_admin
+    is_assigned = task.assigned_to == auth.user_id
+    is_member = auth.is_member(task.project_id)
 
     if not (is_admin or is_assigned or is_member):
         raise HTTPException(
@@ -339,7 +332,7 @@ def get_total_hours_for_task(db: Session, task_id: int, current_user: User) -> d
     }
 
 
-def get_total_hours_for_project(db: Session, project_id: int, current_user: User) -> dict:
+def get_total_hours_for_project(db: Session, project_id: int, auth: AuthContext) -> dict:
     """
     Get total hours logged for a specific project.
 
@@ -348,42 +341,31 @@ def get_total_hours_for_project(db: Session, project_id: int, current_user: User
     - breakdown_per_user: Optional breakdown by user (if admin or project member)
     """
     # Verify project exists
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    auth.require_project(project_id, detail="Project not found")
 
     # Check permissions: user must be project member or admin
-    is_admin = _is_admin(current_user)
-    is_member = (
-        db.query(ProjectMember)
-        .filter(
-            and_(ProjectMember.project_id == project_id, ProjectMember.user_id == current_user.id)
-        )
-        .first()
-        is not None
-    )
-
-    if not (is_admin or is_member):
+    if not auth.can_access(project_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to view hours for this project",
         )
 
-    # Get all logged hours for this project
-    logged_hours = db.query(LoggedHour).filter(LoggedHour.project_id == project_id).all()
-
-    total_hours = sum(lh.hours for lh in logged_hours)
+    # Total comes from the maintained rollup; the breakdown is a grouped query
+    total_hours = ProjectRollupService.get(db, project_id).total_hours
 
-    # Build breakdown per user
-    breakdown_per_user = {}
-    for lh in logged_hours:
-        user_id = lh.user_id
-        if user_id not in breakdown_per_user:
-            breakdown_per_user[user_id] = {"user_id": user_id, "total_hours": 0.0}
-        breakdown_per_user[user_id]["total_hours"] += lh.hours
+    breakdown_rows = (
+        db.query(LoggedHour.user_id, func.sum(LoggedHour.hours))
+        .filter(LoggedHour.project_id == project_id)
+        .group_by(LoggedHour.user_id)
+        .all()
+    )
+    breakdown_per_user = [
+        {"user_id": user_id, "total_hours": float(hours or 0.0)}
+        for user_id, hours in breakdown_rows
+    ]
 
     return {
         "project_id": project_id,
         "total_hours": total_hours,
-        "breakdown_per_user": list(breakdown_per_user.values()),
+        "breakdown_per_user": breakdown_per_user,
     }
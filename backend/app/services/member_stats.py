@@ -0,0 +1,217 @@
+"""
+Set-based member statistics for projects.
+
+Computes logged hours and task counts for every member of a project with a
+constant number of grouped queries, instead of one round-trip per member.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.dbmodels import LoggedHour, ProjectMember, Task, User
+from app.schemas.project import TaskCount
+from sqlalchemy import Select, case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+def count_where(condition):
+    """Conditional COUNT expressed as SUM(CASE ...) so it works on every backend."""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def is_overdue(now_time: datetime):
+    """Tasks not done and past their due date; served by the ix_tasks_open_due_date index."""
+    return (Task.status != "done") & Task.due_date.isnot(None) & (Task.due_date < now_time)
+
+
+def _hours_by_member_stmt(project_id: int, user_ids: Optional[List[int]] = None) -> Select:
+    """Total hours and last log timestamp per user of a project."""
+    stmt = select(
+        LoggedHour.user_id,
+        func.coalesce(func.sum(LoggedHour.hours), 0.0),
+        func.max(LoggedHour.logged_at),
+    ).where(LoggedHour.project_id == project_id)
+    if user_ids is not None:
+        stmt = stmt.where(LoggedHour.user_id.in_(user_ids))
+    return stmt.group_by(LoggedHour.user_id)
+
+
+def _task_counts_by_member_stmt(project_id: int, user_ids: Optional[List[int]] = None) -> Select:
+    """Task counts per assignee of a project, one row per assignee."""
+    stmt = select(
+        Task.assigned_to,
+        func.count(Task.id),
+        count_where(Task.status == "done"),
+        count_where(Task.status == "in_progress"),
+        count_where(Task.status == "todo"),
+        count_where(is_overdue(datetime.now())),
+    ).where(Task.project_id == project_id, Task.assigned_to.isnot(None))
+    if user_ids is not None:
+        stmt = stmt.where(Task.assigned_to.in_(user_ids))
+    return stmt.group_by(Task.assigned_to)
+
+
+def _hours_from_rows(rows) -> Dict[int, Tuple[float, Optional[datetime]]]:
+    return {user_id: (float(hours or 0.0), last_at) for user_id, hours, last_at in rows}
+
+
+def _task_counts_from_rows(rows) -> Dict[int, Dict[str, int]]:
+    return {
+        user_id: {
+            "tasks_count": int(total),
+            "completed_tasks_count": int(completed),
+            "in_progress_tasks_count": int(in_progress),
+            "todo_tasks_count": int(todo),
+            "overdue_tasks_count": int(overdue),
+        }
+        for user_id, total, completed, in_progress, todo, overdue in rows
+    }
+
+
+def _member_stats(
+    user_ids: Optional[List[int]],
+    hours: Dict[int, Tuple[float, Optional[datetime]]],
+    counts: Dict[int, Dict[str, int]],
+) -> Dict[int, TaskCount]:
+    keys = user_ids if user_ids is not None else set(hours) | set(counts)
+    return {
+        user_id: TaskCount(
+            hours_logged=hours.get(user_id, (0.0, None))[0],
+            **counts.get(user_id, {}),
+        )
+        for user_id in keys
+    }
+
+
+class MemberStatsService:
+    """Shared engine behind the project stats, members and health endpoints."""
+
+    @staticmethod
+    def get_hours_by_member(
+        db: Session, project_id: int, user_ids: Optional[Iterable[int]] = None
+    ) -> Dict[int, Tuple[float, Optional[datetime]]]:
+        """
+        Get total hours and last log timestamp per user for a project.
+
+        Returns:
+            Mapping of user_id -> (hours_logged, last_logged_at)
+        """
+        user_ids = list(user_ids) if user_ids is not None else None
+        return _hours_from_rows(db.execute(_hours_by_member_stmt(project_id, user_ids)))
+
+    @staticmethod
+    def get_task_counts_by_member(
+        db: Session, project_id: int, user_ids: Optional[Iterable[int]] = None
+    ) -> Dict[int, Dict[str, int]]:
+        """
+        Get task counts per assignee for a project in a single grouped query.
+
+        Returns:
+            Mapping of user_id -> dict of TaskCount field names to counts
+        """
+        user_ids = list(user_ids) if user_ids is not None else None
+        return _task_counts_from_rows(db.execute(_task_counts_by_member_stmt(project_id, user_ids)))
+
+    @staticmethod
+    def get_member_stats(
+        db: Session, project_id: int, user_ids: Optional[Iterable[int]] = None
+    ) -> Dict[int, TaskCount]:
+        """
+        Get TaskCount statistics for project members.
+
+        Always costs two queries regardless of the number of members.
+        """
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            if not user_ids:
+                return {}
+
+        hours = MemberStatsService.get_hours_by_member(db, project_id, user_ids)
+        counts = MemberStatsService.get_task_counts_by_member(db, project_id, user_ids)
+        return _member_stats(user_ids, hours, counts)
+
+    @staticmethod
+    async def get_member_stats_async(
+        db: AsyncSession, project_id: int, user_ids: Optional[Iterable[int]] = None
+    ) -> Dict[int, TaskCount]:
+        """Async variant of get_member_stats (same two queries)."""
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            if not user_ids:
+                return {}
+
+        hours = _hours_from_rows(await db.execute(_hours_by_member_stmt(project_id, user_ids)))
+        counts = _task_counts_from_rows(
+            await db.execute(_task_counts_by_member_stmt(project_id, user_ids))
+        )
+        return _member_stats(user_ids, hours, counts)
+
+    @staticmethod
+    def populate(db: Session, project_id: int, members: List[ProjectMember]) -> None:
+        """Attach task_count statistics to each member (picked up by Pydantic)."""
+        stats = MemberStatsService.get_member_stats(db, project_id, [m.user_id for m in members])
+        for member in members:
+            member.task_count = stats.get(member.user_id, TaskCount())
+
+    @staticmethod
+    async def populate_async(
+        db: AsyncSession, project_id: int, members: List[ProjectMember]
+    ) -> None:
+        """Async variant of populate."""
+        stats = await MemberStatsService.get_member_stats_async(
+            db, project_id, [m.user_id for m in members]
+        )
+        for member in members:
+            member.task_count = stats.get(member.user_id, TaskCount())
+
+    @staticmethod
+    def get_inactive_members(
+        db: Session, project_ids: Iterable[int], since: datetime
+    ) -> Dict[int, List[dict]]:
+        """
+        Find members with no hours logged on their project since the given time.
+
+        Uses one grouped max(logged_at) subquery outer-joined to the memberships,
+        so the cost does not depend on the number of members or projects.
+
+        Returns:
+            Mapping of project_id -> list of {"id", "name"} for inactive members
+        """
+        project_ids = list(project_ids)
+        if not project_ids:
+            return {}
+
+        last_logged = (
+            db.query(
+                LoggedHour.project_id.label("project_id"),
+                LoggedHour.user_id.label("user_id"),
+                func.max(LoggedHour.logged_at).label("last_logged_at"),
+            )
+            .filter(LoggedHour.project_id.in_(project_ids))
+            .group_by(LoggedHour.project_id, LoggedHour.user_id)
+            .subquery()
+        )
+
+        rows = (
+            db.query(ProjectMember.project_id, User.id, User.first_name, User.last_name)
+            .join(User, User.id == ProjectMember.user_id)
+            .outerjoin(
+                last_logged,
+                (last_logged.c.project_id == ProjectMember.project_id)
+                & (last_logged.c.user_id == ProjectMember.user_id),
+            )
+            .filter(
+                ProjectMember.project_id.in_(project_ids),
+                or_(last_logged.c.last_logged_at.is_(None), last_logged.c.last_logged_at < since),
+            )
+            .order_by(ProjectMember.project_id, ProjectMember.id)
+            .all()
+        )
+
+        inactive: Dict[int, List[dict]] = {}
+        for project_id, user_id, first_name, last_name in rows:
+            inactive.setdefault(project_id, []).append(
+                {"id": user_id, "name": f"{first_name} {last_name}"}
+            )
+        return inactive
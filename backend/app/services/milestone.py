@@ -1,15 +1,32 @@
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from app.dbmodels import Milestone, Task
+from app.dbmodels import Milestone, Project, Task
 from app.schemas.milestone import (
     MilestoneCreate,
     MilestoneProgress,
     MilestoneStatus,
     MilestoneUpdate,
 )
+from app.services.auth_context import AuthContext
+from app.services.member_stats import count_where
+from app.utils.pagination import paginate
+from sqlalchemy import and_, case, func
 from sqlalchemy.orm import Session
 
+# Task statuses with a dedicated counter column
+STATUS_COLUMNS = {
+    "todo": Milestone.todo_tasks,
+    "in_progress": Milestone.in_progress_tasks,
+    "done": Milestone.done_tasks,
+}
+COUNTER_COLUMNS = (
+    Milestone.total_tasks,
+    Milestone.done_tasks,
+    Milestone.in_progress_tasks,
+    Milestone.todo_tasks,
+)
+
 
 class MilestoneService:
     @staticmethod
@@ -33,6 +50,54 @@ class MilestoneService:
     def get_by_project(db: Session, project_id: int) -> List[Milestone]:
         return db.query(Milestone).filter(Milestone.project_id == project_id).all()
 
+    @staticmethod
+    def effective_status():
+        """
+        SQL expression of a milestone's status as of now.
+
+        Task-driven statuses are kept current on write; only OVERDUE depends on
+        the clock, so it is derived from the due date here.
+        """
+        return case(
+            (
+                and_(
+                    Milestone.status != MilestoneStatus.COMPLETED.value,
+                    Milestone.due_date.is_not(None),
+                    Milestone.due_date < datetime.now(timezone.utc),
+                ),
+                MilestoneStatus.OVERDUE.value,
+            ),
+            else_=Milestone.status,
+        )
+
+    @staticmethod
+    def list_milestones(
+        db: Session,
+        auth: AuthContext,
+        project_id: Optional[int] = None,
+        status: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> Tuple[List[Milestone], int]:
+        """
+        List a page of milestones ordered by due date (undated last).
+
+        Without a project_id the list is scoped in SQL to the user's projects;
+        with one, the caller has already checked access to that project.
+
+        Returns:
+            (milestones, total matching milestones)
+        """
+        query = db.query(Milestone)
+        if project_id is not None:
+            query = query.filter(Milestone.project_id == project_id)
+        else:
+            query = auth.scope(query, Milestone.project_id)
+        if status:
+            query = query.filter(MilestoneService.effective_status() == status)
+        query = query.order_by(Milestone.due_date.is_(None), Milestone.due_date, Milestone.id)
+        return paginate(query, skip, limit)
+
     @staticmethod
     def update(db: Session, milestone_id: int, obj_in: MilestoneUpdate) -> Optional[Milestone]:
         db_obj = MilestoneService.get(db, milestone_id)
@@ -61,11 +126,23 @@ class MilestoneService:
         db.commit()
         return True
 
+    @staticmethod
+    def progress_of(counters) -> MilestoneProgress:
+        """Progress from a milestone's task counters (a Milestone or a row of them)."""
+        total = counters.total_tasks
+        completed = counters.done_tasks
+        return MilestoneProgress(
+            total_tasks=total,
+            completed_tasks=completed,
+            in_progress_tasks=counters.in_progress_tasks,
+            todo_tasks=counters.todo_tasks,
+            completion_percentage=round((completed / total) * 100, 2) if total else 0.0,
+        )
+
     @staticmethod
     def calculate_progress(db: Session, milestone_id: int) -> MilestoneProgress:
-        tasks = db.query(Task).filter(Task.milestone_id == milestone_id).all()
-        total = len(tasks)
-        if total == 0:
+        counters = db.query(*COUNTER_COLUMNS).filter(Milestone.id == milestone_id).first()
+        if counters is None:
             return MilestoneProgress(
                 total_tasks=0,
                 completed_tasks=0,
@@ -73,21 +150,18 @@ class MilestoneService:
                 todo_tasks=0,
                 completion_percentage=0.0,
             )
+        return MilestoneService.progress_of(counters)
 
-        completed = sum(1 for t in tasks if t.status == "done")
-        in_progress = sum(1 for t in tasks if t.status == "in_progress")
-        todo = sum(1 for t in tasks if t.status == "todo")
-
-        return MilestoneProgress(
-            total_tasks=total,
-            completed_tasks=completed,
-            in_progress_tasks=in_progress,
-            todo_tasks=todo,
-            completion_percentage=round((completed / total) * 100, 2),
-        )
+    @staticmethod
+    def calculate_progress_many(db: Session, project_id: int) -> Dict[int, MilestoneProgress]:
+        """Progress of every milestone of a project by milestone id, in one query."""
+        rows = db.query(Milestone.id, *COUNTER_COLUMNS).filter(Milestone.project_id == project_id)
+        return {row.id: MilestoneService.progress_of(row) for row in rows}
 
     @staticmethod
-    def update_status(db: Session, milestone: Milestone) -> Milestone:
+    def update_status(
+        db: Session, milestone: Milestone, progress: Optional[MilestoneProgress] = None
+    ) -> Milestone:
         # Determine status based on tasks and due date
         # Logic:
         # 1. If overdue and not completed -> OVERDUE
@@ -95,8 +169,9 @@ class MilestoneService:
         # 3. If started (>0 completed or in_progress) -> IN_PROGRESS
         # 4. Else -> NOT_STARTED
 
-        # We need fresh stats
-        progress = MilestoneService.calculate_progress(db, milestone.id)
+        # We need fresh stats, unless the caller already read them
+        if progress is None:
+            progress = MilestoneService.calculate_progress(db, milestone.id)
 
         new_status = MilestoneStatus.NOT_STARTED
 
@@ -123,3 +198,131 @@ class MilestoneService:
             db.refresh(milestone)
 
         return milestone
+
+    @staticmethod
+    def _apply(
+        db: Session,
+        milestone_id: Optional[int],
+        tasks: int = 0,
+        status_deltas: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Apply counter deltas with a single atomic UPDATE (no commit)."""
+        if milestone_id is None:
+            return
+        values = {}
+        if tasks:
+            values[Milestone.total_tasks] = Milestone.total_tasks + tasks
+        for task_status, delta in (status_deltas or {}).items():
+            column = STATUS_COLUMNS.get(task_status)
+            if column is not None and delta:
+                values[column] = column + delta
+        if not values:
+            return
+
+        db.query(Milestone).filter(Milestone.id == milestone_id).update(
+            values, synchronize_session=False
+        )
+
+    @staticmethod
+    def record_task_added(
+        db: Session, milestone_id: Optional[int], task_status: Optional[str]
+    ) -> None:
+        """Record a task added to a milestone (created in it or linked to it)."""
+        MilestoneService._apply(db, milestone_id, tasks=1, status_deltas={task_status: 1})
+
+    @staticmethod
+    def record_task_removed(
+        db: Session, milestone_id: Optional[int], task_status: Optional[str]
+    ) -> None:
+        """Record a task leaving a milestone (deleted or unlinked)."""
+        MilestoneService._apply(db, milestone_id, tasks=-1, status_deltas={task_status: -1})
+
+    @staticmethod
+    def record_task_change(
+        db: Session,
+        old_milestone_id: Optional[int],
+        old_status: Optional[str],
+        new_milestone_id: Optional[int],
+        new_status: Optional[str],
+    ) -> None:
+        """Record a task changing milestone and/or status."""
+        if old_milestone_id == new_milestone_id:
+            if old_status != new_status:
+                MilestoneService._apply(
+                    db, new_milestone_id, status_deltas={old_status: -1, new_status: 1}
+                )
+            return
+        MilestoneService.record_task_removed(db, old_milestone_id, old_status)
+        MilestoneService.record_task_added(db, new_milestone_id, new_status)
+
+    @staticmethod
+    def compute_counters(db: Session, project_id: int) -> Dict[int, Dict[str, int]]:
+        """Count the tasks of each milestone of a project from the tasks table."""
+        rows = (
+            db.query(
+                Milestone.id,
+                func.count(Task.id),
+                count_where(Task.status == "todo"),
+                count_where(Task.status == "in_progress"),
+                count_where(Task.status == "done"),
+            )
+            .outerjoin(Task, Task.milestone_id == Milestone.id)
+            .filter(Milestone.project_id == project_id)
+            .group_by(Milestone.id)
+            .all()
+        )
+        return {
+            milestone_id: {
+                "total_tasks": int(total or 0),
+                "todo_tasks": int(todo or 0),
+                "in_progress_tasks": int(in_progress or 0),
+                "done_tasks": int(done or 0),
+            }
+            for milestone_id, total, todo, in_progress, done in rows
+        }
+
+    @staticmethod
+    def rebuild_counters(db: Session, project_id: int) -> int:
+        """
+        Recompute the task counters of a project's milestones and overwrite them.
+
+        Does not commit; the caller owns the transaction.
+
+        Returns:
+            Number of milestones whose counters had drifted
+        """
+        counters = MilestoneService.compute_counters(db, project_id)
+        drifted = 0
+        milestones = (
+            db.query(Milestone).populate_existing().filter(Milestone.project_id == project_id)
+        )
+        for milestone in milestones:
+            values = counters[milestone.id]
+            if any(getattr(milestone, field) != value for field, value in values.items()):
+                drifted += 1
+                for field, value in values.items():
+                    setattr(milestone, field, value)
+                db.add(milestone)
+        return drifted
+
+    @staticmethod
+    def rebuild_counters_all(
+        db: Session, project_ids: Optional[Iterable[int]] = None
+    ) -> Tuple[int, int]:
+        """
+        Reconcile milestone counters for the given projects (all projects by default).
+
+        Commits once per project so a long run does not hold one big transaction.
+
+        Returns:
+            (number of projects rebuilt, number of milestones that had drifted)
+        """
+        if project_ids is None:
+            project_ids = [row.id for row in db.query(Project.id).order_by(Project.id).all()]
+
+        rebuilt = drifted = 0
+        for project_id in project_ids:
+            drifted += MilestoneService.rebuild_counters(db, project_id)
+            db.commit()
+            rebuilt += 1
+        return rebuilt, drifted
@@ -0,0 +1,226 @@
+"""
+Cache of authenticated principals (users by access token, clients by API key).
+
+Every authenticated request resolves its bearer token or X-Client-Token to a
+row. This module keeps a bounded, TTL'd in-process cache of those rows keyed by
+the SHA-256 of the credential, so the raw token never sits in memory as a key.
+
+Cached values are detached column snapshots that are never attached to a
+session. Each request gets its own instance through ``Session.merge(load=False)``,
+which copies the snapshot into the request session without a query, so
+relationships still lazy-load and writes (logout, profile updates) behave as
+with a freshly queried row.
+
+Entries are dropped when a transaction that updated or deleted the user or
+client row (role, password, refresh-token revocation, API key rotation, ...)
+through the ORM commits. Evicting at flush would let a concurrent request cache
+the still-committed old row until the TTL runs out; a load that started before
+the eviction is not cached either. Writes from other processes are only picked
+up when the entry expires, so keep the TTL short.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple, Type, TypeVar
+
+from app.core.config import settings
+from app.dbmodels import Client, User
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+T = TypeVar("T")
+
+# Session.info key: (cache, principal id) pairs to evict once the session commits
+_PENDING_INVALIDATIONS_KEY = "principal_cache_invalidations"
+
+
+def credential_key(credential: str) -> str:
+    """Hash a bearer token or API key into a cache key."""
+    return hashlib.sha256(credential.encode("utf-8")).hexdigest()
+
+
+def _detached_snapshot(instance: T) -> T:
+    """Copy the column values of a loaded row into a new detached instance."""
+    mapper = inspect(instance).mapper
+    snapshot = mapper.class_(
+        **{attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs}
+    )
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+@dataclass
+class CacheCounters:
+    """Lookup, eviction and invalidation counters; updated under the cache lock."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+# The entry map, the per-principal key index and the invalidation generations
+# are read and written together under one lock, so they stay on one object
+class PrincipalCache:  # pylint: disable=too-many-instance-attributes
+    """Thread-safe LRU/TTL cache of credential hash -> detached row snapshot."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[object, float]]" = OrderedDict()
+        # principal id -> credential hashes, for invalidation by row
+        self._keys_by_id: Dict[int, Set[str]] = {}
+        # Invalidation counter, and its value at each principal's last invalidation
+        self._generation = 0
+        self._invalidated_at: "OrderedDict[int, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = CacheCounters()
+
+    def get(self, db: Session, key: str, model: Type[T]) -> Optional[T]:
+        """Return the cached principal merged into ``db``, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.counters.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters.hits += 1
+            snapshot = entry[0]
+        return db.merge(snapshot, load=False) if isinstance(snapshot, model) else None
+
+    def generation(self) -> int:
+        """Take before loading a principal from the database; pass it to ``set``."""
+        with self._lock:
+            return self._generation
+
+    def set(
+        self,
+        key: str,
+        instance: object,
+        expires_at: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Cache a principal loaded by the caller.
+
+        Args:
+            expires_at: Wall-clock expiry of the credential itself (e.g. the JWT
+                ``exp``); the entry never outlives it
+            generation: ``generation()`` from before the row was loaded; if the
+                principal was invalidated since, the row may be stale and is
+                not cached
+        """
+        if self.max_size <= 0:
+            return
+        ttl = self.ttl_seconds
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+        snapshot = _detached_snapshot(instance)
+        with self._lock:
+            if generation is not None and self._invalidated_at.get(snapshot.id, -1) >= generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (snapshot, time.monotonic() + ttl)
+            self._keys_by_id.setdefault(snapshot.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.counters.evictions += 1
+
+    def invalidate(self, principal_id: Optional[int]) -> None:
+        """Drop every cached credential of a user or client."""
+        with self._lock:
+            self._generation += 1
+            self._invalidated_at[principal_id] = self._generation
+            self._invalidated_at.move_to_end(principal_id)
+            while len(self._invalidated_at) > max(self.max_size, 1):
+                self._invalidated_at.popitem(last=False)
+            keys = self._keys_by_id.pop(principal_id, None)
+            if not keys:
+                return
+            for key in keys:
+                self._entries.pop(key, None)
+            self.counters.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_id.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counters = self.counters
+            lookups = counters.hits + counters.misses
+            return {
+                "size": len(self._entries),
+                "hits": counters.hits,
+                "misses": counters.misses,
+                "hit_rate": round(counters.hits / lookups, 4) if lookups else 0.0,
+                "evictions": counters.evictions,
+                "invalidations": counters.invalidations,
+            }
+
+    def _remove(self, key: str) -> None:
+        """Remove one entry; caller holds the lock."""
+        snapshot, _ = self._entries.pop(key)
+        keys = self._keys_by_id.get(snapshot.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_id[snapshot.id]
+
+
+user_principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_SIZE, ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+client_principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_SIZE, ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+def principal_cache_stats() -> Dict[str, Dict[str, object]]:
+    return {"users": user_principal_cache.stats(), "clients": client_principal_cache.stats()}
+
+
+def _invalidate_on_commit(cache: PrincipalCache, target: object) -> None:
+    """Queue an eviction for when the session that flushed ``target`` commits."""
+    session = object_session(target)
+    if session is None:
+        cache.invalidate(target.id)
+        return
+    session.info.setdefault(_PENDING_INVALIDATIONS_KEY, []).append((cache, target.id))
+
+
+# Any ORM write to a principal row (role or password change, refresh token
+# revocation, API key rotation, deletion) drops its cached credentials once
+# the transaction commits
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(_mapper, _connection, target: User) -> None:
+    _invalidate_on_commit(user_principal_cache, target)
+
+
+@event.listens_for(Client, "after_update")
+@event.listens_for(Client, "after_delete")
+def _invalidate_client(_mapper, _connection, target: Client) -> None:
+    _invalidate_on_commit(client_principal_cache, target)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    pending: List[Tuple[PrincipalCache, int]] = session.info.pop(_PENDING_INVALIDATIONS_KEY, [])
+    for cache, principal_id in pending:
+        cache.invalidate(principal_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
@@ -1,25 +1,65 @@
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Set
 
-from app.dbmodels import Client, GitContribution, LoggedHour, Project, ProjectMember, Task, User
+from app.dbmodels import Client, Project, ProjectMember, ProjectRollup, Task, User
 from app.schemas.project import (
-    ActivityItem,
     ClientMilestone,
     ClientPortalProject,
-    HealthFlag,
     ProjectCreate,
     ProjectHealth,
-    ProjectHealthIndicator,
     ProjectMemberCreate,
     ProjectProgress,
     ProjectStatistics,
     ProjectUpdate,
-    TaskCount,
 )
+from app.services.member_stats import MemberStatsService, count_where, is_overdue
 from app.services.milestone import MilestoneService
+from app.services.project_activity import CLIENT_TYPES, list_project_activity, to_client_item
+from app.services.project_health import ProjectHealthService
+from app.services.project_rollup import ProjectRollupService
+from app.utils.pagination import PageParams
 from fastapi import HTTPException, status
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Select, exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+
+def _members_stmt(project_id: int) -> Select:
+    return (
+        select(ProjectMember)
+        .options(joinedload(ProjectMember.user))
+        .where(ProjectMember.project_id == project_id)
+    )
+
+
+def _overdue_count_stmt(project_id: int) -> Select:
+    return select(count_where(is_overdue(datetime.now()))).where(Task.project_id == project_id)
+
+
+def _project_statistics(
+    project: Project,
+    members: List[ProjectMember],
+    tasks: List[Task],
+    rollup: ProjectRollup,
+    total_overdue_tasks: Optional[int],
+) -> ProjectStatistics:
+    return ProjectStatistics(
+        id=project.id,
+        name=project.name,
+        description=project.description,
+        status=project.status,
+        client_id=project.client_id,
+        created_at=project.created_at,
+        updated_at=project.updated_at,
+        members=members,
+        tasks=tasks,
+        total_logged_hours=rollup.total_hours,
+        total_tasks=rollup.total_tasks,
+        total_completed_tasks=rollup.done_tasks,
+        total_in_progress_tasks=rollup.in_progress_tasks,
+        total_todo_tasks=rollup.todo_tasks,
+        total_overdue_tasks=int(total_overdue_tasks or 0),
+    )
 
 
 class ProjectService:
@@ -43,6 +83,8 @@ class ProjectService:
             client_id=project_in.client_id,
         )
         db.add(db_project)
+        db.flush()
+        ProjectRollupService.create_empty(db, db_project.id)
         db.commit()
         db.refresh(db_project)
 
@@ -58,36 +100,78 @@ class ProjectService:
         db: Session, project_id: int, user_id: int, is_admin: bool = False
     ) -> Project:
         """Get a project with access control check."""
-        project = ProjectService.get_project(db, project_id)
+        # Load members and their users up front so serializing the member list stays constant
+        project = (
+            db.query(Project)
+            .options(selectinload(Project.members).joinedload(ProjectMember.user))
+            .filter(Project.id == project_id)
+            .first()
+        )
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        if is_admin:
-            # Populate member stats even for admins
-            ProjectService._populate_member_stats(db, project_id, project.members)
-            return project
+        if not is_admin and project_id not in ProjectService._accessible_project_ids(
+            db, [project_id], user_id
+        ):
+            raise HTTPException(status_code=403, detail="Not a member or owner of this project")
 
-        # Check membership for non-admin users
-        member = (
-            db.query(ProjectMember)
-            .filter(ProjectMember.project_id == project_id, ProjectMember.user_id == user_id)
-            .first()
+        # Populate member stats for the project's members list
+        # This ensures get_project returns members with task_count populated
+        ProjectService._populate_member_stats(db, project_id, project.members)
+        return project
+
+    @staticmethod
+    def _accessible_project_ids(db: Session, project_ids: List[int], user_id: int) -> Set[int]:
+        """Projects among project_ids the user is a member or the owner (client creator) of."""
+        rows = (
+            db.query(Project.id)
+            .join(Client, Client.id == Project.client_id)
+            .filter(
+                Project.id.in_(project_ids),
+                or_(
+                    Client.created_by == user_id,
+                    exists().where(
+                        ProjectMember.project_id == Project.id, ProjectMember.user_id == user_id
+                    ),
+                ),
+            )
+            .all()
         )
+        return {row.id for row in rows}
 
-        if member:
-            # Populate member stats for the project's members list
-            # This ensures get_project returns members with task_count populated
-            ProjectService._populate_member_stats(db, project_id, project.members)
-            return project
+    @staticmethod
+    def require_access(
+        db: Session, project_ids: List[int], user_id: int, is_admin: bool = False
+    ) -> None:
+        """
+        Same access rule as get_project_with_check, for any number of projects.
 
-        # Check for project owner (the user who created the client for this project)
-        client = db.query(Client).filter(Client.id == project.client_id).first()
-        if client and client.created_by == user_id:
-            # Populate member stats for the project's members list
-            ProjectService._populate_member_stats(db, project_id, project.members)
-            return project
+        404 if a project does not exist; 403 unless the user is an admin, or a
+        member or the owner of every project.
+        """
+        project_ids = list(dict.fromkeys(project_ids))
+        existing_ids = {
+            row.id for row in db.query(Project.id).filter(Project.id.in_(project_ids)).all()
+        }
+        missing_ids = [pid for pid in project_ids if pid not in existing_ids]
+        if missing_ids:
+            detail = (
+                "This Project does not exist"
+                if len(project_ids) == 1
+                else f"Projects not found: {', '.join(str(pid) for pid in missing_ids)}"
+            )
+            raise HTTPException(status_code=404, detail=detail)
 
-        raise HTTPException(status_code=403, detail="Not a member or owner of this project")
+        if is_admin:
+            return
+        accessible_ids = ProjectService._accessible_project_ids(db, project_ids, user_id)
+        if any(pid not in accessible_ids for pid in project_ids):
+            detail = (
+                "Not a member or owner of this project"
+                if len(project_ids) == 1
+                else "Not a member or owner of all requested projects"
+            )
+            raise HTTPException(status_code=403, detail=detail)
 
     @staticmethod
     def is_project_owner(db: Session, project_id: int, user_id: int) -> bool:
@@ -217,37 +301,17 @@ class ProjectService:
     @staticmethod
     def _populate_member_stats(db: Session, project_id: int, members: List[ProjectMember]):
         """Helper to populate task_count for a list of project members."""
-        now_time = datetime.now()
-        for member in members:
-            # Calculate logged hours
-            hours_logged = (
-                db.query(func.sum(LoggedHour.hours))
-                .filter(LoggedHour.project_id == project_id, LoggedHour.user_id == member.user_id)
-                .scalar()
-                or 0.0
-            )
-
-            # Base task query for this member in this project
-            member_tasks = db.query(Task).filter(
-                Task.project_id == project_id, Task.assigned_to == member.user_id
-            )
-
-            # Assign stats to member.task_count (will be picked up by Pydantic)
-            member.task_count = TaskCount(
-                hours_logged=hours_logged,
-                tasks_count=member_tasks.count(),
-                completed_tasks_count=member_tasks.filter(Task.status == "completed").count(),
-                in_progress_tasks_count=member_tasks.filter(Task.status == "in_progress").count(),
-                todo_tasks_count=member_tasks.filter(Task.status == "todo").count(),
-                overdue_tasks_count=member_tasks.filter(
-                    Task.status != "completed", Task.due_date.isnot(None), Task.due_date < now_time
-                ).count(),
-            )
+        MemberStatsService.populate(db, project_id, members)
 
     @staticmethod
     def list_members(db: Session, project_id: int) -> List[ProjectMember]:
         """List all members of a project."""
-        members = db.query(ProjectMember).filter(ProjectMember.project_id == project_id).all()
+        members = (
+            db.query(ProjectMember)
+            .options(joinedload(ProjectMember.user))
+            .filter(ProjectMember.project_id == project_id)
+            .all()
+        )
         ProjectService._populate_member_stats(db, project_id, members)
         return members
 
@@ -263,66 +327,36 @@ class ProjectService:
         - Member activity summary (hours per member, task count per member)
         """
         # Check if the project exists
-        project = db.query(Project).filter(Project.id == project_id).first()
+        project = db.get(Project, project_id)
         if not project:
             raise HTTPException(status_code=404, detail="This Project does not exist")
 
         # Get project members and their stats
-        members = db.query(ProjectMember).filter(ProjectMember.project_id == project_id).all()
+        members = db.scalars(_members_stmt(project_id)).unique().all()
         ProjectService._populate_member_stats(db, project_id, members)
-        now_time = datetime.now()
-
-        # we have to get the project tasks
-        tasks = db.query(Task).filter(Task.project_id == project_id).all()
-
-        # then we have to check the task counts of an individual task in the task array and increment the counts according to their status
-        total_tasks = len(tasks)
-        total_completed_tasks = 0
-        total_in_progress_tasks = 0
-        total_todo_tasks = 0
-        total_overdue_tasks = 0
-
-        for task in tasks:
-            if task.status == "completed":
-                total_completed_tasks += 1
-            elif task.status == "in_progress":
-                total_in_progress_tasks += 1
-            elif task.status == "todo":
-                total_todo_tasks += 1
-
-            # Check for overdue tasks (must have due_date and not be completed)
-            if (
-                task.status != "completed"
-                and task.due_date is not None
-                and now_time > task.due_date
-            ):
-                total_overdue_tasks += 1
-
-        # Calculate total logged hours for the project
-        total_logged_hours = (
-            db.query(func.sum(LoggedHour.hours))
-            .filter(LoggedHour.project_id == project_id)
-            .scalar()
-            or 0.0
-        )
-        # then we return the project statistics
-        return ProjectStatistics(
-            id=project.id,
-            name=project.name,
-            description=project.description,
-            status=project.status,
-            client_id=project.client_id,
-            created_at=project.created_at,
-            updated_at=project.updated_at,
-            members=members,
-            tasks=tasks,
-            total_logged_hours=total_logged_hours,
-            total_tasks=total_tasks,
-            total_completed_tasks=total_completed_tasks,
-            total_in_progress_tasks=total_in_progress_tasks,
-            total_todo_tasks=total_todo_tasks,
-            total_overdue_tasks=total_overdue_tasks,
-        )
+
+        # The task list is part of the ProjectDetail payload; counts come from the rollup
+        tasks = db.scalars(select(Task).where(Task.project_id == project_id)).all()
+        rollup = ProjectRollupService.get(db, project_id)
+        total_overdue_tasks = db.scalar(_overdue_count_stmt(project_id))
+
+        return _project_statistics(project, members, tasks, rollup, total_overdue_tasks)
+
+    @staticmethod
+    async def get_project_statistics_async(db: AsyncSession, project_id: int) -> ProjectStatistics:
+        """Async variant of get_project_statistics (same queries, awaited one by one)."""
+        project = await db.get(Project, project_id)
+        if not project:
+            raise HTTPException(status_code=404, detail="This Project does not exist")
+
+        members = (await db.scalars(_members_stmt(project_id))).unique().all()
+        await MemberStatsService.populate_async(db, project_id, members)
+
+        tasks = (await db.scalars(select(Task).where(Task.project_id == project_id))).all()
+        rollup = await ProjectRollupService.get_async(db, project_id)
+        total_overdue_tasks = await db.scalar(_overdue_count_stmt(project_id))
+
+        return _project_statistics(project, members, tasks, rollup, total_overdue_tasks)
 
     # ==================================================get the health of a project==========================
     @staticmethod
@@ -335,128 +369,26 @@ class ProjectService:
         - Inactive members (no hours logged in last 7 days)
         - Tasks with no assignee
         - Activity drop-off (last month vs previous month)
-        """
-        # Check if the project exists
-        project = db.query(Project).filter(Project.id == project_id).first()
 
-        if not project:
-            raise HTTPException(status_code=404, detail="This Project does not exist")
-
-        # to get a project health we will use these 4 indicators:
-        # 1. we check for overdues tasks
-        now_time = datetime.now()
-        overdue_tasks = (
-            db.query(Task)
-            .filter(
-                Task.project_id == project_id,
-                Task.status != "completed",
-                Task.due_date.isnot(None),
-                Task.due_date < now_time,
-            )
-            .all()
-        )
-        overdue_count = len(overdue_tasks)
-        overdue_indicator = ProjectHealthIndicator(
-            status=HealthFlag.alert if overdue_count > 0 else HealthFlag.ok,
-            message=f"{overdue_count} overdue tasks",
-        )
-
-        # 2. the seond is that we will have to check for inactive members that have no logged hours in the last N days
-        # we will use the last 7 days as the threshold
-        threshold_date = datetime.now() - timedelta(days=7)
-        last_n_days = 7
-        # Get all project members
-        members = db.query(ProjectMember).filter(ProjectMember.project_id == project_id).all()
-        inactive_members_list = []
-
-        for member in members:
-            # Check for logged hours in last N days
-            recent_log = (
-                db.query(LoggedHour)
-                .filter(
-                    LoggedHour.project_id == project_id,
-                    LoggedHour.user_id == member.user_id,
-                    LoggedHour.logged_at >= threshold_date,
-                )
-                .first()
-            )
-
-            if not recent_log:
-                user = db.query(User).filter(User.id == member.user_id).first()
-                if user:
-                    inactive_members_list.append(
-                        {"id": user.id, "name": f"{user.first_name} {user.last_name}"}
-                    )
-
-        inactive_indicator = ProjectHealthIndicator(
-            status=HealthFlag.warning if inactive_members_list else HealthFlag.ok,
-            message=f"{len(inactive_members_list)} inactive members in the last {last_n_days} days",
-            details={"members": inactive_members_list} if inactive_members_list else None,
-        )
-
-        # 3. The third is that we will check for tasks with no assignee
-        unassigned_tasks = (
-            db.query(Task).filter(Task.project_id == project_id, Task.assigned_to.is_(None)).all()
-        )
-        unassigned_count = len(unassigned_tasks)
-        unassigned_details = [{"id": t.id, "title": t.title} for t in unassigned_tasks]
-
-        unassigned_indicator = ProjectHealthIndicator(
-            status=HealthFlag.info if unassigned_count > 0 else HealthFlag.ok,
-            message=f"{unassigned_count} tasks with no assignees",
-            details={"tasks": unassigned_details} if unassigned_details else None,
-        )
-
-        # 5. Activity Drop-off (last month vs previous month)
-        # We compare count of completed tasks or updated tasks. Let's use tasks completed.
-        now_time = datetime.now()
-        last_month_start = now_time - timedelta(days=30)
-        prev_month_start = now_time - timedelta(days=60)
-
-        last_month_activity = (
-            db.query(Task)
-            .filter(
-                Task.project_id == project_id,
-                Task.status == "completed",
-                Task.updated_at >= last_month_start,
-            )
-            .count()
-        )
+        The caller has already checked the project exists (require_access).
+        """
+        return ProjectHealthService.evaluate_many(db, [project_id])[project_id]
 
-        prev_month_activity = (
-            db.query(Task)
-            .filter(
-                Task.project_id == project_id,
-                Task.status == "completed",
-                Task.updated_at >= prev_month_start,
-                Task.updated_at < last_month_start,
-            )
-            .count()
-        )
+    @staticmethod
+    def get_projects_health(
+        db: Session, project_ids: List[int], user_id: int, is_admin: bool = False
+    ) -> List[ProjectHealth]:
+        """
+        Get health indicators for several projects at once (portfolio dashboard).
 
-        dropoff_status = HealthFlag.ok
-        if prev_month_activity > 0:
-            if last_month_activity < prev_month_activity * 0.5:
-                dropoff_status = HealthFlag.alert
-            elif last_month_activity < prev_month_activity:
-                dropoff_status = HealthFlag.warning
-
-        activity_indicator = ProjectHealthIndicator(
-            status=dropoff_status,
-            message=f"Activity drop-off: {last_month_activity} vs {prev_month_activity} tasks completed",
-            details={
-                "last_month_count": last_month_activity,
-                "previous_month_count": prev_month_activity,
-            },
-        )
+        Access follows get_project_with_check: admins can view any project,
+        other users only projects they are a member or the owner of.
+        """
+        project_ids = list(dict.fromkeys(project_ids))
+        ProjectService.require_access(db, project_ids, user_id, is_admin=is_admin)
 
-        return ProjectHealth(
-            project_id=project_id,
-            overdue_tasks=overdue_indicator,
-            inactive_members=inactive_indicator,
-            unassigned_tasks=unassigned_indicator,
-            activity_dropoff=activity_indicator,
-        )
+        health = ProjectHealthService.evaluate_many(db, project_ids)
+        return [health[pid] for pid in project_ids]
 
     # Helper for getting list of clients relaated to a project
     @staticmethod
@@ -498,68 +430,22 @@ class ProjectService:
             )
 
         # Progress Calculation
-
-        # Hours
-
-        total_hours = (
-            db.query(func.coalesce(func.sum(LoggedHour.hours), 0.0))
-            .filter(LoggedHour.project_id == project.id)
-            .scalar()
-        )
-
-        # Tasks
-        # Use func.count with Task.id to avoid loading full Task objects (which may have missing columns)
-        total_tasks = (
-            db.query(func.count(Task.id)).filter(Task.project_id == project.id).scalar() or 0
-        )
-
-        completed_tasks = (
-            db.query(func.count(Task.id))
-            .filter(Task.project_id == project.id, Task.status == "done")
-            .scalar()
-            or 0
-        )
+        # Hours and task counts are O(1) reads from the maintained project rollup
+        rollup = ProjectRollupService.get(db, project.id)
+        total_hours = rollup.total_hours
+        total_tasks = rollup.total_tasks
+        completed_tasks = rollup.done_tasks
 
         # Progress Percentage
 
         progress_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0.0
 
         # Recent Activity
-        # Fetch more than needed to ensure we have enough after merging and sorting
-        fetch_limit = activity_limit * 2
-
-        logged_hours = (
-            db.query(LoggedHour)
-            .filter(LoggedHour.project_id == project.id)
-            .order_by(LoggedHour.logged_at.desc())
-            .limit(fetch_limit)
-            .all()
-        )
-
-        git_contributions = (
-            db.query(GitContribution)
-            .filter(GitContribution.project_id == project.id)
-            .order_by(GitContribution.created_at.desc())
-            .limit(fetch_limit)
-            .all()
+        # First page of the client's activity feed, merged and limited in the database
+        feed = list_project_activity(
+            db, project.id, PageParams(limit=activity_limit), types=CLIENT_TYPES
         )
-
-        logged_hours_items = [
-            ActivityItem(
-                type="logged_hours", description=f"Logged {lh.hours} hours", date=lh.logged_at
-            )
-            for lh in logged_hours
-        ]
-
-        git_activity_items = [
-            ActivityItem(type="commit", description="Committed code changes", date=gc.created_at)
-            for gc in git_contributions
-        ]
-
-        # Merge and sort by date DESC, then limit
-        all_activities = logged_hours_items + git_activity_items
-        all_activities.sort(key=lambda x: x.date, reverse=True)
-        recent_activity = all_activities[:activity_limit]
+        recent_activity = [to_client_item(activity) for activity in feed.items]
 
         # Milestones
         milestones = MilestoneService.get_by_project(db, project.id)
@@ -569,9 +455,7 @@ class ProjectService:
                     name=ms.name,
                     status=ms.status,
                     due_date=ms.due_date,
-                    completion_percentage=MilestoneService.calculate_progress(
-                        db, ms.id
-                    ).completion_percentage,
+                    completion_percentage=MilestoneService.progress_of(ms).completion_percentage,
                 )
                 for ms in milestones
             ]
@@ -588,6 +472,18 @@ class ProjectService:
             milestones=client_milestones,
         )
 
+    @staticmethod
+    async def get_project_progress_async(
+        db: AsyncSession, project_id: int, client: Client, activity_limit: int = 10
+    ) -> ProjectProgress:
+        """Async variant of get_project_progress (same queries, via run_sync)."""
+        return await db.run_sync(
+            ProjectService.get_project_progress,
+            project_id=project_id,
+            client=client,
+            activity_limit=activity_limit,
+        )
+
     @staticmethod
     def get_client_portal_project(
         db: Session, project_id: int, client: Client
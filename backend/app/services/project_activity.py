@@ -0,0 +1,243 @@
+"""
+Service for project activity feeds.
+
+A project's feed merges, newest first:
+- task events from the task activity log (creation, status and
+  assignment changes, comments, attachments; deleted ones are left out)
+- logged hours
+- commits
+
+The sources are merged in the database by a UNION ALL of their sort keys,
+each one a range scan of its ``(project_id, timestamp, id)`` index, and paged
+by keyset, so every page costs the same however deep the client scrolls. Only
+the rows on the page are then loaded, by id.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from app.dbmodels import Client, GitContribution, LoggedHour, Project, TaskActivity
+from app.schemas.project import ActivityItem
+from app.schemas.task_timeline import ActivityType, ProjectActivity
+from app.services.auth_context import AuthContext
+from app.services.task_timeline import build_activity_user
+from app.utils.pagination import KeysetOrder, Page, PageParams, decode_cursor, paginate_keyset
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, literal_column, select, union_all
+from sqlalchemy.orm import Session, joinedload
+
+# Log activities shown in project feeds. Hours and commits are read from their
+# own tables instead, so each appears exactly once and carries its current task.
+LOG_TYPES = (
+    ActivityType.TASK_CREATED,
+    ActivityType.STATUS_CHANGED,
+    ActivityType.ASSIGNMENT_CHANGED,
+    ActivityType.COMMENT_ADDED,
+    ActivityType.ATTACHMENT_UPLOADED,
+)
+FEED_TYPES = (*LOG_TYPES, ActivityType.HOURS_LOGGED, ActivityType.COMMIT_ADDED)
+
+# Activity types shown to clients, with their client portal type and description
+CLIENT_TYPES = {
+    ActivityType.HOURS_LOGGED: "logged_hours",
+    ActivityType.COMMIT_ADDED: "commit",
+    ActivityType.TASK_CREATED: "task_created",
+    ActivityType.STATUS_CHANGED: "status_changed",
+}
+
+# The rank breaks timestamp ties between sources
+_LOG, _LOGGED_HOUR, _COMMIT = 0, 1, 2
+
+
+def _log_activity(row: TaskActivity) -> ProjectActivity:
+    source_id = row.source_id if row.source_id is not None else row.id
+    return ProjectActivity(
+        id=f"{row.activity_type}_{source_id}",
+        activity_type=ActivityType(row.activity_type),
+        user=build_activity_user(row.user),
+        timestamp=row.created_at,
+        data=row.data,
+        task_id=row.task_id,
+    )
+
+
+def _logged_hour_activity(logged_hour: LoggedHour) -> ProjectActivity:
+    return ProjectActivity(
+        id=f"hours_logged_{logged_hour.id}",
+        activity_type=ActivityType.HOURS_LOGGED,
+        user=build_activity_user(logged_hour.user),
+        timestamp=logged_hour.logged_at,
+        data={
+            "logged_hour_id": logged_hour.id,
+            "hours": float(logged_hour.hours),
+            "description": logged_hour.note,
+            "date": logged_hour.logged_at.isoformat() if logged_hour.logged_at else None,
+        },
+        task_id=logged_hour.task_id,
+    )
+
+
+def _commit_activity(commit: GitContribution) -> ProjectActivity:
+    return ProjectActivity(
+        id=f"commit_added_{commit.id}",
+        activity_type=ActivityType.COMMIT_ADDED,
+        user=build_activity_user(commit.user),
+        timestamp=commit.created_at,
+        data={
+            "commit_id": commit.id,
+            "commit_hash": commit.commit_hash,
+            "commit_message": commit.commit_message,
+            "branch": commit.branch,
+            "provider": commit.provider,
+            "commit_url": commit.commit_url,
+        },
+        task_id=commit.task_id,
+    )
+
+
+# rank -> (model, its user relationship, builder)
+_SOURCES = {
+    _LOG: (TaskActivity, TaskActivity.user, _log_activity),
+    _LOGGED_HOUR: (LoggedHour, LoggedHour.user, _logged_hour_activity),
+    _COMMIT: (GitContribution, GitContribution.user, _commit_activity),
+}
+
+
+def _keys(rank: int, id_column, timestamp):
+    return select(
+        timestamp.label("timestamp"),
+        literal_column(str(rank), Integer).label("rank"),
+        id_column.label("source_id"),
+    )
+
+
+def feed_keys(project_id: int, types: Iterable[ActivityType]):
+    """UNION ALL of (timestamp, rank, source_id) of the project's activities of ``types``."""
+    types = set(types)
+    selects = []
+    log_types = [activity_type.value for activity_type in LOG_TYPES if activity_type in types]
+    if log_types:
+        selects.append(
+            _keys(_LOG, TaskActivity.id, TaskActivity.created_at).where(
+                TaskActivity.project_id == project_id,
+                TaskActivity.activity_type.in_(log_types),
+                TaskActivity.deleted_at.is_(None),
+            )
+        )
+    if ActivityType.HOURS_LOGGED in types:
+        selects.append(
+            _keys(_LOGGED_HOUR, LoggedHour.id, LoggedHour.logged_at).where(
+                LoggedHour.project_id == project_id
+            )
+        )
+    if ActivityType.COMMIT_ADDED in types:
+        selects.append(
+            _keys(_COMMIT, GitContribution.id, GitContribution.created_at).where(
+                GitContribution.project_id == project_id
+            )
+        )
+    if not selects:
+        return None
+    return union_all(*selects).subquery("activity_keys")
+
+
+def _load(db: Session, keys: list) -> List[ProjectActivity]:
+    """Build the activities of a page, loading only the rows on it."""
+    ids_by_rank: Dict[int, List[int]] = {}
+    for key in keys:
+        ids_by_rank.setdefault(key.rank, []).append(key.source_id)
+
+    loaded = {}
+    for rank, ids in ids_by_rank.items():
+        model, user_relationship, build = _SOURCES[rank]
+        for row in db.query(model).options(joinedload(user_relationship)).filter(model.id.in_(ids)):
+            loaded[(rank, row.id)] = build(row)
+
+    # Rows deleted since the keys were read are skipped
+    return [
+        loaded[(key.rank, key.source_id)] for key in keys if (key.rank, key.source_id) in loaded
+    ]
+
+
+def list_project_activity(
+    db: Session,
+    project_id: int,
+    page: PageParams,
+    types: Optional[Iterable[ActivityType]] = None,
+) -> Page:
+    """
+    Get a page of a project's activity feed, newest first.
+
+    Access checks are up to the caller. ``types`` restricts the feed to some
+    activity types (default: all of FEED_TYPES); the page's cursors hold the
+    (timestamp, source, id) sort key of its last/first entry.
+    """
+    keys = feed_keys(project_id, FEED_TYPES if types is None else types)
+    if keys is None:
+        return Page(items=[], total=0)
+
+    cursor = decode_cursor(page.cursor)
+    if cursor is not None and not (
+        len(cursor.values) == 3
+        and isinstance(cursor.values[0], datetime)
+        and all(isinstance(value, int) for value in cursor.values[1:])
+    ):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    order = KeysetOrder((keys.c.timestamp, keys.c.rank, keys.c.source_id), descending=True)
+    result = paginate_keyset(db.query(keys), order, page)
+    result.items = _load(db, result.items)
+    return result
+
+
+def get_project_activity(
+    db: Session,
+    project_id: int,
+    auth: AuthContext,
+    page: PageParams,
+    types: Optional[Iterable[ActivityType]] = None,
+) -> Page:
+    """Activity feed of a project for a member (admins bypass the membership check)."""
+    auth.require_access(project_id, not_found_detail="Project not found")
+    return list_project_activity(db, project_id, page, types)
+
+
+def to_client_item(activity: ProjectActivity) -> ActivityItem:
+    """Client portal view of an activity: its type, a generic description and date."""
+    if activity.activity_type == ActivityType.HOURS_LOGGED:
+        description = f"Logged {activity.data['hours']} hours"
+    elif activity.activity_type == ActivityType.COMMIT_ADDED:
+        description = "Committed code changes"
+    elif activity.activity_type == ActivityType.TASK_CREATED:
+        description = "Created a task"
+    else:
+        description = f"Moved a task to {activity.data.get('new_status')}"
+    return ActivityItem(
+        type=CLIENT_TYPES[activity.activity_type], description=description, date=activity.timestamp
+    )
+
+
+def get_client_project_activity(
+    db: Session,
+    project_id: int,
+    client: Client,
+    page: PageParams,
+    types: Optional[Iterable[ActivityType]] = None,
+) -> Page:
+    """
+    Activity feed of a client's project for the client portal.
+
+    Only the types in CLIENT_TYPES are shown, without their details.
+    """
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    if project.client_id != client.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this project"
+        )
+
+    types = [t for t in (CLIENT_TYPES if types is None else types) if t in CLIENT_TYPES]
+    result = list_project_activity(db, project_id, page, types)
+    result.items = [to_client_item(activity) for activity in result.items]
+    return result
@@ -0,0 +1,153 @@
+"""
+Batched project health evaluation.
+
+Evaluates the health indicators for one or many projects with a fixed number
+of set-based queries, independent of the number of projects, members or tasks.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+from app.dbmodels import Task
+from app.schemas.project import HealthFlag, ProjectHealth, ProjectHealthIndicator
+from app.services.member_stats import MemberStatsService, count_where, is_overdue
+from sqlalchemy.orm import Session
+
+INACTIVE_MEMBER_DAYS = 7
+
+
+class ProjectHealthService:
+    @staticmethod
+    def _get_task_indicators(db: Session, project_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """
+        Count overdue, unassigned and recently completed tasks per project.
+
+        One grouped query with conditional aggregates; no Task rows are loaded.
+        """
+        now_time = datetime.now()
+        last_month_start = now_time - timedelta(days=30)
+        prev_month_start = now_time - timedelta(days=60)
+
+        rows = (
+            db.query(
+                Task.project_id,
+                count_where(is_overdue(now_time)),
+                count_where(Task.assigned_to.is_(None)),
+                count_where((Task.status == "done") & (Task.updated_at >= last_month_start)),
+                count_where(
+                    (Task.status == "done")
+                    & (Task.updated_at >= prev_month_start)
+                    & (Task.updated_at < last_month_start)
+                ),
+            )
+            .filter(Task.project_id.in_(project_ids))
+            .group_by(Task.project_id)
+            .all()
+        )
+
+        return {
+            project_id: {
+                "overdue": int(overdue),
+                "unassigned": int(unassigned),
+                "last_month": int(last_month),
+                "previous_month": int(previous_month),
+            }
+            for project_id, overdue, unassigned, last_month, previous_month in rows
+        }
+
+    @staticmethod
+    def _get_unassigned_tasks(db: Session, project_ids: List[int]) -> Dict[int, List[dict]]:
+        """Fetch id/title of unassigned tasks per project (columns only)."""
+        rows = (
+            db.query(Task.project_id, Task.id, Task.title)
+            .filter(Task.project_id.in_(project_ids), Task.assigned_to.is_(None))
+            .order_by(Task.project_id, Task.id)
+            .all()
+        )
+
+        unassigned: Dict[int, List[dict]] = {}
+        for project_id, task_id, title in rows:
+            unassigned.setdefault(project_id, []).append({"id": task_id, "title": title})
+        return unassigned
+
+    @staticmethod
+    def evaluate_many(db: Session, project_ids: Iterable[int]) -> Dict[int, ProjectHealth]:
+        """
+        Evaluate health indicators for many projects at once.
+
+        Returns health indicators including:
+        - Overdue tasks count
+        - Inactive members (no hours logged in last 7 days)
+        - Tasks with no assignee
+        - Activity drop-off (last month vs previous month)
+
+        Existence and access checks are left to the caller.
+        """
+        project_ids = list(dict.fromkeys(project_ids))
+        if not project_ids:
+            return {}
+
+        threshold_date = datetime.now() - timedelta(days=INACTIVE_MEMBER_DAYS)
+        task_counts = ProjectHealthService._get_task_indicators(db, project_ids)
+        unassigned_tasks = ProjectHealthService._get_unassigned_tasks(db, project_ids)
+        inactive_members = MemberStatsService.get_inactive_members(db, project_ids, threshold_date)
+
+        empty_counts = {"overdue": 0, "unassigned": 0, "last_month": 0, "previous_month": 0}
+        results = {}
+        for project_id in project_ids:
+            counts = task_counts.get(project_id, empty_counts)
+
+            overdue_count = counts["overdue"]
+            overdue_indicator = ProjectHealthIndicator(
+                status=HealthFlag.alert if overdue_count > 0 else HealthFlag.ok,
+                message=f"{overdue_count} overdue tasks",
+            )
+
+            inactive_members_list = inactive_members.get(project_id, [])
+            inactive_indicator = ProjectHealthIndicator(
+                status=HealthFlag.warning if inactive_members_list else HealthFlag.ok,
+                message=(
+                    f"{len(inactive_members_list)} inactive members in the last "
+                    f"{INACTIVE_MEMBER_DAYS} days"
+                ),
+                details={"members": inactive_members_list} if inactive_members_list else None,
+            )
+
+            unassigned_count = counts["unassigned"]
+            unassigned_details = unassigned_tasks.get(project_id, [])
+            unassigned_indicator = ProjectHealthIndicator(
+                status=HealthFlag.info if unassigned_count > 0 else HealthFlag.ok,
+                message=f"{unassigned_count} tasks with no assignees",
+                details={"tasks": unassigned_details} if unassigned_details else None,
+            )
+
+            last_month_activity = counts["last_month"]
+            prev_month_activity = counts["previous_month"]
+            dropoff_status = HealthFlag.ok
+            if prev_month_activity > 0:
+                if last_month_activity < prev_month_activity * 0.5:
+                    dropoff_status = HealthFlag.alert
+                elif last_month_activity < prev_month_activity:
+                    dropoff_status = HealthFlag.warning
+
+            activity_indicator = ProjectHealthIndicator(
+                status=dropoff_status,
+                message=(
+                    f"Activity drop-off: {last_month_activity} vs {prev_month_activity} "
+                    "tasks completed"
+                ),
+                details={
+                    "last_month_count": last_month_activity,
+                    "previous_month_count": prev_month_activity,
+                },
+            )
+
+            results[project_id] = ProjectHealth(
+                project_id=project_id,
+                overdue_tasks=overdue_indicator,
+                inactive_members=inactive_indicator,
+                unassigned_tasks=unassigned_indicator,
+                activity_dropoff=activity_indicator,
+            )
+
+        return results
@@ -0,0 +1,307 @@
+"""
+Incrementally maintained per-project rollups.
+
+Write paths (logged hours, tasks, work sessions, git contributions) call the
+``record_*`` helpers inside their own transaction, before ``db.commit()``, so the
+counters move atomically with the source rows. Read paths use ``get`` for an
+O(1) lookup instead of re-scanning the source tables.
+
+Rows are created with the project (``create_empty``) and backfilled by the
+migration that adds the table. If a row is still missing, reads compute the
+values from the source tables without storing them, and deltas recorded in the
+meantime are dropped; ``rebuild_all`` restores the row.
+
+``change_count`` is bumped from a flush hook rather than by the write paths:
+every flush that inserts, updates or deletes a row of a VERSIONED_MODELS table
+bumps the counter of that row's project (old and new one if it moved), in the
+same transaction. ResourceVersionService builds ETags from it. Core bulk
+inserts do not go through the flush, so ``record_commits`` adds the inserted
+row count itself.
+"""
+
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app.dbmodels import (
+    GitContribution,
+    LoggedHour,
+    Milestone,
+    Project,
+    ProjectMember,
+    ProjectRollup,
+    Task,
+    TaskActivity,
+)
+from app.services.member_stats import count_where
+from app.utils.logger import get_logger
+from sqlalchemy import Select, case, event, func, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+logger = get_logger(__name__)
+
+# Task statuses with a dedicated counter column
+STATUS_COLUMNS = {
+    "todo": ProjectRollup.todo_tasks,
+    "in_progress": ProjectRollup.in_progress_tasks,
+    "done": ProjectRollup.done_tasks,
+}
+
+# Tables whose writes change what the project aggregate endpoints return
+VERSIONED_MODELS = (Task, ProjectMember, Milestone, LoggedHour, GitContribution, TaskActivity)
+
+
+def _compute_stmts(project_id: int) -> Tuple[Select, Select, Select]:
+    """Aggregates of the hours, tasks and commits of a project, one row each."""
+    return (
+        select(
+            func.coalesce(func.sum(LoggedHour.hours), 0.0), func.max(LoggedHour.logged_at)
+        ).where(LoggedHour.project_id == project_id),
+        select(
+            func.count(Task.id),
+            count_where(Task.status == "todo"),
+            count_where(Task.status == "in_progress"),
+            count_where(Task.status == "done"),
+            func.max(Task.updated_at),
+        ).where(Task.project_id == project_id),
+        select(func.count(GitContribution.id), func.max(GitContribution.created_at)).where(
+            GitContribution.project_id == project_id
+        ),
+    )
+
+
+def _rollup_values(hours_row, tasks_row, commits_row) -> Dict[str, object]:
+    total_hours, last_logged_at = hours_row
+    total_tasks, todo_tasks, in_progress_tasks, done_tasks, last_task_at = tasks_row
+    commit_count, last_commit_at = commits_row
+
+    timestamps = [ts for ts in (last_logged_at, last_task_at, last_commit_at) if ts]
+    last_activity_at = None
+    if timestamps:
+        # Mixed naive/aware values can come back from some backends; compare as naive
+        last_activity_at = max(timestamps, key=lambda ts: ts.replace(tzinfo=None))
+
+    return {
+        "total_hours": float(total_hours or 0.0),
+        "total_tasks": int(total_tasks or 0),
+        "todo_tasks": int(todo_tasks or 0),
+        "in_progress_tasks": int(in_progress_tasks or 0),
+        "done_tasks": int(done_tasks or 0),
+        "commit_count": int(commit_count or 0),
+        "last_activity_at": last_activity_at,
+    }
+
+
+def _rollup_stmt(project_id: int) -> Select:
+    return (
+        select(ProjectRollup)
+        .where(ProjectRollup.project_id == project_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+class ProjectRollupService:
+    @staticmethod
+    def compute(db: Session, project_id: int) -> Dict[str, object]:
+        """Compute rollup values for a project from the source tables."""
+        return _rollup_values(*(db.execute(stmt).one() for stmt in _compute_stmts(project_id)))
+
+    @staticmethod
+    async def compute_async(db: AsyncSession, project_id: int) -> Dict[str, object]:
+        """Async variant of compute."""
+        rows = [(await db.execute(stmt)).one() for stmt in _compute_stmts(project_id)]
+        return _rollup_values(*rows)
+
+    @staticmethod
+    def rebuild(db: Session, project_id: int) -> ProjectRollup:
+        """
+        Recompute a project's rollup from the source tables and overwrite it.
+
+        Does not commit; the caller owns the transaction.
+        """
+        values = ProjectRollupService.compute(db, project_id)
+        rollup = db.query(ProjectRollup).filter(ProjectRollup.project_id == project_id).first()
+        if rollup is None:
+            rollup = ProjectRollup(project_id=project_id)
+        for field, value in values.items():
+            setattr(rollup, field, value)
+        rollup.change_count = (rollup.change_count or 0) + 1
+        db.add(rollup)
+        return rollup
+
+    @staticmethod
+    def rebuild_all(db: Session, project_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Reconcile rollups for the given projects (all projects by default).
+
+        Commits once per project so a long run does not hold one big transaction.
+
+        Returns:
+            Number of projects rebuilt
+        """
+        if project_ids is None:
+            project_ids = [row.id for row in db.query(Project.id).order_by(Project.id).all()]
+
+        rebuilt = 0
+        for project_id in project_ids:
+            ProjectRollupService.rebuild(db, project_id)
+            db.commit()
+            rebuilt += 1
+        return rebuilt
+
+    @staticmethod
+    def get(db: Session, project_id: int) -> ProjectRollup:
+        """
+        Get the rollup for a project.
+
+        Read-only: if the row is missing, the values are computed from the source
+        tables and returned on a transient object that is not added to the session.
+        """
+        rollup = db.scalars(_rollup_stmt(project_id)).first()
+        if rollup is not None:
+            return rollup
+
+        logger.warning("Rollup missing for project %d; computing from source", project_id)
+        return ProjectRollup(project_id=project_id, **ProjectRollupService.compute(db, project_id))
+
+    @staticmethod
+    async def get_async(db: AsyncSession, project_id: int) -> ProjectRollup:
+        """Async variant of get (never writes either)."""
+        rollup = (await db.scalars(_rollup_stmt(project_id))).first()
+        if rollup is not None:
+            return rollup
+
+        logger.warning("Rollup missing for project %d; computing from source", project_id)
+        values = await ProjectRollupService.compute_async(db, project_id)
+        return ProjectRollup(project_id=project_id, **values)
+
+    @staticmethod
+    def create_empty(db: Session, project_id: int) -> None:
+        """Add a zeroed rollup row for a brand-new project (no commit)."""
+        db.add(ProjectRollup(project_id=project_id))
+
+    @staticmethod
+    def _apply(
+        db: Session,
+        project_id: int,
+        hours: float = 0.0,
+        tasks: int = 0,
+        status_deltas: Optional[Dict[str, int]] = None,
+        commits: int = 0,
+        activity_at: Optional[datetime] = None,
+        changes: int = 0,
+    ) -> None:
+        """Apply counter deltas with a single atomic UPDATE (no commit)."""
+        values = {}
+        if hours:
+            values[ProjectRollup.total_hours] = ProjectRollup.total_hours + hours
+        if tasks:
+            values[ProjectRollup.total_tasks] = ProjectRollup.total_tasks + tasks
+        for task_status, delta in (status_deltas or {}).items():
+            column = STATUS_COLUMNS.get(task_status)
+            if column is not None and delta:
+                values[column] = column + delta
+        if commits:
+            values[ProjectRollup.commit_count] = ProjectRollup.commit_count + commits
+        if changes:
+            values[ProjectRollup.change_count] = ProjectRollup.change_count + changes
+        if activity_at is not None:
+            values[ProjectRollup.last_activity_at] = case(
+                (
+                    (ProjectRollup.last_activity_at.is_(None))
+                    | (ProjectRollup.last_activity_at < activity_at),
+                    activity_at,
+                ),
+                else_=ProjectRollup.last_activity_at,
+            )
+
+        if not values:
+            return
+
+        db.query(ProjectRollup).filter(ProjectRollup.project_id == project_id).update(
+            values, synchronize_session=False
+        )
+
+    @staticmethod
+    def record_hours(
+        db: Session, project_id: int, hours: float, logged_at: Optional[datetime] = None
+    ) -> None:
+        """Record hours added (positive) or removed (negative) on a project."""
+        ProjectRollupService._apply(db, project_id, hours=hours, activity_at=logged_at)
+
+    @staticmethod
+    def record_task_added(db: Session, project_id: int, task_status: Optional[str]) -> None:
+        """Record a new task on a project."""
+        ProjectRollupService._apply(
+            db,
+            project_id,
+            tasks=1,
+            status_deltas={task_status: 1},
+            activity_at=datetime.now(),
+        )
+
+    @staticmethod
+    def record_task_removed(db: Session, project_id: int, task_status: Optional[str]) -> None:
+        """Record a deleted task on a project."""
+        ProjectRollupService._apply(db, project_id, tasks=-1, status_deltas={task_status: -1})
+
+    @staticmethod
+    def record_task_status_change(
+        db: Session, project_id: int, old_status: Optional[str], new_status: Optional[str]
+    ) -> None:
+        """Record a task moving from one status to another."""
+        if old_status == new_status:
+            return
+        ProjectRollupService._apply(
+            db,
+            project_id,
+            status_deltas={old_status: -1, new_status: 1},
+            activity_at=datetime.now(),
+        )
+
+    @staticmethod
+    def record_commits(
+        db: Session,
+        project_id: int,
+        count: int,
+        committed_at: Optional[datetime] = None,
+        bulk_inserted: bool = False,
+    ) -> None:
+        """
+        Record git contributions added to a project.
+
+        Pass bulk_inserted=True when the rows came from a Core insert: the flush
+        hook never sees those, so change_count moves here by the same count.
+        """
+        ProjectRollupService._apply(
+            db,
+            project_id,
+            commits=count,
+            activity_at=committed_at,
+            changes=count if bulk_inserted else 0,
+        )
+
+
+def _changed_project_ids(session: Session) -> Set[int]:
+    """Projects whose versioned rows are about to be written by this flush."""
+    project_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, VERSIONED_MODELS):
+            history = inspect(obj).attrs.project_id.history
+            project_ids.update(chain(history.added, history.unchanged, history.deleted))
+    project_ids.discard(None)
+    return project_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_change_counts(session: Session, _flush_context) -> None:
+    # new/dirty/deleted still describe the flushed changes here, and foreign
+    # keys set through relationships have been populated
+    project_ids = _changed_project_ids(session)
+    if project_ids:
+        session.connection().execute(
+            update(ProjectRollup)
+            .where(ProjectRollup.project_id.in_(sorted(project_ids)))
+            .values(change_count=ProjectRollup.change_count + 1)
+        )
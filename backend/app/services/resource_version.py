@@ -0,0 +1,120 @@
+"""
+Cheap version tokens for the data behind polled aggregate endpoints.
+
+A project's version is a primary-key lookup of maintained values: the
+project row's ``updated_at`` and its rollup's ``change_count``, which every
+write to the project's tasks, members, milestones, logged hours, commits and
+activity log bumps in the same transaction (see project_rollup). The version
+also changes every ETAG_TIME_BUCKET_SECONDS, since some figures depend on the
+current time and a few joined values (e.g. a member's name) leave no trace in
+these counters.
+
+A task's timeline version is read from the task's own activities instead, so
+writes elsewhere in the project leave it alone: their count and newest id (new
+activities) and newest ``updated_at`` (rewritten or hidden snapshots).
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+from app.dbmodels import Project, ProjectRollup, Task, TaskActivity
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+@dataclass
+class ResourceVersion:
+    version: str
+    last_modified: datetime
+    project_id: int
+    client_id: Optional[int] = None
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive timestamps are stored in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _build(row, project_id: int, client_id: Optional[int] = None) -> ResourceVersion:
+    bucket = int(time.time()) // settings.ETAG_TIME_BUCKET_SECONDS
+    bucket_start = datetime.fromtimestamp(
+        bucket * settings.ETAG_TIME_BUCKET_SECONDS, tz=timezone.utc
+    )
+    timestamps = [_as_utc(value) for value in row if isinstance(value, datetime)]
+    return ResourceVersion(
+        version="|".join(str(value) for value in (*row, bucket)),
+        last_modified=max([*timestamps, bucket_start]),
+        project_id=project_id,
+        client_id=client_id,
+    )
+
+
+def _project_version_stmt(project_id: int) -> Select:
+    return (
+        select(
+            Project.client_id,
+            Project.updated_at,
+            ProjectRollup.change_count,
+            ProjectRollup.updated_at,
+        )
+        .outerjoin(ProjectRollup, ProjectRollup.project_id == Project.id)
+        .where(Project.id == project_id)
+    )
+
+
+def _task_version_stmt(task_id: int) -> Select:
+    return (
+        select(
+            Task.project_id,
+            func.count(TaskActivity.id),
+            func.max(TaskActivity.id),
+            func.max(TaskActivity.updated_at),
+        )
+        .outerjoin(TaskActivity, TaskActivity.task_id == Task.id)
+        .where(Task.id == task_id)
+        .group_by(Task.project_id)
+    )
+
+
+class ResourceVersionService:
+    @staticmethod
+    def get_project_version(db: Session, project_id: int) -> Optional[ResourceVersion]:
+        """
+        Version of a project's statistics, health and progress data.
+
+        Returns None if the project does not exist.
+        """
+        row = db.execute(_project_version_stmt(project_id)).first()
+        if row is None:
+            return None
+        return _build(tuple(row), project_id, client_id=row[0])
+
+    @staticmethod
+    async def get_project_version_async(
+        db: AsyncSession, project_id: int
+    ) -> Optional[ResourceVersion]:
+        """Async variant of get_project_version (same single query)."""
+        row = (await db.execute(_project_version_stmt(project_id))).first()
+        if row is None:
+            return None
+        return _build(tuple(row), project_id, client_id=row[0])
+
+    @staticmethod
+    def get_task_version(db: Session, task_id: int) -> Optional[ResourceVersion]:
+        """
+        Version of a task's timeline data.
+
+        Activities are inserted, rewritten or hidden in the same transaction as
+        the change they describe; the version aggregates the task's activities
+        over the ``(task_id, created_at, id)`` index.
+
+        Returns None if the task does not exist.
+        """
+        row = db.execute(_task_version_stmt(task_id)).first()
+        if row is None:
+            return None
+        return _build(tuple(row), project_id=row[0])
@@ -1,10 +1,17 @@
-from typing import List, Optional
+from typing import Optional
 
 from app.dbmodels import Project, ProjectMember, Task, User
 from app.schemas.task import TaskCreate, TaskUpdate
+from app.services.auth_context import AuthContext
+from app.services.milestone import MilestoneService
+from app.services.project_rollup import ProjectRollupService
+from app.services.task_activity import TaskActivityService
+from app.utils.pagination import KeysetOrder, Page, PageParams, paginate_keyset
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
+TASK_ORDER = KeysetOrder((Task.id,))
+
 
 def validate_project_membership(db: Session, project_id: int, user_id: int) -> bool:
     """
@@ -27,25 +34,29 @@ def get(db: Session, task_id: int) -> Optional[Task]:
 
 def get_multi(
     db: Session,
-    skip: int = 0,
-    limit: int = 100,
+    auth: AuthContext,
+    page: PageParams,
     project_id: Optional[int] = None,
     status: Optional[str] = None,
     assigned_to: Optional[int] = None,
-) -> List[Task]:
-    """Get multiple tasks with optional filters."""
-    query = db.query(Task)
+) -> Page:
+    """
+    Get a page of the tasks visible to the user, with optional filters.
+
+    Membership scoping, ordering (by id) and paging are done in SQL.
+    """
+    query = auth.scope(db.query(Task), Task.project_id)
     if project_id:
         query = query.filter(Task.project_id == project_id)
     if status:
         query = query.filter(Task.status == status)
     if assigned_to:
         query = query.filter(Task.assigned_to == assigned_to)
-    return query.offset(skip).limit(limit).all()
+    return paginate_keyset(query, TASK_ORDER, page)
 
 
-def create(db: Session, obj_in: TaskCreate) -> Task:
-    """Create a new task."""
+def create(db: Session, obj_in: TaskCreate, actor_id: Optional[int] = None) -> Task:
+    """Create a new task; ``actor_id`` is the user recorded in its activity log."""
     # Validate Project exists
     project = db.query(Project).filter(Project.id == obj_in.project_id).first()
     if not project:
@@ -58,32 +69,51 @@ def create(db: Session, obj_in: TaskCreate) -> Task:
         project_id=obj_in.project_id,
         assigned_to=obj_in.assigned_to,
         due_date=obj_in.due_date,
+        milestone_id=obj_in.milestone_id,
     )
     db.add(db_obj)
+    ProjectRollupService.record_task_added(db, obj_in.project_id, obj_in.status)
+    MilestoneService.record_task_added(db, db_obj.milestone_id, db_obj.status)
+    TaskActivityService.record_task_created(db, db_obj, actor_id)
     db.commit()
     db.refresh(db_obj)
     return db_obj
 
 
-def update(db: Session, db_obj: Task, obj_in: TaskUpdate) -> Task:
+def update(db: Session, db_obj: Task, obj_in: TaskUpdate, actor_id: Optional[int] = None) -> Task:
     """Update a task."""
+    old_status, old_assignee_id = db_obj.status, db_obj.assigned_to
+    old_milestone_id = db_obj.milestone_id
     update_data = obj_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_obj, field, value)
 
+    ProjectRollupService.record_task_status_change(db, db_obj.project_id, old_status, db_obj.status)
+    MilestoneService.record_task_change(
+        db, old_milestone_id, old_status, db_obj.milestone_id, db_obj.status
+    )
+    TaskActivityService.record_task_changes(db, db_obj, actor_id, old_status, old_assignee_id)
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
     return db_obj
 
 
-def update_status(db: Session, task_id: int, new_status: str) -> Task:
+def update_status(
+    db: Session, task_id: int, new_status: str, actor_id: Optional[int] = None
+) -> Task:
     """Update only the status of a task."""
     task = get(db, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
+    old_status = task.status
+    ProjectRollupService.record_task_status_change(db, task.project_id, old_status, new_status)
+    MilestoneService.record_task_change(
+        db, task.milestone_id, old_status, task.milestone_id, new_status
+    )
     task.status = new_status
+    TaskActivityService.record_task_changes(db, task, actor_id, old_status, task.assigned_to)
     db.add(task)
     db.commit()
     db.refresh(task)
@@ -95,12 +125,16 @@ def delete(db: Session, task_id: int) -> Optional[Task]:
     obj = db.query(Task).filter(Task.id == task_id).first()
     if not obj:
         return None
+    ProjectRollupService.record_task_removed(db, obj.project_id, obj.status)
+    MilestoneService.record_task_removed(db, obj.milestone_id, obj.status)
     db.delete(obj)
     db.commit()
     return obj
 
 
-def assign(db: Session, task_id: int, user_id: Optional[int]) -> Task:
+def assign(
+    db: Session, task_id: int, user_id: Optional[int], actor_id: Optional[int] = None
+) -> Task:
     """Assign a task to a user."""
     task = get(db, task_id)
     if not task:
@@ -114,7 +148,9 @@ def assign(db: Session, task_id: int, user_id: Optional[int]) -> Task:
         if not validate_project_membership(db, task.project_id, user_id):
             raise HTTPException(status_code=403, detail="User is not a member of this project")
 
+    old_assignee_id = task.assigned_to
     task.assigned_to = user_id
+    TaskActivityService.record_task_changes(db, task, actor_id, task.status, old_assignee_id)
     db.add(task)
     db.commit()
     db.refresh(task)
@@ -0,0 +1,302 @@
+"""
+Task activity log.
+
+Write paths (tasks, comments, attachments, logged hours, commit links) call the
+``record_*`` helpers inside their own transaction, before ``db.commit()``, so an
+activity is stored if and only if the change it describes is. Each row holds a
+snapshot of the change as it happened, so the task timeline and project feeds
+read full history with one indexed range scan on ``(task_id, created_at)`` or
+``(project_id, created_at)`` instead of reconstructing it from the source
+tables. Rows are stamped when they are recorded and keep that ``created_at``,
+so a keyset cursor never skips rows added behind a page already read; the
+date of the work itself (e.g. ``logged_at``) travels in ``data``.
+
+Comments, attachments, logged hours and commit links can change after the
+fact. Their edit and delete paths call the ``record_*_edited``/``record_*_deleted``
+helpers in the same transaction: an edit rewrites the snapshot of the row's
+activity and a delete (or a move to another task) sets its ``deleted_at``,
+which hides it from every reader. Both stamp ``updated_at``, which the task
+timeline's version includes.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.dbmodels import (
+    GitContribution,
+    LoggedHour,
+    Task,
+    TaskActivity,
+    TaskAttachment,
+    TaskComment,
+    User,
+)
+from app.schemas.task_timeline import ActivityType
+from sqlalchemy.orm import Session
+
+
+def _user_name(db: Session, user_id: Optional[int]) -> Optional[str]:
+    if not user_id:
+        return None
+    user = db.get(User, user_id)
+    if not user:
+        return None
+    return user.display_name or f"{user.first_name} {user.last_name}".strip()
+
+
+def _flushed_id(db: Session, row) -> int:
+    # New source rows get their id on flush
+    if row.id is None:
+        db.flush()
+    return row.id
+
+
+def _source_activities(
+    db: Session, task_id: Optional[int], activity_type: ActivityType, source_id: int
+) -> List[TaskActivity]:
+    """The visible activities of a task about one source row."""
+    if task_id is None:
+        return []
+    return (
+        db.query(TaskActivity)
+        .filter(
+            TaskActivity.task_id == task_id,
+            TaskActivity.activity_type == activity_type.value,
+            TaskActivity.source_id == source_id,
+            TaskActivity.deleted_at.is_(None),
+        )
+        .all()
+    )
+
+
+def _mark_deleted(
+    db: Session, task_id: Optional[int], activity_type: ActivityType, source_id: int
+) -> None:
+    now = datetime.now(timezone.utc)
+    for activity in _source_activities(db, task_id, activity_type, source_id):
+        activity.deleted_at = now
+        activity.updated_at = now
+
+
+def _logged_hour_data(logged_hour: LoggedHour) -> Dict[str, Any]:
+    return {
+        "logged_hour_id": logged_hour.id,
+        "hours": float(logged_hour.hours),
+        "description": logged_hour.note,
+        "date": logged_hour.logged_at.isoformat() if logged_hour.logged_at else None,
+    }
+
+
+def _commit_data(commit: GitContribution) -> Dict[str, Any]:
+    return {
+        "commit_id": commit.id,
+        "commit_hash": commit.commit_hash,
+        "commit_message": commit.commit_message,
+        "branch": commit.branch,
+        "provider": commit.provider,
+        "commit_url": commit.commit_url,
+    }
+
+
+class TaskActivityService:
+    @staticmethod
+    def record(
+        db: Session,
+        task: Task,
+        activity_type: ActivityType,
+        user_id: Optional[int],
+        data: Dict[str, Any],
+        source_id: Optional[int] = None,
+        at: Optional[datetime] = None,
+    ) -> TaskActivity:
+        """
+        Add an activity of ``task`` to the session (committed by the caller).
+
+        ``at`` defaults to now; it is set explicitly rather than by the database
+        so activities recorded in one transaction keep distinct timestamps.
+        """
+        activity = TaskActivity(
+            task=task,
+            project_id=task.project_id,
+            user_id=user_id,
+            activity_type=activity_type.value,
+            source_id=source_id,
+            data=data,
+            created_at=at or datetime.now(timezone.utc),
+        )
+        db.add(activity)
+        return activity
+
+    @staticmethod
+    def record_task_created(db: Session, task: Task, user_id: Optional[int]) -> TaskActivity:
+        task_id = _flushed_id(db, task)
+        return TaskActivityService.record(
+            db,
+            task,
+            ActivityType.TASK_CREATED,
+            user_id,
+            {
+                "task_id": task_id,
+                "title": task.title,
+                "description": task.description,
+                "status": task.status,
+                "assigned_to": task.assigned_to,
+            },
+            source_id=task_id,
+        )
+
+    @staticmethod
+    def record_task_changes(
+        db: Session,
+        task: Task,
+        user_id: Optional[int],
+        old_status: Optional[str],
+        old_assignee_id: Optional[int],
+    ) -> None:
+        """Record the status and assignment changes of an update, if any."""
+        if task.status != old_status:
+            TaskActivityService.record(
+                db,
+                task,
+                ActivityType.STATUS_CHANGED,
+                user_id,
+                {"task_id": task.id, "old_status": old_status, "new_status": task.status},
+            )
+        if task.assigned_to != old_assignee_id:
+            TaskActivityService.record(
+                db,
+                task,
+                ActivityType.ASSIGNMENT_CHANGED,
+                user_id,
+                {
+                    "task_id": task.id,
+                    "old_assignee_id": old_assignee_id,
+                    "old_assignee_name": _user_name(db, old_assignee_id),
+                    "new_assignee_id": task.assigned_to,
+                    "new_assignee_name": _user_name(db, task.assigned_to),
+                },
+            )
+
+    @staticmethod
+    def record_comment(db: Session, task: Task, comment: TaskComment) -> TaskActivity:
+        comment_id = _flushed_id(db, comment)
+        return TaskActivityService.record(
+            db,
+            task,
+            ActivityType.COMMENT_ADDED,
+            comment.user_id,
+            {"comment_id": comment_id, "content": comment.content},
+            source_id=comment_id,
+        )
+
+    @staticmethod
+    def record_comment_edited(db: Session, comment: TaskComment) -> None:
+        """Show a comment's new content in its activity."""
+        now = datetime.now(timezone.utc)
+        for activity in _source_activities(
+            db, comment.task_id, ActivityType.COMMENT_ADDED, comment.id
+        ):
+            activity.data = {
+                **activity.data,
+                "content": comment.content,
+                "edited_at": now.isoformat(),
+            }
+            activity.updated_at = now
+
+    @staticmethod
+    def record_comment_deleted(db: Session, comment: TaskComment) -> None:
+        _mark_deleted(db, comment.task_id, ActivityType.COMMENT_ADDED, comment.id)
+
+    @staticmethod
+    def record_attachment(db: Session, task: Task, attachment: TaskAttachment) -> TaskActivity:
+        attachment_id = _flushed_id(db, attachment)
+        return TaskActivityService.record(
+            db,
+            task,
+            ActivityType.ATTACHMENT_UPLOADED,
+            attachment.user_id,
+            {
+                "attachment_id": attachment_id,
+                "filename": attachment.original_filename,
+                "file_size": attachment.file_size,
+                "mime_type": attachment.mime_type,
+            },
+            source_id=attachment_id,
+        )
+
+    @staticmethod
+    def record_attachment_deleted(db: Session, attachment: TaskAttachment) -> None:
+        _mark_deleted(db, attachment.task_id, ActivityType.ATTACHMENT_UPLOADED, attachment.id)
+
+    @staticmethod
+    def record_logged_hour(db: Session, task: Task, logged_hour: LoggedHour) -> TaskActivity:
+        logged_hour_id = _flushed_id(db, logged_hour)
+        return TaskActivityService.record(
+            db,
+            task,
+            ActivityType.HOURS_LOGGED,
+            logged_hour.user_id,
+            _logged_hour_data(logged_hour),
+            source_id=logged_hour_id,
+        )
+
+    @staticmethod
+    def record_logged_hour_edited(
+        db: Session, logged_hour: LoggedHour, old_task_id: Optional[int]
+    ) -> None:
+        """
+        Follow an edited logged hour: hours moved off a task leave its timeline
+        and appear on the new task's; otherwise the activity shows the new values.
+        """
+        if logged_hour.task_id != old_task_id:
+            _mark_deleted(db, old_task_id, ActivityType.HOURS_LOGGED, logged_hour.id)
+            if logged_hour.task_id:
+                TaskActivityService.record_logged_hour(
+                    db, db.get(Task, logged_hour.task_id), logged_hour
+                )
+            return
+
+        for activity in _source_activities(
+            db, old_task_id, ActivityType.HOURS_LOGGED, logged_hour.id
+        ):
+            activity.data = _logged_hour_data(logged_hour)
+            activity.updated_at = datetime.now(timezone.utc)
+
+    @staticmethod
+    def record_logged_hour_deleted(db: Session, logged_hour: LoggedHour) -> None:
+        _mark_deleted(db, logged_hour.task_id, ActivityType.HOURS_LOGGED, logged_hour.id)
+
+    @staticmethod
+    def record_commit_linked(
+        db: Session, task: Task, commit: GitContribution, user_id: Optional[int]
+    ) -> TaskActivity:
+        commit_id = _flushed_id(db, commit)
+        return TaskActivityService.record(
+            db,
+            task,
+            ActivityType.COMMIT_LINKED,
+            user_id,
+            _commit_data(commit),
+            source_id=commit_id,
+        )
+
+    @staticmethod
+    def record_commit_edited(
+        db: Session, commit: GitContribution, old_task_id: Optional[int], user_id: Optional[int]
+    ) -> None:
+        """
+        Follow an edited commit: a commit unlinked or moved off a task leaves its
+        timeline and a newly linked one appears on the new task's; otherwise the
+        activity shows the new message and URL.
+        """
+        if commit.task_id != old_task_id:
+            _mark_deleted(db, old_task_id, ActivityType.COMMIT_LINKED, commit.id)
+            if commit.task_id:
+                TaskActivityService.record_commit_linked(
+                    db, db.get(Task, commit.task_id), commit, user_id
+                )
+            return
+
+        for activity in _source_activities(db, old_task_id, ActivityType.COMMIT_LINKED, commit.id):
+            activity.data = _commit_data(commit)
+            activity.updated_at = datetime.now(timezone.utc)
@@ -4,15 +4,27 @@ Service layer for task attachment business logic.
 
 from typing import List, Optional
 
-from app.api.deps import is_admin_user
-from app.dbmodels import Task, TaskAttachment, User
+from app.dbmodels import Task, TaskAttachment
 from app.services import task as task_service
-from app.utils.file_upload import delete_file, get_file_content, save_uploaded_file
+from app.services.attachment_blob import AttachmentBlobService
+from app.services.auth_context import AuthContext
+from app.services.task_activity import TaskActivityService
+from app.utils.file_upload import (
+    ContentAddressedStorage,
+    delete_file,
+    get_storage_backend,
+    save_uploaded_file,
+    stage_uploaded_file,
+)
+from app.utils.logger import get_logger
 from fastapi import HTTPException, UploadFile, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+logger = get_logger(__name__)
 
-def validate_task_access(db: Session, task_id: int, user_id: int) -> Task:
+
+def validate_task_access(db: Session, task_id: int, auth: AuthContext) -> Task:
     """
     Validate that a user has access to a task (must be project member or admin).
 
@@ -26,16 +38,8 @@ def validate_task_access(db: Session, task_id: int, user_id: int) -> Task:
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
-    # Admins have access to all tasks
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-
-    if is_admin_user(user):
-        return task
-
-    # Regular users must be project members
-    if not task_service.validate_project_membership(db, task.project_id, user_id):
+    # Admins have access to all tasks, regular users must be project members
+    if not auth.can_access(task.project_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this project"
         )
@@ -43,7 +47,7 @@ def validate_task_access(db: Session, task_id: int, user_id: int) -> Task:
     return task
 
 
-def can_delete_attachment(db: Session, attachment_id: int, user_id: int) -> bool:
+def can_delete_attachment(attachment: TaskAttachment, auth: AuthContext) -> bool:
     """
     Check if a user can delete an attachment.
 
@@ -54,49 +58,55 @@ def can_delete_attachment(db: Session, attachment_id: int, user_id: int) -> bool
     Returns:
         True if user can delete, False otherwise
     """
-    attachment = db.query(TaskAttachment).filter(TaskAttachment.id == attachment_id).first()
-    if not attachment:
-        return False
-
-    # Uploader can delete
-    if attachment.user_id == user_id:
-        return True
-
-    # Admins can delete
-    user = db.query(User).filter(User.id == user_id).first()
-    if user and is_admin_user(user):
-        return True
-
-    return False
+    return attachment.user_id == auth.user_id or auth.is_admin
 
 
 async def create(
-    db: Session, upload_file: UploadFile, task_id: int, user_id: int
+    db: Session, upload_file: UploadFile, task_id: int, auth: AuthContext
 ) -> TaskAttachment:
     """
     Upload a file attachment to a task.
 
+    File I/O and every database call (including the blob row lock) run in the
+    threadpool, never on the event loop.
+
     Args:
         db: Database session
         upload_file: The uploaded file
         task_id: ID of the task
-        user_id: ID of the user uploading
+        auth: Authorization context of the uploading user
 
     Returns:
-        Created TaskAttachment object
+        Created TaskAttachment object, with its uploader loaded
 
     Raises:
         HTTPException if validation fails
     """
     # Validate task access
-    validate_task_access(db, task_id, user_id)
+    task = await run_in_threadpool(validate_task_access, db, task_id, auth)
+    user_id = auth.user_id
+
+    storage = get_storage_backend()
+    if isinstance(storage, ContentAddressedStorage):
+        # Identical content is stored once and shared through a reference-counted blob
+        filename, staging_path, file_size, mime_type, content_hash = await stage_uploaded_file(
+            upload_file, storage
+        )
+        attachment = TaskAttachment(
+            task_id=task_id,
+            user_id=user_id,
+            filename=filename,
+            original_filename=upload_file.filename or "unnamed_file",
+            file_size=file_size,
+            mime_type=mime_type,
+            content_hash=content_hash,
+        )
+        return await run_in_threadpool(_save_blob_attachment, db, task, attachment, staging_path)
 
     # Save file and get metadata
     filename, file_path, file_size, mime_type = await save_uploaded_file(
         upload_file, task_id, user_id
     )
-
-    # Create attachment record
     attachment = TaskAttachment(
         task_id=task_id,
         user_id=user_id,
@@ -106,11 +116,31 @@ async def create(
         file_size=file_size,
         mime_type=mime_type,
     )
+    return await run_in_threadpool(_save_attachment, db, task, attachment)
 
+
+def _save_blob_attachment(
+    db: Session, task: Task, attachment: TaskAttachment, staging_path: str
+) -> TaskAttachment:
+    """Take a blob reference for a staged upload, then save the attachment (blocking)."""
+    storage = get_storage_backend()
+    try:
+        attachment.file_path = AttachmentBlobService.acquire(
+            db, storage, staging_path, attachment.content_hash, attachment.file_size
+        )
+    finally:
+        storage.discard_staged(staging_path)
+    return _save_attachment(db, task, attachment)
+
+
+def _save_attachment(db: Session, task: Task, attachment: TaskAttachment) -> TaskAttachment:
+    """Insert an attachment with its activity entry and commit (blocking)."""
     db.add(attachment)
+    TaskActivityService.record_attachment(db, task, attachment)
     db.commit()
     db.refresh(attachment)
-
+    # Loaded here so serializing the response does not query on the event loop
+    _ = attachment.uploader
     return attachment
 
 
@@ -129,17 +159,19 @@ def get_by_task(db: Session, task_id: int) -> List[TaskAttachment]:
     return db.query(TaskAttachment).filter(TaskAttachment.task_id == task_id).all()
 
 
-def get_file_bytes(db: Session, attachment_id: int, user_id: int) -> tuple[bytes, str, str]:
+def get_for_download(db: Session, attachment_id: int, auth: AuthContext) -> TaskAttachment:
     """
-    Get file content for download.
+    Get an attachment for download after checking access.
+
+    The file itself is streamed from storage by the route, never loaded whole.
 
     Args:
         db: Database session
         attachment_id: ID of the attachment
-        user_id: ID of the user requesting download
+        auth: Authorization context of the user requesting download
 
     Returns:
-        Tuple of (file_content, filename, mime_type)
+        The TaskAttachment (file_path, original_filename, mime_type)
 
     Raises:
         HTTPException if attachment not found or access denied
@@ -149,22 +181,19 @@ def get_file_bytes(db: Session, attachment_id: int, user_id: int) -> tuple[bytes
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attachment not found")
 
     # Validate task access
-    validate_task_access(db, attachment.task_id, user_id)
-
-    # Get file content
-    file_content = get_file_content(attachment.file_path)
+    validate_task_access(db, attachment.task_id, auth)
 
-    return file_content, attachment.original_filename, attachment.mime_type
+    return attachment
 
 
-def delete(db: Session, attachment_id: int, user_id: int) -> bool:
+def delete(db: Session, attachment_id: int, auth: AuthContext) -> bool:
     """
     Delete an attachment.
 
     Args:
         db: Database session
         attachment_id: ID of the attachment to delete
-        user_id: ID of the user requesting deletion
+        auth: Authorization context of the user requesting deletion
 
     Returns:
         True if deletion was successful
@@ -177,20 +206,26 @@ def delete(db: Session, attachment_id: int, user_id: int) -> bool:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attachment not found")
 
     # Check permissions
-    if not can_delete_attachment(db, attachment_id, user_id):
+    if not can_delete_attachment(attachment, auth):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to delete this attachment",
         )
 
-    # Delete file from storage
-    file_deleted = delete_file(attachment.file_path)
-    if not file_deleted:
-        # Log warning but continue with DB deletion
-        pass
+    # Shared blob: the file is only removed with its last reference
+    content_hash = attachment.content_hash
+    last_reference = content_hash is not None and AttachmentBlobService.release(db, content_hash)
+    file_path = attachment.file_path
 
     # Delete from database
+    TaskActivityService.record_attachment_deleted(db, attachment)
     db.delete(attachment)
     db.commit()
 
+    # Files go only once the delete is committed, so a rollback never loses one
+    if last_reference:
+        AttachmentBlobService.purge(db, content_hash)
+    elif content_hash is None and not delete_file(file_path):
+        logger.warning("Could not delete attachment file %s", file_path)
+
     return True
@@ -2,6 +2,7 @@ from typing import List, Optional
 
 from app.dbmodels import Task, TaskComment, UserRole
 from app.services.task import validate_project_membership
+from app.services.task_activity import TaskActivityService
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
@@ -35,6 +36,7 @@ def create_comment(db: Session, task_id: int, user_id: int, content: str) -> Tas
     # Create comment
     comment = TaskComment(task_id=task_id, user_id=user_id, content=content)
     db.add(comment)
+    TaskActivityService.record_comment(db, task, comment)
     db.commit()
     db.refresh(comment)
     return comment
@@ -102,6 +104,7 @@ def update_comment(db: Session, comment_id: int, user_id: int, content: str) ->
 
     comment.content = content
     db.add(comment)
+    TaskActivityService.record_comment_edited(db, comment)
     db.commit()
     db.refresh(comment)
     return comment
@@ -139,6 +142,7 @@ def delete_comment(db: Session, comment_id: int, user_id: int, user_role: UserRo
     if not is_owner and not is_system_admin:
         raise HTTPException(status_code=403, detail="You can only delete your own comments")
 
+    TaskActivityService.record_comment_deleted(db, comment)
     db.delete(comment)
     db.commit()
     return comment
@@ -1,20 +1,27 @@
 """
-Service for aggregating task timeline activities.
+Service for task timeline activities.
 
-This service collects activities from multiple sources and normalizes them
-into a unified chronological timeline.
+The timeline is read from the task's activity log (see
+``services.task_activity``) and normalized into a chronological timeline.
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 
-from app.dbmodels import GitContribution, LoggedHour, Task, TaskAttachment, User
+from app.dbmodels import Task, TaskActivity, User
 from app.schemas.task_timeline import ActivityType, ActivityUser, TimelineActivity
-from app.services.task import validate_project_membership
+from app.services.auth_context import AuthContext
+from app.services.resource_version import ResourceVersion, ResourceVersionService
+from app.utils.pagination import KeysetOrder, PageParams, decode_cursor, paginate_keyset
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
+# Oldest first; ids break ties between activities recorded at the same time
+TIMELINE_ORDER = KeysetOrder((TaskActivity.created_at, TaskActivity.id))
 
-def _build_activity_user(user: Optional[User]) -> Optional[ActivityUser]:
+
+def build_activity_user(user: Optional[User]) -> Optional[ActivityUser]:
     """Build ActivityUser from User model."""
     if not user:
         return None
@@ -25,257 +32,126 @@ def _build_activity_user(user: Optional[User]) -> Optional[ActivityUser]:
     )
 
 
-def _get_task_created_activity(task: Task) -> TimelineActivity:
-    """
-    Create activity for task creation.
-
-    Note: Task model doesn't have a created_by field, so we can't
-    determine who created the task. User will be None.
-    """
-    return TimelineActivity(
-        id=f"task_created_{task.id}",
-        activity_type=ActivityType.TASK_CREATED,
-        user=None,  # Can't determine creator without created_by field
-        timestamp=task.created_at,
-        data={
-            "task_id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "status": task.status,
-            "assigned_to": task.assigned_to,
-        },
-    )
-
-
-def _get_status_changed_activity(task: Task) -> Optional[TimelineActivity]:
-    """
-    Create activity for status change.
-
-    Note: This only captures the current status. For full history,
-    a task_activities table would be needed to track all status transitions.
-    """
-    # Since we don't have historical tracking, we'll use updated_at
-    # This will only show the last status change, not all changes
-    # Compare timestamps to avoid timezone issues
-    if task.created_at and task.updated_at:
-        time_diff = (task.updated_at - task.created_at).total_seconds()
-        if abs(time_diff) < 1:  # Less than 1 second difference
-            return None  # No status change yet
-
-    # We can't determine old_status without historical tracking
-    # For now, we'll just show the current status
-    timestamp = task.updated_at if task.updated_at else task.created_at
-    return TimelineActivity(
-        id=f"status_changed_{task.id}_{timestamp.timestamp() if timestamp else 0}",
-        activity_type=ActivityType.STATUS_CHANGED,
-        user=None,  # Can't determine who changed it without history
-        timestamp=timestamp,
-        data={
-            "task_id": task.id,
-            "new_status": task.status,
-            "old_status": None,  # Unknown without historical tracking
-        },
-    )
-
-
-def _get_assignment_changed_activity(task: Task) -> Optional[TimelineActivity]:
-    """
-    Create activity for assignment change.
-
-    Note: This only captures the current assignment. For full history,
-    a task_activities table would be needed to track all assignment changes.
-    """
-    # Compare timestamps to avoid timezone issues
-    if task.created_at and task.updated_at:
-        time_diff = (task.updated_at - task.created_at).total_seconds()
-        if abs(time_diff) < 1:  # Less than 1 second difference
-            return None  # No assignment change yet
-
-    assignee = _build_activity_user(task.assignee) if task.assignee else None
-    timestamp = task.updated_at if task.updated_at else task.created_at
-
+def _activity(row: TaskActivity) -> TimelineActivity:
+    """Build a timeline entry from an activity log row."""
+    # Activities about another row keep that row's id ("attachment_uploaded_123")
+    source_id = row.source_id if row.source_id is not None else row.id
     return TimelineActivity(
-        id=f"assignment_changed_{task.id}_{timestamp.timestamp() if timestamp else 0}",
-        activity_type=ActivityType.ASSIGNMENT_CHANGED,
-        user=None,  # Can't determine who changed it without history
-        timestamp=timestamp,
-        data={
-            "task_id": task.id,
-            "new_assignee_id": task.assigned_to,
-            "new_assignee_name": assignee.name if assignee else None,
-            "old_assignee_id": None,  # Unknown without historical tracking
-            "old_assignee_name": None,
-        },
-    )
-
-
-def _get_attachment_activities(db: Session, task_id: int) -> List[TimelineActivity]:
-    """Get all attachment upload activities for a task."""
-    attachments = (
-        db.query(TaskAttachment)
-        .options(joinedload(TaskAttachment.uploader))
-        .filter(TaskAttachment.task_id == task_id)
-        .all()
+        id=f"{row.activity_type}_{source_id}",
+        activity_type=ActivityType(row.activity_type),
+        user=build_activity_user(row.user),
+        timestamp=row.created_at,
+        data=row.data,
     )
 
-    activities = []
-    for attachment in attachments:
-        uploader = _build_activity_user(attachment.uploader)
-        activities.append(
-            TimelineActivity(
-                id=f"attachment_uploaded_{attachment.id}",
-                activity_type=ActivityType.ATTACHMENT_UPLOADED,
-                user=uploader,
-                timestamp=attachment.created_at,
-                data={
-                    "attachment_id": attachment.id,
-                    "filename": attachment.original_filename,
-                    "file_size": attachment.file_size,
-                    "mime_type": attachment.mime_type,
-                },
-            )
-        )
-
-    return activities
-
-
-def _get_logged_hour_activities(db: Session, task_id: int) -> List[TimelineActivity]:
-    """Get all logged hour activities for a task."""
-    logged_hours = (
-        db.query(LoggedHour)
-        .options(joinedload(LoggedHour.user))
-        .filter(LoggedHour.task_id == task_id)
-        .all()
-    )
-
-    activities = []
-    for logged_hour in logged_hours:
-        user = _build_activity_user(logged_hour.user)
-        # Use the logged_at field for when the work was done
-        timestamp = logged_hour.logged_at if logged_hour.logged_at else None
-
-        activities.append(
-            TimelineActivity(
-                id=f"hours_logged_{logged_hour.id}",
-                activity_type=ActivityType.HOURS_LOGGED,
-                user=user,
-                timestamp=timestamp,
-                data={
-                    "logged_hour_id": logged_hour.id,
-                    "hours": float(logged_hour.hours),
-                    "description": logged_hour.note,
-                    "date": logged_hour.logged_at.isoformat() if logged_hour.logged_at else None,
-                },
-            )
-        )
-
-    return activities
-
-
-def _get_commit_activities(db: Session, task_id: int) -> List[TimelineActivity]:
-    """Get all git commit activities linked to a task."""
-    commits = (
-        db.query(GitContribution)
-        .options(joinedload(GitContribution.user))
-        .filter(GitContribution.task_id == task_id)
-        .all()
-    )
-
-    activities = []
-    for commit in commits:
-        user = _build_activity_user(commit.user)
-        # Use committed_at if available, otherwise created_at
-        timestamp = commit.committed_at if commit.committed_at else commit.created_at
-
-        activities.append(
-            TimelineActivity(
-                id=f"commit_linked_{commit.id}",
-                activity_type=ActivityType.COMMIT_LINKED,
-                user=user,
-                timestamp=timestamp,
-                data={
-                    "commit_id": commit.id,
-                    "commit_hash": commit.commit_hash,
-                    "commit_message": commit.commit_message,
-                    "branch": commit.branch,
-                    "provider": commit.provider,
-                    "commit_url": commit.commit_url,
-                },
-            )
-        )
-
-    return activities
-
 
 def get_task_timeline(
-    db: Session, task_id: int, user_id: int, is_admin: bool = False, skip: int = 0, limit: int = 100
-) -> tuple[List[TimelineActivity], int]:
+    db: Session,
+    task_id: int,
+    auth: AuthContext,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[TimelineActivity], int, Optional[str]]:
     """
-    Get the complete timeline for a task.
+    Get a page of the timeline of a task, oldest first.
 
-    Aggregates activities from all sources:
+    Activities are read from the task's activity log, so status and assignment
+    changes keep their full history (comments, attachments and logged hours
+    since deleted, and commits since unlinked, are left out):
     - Task creation
     - Status changes
     - Assignment changes
+    - Comments
     - Attachments
     - Logged hours
     - Linked commits
 
+    A page is one range scan of the ``(task_id, created_at, id)`` index, with
+    the total counted by a window column (or a separate count after a cursor).
+
     Args:
         db: Database session
         task_id: ID of the task
-        user_id: ID of the user requesting the timeline (for access control)
-        is_admin: Whether the user is an admin (admins bypass access checks)
-        skip: Number of activities to skip (pagination)
+        auth: Authorization context of the requesting user (admins bypass access checks)
+        skip: Number of activities to skip (offset pagination, ignored with a cursor)
         limit: Maximum number of activities to return
+        cursor: next_cursor of the previous page
 
     Returns:
-        Tuple of (activities list, total count)
+        Tuple of (activities list, total count, cursor of the next page or None)
 
     Raises:
-        HTTPException if task not found or user doesn't have access
+        HTTPException if task not found, user doesn't have access or the cursor is invalid
     """
     # Verify task exists
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
+    project_id = db.query(Task.project_id).filter(Task.id == task_id).scalar()
+    if project_id is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Verify user has access to the task's project (admins bypass)
-    if not is_admin:
-        if not validate_project_membership(db, task.project_id, user_id):
-            raise HTTPException(status_code=403, detail="Not a member of this project")
-
-    # Collect all activities
-    activities: List[TimelineActivity] = []
-
-    # Task creation
-    activities.append(_get_task_created_activity(task))
-
-    # Status change (if task was updated)
-    status_activity = _get_status_changed_activity(task)
-    if status_activity:
-        activities.append(status_activity)
+    if not auth.can_access(project_id):
+        raise HTTPException(status_code=403, detail="Not a member of this project")
+
+    position = decode_cursor(cursor)
+    if position is not None and not (
+        len(position.values) == 2
+        and isinstance(position.values[0], datetime)
+        and isinstance(position.values[1], int)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    query = (
+        db.query(TaskActivity)
+        .options(joinedload(TaskActivity.user))
+        .filter(TaskActivity.task_id == task_id, TaskActivity.deleted_at.is_(None))
+    )
+    page = paginate_keyset(
+        query,
+        TIMELINE_ORDER,
+        PageParams(limit=limit, cursor=cursor, skip=None if cursor else skip, include_total=True),
+    )
+    return [_activity(row) for row in page.items], page.total, page.next_cursor
 
-    # Assignment change (if task was updated)
-    assignment_activity = _get_assignment_changed_activity(task)
-    if assignment_activity:
-        activities.append(assignment_activity)
 
-    # Attachments
-    activities.extend(_get_attachment_activities(db, task_id))
+async def get_task_timeline_async(
+    db: AsyncSession,
+    task_id: int,
+    auth: AuthContext,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[TimelineActivity], int, Optional[str]]:
+    """
+    Async variant of get_task_timeline.
 
-    # Logged hours
-    activities.extend(_get_logged_hour_activities(db, task_id))
+    Runs the same queries through ``AsyncSession.run_sync``, so the I/O happens
+    on the async connection without blocking the event loop.
+    """
+    return await db.run_sync(
+        lambda session: get_task_timeline(session, task_id, auth.bind(session), skip, limit, cursor)
+    )
 
-    # Linked commits
-    activities.extend(_get_commit_activities(db, task_id))
 
-    # Sort by timestamp in chronological order (oldest first, then by ID for stability)
-    activities.sort(key=lambda a: (a.timestamp, a.id))
+def get_task_timeline_version(
+    db: Session, task_id: int, auth: AuthContext
+) -> Optional[ResourceVersion]:
+    """
+    Version of the task's timeline data for conditional requests.
 
-    total = len(activities)
+    None if the task does not exist or the user cannot access it; the caller
+    then falls through to ``get_task_timeline``, which raises the error.
+    """
+    version = ResourceVersionService.get_task_version(db, task_id)
+    if version is None or not auth.can_access(version.project_id):
+        return None
+    return version
 
-    # Apply pagination
-    paginated_activities = activities[skip : skip + limit]
 
-    return paginated_activities, total
+async def get_task_timeline_version_async(
+    db: AsyncSession, task_id: int, auth: AuthContext
+) -> Optional[ResourceVersion]:
+    """Async variant of get_task_timeline_version."""
+    return await db.run_sync(
+        lambda session: get_task_timeline_version(session, task_id, auth.bind(session))
+    )
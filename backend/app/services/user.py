@@ -3,7 +3,7 @@ from collections import defaultdict
 from datetime import datetime
 from typing import Optional
 
-from app.core.security import hash_password, verify_password
+from app.core.password_pool import password_hasher
 from app.dbmodels import GitContribution, LoggedHour, Project, ProjectMember, User, UserRole
 from app.schemas.user import (
     ProjectHours,
@@ -31,7 +31,7 @@ def create(db: Session, obj_in: UserCreate, background_tasks: BackgroundTasks) -
         username=obj_in.email,
         display_name=f"{obj_in.first_name} {obj_in.last_name}",
         email=obj_in.email,
-        hashed_password=hash_password(obj_in.password),
+        hashed_password=password_hasher.hash(obj_in.password),
         first_name=obj_in.first_name,
         last_name=obj_in.last_name,
         role=obj_in.role,
@@ -51,8 +51,15 @@ def authenticate(db: Session, email: str, password: str) -> Optional[User]:
     user = get_by_email(db, email=email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        # Stored hash predates the configured work factor; upgrade it transparently
+        user.hashed_password = new_hash
+        db.add(user)
+        db.commit()
+        db.refresh(user)
     return user
 
 
@@ -99,7 +106,7 @@ def reset_password(db: Session, token: str, new_password: str) -> Optional[User]
     if not user:
         return None
 
-    user.hashed_password = hash_password(new_password)
+    user.hashed_password = password_hasher.hash(new_password)
     user.password_reset_token = None  # Clear token
     db.add(user)
     db.commit()
@@ -125,11 +132,11 @@ def change_password(
 ) -> Optional[User]:
     """Change user password after verifying current password"""
     # Verify current password
-    if not verify_password(current_password, user.hashed_password):
+    if not password_hasher.verify(current_password, user.hashed_password):
         return None
 
     # Hash and update new password
-    user.hashed_password = hash_password(new_password)
+    user.hashed_password = password_hasher.hash(new_password)
     db.add(user)
     db.commit()
     db.refresh(user)
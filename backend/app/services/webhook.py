@@ -5,7 +5,6 @@ Handles extraction, normalization, and persistence of commits from
 GitHub, GitLab, and Bitbucket webhook payloads.
 """
 
-import re
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
@@ -16,21 +15,19 @@ from app.schemas.webhook import (
     GitHubPushPayload,
     GitLabPushPayload,
 )
+from app.services.author_resolver import AuthorResolver, author_cache, is_no_reply_email
+from app.services.project_rollup import ProjectRollupService
 from app.utils.logger import get_logger
 from fastapi import HTTPException, status
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 logger = get_logger(__name__)
 
-
-# Common no-reply email patterns
-NO_REPLY_PATTERNS = [
-    r"noreply@.*",
-    r"no-reply@.*",
-    r".*@users\.noreply\.github\.com",
-    r".*@users\.noreply\.gitlab\.com",
-    r".*@bitbucket\.org",
-]
+# Max rows per bulk INSERT / IN list when ingesting a push
+INSERT_BATCH_SIZE = 1000
 
 
 class WebhookService:
@@ -47,15 +44,7 @@ class WebhookService:
         Returns:
             True if email matches no-reply patterns, False otherwise
         """
-        if not email:
-            return True
-
-        email_lower = email.lower().strip()
-        for pattern in NO_REPLY_PATTERNS:
-            if re.match(pattern, email_lower):
-                logger.debug("Ignoring no-reply email: %s", email)
-                return True
-        return False
+        return is_no_reply_email(email)
 
     @staticmethod
     def _normalize_timestamp(timestamp_str: str, provider: str) -> datetime:
@@ -129,13 +118,8 @@ class WebhookService:
         Returns:
             User if found, None otherwise
         """
-        if not email:
-            return None
-
-        # Case-insensitive search
-        user = db.query(User).filter(User.email.ilike(email.strip())).first()
-
-        return user
+        user_id = AuthorResolver.resolve_user_id(db, email) if email else None
+        return db.get(User, user_id) if user_id is not None else None
 
     @staticmethod
     def _normalize_repository_url(url: str) -> str:
@@ -483,6 +467,58 @@ class WebhookService:
         # Process commits
         return WebhookService._process_commits(db, commits, project.id, "bitbucket", repository_url)
 
+    @staticmethod
+    def _build_commit_url(
+        provider: str, repository_url: Optional[str], commit_hash: str
+    ) -> Optional[str]:
+        """Construct a commit URL from the repository URL based on provider."""
+        if not repository_url:
+            return None
+        if provider == "github":
+            return f"{repository_url}/commit/{commit_hash}"
+        if provider == "gitlab":
+            return f"{repository_url}/-/commit/{commit_hash}"
+        if provider == "bitbucket":
+            return f"{repository_url}/commits/{commit_hash}"
+        return None
+
+    @staticmethod
+    def _bulk_insert_contributions(db: Session, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert contribution rows with INSERT ... ON CONFLICT DO NOTHING.
+
+        Conflicts on uix_project_commit (e.g. a concurrent redelivery) are skipped
+        instead of failing the whole batch.
+
+        Returns:
+            Number of rows actually inserted
+        """
+        dialect = db.get_bind().dialect.name
+        inserted = 0
+
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            chunk = rows[start : start + INSERT_BATCH_SIZE]
+            if dialect == "postgresql":
+                stmt = (
+                    pg_insert(GitContribution)
+                    .values(chunk)
+                    .on_conflict_do_nothing(constraint="uix_project_commit")
+                )
+            elif dialect == "sqlite":
+                stmt = (
+                    sqlite_insert(GitContribution)
+                    .values(chunk)
+                    .on_conflict_do_nothing(index_elements=["project_id", "commit_hash"])
+                )
+            else:
+                # Duplicates were already filtered out before the insert
+                stmt = insert(GitContribution).values(chunk)
+
+            result = db.execute(stmt)
+            inserted += result.rowcount if result.rowcount >= 0 else len(chunk)
+
+        return inserted
+
     @staticmethod
     def _process_commits(
         db: Session,
@@ -494,6 +530,10 @@ class WebhookService:
         """
         Process commits and create contributions.
 
+        Works on the whole push at once: authors are resolved with one IN query,
+        duplicates are detected with one commit_hash IN query, and new rows are
+        bulk-inserted, so the number of queries does not grow with the push size.
+
         Args:
             db: Database session
             commits: List of normalized commit information
@@ -504,27 +544,44 @@ class WebhookService:
         Returns:
             Dictionary with processing statistics
         """
-        created_count = 0
         skipped_count = 0
         no_user_count = 0
         no_reply_count = 0
 
+        # 1. Drop no-reply authors (single precompiled pattern)
+        candidates = []
         for commit in commits:
-            try:
-                # Skip no-reply emails
-                if WebhookService._is_no_reply_email(commit.author_email):
-                    logger.debug(
-                        "Skipping commit %s: no-reply email %s",
-                        commit.hash[:8],
-                        commit.author_email,
-                    )
-                    no_reply_count += 1
-                    continue
-
-                # Find user by email
-                user = WebhookService._find_user_by_email(db, commit.author_email)
+            email = (commit.author_email or "").strip().lower()
+            if WebhookService._is_no_reply_email(email):
+                logger.debug(
+                    "Skipping commit %s: no-reply email %s", commit.hash[:8], commit.author_email
+                )
+                no_reply_count += 1
+                continue
+            candidates.append((commit, email))
+
+        # 2. Resolve authors through the shared cache (one query for cache misses)
+        user_ids_by_email = AuthorResolver.resolve_user_ids(db, {email for _, email in candidates})
+
+        # 3. Detect duplicates for the whole batch in one query
+        existing_hashes = set()
+        candidate_hashes = list({commit.hash for commit, _ in candidates})
+        for start in range(0, len(candidate_hashes), INSERT_BATCH_SIZE):
+            chunk = candidate_hashes[start : start + INSERT_BATCH_SIZE]
+            existing_hashes.update(
+                row.commit_hash
+                for row in db.query(GitContribution.commit_hash).filter(
+                    GitContribution.project_id == project_id,
+                    GitContribution.commit_hash.in_(chunk),
+                )
+            )
 
-                if not user:
+        # 4. Build rows for new commits
+        rows = []
+        for commit, email in candidates:
+            try:
+                user_id = user_ids_by_email.get(email)
+                if user_id is None:
                     logger.debug(
                         "Skipping commit %s: no user found for email %s",
                         commit.hash[:8],
@@ -533,51 +590,25 @@ class WebhookService:
                     no_user_count += 1
                     continue
 
-                # Check for duplicate
-                existing = (
-                    db.query(GitContribution)
-                    .filter(
-                        GitContribution.project_id == project_id,
-                        GitContribution.commit_hash == commit.hash,
-                    )
-                    .first()
-                )
-
-                if existing:
+                if commit.hash in existing_hashes:
                     logger.debug("Skipping duplicate commit %s (already exists)", commit.hash[:8])
                     skipped_count += 1
                     continue
-
-                # Build commit URL if not provided
-                commit_url = commit.url
-                if not commit_url and repository_url:
-                    # Try to construct URL based on provider
-                    if provider == "github":
-                        commit_url = f"{repository_url}/commit/{commit.hash}"
-                    elif provider == "gitlab":
-                        commit_url = f"{repository_url}/-/commit/{commit.hash}"
-                    elif provider == "bitbucket":
-                        commit_url = f"{repository_url}/commits/{commit.hash}"
-
-                # Create contribution
-                contribution = GitContribution(
-                    user_id=user.id,
-                    project_id=project_id,
-                    commit_hash=commit.hash,
-                    branch=commit.branch,
-                    commit_message=commit.message,
-                    provider=provider,
-                    commit_url=commit_url,
-                    committed_at=commit.timestamp,
-                )
-
-                db.add(contribution)
-                created_count += 1
-                logger.info(
-                    "Created contribution for commit %s (user: %s, project: %d)",
-                    commit.hash[:8],
-                    user.email,
-                    project_id,
+                # Guard against the same commit appearing twice in one payload
+                existing_hashes.add(commit.hash)
+
+                rows.append(
+                    {
+                        "user_id": user_id,
+                        "project_id": project_id,
+                        "commit_hash": commit.hash,
+                        "branch": commit.branch,
+                        "commit_message": commit.message,
+                        "provider": provider,
+                        "commit_url": commit.url
+                        or WebhookService._build_commit_url(provider, repository_url, commit.hash),
+                        "committed_at": commit.timestamp,
+                    }
                 )
 
             except Exception as e:
@@ -590,16 +621,30 @@ class WebhookService:
                 # Continue processing other commits
                 continue
 
-        # Commit all changes
+        # 5. Insert and commit all changes
+        created_count = 0
         try:
+            if rows:
+                created_count = WebhookService._bulk_insert_contributions(db, rows)
+                # Rows lost to a concurrent insert of the same commit are duplicates too
+                skipped_count += len(rows) - created_count
+            if created_count:
+                ProjectRollupService.record_commits(
+                    db,
+                    project_id,
+                    created_count,
+                    datetime.now(timezone.utc),
+                    bulk_inserted=True,
+                )
             db.commit()
             logger.info(
                 "Webhook processing complete: %d created, %d skipped (duplicates), "
-                "%d skipped (no user), %d skipped (no-reply)",
+                "%d skipped (no user), %d skipped (no-reply); author cache %s",
                 created_count,
                 skipped_count,
                 no_user_count,
                 no_reply_count,
+                author_cache.stats(),
             )
         except Exception as e:
             db.rollback()
@@ -0,0 +1,279 @@
+"""
+Durable webhook delivery queue.
+
+Webhook handlers only verify the request and persist the raw body as a
+``WebhookDelivery`` row, then return 202. An in-process pool of worker threads
+drains the table through ``WebhookService.process_*_push`` with retry and
+exponential backoff. Deliveries are idempotent on (provider, delivery_id), so a
+provider redelivering the same event is acknowledged without being re-queued.
+"""
+
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.dbmodels import WebhookDelivery, WebhookDeliveryStatus
+from app.schemas.webhook import BitbucketPushPayload, GitHubPushPayload, GitLabPushPayload
+from app.services.webhook import WebhookService
+from app.utils.logger import get_logger
+from fastapi import HTTPException
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+logger = get_logger(__name__)
+
+# provider -> (payload schema, processing function)
+PROVIDER_HANDLERS: Dict[str, Tuple[Any, Callable[..., Dict[str, Any]]]] = {
+    "github": (GitHubPushPayload, WebhookService.process_github_push),
+    "gitlab": (GitLabPushPayload, WebhookService.process_gitlab_push),
+    "bitbucket": (BitbucketPushPayload, WebhookService.process_bitbucket_push),
+}
+
+
+class PermanentDeliveryError(Exception):
+    """Delivery can never succeed (bad payload, unmapped repository); do not retry."""
+
+
+class WebhookQueue:
+    @staticmethod
+    def enqueue(
+        db: Session, provider: str, delivery_id: str, event: Optional[str], body: bytes
+    ) -> Tuple[WebhookDelivery, bool]:
+        """
+        Persist a verified webhook delivery.
+
+        Returns:
+            (delivery, created) - created is False when the provider redelivered
+            an event that is already queued or processed
+        """
+        existing = WebhookQueue.get_by_delivery_id(db, provider, delivery_id)
+        if existing:
+            return existing, False
+
+        delivery = WebhookDelivery(
+            provider=provider,
+            delivery_id=delivery_id,
+            event=event,
+            body=body.decode("utf-8"),
+            status=WebhookDeliveryStatus.PENDING,
+            attempts=0,
+            next_attempt_at=datetime.now(timezone.utc),
+        )
+        db.add(delivery)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Concurrent redelivery of the same event won the insert
+            db.rollback()
+            return WebhookQueue.get_by_delivery_id(db, provider, delivery_id), False
+
+        db.refresh(delivery)
+        return delivery, True
+
+    @staticmethod
+    def get_by_delivery_id(
+        db: Session, provider: str, delivery_id: str
+    ) -> Optional[WebhookDelivery]:
+        return (
+            db.query(WebhookDelivery)
+            .filter(
+                WebhookDelivery.provider == provider, WebhookDelivery.delivery_id == delivery_id
+            )
+            .first()
+        )
+
+    @staticmethod
+    def claim_next(db: Session) -> Optional[WebhookDelivery]:
+        """
+        Claim the next due delivery and mark it as processing.
+
+        Uses SELECT ... FOR UPDATE SKIP LOCKED where supported so several workers
+        (or several app processes) never claim the same row. Deliveries stuck in
+        processing longer than the timeout (e.g. a crashed worker) are reclaimed.
+        """
+        now = datetime.now(timezone.utc)
+        stale_before = now - timedelta(seconds=settings.WEBHOOK_PROCESSING_TIMEOUT_SECONDS)
+
+        delivery = (
+            db.query(WebhookDelivery)
+            .filter(
+                or_(
+                    (WebhookDelivery.status == WebhookDeliveryStatus.PENDING)
+                    & (WebhookDelivery.next_attempt_at <= now),
+                    (WebhookDelivery.status == WebhookDeliveryStatus.PROCESSING)
+                    & (WebhookDelivery.locked_at < stale_before),
+                )
+            )
+            .order_by(WebhookDelivery.next_attempt_at, WebhookDelivery.id)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if not delivery:
+            db.rollback()
+            return None
+
+        delivery.status = WebhookDeliveryStatus.PROCESSING
+        delivery.locked_at = now
+        delivery.attempts = (delivery.attempts or 0) + 1
+        db.commit()
+        db.refresh(delivery)
+        return delivery
+
+    @staticmethod
+    def parse_payload(provider: str, body: Union[str, bytes]) -> Any:
+        """
+        Validate a raw body against the provider's push payload schema.
+
+        Raises:
+            PermanentDeliveryError: unknown provider or malformed payload
+        """
+        handler = PROVIDER_HANDLERS.get(provider)
+        if handler is None:
+            raise PermanentDeliveryError(f"Unknown provider: {provider}")
+        payload_schema, _ = handler
+
+        try:
+            return payload_schema(**json.loads(body))
+        except Exception as e:
+            raise PermanentDeliveryError(f"Invalid payload structure: {str(e)}") from e
+
+    @staticmethod
+    def _run(db: Session, delivery: WebhookDelivery) -> Dict[str, Any]:
+        """Parse the stored body and run the provider's push processing."""
+        payload = WebhookQueue.parse_payload(delivery.provider, delivery.body)
+        _, process_push = PROVIDER_HANDLERS[delivery.provider]
+
+        try:
+            return process_push(db, payload)
+        except HTTPException as e:
+            # 4xx from the service (e.g. repository not linked) will not fix itself
+            if e.status_code < 500:
+                raise PermanentDeliveryError(str(e.detail)) from e
+            raise
+
+    @staticmethod
+    def process(db: Session, delivery: WebhookDelivery) -> None:
+        """Process a claimed delivery and record the outcome (success, retry or failure)."""
+        try:
+            result = WebhookQueue._run(db, delivery)
+        except PermanentDeliveryError as e:
+            db.rollback()
+            logger.warning("Webhook delivery %s failed permanently: %s", delivery.delivery_id, e)
+            WebhookQueue._finish(db, delivery, WebhookDeliveryStatus.FAILED, error=str(e))
+            return
+        except Exception as e:
+            db.rollback()
+            if delivery.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                logger.error(
+                    "Webhook delivery %s failed after %d attempts: %s",
+                    delivery.delivery_id,
+                    delivery.attempts,
+                    e,
+                    exc_info=True,
+                )
+                WebhookQueue._finish(db, delivery, WebhookDeliveryStatus.FAILED, error=str(e))
+                return
+
+            delay = min(
+                settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (delivery.attempts - 1),
+                settings.WEBHOOK_RETRY_MAX_SECONDS,
+            )
+            logger.warning(
+                "Webhook delivery %s failed (attempt %d), retrying in %ds: %s",
+                delivery.delivery_id,
+                delivery.attempts,
+                delay,
+                e,
+            )
+            delivery.status = WebhookDeliveryStatus.PENDING
+            delivery.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            delivery.locked_at = None
+            delivery.last_error = str(e)
+            db.add(delivery)
+            db.commit()
+            return
+
+        logger.info("Webhook delivery %s processed: %s", delivery.delivery_id, result)
+        WebhookQueue._finish(db, delivery, WebhookDeliveryStatus.DONE, result=result)
+
+    @staticmethod
+    def _finish(
+        db: Session,
+        delivery: WebhookDelivery,
+        final_status: WebhookDeliveryStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        delivery.status = final_status
+        delivery.locked_at = None
+        delivery.result = result
+        delivery.last_error = error
+        db.add(delivery)
+        db.commit()
+
+
+class WebhookWorkerPool:
+    """Background threads that drain the webhook delivery queue."""
+
+    def __init__(self, num_workers: int, poll_interval: float):
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self._threads = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+
+    def start(self) -> None:
+        if self._threads or self.num_workers <= 0:
+            return
+        if SessionLocal is None:
+            logger.warning("Webhook workers not started: database is not configured")
+            return
+
+        self._stop.clear()
+        for i in range(self.num_workers):
+            thread = threading.Thread(
+                target=self._worker_loop, name=f"webhook-worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Started %d webhook worker(s)", self.num_workers)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        """Wake idle workers after a new delivery was queued."""
+        self._wakeup.set()
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            processed = False
+            db = SessionLocal()
+            try:
+                delivery = WebhookQueue.claim_next(db)
+                if delivery:
+                    WebhookQueue.process(db, delivery)
+                    processed = True
+            except Exception as e:
+                db.rollback()
+                logger.error("Webhook worker error: %s", e, exc_info=True)
+            finally:
+                db.close()
+
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+
+webhook_worker_pool = WebhookWorkerPool(
+    num_workers=settings.WEBHOOK_WORKERS,
+    poll_interval=settings.WEBHOOK_POLL_INTERVAL_SECONDS,
+)
@@ -1,8 +1,11 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Optional
 
-from app.dbmodels import LoggedHour, User, WorkSession, WorkSessionStatus
+from app.dbmodels import LoggedHour, Task, User, WorkSession, WorkSessionStatus
 from app.schemas.work_session import WorkSessionCreate, WorkSessionUpdate
+from app.services.project_rollup import ProjectRollupService
+from app.services.task_activity import TaskActivityService
+from app.utils.pagination import KeysetOrder, Page, PageParams, paginate_keyset
 from fastapi import HTTPException, status
 from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
@@ -135,6 +138,9 @@ def stop_session(db: Session, session_id: int, user: User) -> WorkSession:
     try:
         db.add(session)
         db.add(logged_hour)
+        ProjectRollupService.record_hours(db, session.project_id, hours, now)
+        if session.task_id:
+            TaskActivityService.record_logged_hour(db, db.get(Task, session.task_id), logged_hour)
         db.commit()
         db.refresh(session)
     except Exception as e:
@@ -147,13 +153,10 @@ def stop_session(db: Session, session_id: int, user: User) -> WorkSession:
     return session
 
 
-def list_sessions(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[WorkSession]:
-    """List session history for a user."""
-    return (
-        db.query(WorkSession)
-        .filter(WorkSession.user_id == user_id)
-        .order_by(WorkSession.started_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+SESSION_ORDER = KeysetOrder((WorkSession.started_at, WorkSession.id), descending=True)
+
+
+def list_sessions(db: Session, user_id: int, page: PageParams) -> Page:
+    """List a page of a user's session history, newest first."""
+    query = db.query(WorkSession).filter(WorkSession.user_id == user_id)
+    return paginate_keyset(query, SESSION_ORDER, page)
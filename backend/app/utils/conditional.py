@@ -0,0 +1,61 @@
+"""
+Conditional GET for polled aggregate endpoints.
+
+A route computes a cheap version of the data behind its response first (see
+``services.resource_version``) and calls ``not_modified_response``: when the
+client's ``If-None-Match`` matches, the route returns the 304 right away
+without running its aggregation; otherwise the ``ETag`` and ``Last-Modified``
+validators are set on the response and the route builds the body as usual.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(request: Request, version: str) -> str:
+    """Weak ETag of a data version, specific to the URL's path and query."""
+    key = f"{version}|{request.url.path}?{request.url.query}"
+    return f'W/"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of ``etag`` against the request's If-None-Match."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _http_date(value: datetime) -> str:
+    # Naive timestamps are stored in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def not_modified_response(
+    request: Request,
+    response: Response,
+    version: str,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """
+    Return a 304 response if the client already has this version, else set the
+    validators on ``response`` and return None.
+    """
+    etag = make_etag(request, version)
+    headers: Dict[str, str] = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -5,13 +5,23 @@ This module provides file handling functionality that is storage-agnostic,
 allowing for easy migration to S3 or other cloud storage in the future.
 """
 
+import hashlib
 import os
+import re
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Iterator, Optional
 
 from app.core.config import settings
 from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+RANGE_HEADER_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FileTooLargeError(Exception):
+    """Raised by streaming saves once more than the allowed number of bytes was read."""
 
 
 class StorageBackend:
@@ -66,6 +76,61 @@ class StorageBackend:
         """
         raise NotImplementedError
 
+    def save_stream(self, stream: BinaryIO, file_path: str, max_size: Optional[int] = None) -> int:
+        """
+        Save a file-like object to storage, reading it in chunks.
+
+        The default implementation buffers the content and calls save_file;
+        backends that can write incrementally should override it.
+
+        Args:
+            stream: Readable binary file-like object
+            file_path: The path where the file should be saved
+            max_size: Maximum number of bytes accepted (None for no limit)
+
+        Returns:
+            Number of bytes written
+
+        Raises:
+            FileTooLargeError if the stream exceeds max_size (nothing is saved)
+        """
+        content = bytearray()
+        for chunk in _read_chunks(stream, max_size):
+            content.extend(chunk)
+        self.save_file(bytes(content), file_path)
+        return len(content)
+
+    def open_stream(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Iterate over a file's content in chunks.
+
+        Args:
+            file_path: The path to the file
+            start: First byte offset to return
+            end: Last byte offset to return, inclusive (None for end of file)
+
+        Returns:
+            Iterator of byte chunks
+        """
+        content = self.get_file(file_path)
+        stop = len(content) if end is None else end + 1
+        for offset in range(start, stop, settings.UPLOAD_CHUNK_SIZE):
+            yield content[offset : min(offset + settings.UPLOAD_CHUNK_SIZE, stop)]
+
+    def get_file_size(self, file_path: str) -> int:
+        """
+        Get the size of a stored file in bytes.
+
+        Args:
+            file_path: The path to the file
+
+        Returns:
+            File size in bytes
+        """
+        return len(self.get_file(file_path))
+
 
 class LocalStorageBackend(StorageBackend):
     """Local filesystem storage backend"""
@@ -95,6 +160,56 @@ class LocalStorageBackend(StorageBackend):
             raise FileNotFoundError(f"File not found: {file_path}")
         return full_path.read_bytes()
 
+    def save_stream(self, stream: BinaryIO, file_path: str, max_size: Optional[int] = None) -> int:
+        """Write a stream to the local filesystem chunk by chunk"""
+        full_path = self._get_full_path(file_path)
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary name so a rejected or failed upload never leaves a partial file
+        tmp_path = full_path.with_name(f"{full_path.name}.part")
+        written = 0
+        try:
+            with open(tmp_path, "wb") as out:
+                for chunk in _read_chunks(stream, max_size):
+                    out.write(chunk)
+                    written += len(chunk)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return written
+
+    def open_stream(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Read a byte range from the local filesystem chunk by chunk"""
+        full_path = self._get_full_path(file_path)
+        if not full_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        return self._iter_file(full_path, start, end)
+
+    @staticmethod
+    def _iter_file(full_path: Path, start: int, end: Optional[int]) -> Iterator[bytes]:
+        with open(full_path, "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = settings.UPLOAD_CHUNK_SIZE
+                if remaining is not None:
+                    size = min(size, remaining)
+                chunk = f.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def get_file_size(self, file_path: str) -> int:
+        """Get file size from the local filesystem"""
+        full_path = self._get_full_path(file_path)
+        if not full_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        return full_path.stat().st_size
+
     def delete_file(self, file_path: str) -> bool:
         """Delete file from local filesystem"""
         try:
@@ -114,6 +229,96 @@ class LocalStorageBackend(StorageBackend):
             return False
 
 
+class ContentAddressedStorage(LocalStorageBackend):
+    """
+    Local storage that keeps attachment content once per SHA-256 digest.
+
+    Uploads are hashed while they are streamed to a staging file, then moved to
+    blobs/<aa>/<bb>/<digest> unless that blob already exists. Reference counting
+    lives in the attachment_blobs table (see app.services.attachment_blob).
+    Explicit-path methods (save_file, get_file, ...) behave like
+    LocalStorageBackend, so other callers such as invoice PDFs are unaffected.
+    """
+
+    BLOB_DIR = "blobs"
+    STAGING_DIR = "staging"
+
+    def blob_path(self, digest: str) -> str:
+        """Storage path of the blob for a digest."""
+        return f"{self.BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+    def stage_stream(
+        self, stream: BinaryIO, max_size: Optional[int] = None
+    ) -> tuple[str, str, int]:
+        """
+        Write a stream to a staging file while hashing it.
+
+        Returns:
+            Tuple of (staging_path, sha256_hex_digest, size_in_bytes)
+
+        Raises:
+            FileTooLargeError if the stream exceeds max_size (nothing is kept)
+        """
+        staging_path = f"{self.STAGING_DIR}/{uuid.uuid4()}"
+        full_path = self._get_full_path(staging_path)
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(full_path, "wb") as out:
+                for chunk in _read_chunks(stream, max_size):
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            full_path.unlink(missing_ok=True)
+            raise
+        return staging_path, digest.hexdigest(), size
+
+    def stage_file(self, file_path: str) -> tuple[str, str, int]:
+        """Stage an existing stored file (used to migrate legacy uploads into blobs)."""
+        full_path = self._get_full_path(file_path)
+        if not full_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        with open(full_path, "rb") as f:
+            return self.stage_stream(f)
+
+    def promote_staged(self, staging_path: str, digest: str) -> str:
+        """
+        Move a staged file to its blob path, or drop it if the blob already exists.
+
+        Returns:
+            The blob's storage path
+        """
+        blob_path = self.blob_path(digest)
+        full_blob_path = self._get_full_path(blob_path)
+        full_staging_path = self._get_full_path(staging_path)
+        if full_blob_path.exists():
+            full_staging_path.unlink(missing_ok=True)
+        else:
+            full_blob_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(full_staging_path, full_blob_path)
+        return blob_path
+
+    def discard_staged(self, staging_path: str) -> None:
+        """Remove a staged file that was not promoted (no-op if already moved)."""
+        self._get_full_path(staging_path).unlink(missing_ok=True)
+
+
+def _read_chunks(stream: BinaryIO, max_size: Optional[int]) -> Iterator[bytes]:
+    """Read a stream in UPLOAD_CHUNK_SIZE chunks, enforcing max_size as bytes arrive."""
+    total = 0
+    while True:
+        chunk = stream.read(settings.UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return
+        total += len(chunk)
+        if max_size is not None and total > max_size:
+            raise FileTooLargeError(f"File exceeds {max_size} bytes")
+        yield chunk
+
+
 # Initialize default storage backend (local filesystem)
 _storage_backend: Optional[StorageBackend] = None
 
@@ -122,7 +327,10 @@ def get_storage_backend() -> StorageBackend:
     """Get the current storage backend instance"""
     global _storage_backend
     if _storage_backend is None:
-        _storage_backend = LocalStorageBackend(settings.UPLOAD_DIR)
+        if settings.ATTACHMENT_DEDUP_ENABLED:
+            _storage_backend = ContentAddressedStorage(settings.UPLOAD_DIR)
+        else:
+            _storage_backend = LocalStorageBackend(settings.UPLOAD_DIR)
     return _storage_backend
 
 
@@ -193,11 +401,15 @@ def validate_file_size(file_size: int) -> None:
         HTTPException if file size exceeds limit
     """
     if file_size > settings.MAX_UPLOAD_SIZE:
-        max_size_mb = settings.MAX_UPLOAD_SIZE / (1024 * 1024)
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds maximum allowed size of {max_size_mb}MB",
-        )
+        _raise_file_too_large()
+
+
+def _raise_file_too_large() -> None:
+    max_size_mb = settings.MAX_UPLOAD_SIZE / (1024 * 1024)
+    raise HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File size exceeds maximum allowed size of {max_size_mb}MB",
+    )
 
 
 def validate_mime_type(mime_type: str) -> None:
@@ -235,12 +447,9 @@ async def save_uploaded_file(
     Raises:
         HTTPException if validation fails
     """
-    # Read file content
-    content = await upload_file.read()
-    file_size = len(content)
-
-    # Validate file size
-    validate_file_size(file_size)
+    # Reject early when the client declared the size; otherwise it is enforced while streaming
+    if upload_file.size is not None:
+        validate_file_size(upload_file.size)
 
     # Get MIME type
     mime_type = upload_file.content_type or "application/octet-stream"
@@ -255,13 +464,55 @@ async def save_uploaded_file(
     # Create storage path: task_{task_id}/user_{user_id}/{filename}
     file_path = f"task_{task_id}/user_{user_id}/{filename}"
 
-    # Save file using storage backend
+    # Stream to the storage backend in chunks, off the event loop
     storage = get_storage_backend()
-    storage.save_file(content, file_path)
+    try:
+        file_size = await run_in_threadpool(
+            storage.save_stream, upload_file.file, file_path, settings.MAX_UPLOAD_SIZE
+        )
+    except FileTooLargeError:
+        _raise_file_too_large()
 
     return filename, file_path, file_size, mime_type
 
 
+async def stage_uploaded_file(
+    upload_file: UploadFile, storage: ContentAddressedStorage
+) -> tuple[str, str, int, str, str]:
+    """
+    Validate an upload and stream it into the content-addressed staging area.
+
+    The caller promotes the staged file to its blob (or discards it) once the
+    blob reference is recorded; see app.services.attachment_blob.
+
+    Args:
+        upload_file: FastAPI UploadFile object
+        storage: Content-addressed storage backend
+
+    Returns:
+        Tuple of (filename, staging_path, file_size, mime_type, content_hash)
+
+    Raises:
+        HTTPException if validation fails
+    """
+    if upload_file.size is not None:
+        validate_file_size(upload_file.size)
+
+    mime_type = upload_file.content_type or "application/octet-stream"
+    validate_mime_type(mime_type)
+
+    filename = generate_unique_filename(upload_file.filename or "unnamed_file")
+
+    try:
+        staging_path, content_hash, file_size = await run_in_threadpool(
+            storage.stage_stream, upload_file.file, settings.MAX_UPLOAD_SIZE
+        )
+    except FileTooLargeError:
+        _raise_file_too_large()
+
+    return filename, staging_path, file_size, mime_type, content_hash
+
+
 def get_file_content(file_path: str) -> bytes:
     """
     Retrieve file content from storage.
@@ -279,6 +530,88 @@ def get_file_content(file_path: str) -> bytes:
     return storage.get_file(file_path)
 
 
+def parse_range_header(range_header: Optional[str], file_size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header.
+
+    Args:
+        range_header: Value of the Range header (e.g. "bytes=0-1023")
+        file_size: Size of the file in bytes
+
+    Returns:
+        (start, end) inclusive byte offsets, or None to serve the whole file
+        (no header, or a form we do not support such as multiple ranges)
+
+    Raises:
+        HTTPException 416 if the range cannot be satisfied
+    """
+    if not range_header:
+        return None
+    match = RANGE_HEADER_RE.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), file_size - 1) if last else file_size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(file_size - int(last), 0)
+        end = file_size - 1
+
+    if start > end or start >= file_size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"},
+        )
+    return start, end
+
+
+def stream_file_response(
+    file_path: str, filename: str, mime_type: str, range_header: Optional[str] = None
+) -> StreamingResponse:
+    """
+    Build a chunked download response for a stored file, honouring HTTP Range.
+
+    Args:
+        file_path: The storage path of the file
+        filename: Filename for the Content-Disposition header
+        mime_type: Content type of the file
+        range_header: Value of the request's Range header, if any
+
+    Returns:
+        200 response with the whole file, or 206 with the requested range
+
+    Raises:
+        FileNotFoundError if file doesn't exist
+    """
+    storage = get_storage_backend()
+    file_size = storage.get_file_size(file_path)
+    byte_range = parse_range_header(range_header, file_size)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Accept-Ranges": "bytes",
+    }
+    if byte_range is None:
+        headers["Content-Length"] = str(file_size)
+        return StreamingResponse(
+            storage.open_stream(file_path), media_type=mime_type, headers=headers
+        )
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        storage.open_stream(file_path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=mime_type,
+        headers=headers,
+    )
+
+
 def delete_file(file_path: str) -> bool:
     """
     Delete a file from storage.
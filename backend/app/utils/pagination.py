@@ -0,0 +1,252 @@
+"""
+Pagination computed by the database.
+
+``paginate`` fetches an offset page together with the total number of matching
+rows in a single query, using a ``COUNT(*) OVER ()`` window column.
+
+``paginate_keyset`` pages by the sort key instead of an offset: each page
+returns opaque next/prev cursors holding the sort key of its last/first row,
+and the next page is ``WHERE (sort key) < (cursor)`` on an index, so deep pages
+cost the same as the first one. Offsets are still accepted as a deprecated
+fallback. Routes take ``PageParams`` through ``Depends(page_params)`` and expose
+totals and cursors in response headers, so list bodies keep their shape.
+``paginate_keyset_async`` does the same for a ``select()`` on an AsyncSession.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Select, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query as ORMQuery
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+
+
+def paginate(query: ORMQuery, skip: int, limit: int) -> Tuple[List, int]:
+    """
+    Apply offset/limit to an ordered query and count all matching rows.
+
+    Returns:
+        (page items, total matching rows); the items of a query of several
+        columns are its rows, with an extra ``total_count`` column
+    """
+    rows = query.add_columns(func.count().over().label("total_count")).offset(skip).limit(limit)
+    rows = rows.all()
+    if rows:
+        items = [row[0] for row in rows] if len(query.column_descriptions) == 1 else rows
+        return items, rows[0][-1]
+    # An empty page past the end carries no window value; count separately
+    total = query.order_by(None).count() if skip else 0
+    return [], total
+
+
+def set_total_count(response: Response, total: int) -> None:
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+
+
+@dataclass
+class PageParams:
+    """Pagination query parameters of a list endpoint."""
+
+    limit: int = 100
+    cursor: Optional[str] = None
+    skip: Optional[int] = None
+    include_total: bool = False
+
+
+def page_params(
+    cursor: Optional[str] = Query(
+        None, description="Cursor from the X-Next-Cursor/X-Prev-Cursor header of a previous page"
+    ),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    include_total: bool = Query(
+        False, description="Also count all matches (X-Total-Count); always on with skip"
+    ),
+    skip: Optional[int] = Query(
+        None, ge=0, deprecated=True, description="Offset pagination; use cursor instead"
+    ),
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor, skip=skip, include_total=include_total)
+
+
+@dataclass
+class Page:
+    """A page of results with its total (if counted) and neighbour cursors."""
+
+    items: List = field(default_factory=list)
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    offset: bool = False  # Served through the deprecated offset fallback
+
+
+def set_page_headers(response: Response, page: Page) -> None:
+    if page.total is not None:
+        set_total_count(response, page.total)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.prev_cursor:
+        response.headers[PREV_CURSOR_HEADER] = page.prev_cursor
+    if page.offset:
+        response.headers["Deprecation"] = "true"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    values: Tuple
+    backwards: bool = False  # Points at the page before `values`
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("Unknown cursor value")
+    return value
+
+
+def encode_cursor(values: Tuple, backwards: bool = False) -> str:
+    payload = {"v": [_encode_value(value) for value in values]}
+    if backwards:
+        payload["b"] = True
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """Decode a cursor from a request; 400 if it is malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = tuple(_decode_value(value) for value in payload["v"])
+        return Cursor(values=values, backwards=bool(payload.get("b")))
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+
+
+@dataclass(frozen=True)
+class KeysetOrder:
+    """
+    Sort order of a keyset-paginated list. All columns sort in the same
+    direction and the last one must be unique (normally the primary key).
+    Rows with NULL sort keys are never reached through cursors.
+    """
+
+    columns: Tuple
+    descending: bool = False
+
+    def order_by(self, query, backwards: bool = False):
+        descending = self.descending != backwards
+        return query.order_by(*(c.desc() if descending else c.asc() for c in self.columns))
+
+    def values(self, item) -> Tuple:
+        return tuple(getattr(item, column.key) for column in self.columns)
+
+    def seek(self, query, cursor: Cursor):
+        """Restrict a query to the rows after the cursor, in the cursor's direction."""
+        if len(cursor.values) != len(self.columns):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        key = tuple_(*self.columns)
+        bound = tuple_(*(literal(v, c.type) for c, v in zip(self.columns, cursor.values)))
+        descending = self.descending != cursor.backwards
+        return query.filter(key < bound if descending else key > bound)
+
+
+def paginate_keyset(query: ORMQuery, order: KeysetOrder, page: PageParams) -> Page:
+    """
+    Fetch one page of an unordered query in ``order``.
+
+    With ``page.skip`` (and no cursor) this falls back to offset pagination
+    with a total count; the page still carries a next cursor so clients can
+    switch over.
+    """
+    if page.skip is not None and not page.cursor:
+        items, total = paginate(order.order_by(query), page.skip, page.limit)
+        has_next = page.skip + len(items) < total
+        next_cursor = encode_cursor(order.values(items[-1])) if items and has_next else None
+        return Page(items=items, total=total, next_cursor=next_cursor, offset=True)
+
+    cursor = decode_cursor(page.cursor)
+    seeked = order.seek(query, cursor) if cursor else query
+    backwards = cursor is not None and cursor.backwards
+    rows = order.order_by(seeked, backwards=backwards).limit(page.limit + 1).all()
+
+    result = _keyset_page(rows, order, page, cursor)
+    if page.include_total:
+        result.total = query.order_by(None).count()
+    return result
+
+
+async def paginate_keyset_async(
+    db: AsyncSession, stmt: Select, order: KeysetOrder, page: PageParams
+) -> Page:
+    """``paginate_keyset`` for an unordered single-entity ``select()``, run on an AsyncSession."""
+    if page.skip is not None and not page.cursor:
+        counted = order.order_by(stmt).add_columns(func.count().over().label("total_count"))
+        rows = (await db.execute(counted.offset(page.skip).limit(page.limit))).all()
+        items = [row[0] for row in rows]
+        if rows:
+            total = rows[0][-1]
+        else:
+            # An empty page past the end carries no window value; count separately
+            total = await _count_async(db, stmt) if page.skip else 0
+        has_next = page.skip + len(items) < total
+        next_cursor = encode_cursor(order.values(items[-1])) if items and has_next else None
+        return Page(items=items, total=total, next_cursor=next_cursor, offset=True)
+
+    cursor = decode_cursor(page.cursor)
+    seeked = order.seek(stmt, cursor) if cursor else stmt
+    backwards = cursor is not None and cursor.backwards
+    ordered = order.order_by(seeked, backwards=backwards).limit(page.limit + 1)
+    rows = list(await db.scalars(ordered))
+
+    result = _keyset_page(rows, order, page, cursor)
+    if page.include_total:
+        result.total = await _count_async(db, stmt)
+    return result
+
+
+async def _count_async(db: AsyncSession, stmt: Select) -> int:
+    return await db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+
+
+def _keyset_page(
+    rows: List, order: KeysetOrder, page: PageParams, cursor: Optional[Cursor]
+) -> Page:
+    """Build a page from up to ``page.limit + 1`` rows fetched past ``cursor``."""
+    backwards = cursor is not None and cursor.backwards
+    # One extra row tells whether there is a page beyond this one
+    has_more = len(rows) > page.limit
+    items = rows[: page.limit]
+    if backwards:
+        items.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, cursor is not None
+
+    result = Page(items=items)
+    if items and has_next:
+        result.next_cursor = encode_cursor(order.values(items[-1]))
+    if items and has_prev:
+        result.prev_cursor = encode_cursor(order.values(items[0]), backwards=True)
+    return result
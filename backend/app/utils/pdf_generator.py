@@ -448,7 +448,12 @@ def generate_invoice_pdf(
         raise RuntimeError("Neither WeasyPrint nor ReportLab is available for PDF generation")
 
 
-def save_invoice_pdf(invoice: Invoice, project: Project, client: Optional[Client] = None) -> str:
+def save_invoice_pdf(
+    invoice: Invoice,
+    project: Project,
+    client: Optional[Client] = None,
+    version: Optional[str] = None,
+) -> str:
     """
     Generate and save invoice PDF to storage.
 
@@ -456,6 +461,7 @@ def save_invoice_pdf(invoice: Invoice, project: Project, client: Optional[Client
         invoice: Invoice object with items loaded
         project: Project object
         client: Optional Client object
+        version: Optional suffix (e.g. snapshot hash) so renders never overwrite each other
 
     Returns:
         Storage path of the saved PDF
@@ -466,8 +472,9 @@ def save_invoice_pdf(invoice: Invoice, project: Project, client: Optional[Client
     # Generate PDF
     pdf_bytes = generate_invoice_pdf(invoice, project, client)
 
-    # Create storage path: invoices/invoice_{invoice_id}/{invoice_number}.pdf
-    file_path = f"invoices/invoice_{invoice.id}/{invoice.invoice_number}.pdf"
+    # Create storage path: invoices/invoice_{invoice_id}/{invoice_number}[-{version}].pdf
+    file_name = invoice.invoice_number if not version else f"{invoice.invoice_number}-{version}"
+    file_path = f"invoices/invoice_{invoice.id}/{file_name}.pdf"
 
     # Save using storage backend
     storage = get_storage_backend()
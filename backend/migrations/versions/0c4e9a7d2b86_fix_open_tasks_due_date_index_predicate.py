@@ -0,0 +1,48 @@
+"""Fix open tasks due date index predicate
+
+Revision ID: 0c4e9a7d2b86
+Revises: f2b6d8a4c715
+Create Date: 2026-10-17 00:12:45.208371
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0c4e9a7d2b86"
+down_revision: Union[str, Sequence[str], None] = "f2b6d8a4c715"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "ix_tasks_open_due_date"
+# d4b7e2a9c613 excluded "completed", which is not a task status; finished tasks are "done"
+OPEN_TASKS_WITH_DUE_DATE = sa.text("status != 'done' AND due_date IS NOT NULL")
+PREVIOUS_PREDICATE = sa.text("status != 'completed' AND due_date IS NOT NULL")
+
+
+def _replace_index(where) -> None:
+    # See d4b7e2a9c613: CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.drop_index(INDEX, table_name="tasks", postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            INDEX,
+            "tasks",
+            ["project_id", "due_date"],
+            unique=False,
+            postgresql_where=where,
+            sqlite_where=where,
+            postgresql_concurrently=True,
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_index(OPEN_TASKS_WITH_DUE_DATE)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_index(PREVIOUS_PREDICATE)
@@ -0,0 +1,83 @@
+"""Add project_rollups table
+
+Revision ID: 3b7e1c9a2f40
+Revises: 44eede3a242f
+Create Date: 2026-10-16 09:12:41.503118
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7e1c9a2f40"
+down_revision: Union[str, Sequence[str], None] = "44eede3a242f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "project_rollups",
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("total_hours", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("total_tasks", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("todo_tasks", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("in_progress_tasks", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("done_tasks", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("commit_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_activity_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ["project_id"], ["projects.id"], onupdate="CASCADE", ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("project_id"),
+    )
+
+    # Backfill rollups for existing projects from the source tables
+    op.execute("""
+        INSERT INTO project_rollups (
+            project_id, total_hours, total_tasks, todo_tasks, in_progress_tasks,
+            done_tasks, commit_count, last_activity_at
+        )
+        SELECT
+            p.id,
+            COALESCE(h.total_hours, 0),
+            COALESCE(t.total_tasks, 0),
+            COALESCE(t.todo_tasks, 0),
+            COALESCE(t.in_progress_tasks, 0),
+            COALESCE(t.done_tasks, 0),
+            COALESCE(g.commit_count, 0),
+            GREATEST(h.last_logged_at, t.last_task_at, g.last_commit_at)
+        FROM projects p
+        LEFT JOIN (
+            SELECT project_id, SUM(hours) AS total_hours, MAX(logged_at) AS last_logged_at
+            FROM logged_hours GROUP BY project_id
+        ) h ON h.project_id = p.id
+        LEFT JOIN (
+            SELECT project_id,
+                   COUNT(*) AS total_tasks,
+                   SUM(CASE WHEN status = 'todo' THEN 1 ELSE 0 END) AS todo_tasks,
+                   SUM(CASE WHEN status = 'in_progress' THEN 1 ELSE 0 END) AS in_progress_tasks,
+                   SUM(CASE WHEN status = 'done' THEN 1 ELSE 0 END) AS done_tasks,
+                   MAX(updated_at) AS last_task_at
+            FROM tasks GROUP BY project_id
+        ) t ON t.project_id = p.id
+        LEFT JOIN (
+            SELECT project_id, COUNT(*) AS commit_count, MAX(created_at) AS last_commit_at
+            FROM git_contributions GROUP BY project_id
+        ) g ON g.project_id = p.id
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("project_rollups")
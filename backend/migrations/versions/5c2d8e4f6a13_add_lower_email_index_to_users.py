@@ -0,0 +1,28 @@
+"""Add lower(email) index to users
+
+Revision ID: 5c2d8e4f6a13
+Revises: 3b7e1c9a2f40
+Create Date: 2026-10-16 11:03:27.418902
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c2d8e4f6a13"
+down_revision: Union[str, Sequence[str], None] = "3b7e1c9a2f40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_users_email_lower", "users", [sa.text("lower(email)")], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_users_email_lower", table_name="users")
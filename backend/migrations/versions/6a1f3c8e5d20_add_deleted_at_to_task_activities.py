@@ -0,0 +1,57 @@
+"""Add deleted_at to task activities
+
+Revision ID: 6a1f3c8e5d20
+Revises: 0c4e9a7d2b86
+Create Date: 2026-10-17 00:40:03.572914
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6a1f3c8e5d20"
+down_revision: Union[str, Sequence[str], None] = "0c4e9a7d2b86"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Log types that snapshot another row, with the table holding it (hours below)
+SOURCE_TABLES = {
+    "comment_added": "task_comments",
+    "attachment_uploaded": "task_attachments",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "task_activities", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+    # Hide the activities of rows deleted before this revision
+    for activity_type, table in SOURCE_TABLES.items():
+        op.execute(f"""
+            UPDATE task_activities SET deleted_at = CURRENT_TIMESTAMP
+            WHERE activity_type = '{activity_type}'
+              AND NOT EXISTS (
+                  SELECT 1 FROM {table} WHERE {table}.id = task_activities.source_id
+              )
+            """)
+    # Hours deleted, or since moved to another task (or none)
+    op.execute("""
+        UPDATE task_activities SET deleted_at = CURRENT_TIMESTAMP
+        WHERE activity_type = 'hours_logged'
+          AND deleted_at IS NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM logged_hours
+              WHERE logged_hours.id = task_activities.source_id
+                AND logged_hours.task_id = task_activities.task_id
+          )
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("task_activities", "deleted_at")
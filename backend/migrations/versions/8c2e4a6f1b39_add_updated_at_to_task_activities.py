@@ -0,0 +1,31 @@
+"""Add updated_at to task activities
+
+Revision ID: 8c2e4a6f1b39
+Revises: 6a1f3c8e5d20
+Create Date: 2026-10-17 01:24:47.208315
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c2e4a6f1b39"
+down_revision: Union[str, Sequence[str], None] = "6a1f3c8e5d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "task_activities", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.execute("UPDATE task_activities SET updated_at = deleted_at WHERE deleted_at IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("task_activities", "updated_at")
@@ -0,0 +1,51 @@
+"""Add attachment_blobs table and task_attachments.content_hash
+
+Revision ID: 9d4e6b1f3a27
+Revises: 7a9f3d2b8c51
+Create Date: 2026-10-16 13:41:09.552817
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4e6b1f3a27"
+down_revision: Union[str, Sequence[str], None] = "7a9f3d2b8c51"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "attachment_blobs",
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("content_hash"),
+    )
+    op.add_column(
+        "task_attachments", sa.Column("content_hash", sa.String(length=64), nullable=True)
+    )
+    op.create_index(
+        op.f("ix_task_attachments_content_hash"),
+        "task_attachments",
+        ["content_hash"],
+        unique=False,
+    )
+    # Existing files keep their per-upload paths until
+    # scripts/migrate_attachments_to_blobs.py moves them into the blob store
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_task_attachments_content_hash"), table_name="task_attachments")
+    op.drop_column("task_attachments", "content_hash")
+    op.drop_table("attachment_blobs")
@@ -0,0 +1,54 @@
+"""Add milestone task counters
+
+Revision ID: a5d2c8e4f913
+Revises: e8c3f1a7b254
+Create Date: 2026-10-16 23:41:27.904415
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a5d2c8e4f913"
+down_revision: Union[str, Sequence[str], None] = "e8c3f1a7b254"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTER_COLUMNS = ("total_tasks", "todo_tasks", "in_progress_tasks", "done_tasks")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in COUNTER_COLUMNS:
+        op.add_column(
+            "milestones", sa.Column(column, sa.Integer(), nullable=False, server_default="0")
+        )
+
+    # Backfill the counters of existing milestones from their tasks
+    op.execute("""
+        UPDATE milestones SET
+            total_tasks = (
+                SELECT COUNT(*) FROM tasks WHERE tasks.milestone_id = milestones.id
+            ),
+            todo_tasks = (
+                SELECT COUNT(*) FROM tasks
+                WHERE tasks.milestone_id = milestones.id AND tasks.status = 'todo'
+            ),
+            in_progress_tasks = (
+                SELECT COUNT(*) FROM tasks
+                WHERE tasks.milestone_id = milestones.id AND tasks.status = 'in_progress'
+            ),
+            done_tasks = (
+                SELECT COUNT(*) FROM tasks
+                WHERE tasks.milestone_id = milestones.id AND tasks.status = 'done'
+            )
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in reversed(COUNTER_COLUMNS):
+        op.drop_column("milestones", column)
@@ -0,0 +1,29 @@
+"""Add pdf_hash to invoices
+
+Revision ID: b2f8c4d6e913
+Revises: 9d4e6b1f3a27
+Create Date: 2026-10-16 14:22:51.306144
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b2f8c4d6e913"
+down_revision: Union[str, Sequence[str], None] = "9d4e6b1f3a27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing PDFs have no hash and are re-rendered once on their next download
+    op.add_column("invoices", sa.Column("pdf_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("invoices", "pdf_hash")
@@ -0,0 +1,51 @@
+"""Add invoice_number_sequences table
+
+Revision ID: c7a1e5f92d48
+Revises: b2f8c4d6e913
+Create Date: 2026-10-16 15:08:14.771230
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7a1e5f92d48"
+down_revision: Union[str, Sequence[str], None] = "b2f8c4d6e913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    sequences = op.create_table(
+        "invoice_number_sequences",
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("last_number", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("year"),
+    )
+
+    # Seed each year with the highest number already issued (INV-YYYY-NNN)
+    last_numbers = {}
+    for (invoice_number,) in op.get_bind().execute(sa.text("SELECT invoice_number FROM invoices")):
+        parts = (invoice_number or "").split("-")
+        if len(parts) != 3 or parts[0] != "INV":
+            continue
+        try:
+            year, number = int(parts[1]), int(parts[2])
+        except ValueError:
+            continue
+        last_numbers[year] = max(number, last_numbers.get(year, 0))
+
+    if last_numbers:
+        op.bulk_insert(
+            sequences,
+            [{"year": year, "last_number": number} for year, number in last_numbers.items()],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("invoice_number_sequences")
@@ -0,0 +1,63 @@
+"""Add composite and partial indexes for hot filters
+
+Revision ID: d4b7e2a9c613
+Revises: c7a1e5f92d48
+Create Date: 2026-10-16 21:02:41.530917
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4b7e2a9c613"
+down_revision: Union[str, Sequence[str], None] = "c7a1e5f92d48"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_TASKS_WITH_DUE_DATE = sa.text("status != 'completed' AND due_date IS NOT NULL")
+OPEN_WORK_SESSIONS = sa.text("status IN ('ACTIVE', 'PAUSED')")
+
+# name -> (table, columns, partial index predicate)
+INDEXES = {
+    "ix_logged_hours_project_logged_at": ("logged_hours", ["project_id", "logged_at", "id"], None),
+    "ix_logged_hours_user_logged_at": ("logged_hours", ["user_id", "logged_at", "id"], None),
+    "ix_tasks_project_status": ("tasks", ["project_id", "status"], None),
+    "ix_tasks_project_assigned_to": ("tasks", ["project_id", "assigned_to"], None),
+    "ix_tasks_open_due_date": ("tasks", ["project_id", "due_date"], OPEN_TASKS_WITH_DUE_DATE),
+    "ix_git_contributions_project_created_at": (
+        "git_contributions",
+        ["project_id", "created_at", "id"],
+        None,
+    ),
+    "ix_work_sessions_user_started_at": ("work_sessions", ["user_id", "started_at", "id"], None),
+    "ix_work_sessions_user_open": ("work_sessions", ["user_id"], OPEN_WORK_SESSIONS),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps these tables writable while the indexes build on
+    # PostgreSQL; it cannot run inside a transaction. A failed build leaves an
+    # INVALID index behind: drop it before running the upgrade again.
+    with op.get_context().autocommit_block():
+        for name, (table, columns, where) in INDEXES.items():
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=where,
+                sqlite_where=where,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, (table, _columns, _where) in reversed(INDEXES.items()):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
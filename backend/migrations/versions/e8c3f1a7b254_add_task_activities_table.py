@@ -0,0 +1,227 @@
+"""Add task_activities table
+
+Revision ID: e8c3f1a7b254
+Revises: d4b7e2a9c613
+Create Date: 2026-10-16 22:14:06.318402
+
+"""
+
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8c3f1a7b254"
+down_revision: Union[str, Sequence[str], None] = "d4b7e2a9c613"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 2000
+
+task_activities = sa.table(
+    "task_activities",
+    sa.column("task_id", sa.Integer),
+    sa.column("project_id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("activity_type", sa.String),
+    sa.column("source_id", sa.Integer),
+    sa.column("data", sa.JSON),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+)
+tasks = sa.table(
+    "tasks",
+    sa.column("id", sa.Integer),
+    sa.column("project_id", sa.Integer),
+    sa.column("title", sa.String),
+    sa.column("description", sa.Text),
+    sa.column("status", sa.String),
+    sa.column("assigned_to", sa.Integer),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+)
+task_comments = sa.table(
+    "task_comments",
+    sa.column("id", sa.Integer),
+    sa.column("task_id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("content", sa.Text),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+)
+task_attachments = sa.table(
+    "task_attachments",
+    sa.column("id", sa.Integer),
+    sa.column("task_id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("original_filename", sa.String),
+    sa.column("file_size", sa.Integer),
+    sa.column("mime_type", sa.String),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+)
+logged_hours = sa.table(
+    "logged_hours",
+    sa.column("id", sa.Integer),
+    sa.column("task_id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("hours", sa.Float),
+    sa.column("note", sa.Text),
+    sa.column("logged_at", sa.DateTime(timezone=True)),
+)
+git_contributions = sa.table(
+    "git_contributions",
+    sa.column("id", sa.Integer),
+    sa.column("task_id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("commit_hash", sa.String),
+    sa.column("commit_message", sa.Text),
+    sa.column("branch", sa.String),
+    sa.column("provider", sa.String),
+    sa.column("commit_url", sa.String),
+    sa.column("committed_at", sa.DateTime(timezone=True)),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+)
+
+
+# Builders of an activity's (timestamp, data) from its source row
+def _task_created(row):
+    return row.created_at, {
+        "task_id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "status": row.status,
+        "assigned_to": row.assigned_to,
+    }
+
+
+def _comment_added(row):
+    return row.created_at, {"comment_id": row.id, "content": row.content}
+
+
+def _attachment_uploaded(row):
+    return row.created_at, {
+        "attachment_id": row.id,
+        "filename": row.original_filename,
+        "file_size": row.file_size,
+        "mime_type": row.mime_type,
+    }
+
+
+def _hours_logged(row):
+    return row.logged_at, {
+        "logged_hour_id": row.id,
+        "hours": float(row.hours),
+        "description": row.note,
+        "date": row.logged_at.isoformat() if row.logged_at else None,
+    }
+
+
+def _commit_linked(row):
+    return row.committed_at or row.created_at, {
+        "commit_id": row.id,
+        "commit_hash": row.commit_hash,
+        "commit_message": row.commit_message,
+        "branch": row.branch,
+        "provider": row.provider,
+        "commit_url": row.commit_url,
+    }
+
+
+def _backfill(bind) -> None:
+    """
+    Seed the log with the history that can be recovered from the source tables.
+
+    Tasks get a task_created activity with their current fields; earlier status
+    and assignment changes were never stored, so history starts there.
+    """
+    sources = [
+        (
+            "task_created",
+            sa.select(
+                tasks.c.id,
+                tasks.c.project_id,
+                tasks.c.title,
+                tasks.c.description,
+                tasks.c.status,
+                tasks.c.assigned_to,
+                tasks.c.created_at,
+                sa.null().label("user_id"),
+                tasks.c.id.label("task_id"),
+            ),
+            _task_created,
+        ),
+    ]
+    for activity_type, source, build in [
+        ("comment_added", task_comments, _comment_added),
+        ("attachment_uploaded", task_attachments, _attachment_uploaded),
+        ("hours_logged", logged_hours, _hours_logged),
+        ("commit_linked", git_contributions, _commit_linked),
+    ]:
+        query = sa.select(source, tasks.c.project_id).join(tasks, tasks.c.id == source.c.task_id)
+        sources.append((activity_type, query, build))
+
+    now = datetime.now(timezone.utc)
+    for activity_type, query, build in sources:
+        result = bind.execution_options(yield_per=BATCH_SIZE).execute(query)
+        for rows in result.partitions():
+            values = []
+            for row in rows:
+                created_at, data = build(row)
+                values.append(
+                    {
+                        "task_id": row.task_id,
+                        "project_id": row.project_id,
+                        "user_id": row.user_id,
+                        "activity_type": activity_type,
+                        "source_id": row.id,
+                        "data": data,
+                        "created_at": created_at or now,
+                    }
+                )
+            bind.execute(sa.insert(task_activities), values)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "task_activities",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("activity_type", sa.String(length=32), nullable=False),
+        sa.Column("source_id", sa.Integer(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["task_id"], ["tasks.id"], onupdate="CASCADE", ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["project_id"], ["projects.id"], onupdate="CASCADE", ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], onupdate="CASCADE", ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    _backfill(op.get_bind())
+    # Built after the backfill, which is cheaper than maintaining them row by row
+    op.create_index(
+        "ix_task_activities_task_created_at",
+        "task_activities",
+        ["task_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_task_activities_project_created_at",
+        "task_activities",
+        ["project_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_task_activities_project_created_at", table_name="task_activities")
+    op.drop_index("ix_task_activities_task_created_at", table_name="task_activities")
+    op.drop_table("task_activities")
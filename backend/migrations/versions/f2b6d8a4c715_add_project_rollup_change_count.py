@@ -0,0 +1,31 @@
+"""Add project rollup change count
+
+Revision ID: f2b6d8a4c715
+Revises: a5d2c8e4f913
+Create Date: 2026-10-16 23:58:12.316042
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b6d8a4c715"
+down_revision: Union[str, Sequence[str], None] = "a5d2c8e4f913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "project_rollups",
+        sa.Column("change_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("project_rollups", "change_count")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark login throughput (user_service.authenticate) under concurrency.
+
+Builds a throwaway SQLite database with N users, then fires logins from a
+thread pool the size of the FastAPI request threadpool, once with hashing
+inline in the request threads and once through the password process pool.
+Reports logins/s, p50/p95 latency and how many logins were shed with 429.
+
+Usage (from the backend directory):
+    python scripts/benchmark_login.py --logins 400 --concurrency 40 --workers 4
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Point the app at a throwaway database before importing it
+_DB_DIR = tempfile.mkdtemp(prefix="continuum-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'bench.db')}"
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from app.core.config import settings
+from app.core.password_pool import PasswordHasherPool
+from app.core.security import hash_password
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.dbmodels import User
+from app.services import user as user_service
+from fastapi import HTTPException
+
+# pylint: enable=wrong-import-position
+
+PASSWORD = "correct horse battery staple"
+
+
+def seed(db, count):
+    """Create users sharing one password hash (hashing is what is being measured)."""
+    hashed = hash_password(PASSWORD)
+    for i in range(count):
+        db.add(
+            User(
+                username=f"user{i}",
+                email=f"user{i}@example.com",
+                hashed_password=hashed,
+                display_name=f"User {i}",
+                first_name="User",
+                last_name=str(i),
+            )
+        )
+    db.commit()
+
+
+def login(index, users):
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        user = user_service.authenticate(db, f"user{index % users}@example.com", PASSWORD)
+        assert user is not None
+        return time.perf_counter() - started, False
+    except HTTPException as e:
+        if e.status_code != 429:
+            raise
+        return time.perf_counter() - started, True
+    finally:
+        db.close()
+
+
+def run(label, hasher, logins, users, concurrency):
+    user_service.password_hasher = hasher
+    if hasher.num_workers > 0:
+        login(0, users)  # Start the worker processes outside the measurement
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: login(i, users), range(logins)))
+    elapsed = time.perf_counter() - started
+    hasher.shutdown()
+
+    accepted = sorted(latency for latency, shed in results if not shed)
+    shed = sum(1 for _, was_shed in results if was_shed)
+    p95 = accepted[int(len(accepted) * 0.95) - 1] if accepted else 0.0
+    print(
+        f"{label:<10} {len(accepted) / elapsed:8.1f} logins/s  "
+        f"p50 {statistics.median(accepted) * 1000 if accepted else 0.0:7.1f} ms  "
+        f"p95 {p95 * 1000:7.1f} ms  {shed:5d} shed (429)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login throughput")
+    parser.add_argument("--logins", type=int, default=400, help="Total login attempts")
+    parser.add_argument("--users", type=int, default=50, help="Distinct users")
+    parser.add_argument("--concurrency", type=int, default=40, help="Concurrent request threads")
+    parser.add_argument(
+        "--workers", type=int, default=settings.PASSWORD_HASH_WORKERS, help="Hashing processes"
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=settings.PASSWORD_HASH_MAX_PENDING,
+        help="Pending hashing operations before shedding",
+    )
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db, args.users)
+    finally:
+        db.close()
+
+    timeout = settings.PASSWORD_HASH_TIMEOUT_SECONDS
+    run("inline", PasswordHasherPool(0, 0, timeout), args.logins, args.users, args.concurrency)
+    run(
+        "pool",
+        PasswordHasherPool(args.workers, args.max_pending, timeout),
+        args.logins,
+        args.users,
+        args.concurrency,
+    )
+
+
+if __name__ == "__main__":
+    main()
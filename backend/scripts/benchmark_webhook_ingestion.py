@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark webhook commit ingestion (WebhookService._process_commits).
+
+Builds a throwaway SQLite database, seeds a project with a few authors and
+replays a synthetic push of N commits twice: the first run inserts everything,
+the second run is a full redelivery where every commit is a duplicate.
+Reports wall time and SQL statement count for both runs.
+
+Usage (from the backend directory):
+    python scripts/benchmark_webhook_ingestion.py --commits 1000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Point the app at a throwaway database before importing it
+_DB_DIR = tempfile.mkdtemp(prefix="continuum-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'bench.db')}"
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.dbmodels import Client, Project, User
+from app.schemas.webhook import CommitInfo
+from app.services.webhook import WebhookService
+from sqlalchemy import event
+
+# pylint: enable=wrong-import-position
+
+AUTHORS = 3
+
+
+def seed(db):
+    """Create a project and a few registered authors."""
+    owner = User(
+        username="owner",
+        email="owner@example.com",
+        hashed_password="x",
+        display_name="Owner",
+        first_name="Owner",
+        last_name="User",
+    )
+    db.add(owner)
+    db.flush()
+    client = Client(name="Bench Client", created_by=owner.id)
+    db.add(client)
+    db.flush()
+    project = Project(name="Bench Project", client_id=client.id)
+    db.add(project)
+    for i in range(AUTHORS):
+        db.add(
+            User(
+                username=f"dev{i}",
+                email=f"Dev{i}@Example.com",
+                hashed_password="x",
+                display_name=f"Dev {i}",
+                first_name="Dev",
+                last_name=str(i),
+            )
+        )
+    db.commit()
+    return project.id
+
+
+def build_commits(count):
+    """Synthetic push: mostly registered authors, some unknown and no-reply ones."""
+    now = datetime.now(timezone.utc)
+    commits = []
+    for i in range(count):
+        if i % 10 == 8:
+            email = f"stranger{i}@elsewhere.org"
+        elif i % 10 == 9:
+            email = f"{i}+bot@users.noreply.github.com"
+        else:
+            email = f"dev{i % AUTHORS}@example.com"
+        commits.append(
+            CommitInfo(
+                hash=f"{i:040x}",
+                message=f"Commit {i}",
+                branch="main",
+                timestamp=now,
+                author_email=email,
+                author_name="Dev",
+                url=None,
+            )
+        )
+    return commits
+
+
+def run(project_id, commits, label):
+    statements = []
+
+    def count_statement(conn, cursor, statement, params, context, executemany):
+        # pylint: disable=unused-argument,too-many-arguments
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = WebhookService._process_commits(  # pylint: disable=protected-access
+            db, commits, project_id, "github", "https://github.com/acme/bench"
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    print(f"{label:<12} {elapsed * 1000:9.1f} ms  {len(statements):6d} statements  {result}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark webhook commit ingestion")
+    parser.add_argument("--commits", type=int, default=1000, help="Commits per push")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        project_id = seed(db)
+    finally:
+        db.close()
+
+    commits = build_commits(args.commits)
+    run(project_id, commits, "first push")
+    run(project_id, commits, "redelivery")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Move existing per-upload attachment files into the content-addressed blob store.
+
+Each legacy attachment (content_hash IS NULL) is hashed, linked to the shared
+blob for its content and its old file removed. Afterwards blob reference
+counts are reconciled against task_attachments and unreferenced blobs deleted.
+Safe to re-run; attachments already in the blob store are skipped.
+
+Usage (from the backend directory):
+    python scripts/migrate_attachments_to_blobs.py            # migrate + reconcile
+    python scripts/migrate_attachments_to_blobs.py --dry-run  # report only
+"""
+
+import argparse
+import os
+import sys
+
+# Add backend directory to path so we can import the app package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal  # pylint: disable=wrong-import-position
+from app.dbmodels import TaskAttachment  # pylint: disable=wrong-import-position
+from app.services.attachment_blob import (  # pylint: disable=wrong-import-position
+    AttachmentBlobService,
+)
+from app.utils.file_upload import (  # pylint: disable=wrong-import-position
+    ContentAddressedStorage,
+    delete_file,
+    get_storage_backend,
+)
+
+
+def migrate(db, storage: ContentAddressedStorage, dry_run: bool) -> dict:
+    stats = {"migrated": 0, "missing": 0, "failed": 0}
+    legacy_ids = [
+        row.id
+        for row in db.query(TaskAttachment.id)
+        .filter(TaskAttachment.content_hash.is_(None))
+        .order_by(TaskAttachment.id)
+    ]
+    print(f"Found {len(legacy_ids)} legacy attachment(s).")
+
+    for attachment_id in legacy_ids:
+        attachment = db.get(TaskAttachment, attachment_id)
+        if not storage.file_exists(attachment.file_path):
+            print(f"  #{attachment_id}: file missing ({attachment.file_path}), skipped")
+            stats["missing"] += 1
+            continue
+        if dry_run:
+            stats["migrated"] += 1
+            continue
+
+        old_path = attachment.file_path
+        staging_path, content_hash, size = storage.stage_file(old_path)
+        try:
+            attachment.file_path = AttachmentBlobService.acquire(
+                db, storage, staging_path, content_hash, size
+            )
+            attachment.content_hash = content_hash
+            attachment.file_size = size
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"  #{attachment_id}: failed ({e})")
+            stats["failed"] += 1
+            continue
+        finally:
+            storage.discard_staged(staging_path)
+
+        delete_file(old_path)
+        stats["migrated"] += 1
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate attachments into the blob store")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be migrated")
+    args = parser.parse_args()
+
+    if SessionLocal is None:
+        print("DATABASE_URL is not set.")
+        sys.exit(1)
+
+    storage = get_storage_backend()
+    if not isinstance(storage, ContentAddressedStorage):
+        print("ATTACHMENT_DEDUP_ENABLED is off; nothing to migrate.")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        stats = migrate(db, storage, args.dry_run)
+        action = "Would migrate" if args.dry_run else "Migrated"
+        print(
+            f"{action} {stats['migrated']} attachment(s); "
+            f"{stats['missing']} missing, {stats['failed']} failed."
+        )
+        if not args.dry_run:
+            reconciled = AttachmentBlobService.reconcile(db)
+            print(
+                f"Reconciled blobs: {reconciled['updated']} recounted, "
+                f"{reconciled['removed']} unreferenced removed."
+            )
+        print(AttachmentBlobService.get_stats(db))
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
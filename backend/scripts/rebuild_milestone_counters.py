@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Rebuild milestone task counters from the tasks table to reconcile drift.
+
+Usage (from the backend directory):
+    python scripts/rebuild_milestone_counters.py               # all projects
+    python scripts/rebuild_milestone_counters.py --project 12  # one or more projects
+"""
+
+import argparse
+import os
+import sys
+
+# Add backend directory to path so we can import the app package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal  # pylint: disable=wrong-import-position
+from app.services.milestone import MilestoneService  # pylint: disable=wrong-import-position
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild milestone task counters from tasks")
+    parser.add_argument(
+        "--project",
+        type=int,
+        action="append",
+        dest="project_ids",
+        help="Project ID to rebuild (repeatable). Defaults to all projects.",
+    )
+    args = parser.parse_args()
+
+    if SessionLocal is None:
+        print("DATABASE_URL is not set.")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        rebuilt, drifted = MilestoneService.rebuild_counters_all(db, args.project_ids)
+        print(
+            f"Rebuilt milestone counters for {rebuilt} project(s); "
+            f"{drifted} milestone(s) had drifted."
+        )
+    except Exception as e:
+        db.rollback()
+        print(f"Rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Shared test fixtures.
+
+Tests run the app against a throwaway SQLite database. DATABASE_URL is pointed
+at it before anything under app/ is imported, so the sync and async engines in
+app.db.session are both created on it; every test starts from empty tables.
+"""
+
+# pylint: disable=redefined-outer-name,wrong-import-position
+import os
+import re
+import tempfile
+from itertools import count
+
+_TEST_DIR = tempfile.mkdtemp(prefix="continuum-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_DIR, 'test.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.pop("DATABASE_REPLICA_URL", None)
+os.environ["WEBHOOK_WORKERS"] = "0"
+os.environ["UPLOAD_DIR"] = os.path.join(_TEST_DIR, "uploads")
+
+import pytest
+from app.core.config import settings
+from app.core.security import create_access_token, hash_password
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.dbmodels import Client, Project, ProjectMember, User, UserRole
+from app.main import app
+from app.services.principal_cache import client_principal_cache, user_principal_cache
+from app.services.project_rollup import ProjectRollupService
+from fastapi.testclient import TestClient
+
+_SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+_PASSWORD_HASH = hash_password("password")
+_sequence = count(1)
+
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    """Empty tables and principal caches for every test."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    user_principal_cache.clear()
+    client_principal_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(monkeypatch):
+    """Any request running more queries than its endpoint's @query_budget fails the test."""
+    monkeypatch.setattr(settings, "SQL_QUERY_BUDGET_STRICT", True)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    """Test client without the lifespan (no background workers)."""
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_user(db):
+    def _make_user(role: UserRole = UserRole.FRONTEND) -> User:
+        n = next(_sequence)
+        user = User(
+            username=f"user{n}",
+            email=f"user{n}@example.com",
+            hashed_password=_PASSWORD_HASH,
+            display_name=f"User {n}",
+            first_name="User",
+            last_name=str(n),
+            role=role,
+            is_verified=True,
+        )
+        db.add(user)
+        db.commit()
+        return user
+
+    return _make_user
+
+
+@pytest.fixture
+def make_project(db):
+    """Create a project (with its rollup) and add the given users as members."""
+
+    def _make_project(*members: User, owner: User = None) -> Project:
+        client_row = Client(name="Client", created_by=owner.id if owner else None)
+        db.add(client_row)
+        db.flush()
+        project = Project(name="Project", client_id=client_row.id)
+        db.add(project)
+        db.flush()
+        ProjectRollupService.create_empty(db, project.id)
+        db.add_all(ProjectMember(project_id=project.id, user_id=member.id) for member in members)
+        db.commit()
+        return project
+
+    return _make_project
+
+
+def auth_headers(user: User) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.id})}"}
+
+
+def query_count(response) -> int:
+    """Statements the request ran, from the Server-Timing header of QueryStatsMiddleware."""
+    return int(_SERVER_TIMING_QUERIES.search(response.headers["Server-Timing"]).group(1))
+
+
+@pytest.fixture
+def headers():
+    return auth_headers
+
+
+@pytest.fixture
+def queries():
+    return query_count
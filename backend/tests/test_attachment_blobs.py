@@ -0,0 +1,56 @@
+"""Blob files are only removed once the delete of their last reference is committed."""
+
+from app.dbmodels import AttachmentBlob, Task
+from app.services.attachment_blob import AttachmentBlobService
+from app.utils.file_upload import get_storage_backend
+
+
+def upload(client, headers, user, task_id, content=b"same bytes"):
+    response = client.post(
+        f"/api/v1/tasks/{task_id}/attachments",
+        files={"file": ("notes.txt", content, "text/plain")},
+        headers=headers(user),
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def make_task(db, project):
+    task = Task(project_id=project.id, title="Task")
+    db.add(task)
+    db.commit()
+    return task
+
+
+def test_rolled_back_release_keeps_the_file(db, client, make_user, make_project, headers):
+    user = make_user()
+    task = make_task(db, make_project(user))
+    attachment = upload(client, headers, user, task.id)
+    blob = db.query(AttachmentBlob).one()
+
+    assert AttachmentBlobService.release(db, blob.content_hash)
+    db.rollback()
+
+    assert get_storage_backend().file_exists(blob.file_path)
+    assert db.query(AttachmentBlob).one().ref_count == 1
+    assert attachment["uploader"]["id"] == user.id
+
+
+def test_delete_removes_the_file_after_the_last_reference(
+    db, client, make_user, make_project, headers
+):
+    user = make_user()
+    task = make_task(db, make_project(user))
+    first = upload(client, headers, user, task.id)
+    second = upload(client, headers, user, task.id)
+    blob = db.query(AttachmentBlob).one()
+    storage = get_storage_backend()
+
+    response = client.delete(f"/api/v1/attachments/{first['id']}", headers=headers(user))
+    assert response.status_code == 204
+    assert storage.file_exists(blob.file_path)
+
+    response = client.delete(f"/api/v1/attachments/{second['id']}", headers=headers(user))
+    assert response.status_code == 204
+    assert not storage.file_exists(blob.file_path)
+    assert db.query(AttachmentBlob).count() == 0
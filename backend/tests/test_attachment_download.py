@@ -0,0 +1,64 @@
+"""Attachment downloads stream the stored file and honour a single HTTP Range."""
+
+import pytest
+from app.dbmodels import Task
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def download(db, client, make_user, make_project, headers):
+    user = make_user()
+    task = Task(project_id=make_project(user).id, title="Task")
+    db.add(task)
+    db.commit()
+    response = client.post(
+        f"/api/v1/tasks/{task.id}/attachments",
+        files={"file": ("data.bin", CONTENT, "application/octet-stream")},
+        headers=headers(user),
+    )
+    assert response.status_code == 201, response.text
+    url = f"/api/v1/attachments/{response.json()['id']}/download"
+
+    def _download(range_header=None):
+        extra = {"Range": range_header} if range_header else {}
+        return client.get(url, headers={**headers(user), **extra})
+
+    return _download
+
+
+def test_full_download(download):
+    response = download()
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.headers["Content-Length"] == str(len(CONTENT))
+
+
+@pytest.mark.parametrize(
+    "range_header, start, end",
+    [("bytes=0-99", 0, 99), ("bytes=10000-", 10000, 10239), ("bytes=-40", 10200, 10239)],
+)
+def test_range_download(download, range_header, start, end):
+    response = download(range_header)
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[start : end + 1]
+    assert response.headers["Content-Range"] == f"bytes {start}-{end}/{len(CONTENT)}"
+    assert response.headers["Content-Length"] == str(end - start + 1)
+
+
+@pytest.mark.parametrize("range_header", ["bytes=abc", "items=0-10", "bytes=0-1,5-9"])
+def test_unsupported_range_serves_the_whole_file(download, range_header):
+    response = download(range_header)
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_unsatisfiable_range(download):
+    response = download(f"bytes={len(CONTENT)}-")
+
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(CONTENT)}"
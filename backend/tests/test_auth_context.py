@@ -0,0 +1,56 @@
+"""The request-scoped AuthContext answers access questions from one membership load."""
+
+import pytest
+from app.db.session import engine
+from app.dbmodels import LoggedHour, UserRole
+from app.services.auth_context import AuthContext
+from app.services.project_rollup import ProjectRollupService
+from sqlalchemy import event
+
+
+@pytest.mark.parametrize(
+    "viewer, expected", [("member", 200), ("admin", 200), ("outsider", 403), ("missing", 404)]
+)
+def test_project_hours_access(viewer, expected, db, client, make_user, make_project, headers):
+    member = make_user()
+    project = make_project(member)
+    db.add(LoggedHour(user_id=member.id, project_id=project.id, hours=2.5))
+    db.flush()
+    ProjectRollupService.rebuild(db, project.id)
+    db.commit()
+    users = {
+        "member": member,
+        "admin": make_user(role=UserRole.ADMIN),
+        "outsider": make_user(),
+        "missing": member,
+    }
+    project_id = 999 if viewer == "missing" else project.id
+
+    response = client.get(f"/api/v1/projects/{project_id}/hours", headers=headers(users[viewer]))
+
+    assert response.status_code == expected, response.text
+    if expected == 200:
+        body = response.json()
+        assert body["total_hours"] == 2.5
+        assert body["breakdown_per_user"] == [{"user_id": member.id, "total_hours": 2.5}]
+
+
+def test_bound_context_shares_loaded_memberships(db, make_user, make_project):
+    user = make_user()
+    project_id = make_project(user).id
+    auth = AuthContext(db, user)
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        bound = auth.bind(db)
+        assert bound.is_member(project_id)
+        assert auth.is_member(project_id)
+        assert auth.bind(db).member_project_ids() == {project_id}
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(statements) == 1
@@ -0,0 +1,82 @@
+"""Single and batch invoice generation share one builder and one numbering sequence."""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from app.core.config import settings
+from app.dbmodels import Invoice, InvoiceItem, LoggedHour
+
+PERIODS = {
+    2025: ("2025-12-01T00:00:00", "2025-12-31T23:59:59"),
+    2026: ("2026-01-01T00:00:00", "2026-01-31T23:59:59"),
+}
+
+
+@pytest.fixture
+def billable(db, make_user, make_project):
+    """A member with a rate and projects with hours in December 2025 and January 2026."""
+    user = make_user()
+    user.hourly_rate = Decimal("50.00")
+    projects = [make_project(user) for _ in range(3)]
+    for project in projects:
+        for logged_at in (datetime(2025, 12, 10), datetime(2026, 1, 10)):
+            db.add(
+                LoggedHour(user_id=user.id, project_id=project.id, hours=2.0, logged_at=logged_at)
+            )
+    db.commit()
+    return user, projects
+
+
+def entry(project, year):
+    start, end = PERIODS[year]
+    return {"project_id": project.id, "billing_period_start": start, "billing_period_end": end}
+
+
+def test_batch_numbers_are_consecutive_per_year_across_chunks(
+    billable, monkeypatch, db, client, make_project, headers
+):
+    monkeypatch.setattr(settings, "INVOICE_BATCH_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "INVOICE_BATCH_WORKERS", 1)
+    user, projects = billable
+    empty = make_project(user)
+    entries = [entry(project, year) for project in projects for year in (2025, 2026)]
+    entries.insert(3, entry(empty, 2026))
+
+    response = client.post(
+        "/api/v1/invoices/generate-batch", json={"invoices": entries}, headers=headers(user)
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["created"], body["failed"]) == (6, 1)
+    failed = body["results"][3]
+    assert failed["error"] == "No logged hours found for the specified billing period"
+    numbers = [item["invoice_number"] for item in body["results"] if item["success"]]
+    assert sorted(numbers) == [f"INV-{year}-{n:03d}" for year in (2025, 2026) for n in (1, 2, 3)]
+    assert all(Decimal(item["total"]) == 100 for item in body["results"] if item["success"])
+    assert db.query(InvoiceItem).count() == 6
+
+    # The single path continues the same sequence
+    response = client.post(
+        "/api/v1/invoices/generate", json=entry(projects[0], 2026), headers=headers(user)
+    )
+    assert response.status_code == 201, response.text
+    invoice = response.json()
+    assert invoice["invoice_number"] == "INV-2026-004"
+    assert Decimal(invoice["total"]) == 100
+    assert len(invoice["items"]) == 1
+
+
+def test_single_invoice_requires_hourly_rates(billable, db, client, headers):
+    user, projects = billable
+    user.hourly_rate = 0
+    db.commit()
+
+    response = client.post(
+        "/api/v1/invoices/generate", json=entry(projects[0], 2026), headers=headers(user)
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Users without hourly rates")
+    assert db.query(Invoice).count() == 0
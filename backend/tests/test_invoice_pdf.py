@@ -0,0 +1,97 @@
+"""Invoice PDFs are rendered once per snapshot, off the request path."""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from app.dbmodels import Invoice, InvoiceStatus, UserRole
+from app.services import invoice_pdf
+from app.services.invoice_pdf import invoice_pdf_renderer
+from app.utils.file_upload import get_storage_backend
+
+PDF_BYTES = b"%PDF-1.4 rendered"
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Replace the PDF engine and the background scheduling with recorders."""
+    rendered, scheduled = [], []
+
+    def fake_save(invoice, _project, _client=None, version=None):
+        path = f"invoices/invoice_{invoice.id}/{invoice.invoice_number}-{version}.pdf"
+        get_storage_backend().save_file(PDF_BYTES, path)
+        rendered.append(version)
+        return path
+
+    monkeypatch.setattr(invoice_pdf, "save_invoice_pdf", fake_save)
+    monkeypatch.setattr(invoice_pdf_renderer, "schedule", scheduled.append)
+    return rendered, scheduled
+
+
+@pytest.fixture
+def invoice(db, make_user, make_project):
+    # Only admins may change an invoice's status
+    user = make_user(role=UserRole.ADMIN)
+    project = make_project(user)
+    invoice = Invoice(
+        project_id=project.id,
+        invoice_number="INV-2026-0001",
+        status=InvoiceStatus.DRAFT,
+        billing_period_start=datetime(2026, 1, 1),
+        billing_period_end=datetime(2026, 1, 31),
+        subtotal=Decimal("100.00"),
+        tax_rate=Decimal("0"),
+        tax_amount=Decimal("0"),
+        total=Decimal("100.00"),
+        created_by=user.id,
+    )
+    db.add(invoice)
+    db.commit()
+    return invoice, user
+
+
+def test_pdf_is_rendered_once_per_snapshot(invoice, renders, client, headers):
+    invoice, user = invoice
+    rendered, scheduled = renders
+    url = f"/api/v1/invoices/{invoice.id}/pdf"
+
+    response = client.get(url, headers=headers(user))
+    assert response.status_code == 202
+    assert "Retry-After" in response.headers
+    assert scheduled == [invoice.id]
+
+    invoice_pdf_renderer._render(invoice.id)
+    invoice_pdf_renderer._render(invoice.id)
+    assert len(rendered) == 1
+
+    response = client.get(url, headers=headers(user))
+    assert response.status_code == 200
+    assert response.content == PDF_BYTES
+
+    # A status change is shown on the PDF, so the stored render is stale
+    response = client.put(
+        f"/api/v1/invoices/{invoice.id}", json={"status": "sent"}, headers=headers(user)
+    )
+    assert response.status_code == 200, response.text
+    response = client.get(url, headers=headers(user))
+    assert response.status_code == 202
+    invoice_pdf_renderer._render(invoice.id)
+    assert len(rendered) == 2
+
+
+def test_failed_render_is_reported_once(invoice, renders, monkeypatch, client, headers):
+    invoice, user = invoice
+
+    def broken_save(*_args, **_kwargs):
+        raise RuntimeError("no PDF engine")
+
+    monkeypatch.setattr(invoice_pdf, "save_invoice_pdf", broken_save)
+    invoice_pdf_renderer._render(invoice.id)
+    url = f"/api/v1/invoices/{invoice.id}/pdf"
+
+    response = client.get(url, headers=headers(user))
+    assert response.status_code == 500
+    assert "no PDF engine" in response.json()["detail"]
+
+    # The failure is cleared so the next download queues a retry
+    assert client.get(url, headers=headers(user)).status_code == 202
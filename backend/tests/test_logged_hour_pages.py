@@ -0,0 +1,82 @@
+"""The async logged-hours listing pages by keyset, with the offset fallback."""
+
+from datetime import datetime, timedelta
+
+from app.dbmodels import LoggedHour
+from app.utils.pagination import NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, TOTAL_COUNT_HEADER
+
+
+def log_hours(db, user, project, count):
+    start = datetime(2026, 1, 5, 10)
+    entries = [
+        LoggedHour(
+            user_id=user.id, project_id=project.id, hours=1.0, logged_at=start + timedelta(days=i)
+        )
+        for i in range(count)
+    ]
+    db.add_all(entries)
+    db.commit()
+    # Most recent first
+    return [entry.id for entry in reversed(entries)]
+
+
+def test_cursor_pages_cover_every_entry_once(db, client, make_user, make_project, headers):
+    user = make_user()
+    expected = log_hours(db, user, make_project(user), 5)
+
+    seen, cursor, pages = [], None, []
+    while True:
+        params = {"limit": 2, "include_total": "true"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/logged-hours/", params=params, headers=headers(user))
+        assert response.status_code == 200, response.text
+        assert response.headers[TOTAL_COUNT_HEADER] == "5"
+        pages.append(response)
+        seen += [entry["id"] for entry in response.json()]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    assert seen == expected
+    assert len(pages) == 3
+
+    # Stepping back from the last page returns the page before it
+    response = client.get(
+        "/api/v1/logged-hours/",
+        params={"limit": 2, "cursor": pages[-1].headers[PREV_CURSOR_HEADER]},
+        headers=headers(user),
+    )
+    assert [entry["id"] for entry in response.json()] == expected[2:4]
+
+
+def test_offset_fallback_counts_and_hands_over_a_cursor(
+    db, client, make_user, make_project, headers
+):
+    user = make_user()
+    expected = log_hours(db, user, make_project(user), 5)
+
+    response = client.get(
+        "/api/v1/logged-hours/", params={"limit": 2, "skip": 1}, headers=headers(user)
+    )
+
+    assert [entry["id"] for entry in response.json()] == expected[1:3]
+    assert response.headers[TOTAL_COUNT_HEADER] == "5"
+    assert response.headers["Deprecation"] == "true"
+    following = client.get(
+        "/api/v1/logged-hours/",
+        params={"limit": 2, "cursor": response.headers[NEXT_CURSOR_HEADER]},
+        headers=headers(user),
+    )
+    assert [entry["id"] for entry in following.json()] == expected[3:5]
+
+
+def test_only_own_entries_are_listed(db, client, make_user, make_project, headers):
+    user, other = make_user(), make_user()
+    project = make_project(user, other)
+    log_hours(db, other, project, 2)
+    expected = log_hours(db, user, project, 2)
+
+    response = client.get("/api/v1/logged-hours/", headers=headers(user))
+
+    assert [entry["id"] for entry in response.json()] == expected
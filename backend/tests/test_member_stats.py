@@ -0,0 +1,136 @@
+"""Member statistics cost a constant number of queries, whatever the project size."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from app.dbmodels import LoggedHour, ProjectRollup, Task
+from app.services.project_rollup import ProjectRollupService
+
+STATS_ENDPOINTS = [
+    "/api/v1/projects/{project_id}",
+    "/api/v1/projects/{project_id}/members",
+    "/api/v1/projects/{project_id}/stats",
+]
+
+
+def seed_project(db, make_user, make_project, member_count: int):
+    """A project whose members each have tasks in every status and logged hours."""
+    members = [make_user() for _ in range(member_count)]
+    project = make_project(*members)
+    overdue = datetime.now() - timedelta(days=1)
+    for member in members:
+        db.add_all(
+            [
+                Task(project_id=project.id, title="todo", status="todo", assigned_to=member.id),
+                Task(
+                    project_id=project.id,
+                    title="in progress",
+                    status="in_progress",
+                    assigned_to=member.id,
+                    due_date=overdue,
+                ),
+                Task(project_id=project.id, title="done", status="done", assigned_to=member.id),
+                LoggedHour(user_id=member.id, project_id=project.id, hours=1.5),
+            ]
+        )
+    # Direct inserts bypass the write paths that keep the rollup current
+    db.flush()
+    ProjectRollupService.rebuild(db, project.id)
+    db.commit()
+    return project, members[0]
+
+
+@pytest.mark.parametrize("path", STATS_ENDPOINTS)
+def test_member_stats_query_count_is_constant(
+    path, db, client, make_user, make_project, headers, queries
+):
+    counts = {}
+    for member_count in (5, 50):
+        project, viewer = seed_project(db, make_user, make_project, member_count)
+        response = client.get(path.format(project_id=project.id), headers=headers(viewer))
+        assert response.status_code == 200, response.text
+        counts[member_count] = queries(response)
+
+    assert counts[5] == counts[50]
+
+
+def test_member_stats_values(db, client, make_user, make_project, headers):
+    project, viewer = seed_project(db, make_user, make_project, 2)
+    # Finished late: done, so not overdue
+    db.add(
+        Task(
+            project_id=project.id,
+            title="done late",
+            status="done",
+            assigned_to=viewer.id,
+            due_date=datetime.now() - timedelta(days=3),
+        )
+    )
+    db.flush()
+    ProjectRollupService.rebuild(db, project.id)
+    db.commit()
+
+    response = client.get(f"/api/v1/projects/{project.id}/stats", headers=headers(viewer))
+
+    assert response.status_code == 200, response.text
+    stats = response.json()
+    assert (stats["total_tasks"], stats["total_completed_tasks"]) == (7, 3)
+    assert stats["total_overdue_tasks"] == 2
+    task_count = next(m["task_count"] for m in stats["members"] if m["user_id"] == viewer.id)
+    assert task_count == {
+        "hours_logged": "1.5",
+        "tasks_count": 4,
+        "completed_tasks_count": 2,
+        "in_progress_tasks_count": 1,
+        "todo_tasks_count": 1,
+        "overdue_tasks_count": 1,
+    }
+
+
+def test_project_stats_follow_task_writes(client, make_user, make_project, headers):
+    member = make_user()
+    project = make_project(member)
+    overdue = (datetime.now() - timedelta(days=1)).isoformat()
+    task_ids = []
+    for due_date in (overdue, None, None):
+        response = client.post(
+            "/api/v1/tasks/",
+            json={"title": "Task", "project_id": project.id, "due_date": due_date},
+            headers=headers(member),
+        )
+        assert response.status_code == 201, response.text
+        task_ids.append(response.json()["id"])
+    for task_id, task_status in zip(task_ids[1:], ("in_progress", "done")):
+        response = client.patch(
+            f"/api/v1/tasks/{task_id}/status", json={"status": task_status}, headers=headers(member)
+        )
+        assert response.status_code == 200, response.text
+
+    response = client.get(f"/api/v1/projects/{project.id}/stats", headers=headers(member))
+
+    assert response.status_code == 200, response.text
+    stats = response.json()
+    counts = [
+        stats[key]
+        for key in (
+            "total_tasks",
+            "total_todo_tasks",
+            "total_in_progress_tasks",
+            "total_completed_tasks",
+            "total_overdue_tasks",
+        )
+    ]
+    assert counts == [3, 1, 1, 1, 1]
+
+
+def test_missing_rollup_is_computed_without_writing(db, make_user, make_project):
+    project = make_project(make_user())
+    db.add(Task(project_id=project.id, title="done", status="done"))
+    db.query(ProjectRollup).filter(ProjectRollup.project_id == project.id).delete()
+    db.commit()
+
+    rollup = ProjectRollupService.get(db, project.id)
+
+    assert (rollup.total_tasks, rollup.done_tasks) == (1, 1)
+    assert rollup not in db
+    assert db.query(ProjectRollup).filter(ProjectRollup.project_id == project.id).count() == 0
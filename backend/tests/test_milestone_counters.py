@@ -0,0 +1,67 @@
+"""Milestone task counters are kept in step by every task write."""
+
+from app.dbmodels import Milestone, ProjectMember, UserRole
+from app.schemas.milestone import MilestoneStatus
+from app.services.milestone import MilestoneService
+
+COUNTERS = ("total_tasks", "todo_tasks", "in_progress_tasks", "done_tasks")
+
+
+def stored_counters(db, project_id):
+    db.expire_all()
+    milestones = db.query(Milestone).filter(Milestone.project_id == project_id)
+    return {
+        milestone.id: {field: getattr(milestone, field) for field in COUNTERS}
+        for milestone in milestones
+    }
+
+
+def test_counters_follow_task_create_move_and_delete(db, client, make_user, make_project, headers):
+    user = make_user()
+    project = make_project(user)
+    db.query(ProjectMember).filter(ProjectMember.user_id == user.id).update(
+        {ProjectMember.role: UserRole.PROJECTMANAGER.value}
+    )
+    milestones = [Milestone(project_id=project.id, name=name) for name in ("one", "two")]
+    db.add_all(milestones)
+    db.commit()
+    first, second = (milestone.id for milestone in milestones)
+    auth = headers(user)
+
+    def create(milestone_id, task_status="todo"):
+        response = client.post(
+            "/api/v1/tasks/",
+            json={
+                "title": "Task",
+                "project_id": project.id,
+                "milestone_id": milestone_id,
+                "status": task_status,
+            },
+            headers=auth,
+        )
+        assert response.status_code == 201, response.text
+        assert response.json()["milestone_id"] == milestone_id
+        return response.json()["id"]
+
+    def check():
+        assert stored_counters(db, project.id) == MilestoneService.compute_counters(db, project.id)
+
+    todo, done = create(first), create(first, "in_progress")
+    create(None)
+    check()
+    assert db.get(Milestone, first).status == MilestoneStatus.IN_PROGRESS.value
+
+    response = client.put(
+        f"/api/v1/tasks/{todo}", json={"milestone_id": second, "status": "done"}, headers=auth
+    )
+    assert response.status_code == 200, response.text
+    response = client.patch(f"/api/v1/tasks/{done}/status", json={"status": "done"}, headers=auth)
+    assert response.status_code == 200, response.text
+    check()
+    assert db.get(Milestone, second).status == MilestoneStatus.COMPLETED.value
+
+    response = client.delete(f"/api/v1/tasks/{todo}", headers=auth)
+    assert response.status_code == 204, response.text
+    check()
+    assert stored_counters(db, project.id)[second]["total_tasks"] == 0
+    assert db.get(Milestone, second).status == MilestoneStatus.NOT_STARTED.value
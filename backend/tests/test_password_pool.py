@@ -0,0 +1,61 @@
+"""Password hashing is bounded: bursts are shed with 429, outdated hashes upgraded on login."""
+
+import pytest
+from app.core.password_pool import PasswordHasherPool
+from app.core.security import pwd_context
+from app.services import user as user_service
+
+
+def login(client, user, password="password"):
+    return client.post("/api/v1/auth/login", json={"email": user.email, "password": password})
+
+
+@pytest.fixture
+def inline_hasher(monkeypatch):
+    """Hash in the request thread, as with PASSWORD_HASH_WORKERS=0."""
+    pool = PasswordHasherPool(num_workers=0, max_pending=1, timeout=5)
+    monkeypatch.setattr(user_service, "password_hasher", pool)
+    return pool
+
+
+def test_full_pool_sheds_logins_with_429(monkeypatch, client, make_user):
+    user = make_user()
+    # No free slot: the request is shed before any worker process is started
+    pool = PasswordHasherPool(num_workers=1, max_pending=0, timeout=5)
+    monkeypatch.setattr(user_service, "password_hasher", pool)
+
+    response = login(client, user)
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["pending"] == 0
+
+
+def test_login_rehashes_an_outdated_hash(inline_hasher, db, client, make_user):
+    user = make_user()
+    user.hashed_password = pwd_context.handler("pbkdf2_sha256").using(rounds=1000).hash("password")
+    db.commit()
+    old_hash = user.hashed_password
+
+    assert login(client, user).status_code == 200
+    db.refresh(user)
+    new_hash = user.hashed_password
+
+    assert new_hash != old_hash
+    assert not pwd_context.needs_update(new_hash)
+    assert pwd_context.verify("password", new_hash)
+
+    # Current hashes are left alone
+    assert login(client, user).status_code == 200
+    db.refresh(user)
+    assert user.hashed_password == new_hash
+
+
+@pytest.mark.usefixtures("inline_hasher")
+def test_wrong_password_is_rejected(client, make_user):
+    user = make_user()
+
+    response = login(client, user, password="wrong")
+
+    assert response.status_code == 401
@@ -0,0 +1,58 @@
+"""Pool telemetry: who holds connections, for how long, and how long callers wait."""
+
+import pytest
+from app.db import pool_monitor as pool_monitor_module
+from app.db.pool_monitor import MonitoredQueuePool, PoolMonitor
+from app.db.session import DATABASE_URL
+from app.dbmodels import UserRole
+from sqlalchemy import create_engine, exc
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    """A fresh monitor that also receives the pool wait timings."""
+    fresh = PoolMonitor(long_held_seconds=0.0)
+    monkeypatch.setattr(pool_monitor_module, "pool_monitor", fresh)
+    return fresh
+
+
+def test_checkouts_waits_and_timeouts_are_tracked(monitor):
+    engine = create_engine(
+        DATABASE_URL, poolclass=MonitoredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    monitor.instrument("test", engine)
+    try:
+        connection = engine.connect()
+        stats = monitor.stats()
+        assert stats["engines"]["test"]["checked_out"] == 1
+        assert [item["holder"] for item in stats["checked_out"]] == ["thread:MainThread"]
+
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        connection.close()
+    finally:
+        engine.dispose()
+
+    stats = monitor.stats()
+    assert stats["checked_out"] == []
+    assert stats["waits"]["count"] == 2
+    assert stats["waits"]["timeouts"] == 1
+    assert stats["waits"]["max_ms"] >= 50
+    # Every checkout counts as long-held with a zero threshold
+    assert [item["engine"] for item in stats["long_held"]] == ["test"]
+    assert [(item["holder"], item["checkouts"]) for item in stats["holders"]] == [
+        ("thread:MainThread", 1)
+    ]
+
+
+def test_admin_endpoint_reports_request_holders(client, make_user, headers):
+    admin = make_user(role=UserRole.ADMIN)
+
+    response = client.get("/api/v1/admin/db-pool", headers=headers(admin))
+
+    assert response.status_code == 200
+    assert "sync" in response.json()["engines"]
+    # Checkouts made while serving the request are tagged with its endpoint;
+    # other tests' routes may fill the endpoint's top 20, so read them all
+    holders = pool_monitor_module.pool_monitor.stats(top_holders=1000)["holders"]
+    assert "GET admin.db_pool_stats" in {item["holder"] for item in holders}
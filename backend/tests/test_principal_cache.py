@@ -0,0 +1,45 @@
+"""Principal cache entries are evicted when the write commits, not at flush."""
+
+from app.dbmodels import UserRole
+from app.services.principal_cache import credential_key, user_principal_cache
+
+
+def cache_user(user, token="token"):
+    user_principal_cache.set(credential_key(token), user)
+
+
+def is_cached(db, user, token="token"):
+    return user_principal_cache.get(db, credential_key(token), type(user)) is not None
+
+
+def test_update_evicts_on_commit(db, make_user):
+    user = make_user()
+    cache_user(user)
+
+    user.role = UserRole.ADMIN
+    db.flush()
+    assert is_cached(db, user)
+
+    db.commit()
+    assert not is_cached(db, user)
+
+
+def test_rolled_back_update_keeps_the_entry(db, make_user):
+    user = make_user()
+    cache_user(user)
+
+    user.role = UserRole.ADMIN
+    db.flush()
+    db.rollback()
+
+    assert is_cached(db, user)
+
+
+def test_load_started_before_an_invalidation_is_not_cached(make_user):
+    user = make_user()
+    generation = user_principal_cache.generation()
+    user_principal_cache.invalidate(user.id)
+
+    user_principal_cache.set(credential_key("token"), user, generation=generation)
+
+    assert user_principal_cache.stats()["size"] == 0
@@ -0,0 +1,86 @@
+"""The project feed merges its sources in the database and pages them by keyset."""
+
+from datetime import datetime
+
+from app.dbmodels import GitContribution, LoggedHour, Task
+from app.schemas.task_timeline import ActivityType
+from app.services.task_activity import TaskActivityService
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+NOON = datetime(2026, 1, 5, 12)
+
+
+def seed_tie(db, user, project):
+    """Three activities of each source sharing one timestamp, plus one hidden."""
+    task = Task(title="Task", project=project)
+    db.add(task)
+    db.flush()
+    for n in range(3):
+        TaskActivityService.record(
+            db,
+            task,
+            ActivityType.STATUS_CHANGED,
+            user.id,
+            {"task_id": task.id, "old_status": "todo", "new_status": f"step {n}"},
+            at=NOON,
+        )
+        db.add(LoggedHour(user_id=user.id, project_id=project.id, hours=1.0, logged_at=NOON))
+        db.add(
+            GitContribution(
+                user_id=user.id,
+                project_id=project.id,
+                commit_hash=f"abc{n}",
+                provider="github",
+                committed_at=NOON,
+                created_at=NOON,
+            )
+        )
+    hidden = TaskActivityService.record(
+        db, task, ActivityType.COMMENT_ADDED, user.id, {"content": "gone"}, source_id=1, at=NOON
+    )
+    hidden.deleted_at = NOON
+    db.commit()
+
+
+def read_pages(client, auth, url, **params):
+    seen, sizes, cursor = [], [], None
+    while True:
+        query = {"limit": 2, **params, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, params=query, headers=auth)
+        assert response.status_code == 200, response.text
+        seen += [entry["id"] for entry in response.json()]
+        sizes.append(len(response.json()))
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return seen, sizes
+
+
+def test_cursor_pages_split_a_timestamp_tie(db, client, make_user, make_project, headers):
+    user = make_user()
+    project = make_project(user)
+    seed_tie(db, user, project)
+    auth = headers(user)
+    url = f"/api/v1/projects/{project.id}/activity"
+
+    everything = client.get(url, headers=auth).json()
+    seen, sizes = read_pages(client, auth, url)
+
+    assert len(everything) == 9
+    assert not any(entry["id"].startswith("comment_added") for entry in everything)
+    assert seen == [entry["id"] for entry in everything]
+    assert sizes == [2, 2, 2, 2, 1]
+
+
+def test_type_filter_and_invalid_cursor(db, client, make_user, make_project, headers):
+    user = make_user()
+    project = make_project(user)
+    seed_tie(db, user, project)
+    auth = headers(user)
+    url = f"/api/v1/projects/{project.id}/activity"
+
+    seen, _ = read_pages(client, auth, url, types=ActivityType.HOURS_LOGGED.value)
+    assert len(seen) == 3
+    assert all(entry_id.startswith("hours_logged_") for entry_id in seen)
+
+    response = client.get(url, params={"cursor": "garbage"}, headers=auth)
+    assert response.status_code == 400
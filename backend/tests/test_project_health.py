@@ -0,0 +1,70 @@
+"""The single and bulk project health endpoints apply the same access rule."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from app.dbmodels import Task, UserRole
+
+
+def health_statuses(client, headers, user, project_id):
+    single = client.get(f"/api/v1/projects/{project_id}/health", headers=headers(user))
+    bulk = client.get(f"/api/v1/projects/health?ids={project_id}", headers=headers(user))
+    return single.status_code, bulk.status_code
+
+
+@pytest.mark.parametrize(
+    "viewer, expected",
+    [("member", 200), ("owner", 200), ("admin", 200), ("outsider", 403)],
+)
+def test_single_and_bulk_health_agree(viewer, expected, client, make_user, make_project, headers):
+    users = {
+        "member": make_user(),
+        "owner": make_user(),
+        "admin": make_user(role=UserRole.ADMIN),
+        "outsider": make_user(),
+    }
+    project = make_project(users["member"], owner=users["owner"])
+
+    assert health_statuses(client, headers, users[viewer], project.id) == (expected, expected)
+
+
+def test_bulk_health_requires_access_to_every_project(client, make_user, make_project, headers):
+    member = make_user()
+    own = make_project(member)
+    other = make_project(make_user())
+
+    response = client.get(
+        f"/api/v1/projects/health?ids={own.id},{other.id}", headers=headers(member)
+    )
+
+    assert response.status_code == 403
+
+
+def test_health_of_missing_project(client, make_user, headers):
+    user = make_user()
+
+    assert health_statuses(client, headers, user, 999) == (404, 404)
+
+
+def test_health_counts_done_tasks(db, client, make_user, make_project, headers):
+    member = make_user()
+    project = make_project(member)
+    past_due = datetime.now() - timedelta(days=2)
+    db.add_all(
+        [
+            Task(project_id=project.id, title="late", status="in_progress", due_date=past_due),
+            Task(project_id=project.id, title="done late", status="done", due_date=past_due),
+            Task(project_id=project.id, title="done", status="done", assigned_to=member.id),
+        ]
+    )
+    db.commit()
+
+    response = client.get(f"/api/v1/projects/{project.id}/health", headers=headers(member))
+
+    assert response.status_code == 200, response.text
+    health = response.json()
+    assert health["overdue_tasks"]["message"] == "1 overdue tasks"
+    assert health["activity_dropoff"]["details"] == {
+        "last_month_count": 2,
+        "previous_month_count": 0,
+    }
@@ -0,0 +1,142 @@
+"""
+Every endpoint with a @query_budget stays within it.
+
+Strict budgets are on for the whole suite (see conftest.strict_query_budgets),
+so a request over budget raises QueryBudgetExceeded out of the test client.
+These tests give each budgeted route a realistic amount of data, for a member
+and for an admin, and double as the measurement behind the declared numbers.
+"""
+
+import importlib
+import pkgutil
+
+import pytest
+from app.api.v1 import routes
+from app.api.v1.routes import logged_hours, projects, tasks
+from app.db.query_monitor import QueryBudgetExceeded
+from app.dbmodels import UserRole
+from app.services.principal_cache import user_principal_cache
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from fastapi import APIRouter
+
+BUDGETED_ENDPOINTS = {
+    projects.get_project_stats,
+    projects.get_project_activity,
+    logged_hours.list_logged_hours,
+    tasks.list_tasks,
+    tasks.get_task_timeline,
+}
+
+
+@pytest.fixture
+def activity(client, make_user, make_project, headers):
+    """A project with several members, tasks, comments and logged hours, created through the API."""
+    members = [make_user() for _ in range(3)]
+    admin = make_user(role=UserRole.ADMIN)
+    project = make_project(*members, admin)
+    task_ids = []
+    for member in members:
+        auth = headers(member)
+        for title in ("first", "second"):
+            response = client.post(
+                "/api/v1/tasks/",
+                json={"title": title, "project_id": project.id, "assigned_to": member.id},
+                headers=auth,
+            )
+            assert response.status_code == 201, response.text
+            task_id = response.json()["id"]
+            task_ids.append(task_id)
+            client.put(f"/api/v1/tasks/{task_id}", json={"status": "in_progress"}, headers=auth)
+            client.post(f"/api/v1/tasks/{task_id}/comments", json={"content": "hi"}, headers=auth)
+            response = client.post(
+                "/api/v1/logged-hours/",
+                json={
+                    "task_id": task_id,
+                    "project_id": project.id,
+                    "hours": "1.5",
+                    "description": "work",
+                    "date": "2026-01-05T10:00:00",
+                },
+                headers=auth,
+            )
+            assert response.status_code == 201, response.text
+    return {"project": project, "member": members[0], "admin": admin, "task_id": task_ids[0]}
+
+
+def budgeted_requests(activity):
+    project_id, task_id = activity["project"].id, activity["task_id"]
+    return [
+        f"/api/v1/projects/{project_id}/stats",
+        f"/api/v1/projects/{project_id}/activity",
+        "/api/v1/logged-hours/",
+        f"/api/v1/logged-hours/?project_id={project_id}",
+        "/api/v1/tasks/",
+        f"/api/v1/tasks/?project_id={project_id}&status=in_progress&include_total=true",
+        f"/api/v1/tasks/{task_id}/timeline",
+    ]
+
+
+def test_every_budgeted_route_is_covered():
+    declared = set()
+    for module_info in pkgutil.iter_modules(routes.__path__):
+        module = importlib.import_module(f"{routes.__name__}.{module_info.name}")
+        for router in vars(module).values():
+            if isinstance(router, APIRouter):
+                declared.update(
+                    route.endpoint
+                    for route in router.routes
+                    if hasattr(getattr(route, "endpoint", None), "query_budget")
+                )
+
+    assert declared == BUDGETED_ENDPOINTS
+
+
+@pytest.mark.parametrize("viewer", ["member", "admin"])
+def test_budgeted_routes_stay_within_budget(viewer, activity, client, headers):
+    user = activity[viewer]
+
+    for path in budgeted_requests(activity):
+        # Worst case: the user is not in the principal cache yet
+        user_principal_cache.clear()
+        # A request over budget raises QueryBudgetExceeded here
+        response = client.get(path, headers=headers(user))
+        assert response.status_code == 200, (path, response.text)
+
+
+@pytest.mark.parametrize("viewer", ["member", "admin"])
+def test_cursor_pages_stay_within_budget(viewer, activity, client, headers):
+    """Pages after the first may count the total in a separate query."""
+    user = activity[viewer]
+
+    for path in budgeted_requests(activity):
+        separator = "&" if "?" in path else "?"
+        response = client.get(f"{path}{separator}limit=1", headers=headers(user))
+        assert response.status_code == 200, (path, response.text)
+        body = response.json()
+        cursor = response.headers.get(NEXT_CURSOR_HEADER) or (
+            body.get("next_cursor") if isinstance(body, dict) else None
+        )
+        if cursor is None:
+            continue
+        user_principal_cache.clear()
+        response = client.get(path, params={"limit": 1, "cursor": cursor}, headers=headers(user))
+        assert response.status_code == 200, (path, response.text)
+
+
+@pytest.mark.parametrize(
+    "endpoint, path",
+    [
+        (tasks.list_tasks, "/api/v1/tasks/"),
+        (logged_hours.list_logged_hours, "/api/v1/logged-hours/"),
+        (projects.get_project_activity, "/api/v1/projects/{project_id}/activity"),
+    ],
+)
+def test_strict_mode_fails_requests_over_budget(
+    endpoint, path, monkeypatch, activity, client, headers
+):
+    monkeypatch.setattr(endpoint, "query_budget", 0)
+
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(
+            path.format(project_id=activity["project"].id), headers=headers(activity["member"])
+        )
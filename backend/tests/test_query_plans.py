@@ -0,0 +1,336 @@
+"""
+Query-plan regression checks for the hot filters (PostgreSQL only).
+
+Seeds synthetic projects, tasks, task activities, logged hours, commits and work
+sessions, runs ANALYZE, then EXPLAINs the queries of the services' hot paths
+and checks that each uses its index. Sequential scans are disabled, so a
+failure means the index cannot serve the query shape at all (dropped index,
+changed filter or ordering). Everything runs in one transaction that is rolled
+back, so the database is left as it was.
+
+Skipped unless TEST_POSTGRES_URL points to a PostgreSQL database; the schema
+is migrated to head there, or created inside the rolled-back transaction:
+
+    TEST_POSTGRES_URL=postgresql+psycopg://... pytest -m integration tests/test_query_plans.py
+"""
+
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from app.db.base import Base
+from app.dbmodels import (
+    Client,
+    GitContribution,
+    LoggedHour,
+    Project,
+    ProjectMember,
+    Task,
+    TaskActivity,
+    User,
+    WorkSession,
+    WorkSessionStatus,
+)
+from app.services.git_contribution import CONTRIBUTION_ORDER
+from app.services.logged_hour import LOGGED_HOUR_ORDER
+from app.services.member_stats import is_overdue
+from app.services.project_activity import FEED_TYPES, feed_keys
+from app.services.task_timeline import TIMELINE_ORDER
+from app.services.work_session import SESSION_ORDER
+from app.utils.pagination import Cursor, KeysetOrder
+from sqlalchemy import create_engine, func, insert, select
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"),
+]
+
+TASK_STATUSES = ["todo", "in_progress", "done"]
+
+SIZES = {
+    "users": 200,
+    "projects": 50,
+    "members_per_project": 10,
+    "tasks": 10000,
+    "activities": 50000,
+    "logged_hours": 50000,
+    "contributions": 20000,
+    "work_sessions": 20000,
+}
+
+
+def seed(conn, rng):
+    """Insert synthetic rows; returns (a project id, a user id, a task id)."""
+    now = datetime.now(timezone.utc)
+
+    def recent(days=365):
+        return now - timedelta(seconds=rng.randint(0, days * 86400))
+
+    user_ids = (
+        conn.execute(
+            insert(User).returning(User.id),
+            [
+                {
+                    "username": f"plan-check-{i}",
+                    "email": f"plan-check-{i}@example.com",
+                    "hashed_password": "x",
+                    "display_name": f"Plan Check {i}",
+                    "first_name": "Plan",
+                    "last_name": str(i),
+                }
+                for i in range(SIZES["users"])
+            ],
+        )
+        .scalars()
+        .all()
+    )
+    client_id = conn.execute(
+        insert(Client).returning(Client.id), {"name": "plan-check", "created_by": user_ids[0]}
+    ).scalar_one()
+    project_ids = (
+        conn.execute(
+            insert(Project).returning(Project.id),
+            [{"client_id": client_id, "name": f"plan-check-{i}"} for i in range(SIZES["projects"])],
+        )
+        .scalars()
+        .all()
+    )
+
+    members = {
+        project_id: rng.sample(user_ids, min(len(user_ids), SIZES["members_per_project"]))
+        for project_id in project_ids
+    }
+    conn.execute(
+        insert(ProjectMember),
+        [
+            {"project_id": project_id, "user_id": user_id}
+            for project_id, user_ids_ in members.items()
+            for user_id in user_ids_
+        ],
+    )
+
+    def member_pair():
+        project_id = rng.choice(project_ids)
+        return project_id, rng.choice(members[project_id])
+
+    tasks = []
+    for _ in range(SIZES["tasks"]):
+        project_id, user_id = member_pair()
+        tasks.append(
+            {
+                "project_id": project_id,
+                "title": "plan check",
+                "status": rng.choice(TASK_STATUSES),
+                "assigned_to": user_id if rng.random() < 0.8 else None,
+                "due_date": recent(60) + timedelta(days=30) if rng.random() < 0.3 else None,
+            }
+        )
+    task_rows = conn.execute(insert(Task).returning(Task.id, Task.project_id), tasks).all()
+
+    activities = []
+    for _ in range(SIZES["activities"]):
+        task_id, project_id = rng.choice(task_rows)
+        activities.append(
+            {
+                "task_id": task_id,
+                "project_id": project_id,
+                "activity_type": "status_changed",
+                "data": {},
+                "created_at": recent(),
+            }
+        )
+    conn.execute(insert(TaskActivity), activities)
+
+    logged_hours = []
+    for _ in range(SIZES["logged_hours"]):
+        project_id, user_id = member_pair()
+        logged_hours.append(
+            {"project_id": project_id, "user_id": user_id, "hours": 1.0, "logged_at": recent()}
+        )
+    conn.execute(insert(LoggedHour), logged_hours)
+
+    contributions = []
+    for i in range(SIZES["contributions"]):
+        project_id, user_id = member_pair()
+        contributions.append(
+            {
+                "project_id": project_id,
+                "user_id": user_id,
+                "commit_hash": f"plan-check-{i:040d}",
+                "provider": "github",
+                "created_at": recent(),
+            }
+        )
+    conn.execute(insert(GitContribution), contributions)
+
+    sessions = []
+    for _ in range(SIZES["work_sessions"]):
+        project_id, user_id = member_pair()
+        sessions.append(
+            {
+                "project_id": project_id,
+                "user_id": user_id,
+                "started_at": recent().replace(tzinfo=None),
+                "status": (
+                    WorkSessionStatus.ACTIVE if rng.random() < 0.02 else WorkSessionStatus.COMPLETED
+                ),
+            }
+        )
+    conn.execute(insert(WorkSession), sessions)
+
+    return project_ids[0], members[project_ids[0]][0], task_rows[0][0]
+
+
+def plan_checks(project_id, user_id, task_id):
+    """description -> (expected index, statement) for each hot query shape."""
+    now = datetime.now(timezone.utc)
+    cursor = Cursor(values=(now - timedelta(days=30), 2**31 - 1))
+    feed = feed_keys(project_id, FEED_TYPES)
+    feed_order = KeysetOrder((feed.c.timestamp, feed.c.rank, feed.c.source_id), descending=True)
+    checks = [
+        (
+            "logged hours of a project, newest first",
+            "ix_logged_hours_project_logged_at",
+            LOGGED_HOUR_ORDER.order_by(
+                select(LoggedHour).filter(LoggedHour.project_id == project_id)
+            ).limit(100),
+        ),
+        (
+            "logged hours of a user, next keyset page",
+            "ix_logged_hours_user_logged_at",
+            LOGGED_HOUR_ORDER.order_by(
+                LOGGED_HOUR_ORDER.seek(
+                    select(LoggedHour).filter(LoggedHour.user_id == user_id), cursor
+                )
+            ).limit(100),
+        ),
+        (
+            "hours of a user in a date range",
+            "ix_logged_hours_user_logged_at",
+            select(func.sum(LoggedHour.hours)).filter(
+                LoggedHour.user_id == user_id,
+                LoggedHour.logged_at >= now - timedelta(days=7),
+                LoggedHour.logged_at <= now,
+            ),
+        ),
+        (
+            "tasks of a project by status",
+            "ix_tasks_project_status",
+            select(Task).filter(Task.project_id == project_id, Task.status == "in_progress"),
+        ),
+        (
+            "tasks of a project by assignee",
+            "ix_tasks_project_assigned_to",
+            select(Task).filter(Task.project_id == project_id, Task.assigned_to == user_id),
+        ),
+        (
+            "overdue open tasks per project",
+            "ix_tasks_open_due_date",
+            select(Task.project_id, func.count())
+            .filter(Task.project_id.in_([project_id]), is_overdue(now))
+            .group_by(Task.project_id),
+        ),
+        (
+            "activity timeline of a task, next keyset page",
+            "ix_task_activities_task_created_at",
+            TIMELINE_ORDER.order_by(
+                TIMELINE_ORDER.seek(
+                    select(TaskActivity).filter(TaskActivity.task_id == task_id),
+                    Cursor(values=(now - timedelta(days=30), 0)),
+                )
+            ).limit(100),
+        ),
+        (
+            "activity feed of a project, next keyset page",
+            "ix_task_activities_project_created_at",
+            feed_order.order_by(
+                feed_order.seek(
+                    select(feed), Cursor(values=(now - timedelta(days=30), 0, 2**31 - 1))
+                )
+            ).limit(100),
+        ),
+        (
+            "git contributions of a project, newest first",
+            "ix_git_contributions_project_created_at",
+            CONTRIBUTION_ORDER.order_by(
+                select(GitContribution).filter(GitContribution.project_id == project_id)
+            ).limit(100),
+        ),
+        (
+            "active or paused work session of a user",
+            "ix_work_sessions_user_open",
+            select(WorkSession)
+            .filter(
+                WorkSession.user_id == user_id,
+                WorkSession.status.in_([WorkSessionStatus.ACTIVE, WorkSessionStatus.PAUSED]),
+            )
+            .limit(1),
+        ),
+        (
+            "work session history of a user, newest first",
+            "ix_work_sessions_user_started_at",
+            SESSION_ORDER.order_by(
+                select(WorkSession).filter(WorkSession.user_id == user_id)
+            ).limit(100),
+        ),
+        (
+            "user by case-insensitive email",
+            "ix_users_email_lower",
+            select(User).filter(func.lower(User.email) == "plan-check-1@example.com"),
+        ),
+    ]
+    return {description: (index, statement) for description, index, statement in checks}
+
+
+def explain(conn, statement):
+    sql = statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar_one()
+    return json.loads(plan) if isinstance(plan, str) else plan
+
+
+def index_names(node):
+    """All indexes used anywhere in an EXPLAIN (FORMAT JSON) plan tree."""
+    names = {node["Index Name"]} if "Index Name" in node else set()
+    for child in node.get("Plans", []):
+        names |= index_names(child)
+    return names
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    """A connection with the synthetic data, in a transaction rolled back afterwards."""
+    engine = create_engine(POSTGRES_URL)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            # Postgres DDL is transactional: a bare database gets the schema rolled back too
+            Base.metadata.create_all(conn)
+            ids = seed(conn, random.Random(42))
+            for table in (
+                "users",
+                "tasks",
+                "task_activities",
+                "logged_hours",
+                "git_contributions",
+                "work_sessions",
+            ):
+                conn.exec_driver_sql(f"ANALYZE {table}")
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            yield conn, ids
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("description", list(plan_checks(0, 0, 0)))
+def test_query_uses_its_index(description, seeded):
+    conn, ids = seeded
+    expected, statement = plan_checks(*ids)[description]
+
+    plan = explain(conn, statement)[0]["Plan"]
+
+    assert expected in index_names(plan), json.dumps(plan, indent=2)
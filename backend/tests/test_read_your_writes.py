@@ -0,0 +1,50 @@
+"""The read-your-writes marker is handed to clients whose request committed a write."""
+
+import time
+
+from app.db.replica import READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_HEADER, reads_from_primary
+from starlette.requests import Request
+
+
+def request_with(headers):
+    return Request(
+        {
+            "type": "http",
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        }
+    )
+
+
+def test_write_response_carries_the_marker(client, make_user, make_project, headers):
+    user = make_user()
+    project = make_project(user)
+
+    response = client.post(
+        "/api/v1/tasks/", json={"title": "Task", "project_id": project.id}, headers=headers(user)
+    )
+
+    assert response.status_code == 201, response.text
+    marker = response.headers[READ_YOUR_WRITES_HEADER]
+    assert response.cookies[READ_YOUR_WRITES_COOKIE] == marker
+    assert float(marker) > time.time()
+
+
+def test_read_response_has_no_marker(client, make_user, make_project, headers):
+    user = make_user()
+    project = make_project(user)
+
+    response = client.get(f"/api/v1/projects/{project.id}", headers=headers(user))
+
+    assert response.status_code == 200
+    assert READ_YOUR_WRITES_HEADER not in response.headers
+    assert "set-cookie" not in response.headers
+
+
+def test_reads_from_primary_until_the_marker_expires():
+    future, past = f"{time.time() + 5:.3f}", f"{time.time() - 1:.3f}"
+
+    assert reads_from_primary(request_with({READ_YOUR_WRITES_HEADER: future}))
+    assert reads_from_primary(request_with({"Cookie": f"{READ_YOUR_WRITES_COOKIE}={future}"}))
+    assert not reads_from_primary(request_with({READ_YOUR_WRITES_HEADER: past}))
+    assert not reads_from_primary(request_with({READ_YOUR_WRITES_HEADER: "garbage"}))
+    assert not reads_from_primary(request_with({}))
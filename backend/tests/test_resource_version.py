@@ -0,0 +1,203 @@
+"""Project versions come from the maintained change counter; task timelines from their activities."""
+
+from datetime import datetime
+
+from app.db.session import engine
+from app.dbmodels import LoggedHour, Milestone, ProjectMember, Repository, Task
+from app.schemas.webhook import GitHubPushPayload
+from app.services.resource_version import ResourceVersionService
+from app.services.webhook import WebhookService
+from sqlalchemy import event
+
+
+def version(db, project):
+    project_id = project.id
+    db.expire_all()
+    return ResourceVersionService.get_project_version(db, project_id).version
+
+
+def test_writes_change_the_version(db, make_user, make_project):
+    user, other = make_user(), make_user()
+    project = make_project(user)
+    seen = {version(db, project)}
+
+    task = Task(title="Task", project=project, status="todo")
+    db.add(task)
+    db.commit()
+    seen.add(version(db, project))
+
+    entry = LoggedHour(
+        user_id=user.id, project_id=project.id, hours=1.0, logged_at=datetime(2026, 1, 5)
+    )
+    db.add(entry)
+    db.commit()
+    seen.add(version(db, project))
+
+    # An edit that moves no rollup counter
+    entry.note = "edited"
+    db.commit()
+    seen.add(version(db, project))
+
+    db.add(ProjectMember(project_id=project.id, user_id=other.id))
+    db.commit()
+    seen.add(version(db, project))
+
+    db.add(Milestone(project_id=project.id, name="M1"))
+    db.commit()
+    seen.add(version(db, project))
+
+    db.delete(task)
+    db.commit()
+    seen.add(version(db, project))
+
+    assert len(seen) == 7
+
+
+def test_moving_a_row_changes_both_projects(db, make_user, make_project):
+    user = make_user()
+    source, target = make_project(user), make_project(user)
+    entry = LoggedHour(
+        user_id=user.id, project_id=source.id, hours=1.0, logged_at=datetime(2026, 1, 5)
+    )
+    db.add(entry)
+    db.commit()
+    before = version(db, source), version(db, target)
+
+    # Loaded first, as the update path does, so the old project is known
+    assert entry.project_id == source.id
+    entry.project_id = target.id
+    db.commit()
+
+    after = version(db, source), version(db, target)
+    assert before[0] != after[0] and before[1] != after[1]
+
+
+def test_other_projects_and_reads_keep_the_version(db, make_user, make_project):
+    user = make_user()
+    project, other = make_project(user), make_project(user)
+    before = version(db, project)
+
+    db.add(Task(title="Elsewhere", project_id=other.id, status="todo"))
+    db.commit()
+    db.query(Task).all()
+
+    assert version(db, project) == before
+
+
+def test_version_is_a_single_lookup(db, make_user, make_project):
+    project_id = make_project(make_user()).id
+    statements = []
+
+    def count(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        ResourceVersionService.get_project_version(db, project_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(statements) == 1
+
+
+def test_webhook_push_changes_the_version(db, make_user, make_project):
+    user = make_user()
+    project = make_project(user)
+    url = "https://github.com/acme/app"
+    db.add(
+        Repository(
+            project_id=project.id, repository_url=url, repository_name="acme/app", provider="github"
+        )
+    )
+    db.commit()
+    payload = GitHubPushPayload(
+        ref="refs/heads/main",
+        commits=[
+            {"sha": f"{n:040x}", "message": "work", "author": {"email": user.email}} for n in (1, 2)
+        ],
+        repository={"clone_url": url, "full_name": "acme/app"},
+    )
+    before = version(db, project)
+
+    result = WebhookService.process_github_push(db, payload)
+
+    assert result["created"] == 2
+    after = version(db, project)
+    assert after != before
+
+    # A redelivery inserts nothing and leaves the version alone
+    WebhookService.process_github_push(db, payload)
+    assert version(db, project) == after
+
+
+def test_async_stats_and_progress_revalidate(client, make_user, make_project, headers):
+    member, owner = make_user(), make_user()
+    project = make_project(member, owner=owner)
+    urls = {
+        member: f"/api/v1/projects/{project.id}/stats",
+        owner: f"/api/v1/client-portal/projects/{project.id}/progress",
+    }
+    etags = {}
+    for user, url in urls.items():
+        response = client.get(url, headers=headers(user))
+        assert response.status_code == 200, response.text
+        etags[user] = response.headers["ETag"]
+        cached = client.get(url, headers={**headers(user), "If-None-Match": etags[user]})
+        assert cached.status_code == 304
+
+    response = client.post(
+        "/api/v1/tasks/", json={"title": "Task", "project_id": project.id}, headers=headers(member)
+    )
+    assert response.status_code == 201, response.text
+
+    for user, url in urls.items():
+        response = client.get(url, headers={**headers(user), "If-None-Match": etags[user]})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etags[user]
+    assert response.json()["total_tasks"] == 1
+
+
+def test_task_timeline_version_ignores_other_tasks(db, client, make_user, make_project, headers):
+    user = make_user()
+    project = make_project(user)
+    task, other = Task(title="Task", project=project), Task(title="Other", project=project)
+    db.add_all([task, other])
+    db.commit()
+    url = f"/api/v1/tasks/{task.id}/timeline"
+
+    def comment(task_id, content):
+        response = client.post(
+            f"/api/v1/tasks/{task_id}/comments", json={"content": content}, headers=headers(user)
+        )
+        assert response.status_code == 201, response.text
+        return response.json()["id"]
+
+    def revalidate(etag):
+        return client.get(url, headers={**headers(user), "If-None-Match": etag})
+
+    etag = client.get(url, headers=headers(user)).headers["ETag"]
+    comment(other.id, "elsewhere")
+    response = client.post(
+        "/api/v1/logged-hours/",
+        json={
+            "project_id": project.id,
+            "hours": "1",
+            "description": "work",
+            "date": "2026-01-05T10:00:00",
+        },
+        headers=headers(user),
+    )
+    assert response.status_code == 201, response.text
+    assert revalidate(etag).status_code == 304
+
+    comment_id = comment(task.id, "here")
+    response = revalidate(etag)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    # Rewritten snapshots change the version too
+    response = client.put(
+        f"/api/v1/comments/{comment_id}", json={"content": "edited"}, headers=headers(user)
+    )
+    assert response.status_code == 200, response.text
+    assert revalidate(etag).status_code == 200
@@ -0,0 +1,169 @@
+"""Edits and deletes of comments, attachments and logged hours reach the activity log."""
+
+import pytest
+from app.dbmodels import Task
+
+
+@pytest.fixture
+def task_setup(db, make_user, make_project):
+    user = make_user()
+    project = make_project(user)
+    tasks = [Task(project_id=project.id, title=title, assigned_to=user.id) for title in "ab"]
+    db.add_all(tasks)
+    db.commit()
+    return user, project, tasks
+
+
+def timeline(client, headers, user, task_id):
+    response = client.get(f"/api/v1/tasks/{task_id}/timeline", headers=headers(user))
+    assert response.status_code == 200, response.text
+    return {entry["id"]: entry for entry in response.json()["activities"]}
+
+
+def feed_ids(client, headers, user, project_id):
+    response = client.get(f"/api/v1/projects/{project_id}/activity", headers=headers(user))
+    assert response.status_code == 200, response.text
+    return {entry["id"] for entry in response.json()}
+
+
+def test_comment_edit_and_delete(task_setup, client, headers):
+    user, project, (task, _) = task_setup
+    comment = client.post(
+        f"/api/v1/tasks/{task.id}/comments", json={"content": "first"}, headers=headers(user)
+    ).json()
+    entry_id = f"comment_added_{comment['id']}"
+
+    response = client.put(
+        f"/api/v1/comments/{comment['id']}", json={"content": "second"}, headers=headers(user)
+    )
+    assert response.status_code == 200, response.text
+    assert timeline(client, headers, user, task.id)[entry_id]["data"]["content"] == "second"
+
+    etag = client.get(f"/api/v1/tasks/{task.id}/timeline", headers=headers(user)).headers["ETag"]
+    response = client.delete(f"/api/v1/comments/{comment['id']}", headers=headers(user))
+    assert response.status_code == 204, response.text
+
+    assert entry_id not in timeline(client, headers, user, task.id)
+    assert entry_id not in feed_ids(client, headers, user, project.id)
+    response = client.get(
+        f"/api/v1/tasks/{task.id}/timeline", headers={**headers(user), "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
+def test_attachment_delete(task_setup, client, headers):
+    user, project, (task, _) = task_setup
+    attachment = client.post(
+        f"/api/v1/tasks/{task.id}/attachments",
+        files={"file": ("notes.txt", b"notes", "text/plain")},
+        headers=headers(user),
+    ).json()
+    entry_id = f"attachment_uploaded_{attachment['id']}"
+    assert entry_id in timeline(client, headers, user, task.id)
+
+    response = client.delete(f"/api/v1/attachments/{attachment['id']}", headers=headers(user))
+    assert response.status_code == 204, response.text
+
+    assert entry_id not in timeline(client, headers, user, task.id)
+    assert entry_id not in feed_ids(client, headers, user, project.id)
+
+
+def test_logged_hour_edit_move_and_delete(task_setup, client, headers):
+    user, project, (task, other_task) = task_setup
+    logged_hour = client.post(
+        "/api/v1/logged-hours/",
+        json={
+            "task_id": task.id,
+            "project_id": project.id,
+            "hours": "1.5",
+            "description": "work",
+            "date": "2026-01-05T10:00:00",
+        },
+        headers=headers(user),
+    ).json()
+    entry_id = f"hours_logged_{logged_hour['id']}"
+    url = f"/api/v1/logged-hours/{logged_hour['id']}"
+
+    response = client.put(url, json={"hours": "2.5"}, headers=headers(user))
+    assert response.status_code == 200, response.text
+    assert timeline(client, headers, user, task.id)[entry_id]["data"]["hours"] == 2.5
+
+    response = client.put(
+        url, json={"task_id": other_task.id, "project_id": project.id}, headers=headers(user)
+    )
+    assert response.status_code == 200, response.text
+    assert entry_id not in timeline(client, headers, user, task.id)
+    assert timeline(client, headers, user, other_task.id)[entry_id]["data"]["hours"] == 2.5
+
+    response = client.delete(url, headers=headers(user))
+    assert response.status_code == 204, response.text
+    assert entry_id not in timeline(client, headers, user, other_task.id)
+    assert entry_id not in feed_ids(client, headers, user, project.id)
+
+
+def test_commit_move_unlink_and_relink(task_setup, client, headers):
+    user, project, (task, other_task) = task_setup
+    commit = client.post(
+        "/api/v1/git-contributions/",
+        json={
+            "user_id": user.id,
+            "project_id": project.id,
+            "task_id": task.id,
+            "commit_hash": "abc123",
+            "commit_message": "Fix it",
+            "provider": "github",
+        },
+        headers=headers(user),
+    ).json()
+    entry_id = f"commit_linked_{commit['id']}"
+    url = f"/api/v1/git-contributions/{commit['id']}"
+    assert entry_id in timeline(client, headers, user, task.id)
+
+    response = client.put(url, json={"commit_message": "Fix it properly"}, headers=headers(user))
+    assert response.status_code == 200, response.text
+    entry = timeline(client, headers, user, task.id)[entry_id]
+    assert entry["data"]["commit_message"] == "Fix it properly"
+
+    response = client.patch(
+        f"{url}/link-task", params={"task_id": other_task.id}, headers=headers(user)
+    )
+    assert response.status_code == 200, response.text
+    assert entry_id not in timeline(client, headers, user, task.id)
+    assert entry_id in timeline(client, headers, user, other_task.id)
+
+    response = client.put(url, json={"task_id": None}, headers=headers(user))
+    assert response.status_code == 200, response.text
+    assert entry_id not in timeline(client, headers, user, other_task.id)
+
+    # Relinking shows the commit once
+    response = client.patch(f"{url}/link-task", params={"task_id": task.id}, headers=headers(user))
+    assert response.status_code == 200, response.text
+    response = client.get(f"/api/v1/tasks/{task.id}/timeline", headers=headers(user))
+    ids = [entry["id"] for entry in response.json()["activities"]]
+    assert ids.count(entry_id) == 1
+
+
+def test_backdated_hours_are_listed_after_pages_already_read(task_setup, client, headers):
+    user, project, (task, _) = task_setup
+    auth = headers(user)
+    url = f"/api/v1/tasks/{task.id}/timeline"
+    client.post(f"/api/v1/tasks/{task.id}/comments", json={"content": "first"}, headers=auth)
+    page = client.get(url, params={"limit": 1}, headers=auth).json()
+    assert page["next_cursor"] is None
+
+    logged_hour = client.post(
+        "/api/v1/logged-hours/",
+        json={
+            "task_id": task.id,
+            "project_id": project.id,
+            "hours": "1",
+            "description": "last year",
+            "date": "2025-01-05T10:00:00",
+        },
+        headers=auth,
+    ).json()
+    # Stamped when recorded, so it follows the page read before it was added
+    activities = client.get(url, headers=auth).json()["activities"]
+    assert activities[0]["id"] == page["activities"][0]["id"]
+    assert activities[-1]["id"] == f"hours_logged_{logged_hour['id']}"
+    assert activities[-1]["data"]["date"].startswith("2025-01-05")
@@ -0,0 +1,70 @@
+"""Task lists are scoped to the user's projects in SQL, so every page is full."""
+
+from app.dbmodels import Task, UserRole
+from app.utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+
+
+def make_tasks(db, project, count):
+    tasks = [Task(project_id=project.id, title=f"Task {n}") for n in range(count)]
+    db.add_all(tasks)
+    db.commit()
+    return [task.id for task in tasks]
+
+
+def list_pages(client, headers, user, **params):
+    seen, cursor, sizes, total = [], None, [], None
+    while True:
+        query = {"limit": 3, "include_total": "true", **params}
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get("/api/v1/tasks/", params=query, headers=headers(user))
+        assert response.status_code == 200, response.text
+        seen.extend(task["id"] for task in response.json())
+        sizes.append(len(response.json()))
+        total = response.headers.get(TOTAL_COUNT_HEADER, total)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return seen, sizes, total
+
+
+def test_member_pages_only_hold_their_projects(db, client, make_user, make_project, headers):
+    member = make_user()
+    own, other = make_project(member), make_project(make_user())
+    # Interleave foreign tasks so a post-filter would leave holes in the pages
+    expected = []
+    for _ in range(4):
+        expected += make_tasks(db, own, 2)
+        make_tasks(db, other, 3)
+
+    seen, sizes, total = list_pages(client, headers, member)
+
+    assert seen == expected
+    assert sizes[:-1] == [3] * (len(sizes) - 1)
+    assert int(total) == len(expected)
+
+
+def test_admin_sees_every_project(db, client, make_user, make_project, headers):
+    admin = make_user(role=UserRole.ADMIN)
+    expected = make_tasks(db, make_project(make_user()), 4) + make_tasks(
+        db, make_project(make_user()), 3
+    )
+
+    seen, _, total = list_pages(client, headers, admin)
+
+    assert seen == expected
+    assert int(total) == 7
+
+
+def test_filtering_on_a_foreign_project_finds_nothing(db, client, make_user, make_project, headers):
+    member = make_user()
+    make_project(member)
+    other = make_project(make_user())
+    make_tasks(db, other, 2)
+
+    response = client.get(
+        "/api/v1/tasks/", params={"project_id": other.id}, headers=headers(member)
+    )
+
+    assert response.status_code == 200
+    assert response.json() == []
+    assert NEXT_CURSOR_HEADER not in response.headers
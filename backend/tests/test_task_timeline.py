@@ -0,0 +1,68 @@
+"""The task timeline is paged in the database by a (created_at, id) cursor."""
+
+from datetime import datetime, timezone
+
+from app.dbmodels import Task
+from app.schemas.task_timeline import ActivityType
+from app.services.task_activity import TaskActivityService
+
+NOON = datetime(2026, 1, 5, 12, tzinfo=timezone.utc)
+
+
+def record_status(db, task, n, at, user_id=None):
+    return TaskActivityService.record(
+        db,
+        task,
+        ActivityType.STATUS_CHANGED,
+        user_id,
+        {"task_id": task.id, "old_status": "todo", "new_status": f"step {n}"},
+        at=at,
+    )
+
+
+def test_pages_follow_the_cursor_across_timestamp_ties(
+    db, client, make_user, make_project, headers
+):
+    user = make_user()
+    project = make_project(user)
+    task, other = Task(title="Task", project=project), Task(title="Other", project=project)
+    db.add_all([task, other])
+    db.flush()
+    # Seven activities sharing one timestamp, so pages split inside the tie
+    activities = [record_status(db, task, n, NOON, user.id) for n in range(7)]
+    activities.append(record_status(db, task, 7, datetime(2026, 1, 6, tzinfo=timezone.utc)))
+    hidden = record_status(db, task, 8, NOON)
+    hidden.deleted_at = NOON
+    record_status(db, other, 9, NOON)
+    db.commit()
+    expected = [f"status_changed_{activity.id}" for activity in activities]
+
+    auth = headers(user)
+    seen, sizes, cursor = [], [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/api/v1/tasks/{task.id}/timeline", params=params, headers=auth)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["total"] == len(expected)
+        seen += [entry["id"] for entry in body["activities"]]
+        sizes.append(len(body["activities"]))
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert sizes == [3, 3, 2]
+
+
+def test_invalid_cursor_is_rejected(db, client, make_user, make_project, headers):
+    user = make_user()
+    task = Task(title="Task", project=make_project(user))
+    db.add(task)
+    db.commit()
+
+    response = client.get(
+        f"/api/v1/tasks/{task.id}/timeline", params={"cursor": "garbage"}, headers=headers(user)
+    )
+
+    assert response.status_code == 400
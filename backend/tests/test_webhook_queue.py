@@ -0,0 +1,100 @@
+"""Webhook receivers validate before queueing; workers claim, retry and fail deliveries."""
+
+import hashlib
+import hmac
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from app.core.config import settings
+from app.dbmodels import WebhookDelivery, WebhookDeliveryStatus
+from app.schemas.webhook import GitHubPushPayload
+from app.services.webhook_queue import PROVIDER_HANDLERS, WebhookQueue
+
+SECRET = "webhook-secret"
+
+PUSH = {
+    "ref": "refs/heads/main",
+    "commits": [{"sha": "a" * 40, "message": "work", "author": {"email": "dev@example.com"}}],
+    "repository": {"clone_url": "https://github.com/acme/unlinked", "full_name": "acme/unlinked"},
+}
+
+
+@pytest.fixture(autouse=True)
+def github_secret(monkeypatch):
+    monkeypatch.setattr(settings, "GITHUB_WEBHOOK_SECRET", SECRET)
+
+
+def post_github(client, body: bytes, delivery_id: str):
+    signature = hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return client.post(
+        "/api/v1/webhooks/github",
+        content=body,
+        headers={
+            "X-Hub-Signature-256": f"sha256={signature}",
+            "X-GitHub-Event": "push",
+            "X-GitHub-Delivery": delivery_id,
+        },
+    )
+
+
+def claim(db):
+    delivery = WebhookQueue.claim_next(db)
+    assert delivery is not None
+    return delivery
+
+
+def test_push_is_queued_once(db, client):
+    body = json.dumps(PUSH).encode()
+
+    first = post_github(client, body, "delivery-1")
+    again = post_github(client, body, "delivery-1")
+
+    assert first.status_code == 202, first.text
+    assert (first.json()["status"], first.json()["duplicate"]) == ("pending", False)
+    assert (again.status_code, again.json()["duplicate"]) == (202, True)
+    assert db.query(WebhookDelivery).count() == 1
+
+
+def test_malformed_push_is_rejected_before_queueing(db, client):
+    response = post_github(client, json.dumps({"ref": "refs/heads/main"}).encode(), "delivery-2")
+
+    assert response.status_code == 400, response.text
+    assert db.query(WebhookDelivery).count() == 0
+
+
+def test_failed_delivery_is_retried_with_backoff(db, monkeypatch):
+    def failing_push(_db, _payload):
+        raise RuntimeError("provider API down")
+
+    monkeypatch.setitem(PROVIDER_HANDLERS, "github", (GitHubPushPayload, failing_push))
+    monkeypatch.setattr(settings, "WEBHOOK_MAX_ATTEMPTS", 2)
+    WebhookQueue.enqueue(db, "github", "delivery-3", "push", json.dumps(PUSH).encode())
+
+    delivery = claim(db)
+    assert (delivery.status, delivery.attempts) == (WebhookDeliveryStatus.PROCESSING, 1)
+    WebhookQueue.process(db, delivery)
+
+    assert delivery.status == WebhookDeliveryStatus.PENDING
+    assert delivery.last_error == "provider API down"
+    # Backing off: not due yet
+    assert WebhookQueue.claim_next(db) is None
+
+    delivery.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+    delivery = claim(db)
+    assert delivery.attempts == 2
+    WebhookQueue.process(db, delivery)
+
+    assert delivery.status == WebhookDeliveryStatus.FAILED
+    assert WebhookQueue.claim_next(db) is None
+
+
+def test_unlinked_repository_fails_without_retry(db):
+    WebhookQueue.enqueue(db, "github", "delivery-4", "push", json.dumps(PUSH).encode())
+
+    delivery = claim(db)
+    WebhookQueue.process(db, delivery)
+
+    assert (delivery.status, delivery.attempts) == (WebhookDeliveryStatus.FAILED, 1)
+    assert "not linked" in delivery.last_error